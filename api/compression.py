@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Compression des réponses (gzip, brotli si le module est installé) et gestion des ETags.
+
+- CompressionMiddleware : compresse les réponses au-delà d'un seuil de taille
+  (BARREL_COMPRESSION_MIN_SIZE, 1024 octets par défaut) selon Accept-Encoding ;
+  les réponses en flux (StreamingResponse) sont compressées au fil de l'eau.
+  Une réponse compressée reçoit un ETag suffixé par l'encodage (« "...-gzip" »),
+  chaque représentation ayant ainsi son propre ETag fort ; un 304 reçoit l'ETag de la
+  représentation détenue par le client (suffixé, sauf si If-None-Match cite l'ETag nu).
+  Toute réponse négociable (sans Content-Encoding posé par l'application) porte
+  Vary: Accept-Encoding, qu'elle soit compressée ou non.
+- etag_matches : compare If-None-Match à un ETag en ignorant ce suffixe.
+"""
+
+import os
+import zlib
+from typing import List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    brotli = None
+
+DEFAULT_MIN_SIZE = int(os.environ.get("BARREL_COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.environ.get("BARREL_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BARREL_BROTLI_QUALITY", "5"))
+
+_ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True si l'en-tête If-None-Match désigne etag (ou l'une de ses variantes compressées)."""
+    if not if_none_match:
+        return False
+    target = etag.strip('"')
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        candidate = candidate.strip('"')
+        for suffix in _ENCODING_SUFFIXES:
+            if candidate.endswith(suffix):
+                candidate = candidate[: -len(suffix)]
+                break
+        if candidate == target:
+            return True
+    return False
+
+
+def _accepted_encoding(accept_encoding: str) -> Optional[str]:
+    """Encodage retenu : br si accepté et disponible, sinon gzip, sinon None."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._obj = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31 : en-tête gzip
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compresse un morceau et vide le tampon (le client reçoit les données au fil de l'eau)."""
+        if self.encoding == "br":
+            return self._obj.process(data) + self._obj.flush()
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._obj.process(data) + self._obj.finish()
+        return self._obj.compress(data) + self._obj.flush()
+
+
+def _set_header(headers: List[Tuple[bytes, bytes]], name: bytes, value: Optional[bytes]) -> List[Tuple[bytes, bytes]]:
+    out = [(k, v) for k, v in headers if k.lower() != name]
+    if value is not None:
+        out.append((name, value))
+    return out
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for k, v in headers:
+        if k.lower() == name:
+            return v
+    return None
+
+
+def _with_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    vary = _header(headers, b"vary")
+    if vary is None or b"accept-encoding" not in vary.lower():
+        headers = _set_header(headers, b"vary", (vary + b", " if vary else b"") + b"Accept-Encoding")
+    return headers
+
+
+def _with_encoded_etag(headers: List[Tuple[bytes, bytes]], encoding: str) -> List[Tuple[bytes, bytes]]:
+    etag = _header(headers, b"etag")
+    if etag is not None and etag.endswith(b'"'):
+        headers = _set_header(headers, b"etag", etag[:-1] + b"-" + encoding.encode("ascii") + b'"')
+    return headers
+
+
+def _names_bare_etag(if_none_match: bytes, etag: Optional[bytes]) -> bool:
+    """True si If-None-Match cite l'ETag sans suffixe d'encodage (représentation non compressée)."""
+    if etag is None:
+        return False
+    bare = etag.strip(b'"')
+    for candidate in if_none_match.split(b","):
+        candidate = candidate.strip()
+        if candidate.startswith(b"W/"):
+            candidate = candidate[2:]
+        if candidate.strip(b'"') == bare:
+            return True
+    return False
+
+
+class CompressionMiddleware:
+    """Middleware ASGI de compression gzip / brotli avec seuil de taille."""
+
+    def __init__(self, app, minimum_size: int = DEFAULT_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = if_none_match = b""
+        for k, v in scope.get("headers") or []:
+            if k == b"accept-encoding":
+                accept = v
+            elif k == b"if-none-match":
+                if_none_match = v
+        encoding = _accepted_encoding(accept.decode("latin-1"))
+
+        state = {"start": None, "compressor": None, "passthrough": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["start"] = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            start = state["start"]
+            if start is not None:
+                state["start"] = None
+                headers = list(start.get("headers") or [])
+                body = message.get("body", b"")
+                more = message.get("more_body", False)
+                if _header(headers, b"content-encoding") is None:
+                    headers = _with_vary(headers)
+                    if (encoding is not None and start["status"] == 304
+                            and not _names_bare_etag(if_none_match, _header(headers, b"etag"))):
+                        headers = _with_encoded_etag(headers, encoding)
+                if (encoding is None
+                        or _header(headers, b"content-encoding") is not None
+                        or start["status"] in (204, 304)
+                        or (not more and len(body) < self.minimum_size)):
+                    state["passthrough"] = True
+                    await send(dict(start, headers=headers))
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                headers = _set_header(headers, b"content-encoding", encoding.encode("ascii"))
+                headers = _with_encoded_etag(headers, encoding)
+                if more:
+                    state["compressor"] = compressor
+                    headers = _set_header(headers, b"content-length", None)
+                    await send(dict(start, headers=headers))
+                    await send({"type": "http.response.body", "body": compressor.chunk(body), "more_body": True})
+                else:
+                    compressed = compressor.finish(body)
+                    headers = _set_header(headers, b"content-length", str(len(compressed)).encode("ascii"))
+                    await send(dict(start, headers=headers))
+                    await send({"type": "http.response.body", "body": compressed})
+                return
+            if state["passthrough"]:
+                await send(message)
+                return
+            compressor = state["compressor"]
+            if message.get("more_body", False):
+                await send({"type": "http.response.body", "body": compressor.chunk(message.get("body", b"")), "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.finish(message.get("body", b""))})
+
+        await self.app(scope, receive, send_wrapper)
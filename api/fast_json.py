@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Chemin JSON rapide de l'API pour les gros MCD.
+
+- FastJSONResponse : réponse sérialisée directement par api.services.json_codec
+  (orjson si disponible), sans passer par jsonable_encoder ;
+- json_body : dépendance qui décode le corps brut de la requête et ne vérifie que
+  les champs de premier niveau, au lieu de valider un modèle pydantic Dict[str, Any]
+  (parcours récursif de tout le MCD).
+"""
+
+from typing import Any, Callable, Dict
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from api.services import json_codec
+from api.services.json_codec import optional
+from api.services.metrics import PAYLOAD_BYTES
+
+__all__ = ["FastJSONResponse", "json_body", "optional"]
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encodée par json_codec (orjson si installé)."""
+
+    def render(self, content: Any) -> bytes:
+        return json_codec.dumps(content)
+
+
+def json_body(**fields: Any) -> Callable:
+    """
+    Dépendance FastAPI : corps JSON décodé en dict.
+    fields : nom → type attendu (dict, list, str) si le champ est obligatoire, optional(type) pour un
+    champ facultatif sans défaut, ou valeur par défaut (le champ fourni doit être du même type).
+    Champ manquant ou mal typé : 422 (voir json_codec.check_fields).
+    Exemple : Depends(json_body(mcd=dict, dbms="mysql", rows=optional(dict))).
+    """
+    async def dependency(request: Request) -> Dict[str, Any]:
+        raw = await request.body()
+        PAYLOAD_BYTES.set(len(raw), route=request.url.path)
+        try:
+            body = json_codec.loads(raw) if raw else {}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"JSON invalide : {e}")
+        if not isinstance(body, dict):
+            raise HTTPException(status_code=422, detail="Le corps de la requête doit être un objet JSON.")
+        try:
+            return json_codec.check_fields(body, fields)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    return dependency
@@ -19,15 +19,20 @@ logging.basicConfig(
     datefmt="%H:%M:%S",
 )
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from api.compression import CompressionMiddleware
+from api.fast_json import FastJSONResponse
 from api.routers import mcd
+from api.services import metrics
+from api.services.offload import offloader
 
 app = FastAPI(
     title="BarrelMCD API",
     description="API de modélisation MCD/MLD/SQL pour l'interface Flutter",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
@@ -36,17 +41,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# gzip (brotli si installé) au-delà de BARREL_COMPRESSION_MIN_SIZE octets
+app.add_middleware(CompressionMiddleware)
+
 app.include_router(mcd.router, prefix="/api", tags=["mcd"])
 
 
+@app.on_event("shutdown")
+def shutdown_offloader():
+    """Arrête le pool de processus des routes lourdes."""
+    offloader.shutdown()
+
+
 @app.get("/health")
 def health():
     """Santé du serveur."""
     return {"status": "ok", "service": "barrelmcd-api"}
 
 
+@app.get("/metrics")
+def prometheus_metrics():
+    """Métriques au format texte Prometheus : durée par étape, taille des requêtes et des modèles."""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("api.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -3,17 +3,44 @@
 Routes API MCD : parse markdown, validate, MCD -> MLD -> SQL.
 """
 
+import codecs
 import logging
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, List, Any, Optional
 
+from api.compression import etag_matches
+from api.fast_json import FastJSONResponse, json_body, optional
 from api.services import mcd_service
+from api.services.compile_session import SessionNotFoundError, SessionVersionConflict
+from api.services.ddl_import import DdlImport
+from api.services.metrics import PAYLOAD_BYTES
+from api.services.offload import OFFLOAD_MIN_ENTITIES, OffloadRejected, offloader
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _body_doc(model) -> Dict:
+    """Schéma OpenAPI du corps pour les routes qui décodent le JSON brut (json_body)."""
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": model.model_json_schema()}}}}
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 sans corps si le client possède déjà cet artefact (If-None-Match)."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+def _rejected(e: OffloadRejected) -> HTTPException:
+    """Refus de la contre-pression (429 / 503) avec Retry-After."""
+    logger.warning("%s", e)
+    return HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
 class ParseMarkdownRequest(BaseModel):
     content: str
 
@@ -23,7 +50,8 @@ class ParseMotsCodesRequest(BaseModel):
 
 
 class ValidateMcdRequest(BaseModel):
-    mcd: Dict[str, Any]
+    mcd: Optional[Dict[str, Any]] = None
+    session_id: Optional[str] = None  # session de compilation : validation incrémentale, mcd inutile
 
 
 class McdToMldRequest(BaseModel):
@@ -49,36 +77,117 @@ class ValidateAssociationAfterUpdateRequest(BaseModel):
     new_attributes: Optional[List[Dict[str, Any]]] = None
 
 
+class ValidateBatchRequest(BaseModel):
+    mcd: Dict[str, Any]
+    operations: List[Dict[str, Any]]  # {"op": "create_association" | "add_link" | "update_association", ...}
+    apply: bool = False  # appliquer chaque opération valide avant de valider la suivante
+
+
 class McdToSqlRequest(BaseModel):
     mcd: Dict[str, Any]
     dbms: str = "mysql"  # mysql | postgresql | sqlite | sqlserver (Barrel)
 
 
+class McdToSqlStreamRequest(BaseModel):
+    mcd: Dict[str, Any]
+    dbms: str = "mysql"
+    use_original: bool = False  # types du modèle sans traduction (sql_original)
+
+
 class McdToMpdRequest(BaseModel):
     mcd: Dict[str, Any]
     dbms: str = "mysql"
 
 
+class CompileRequest(BaseModel):
+    mcd: Dict[str, Any]
+    dialects: Optional[List[str]] = None  # None = tous (mysql, postgresql, sqlite, sqlserver)
+
+
+class DiffRequest(BaseModel):
+    old_mcd: Optional[Dict[str, Any]] = None  # None = schéma vide (création complète)
+    new_mcd: Dict[str, Any]
+    dbms: str = "mysql"
+
+
+class VolumetryRequest(BaseModel):
+    mcd: Dict[str, Any]
+    dbms: str = "mysql"
+    rows: Optional[Dict[str, float]] = None  # lignes estimées par entité
+    fanout: Optional[Dict[str, float]] = None  # liens moyens par association
+    default_rows: Optional[int] = None
+
+
+class SyntheticDataRequest(BaseModel):
+    mcd: Dict[str, Any]
+    dbms: str = "mysql"
+    format: str = "insert"  # insert (tous SGBD) ou copy (PostgreSQL)
+    rows: Optional[Dict[str, float]] = None  # lignes par entité
+    fanout: Optional[Dict[str, float]] = None  # liens moyens par association
+    default_rows: Optional[int] = None
+    seed: int = 0
+
+
+class CreateSessionRequest(BaseModel):
+    mcd: Dict[str, Any]
+    dbms: str = "mysql"
+
+
+class PatchSessionRequest(BaseModel):
+    ops: List[Dict[str, Any]]  # JSON Patch (RFC 6902) : add, remove, replace, test
+    base_version: Optional[int] = None
+
+
 class AnalyzeDataRequest(BaseModel):
     data: Any
     format_type: str = "json"
 
 
 @router.post("/parse-markdown", response_model=Dict)
-def parse_markdown(req: ParseMarkdownRequest):
-    """Parse un contenu Markdown et retourne la structure MCD + format canvas pour l'UI."""
+async def parse_markdown(req: ParseMarkdownRequest):
+    """Parse un contenu Markdown et retourne la structure MCD + format canvas pour l'UI (pool de processus)."""
+    PAYLOAD_BYTES.set(len(req.content.encode("utf-8")), route="/api/parse-markdown")
     try:
-        parsed = mcd_service.parse_markdown(req.content)
-        canvas_format = mcd_service.markdown_to_canvas_format(parsed)
-        return {
-            "parsed": parsed,
-            "canvas": canvas_format,
-            "precision_score": parsed.get("metadata", {}).get("precision_score", 0.0),
-        }
+        return await offloader.run("parse-markdown", mcd_service.parse_markdown_for_canvas, req.content)
+    except OffloadRejected as e:
+        raise _rejected(e)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/parse-markdown/preview", response_model=Dict)
+def parse_markdown_preview(req: ParseMarkdownRequest):
+    """
+    Variante de /api/parse-markdown pour l'aperçu en direct (appel à chaque frappe) : les sections
+    inchangées viennent du cache de sections du serveur (thread pool, pas le pool de processus).
+    """
+    PAYLOAD_BYTES.set(len(req.content.encode("utf-8")), route="/api/parse-markdown/preview")
+    try:
+        return FastJSONResponse(mcd_service.parse_markdown_preview(req.content))
+    except Exception as e:
+        logger.exception("parse-markdown/preview ERROR: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/parse-markdown/upload", response_model=Dict)
+async def parse_markdown_upload(file: UploadFile = File(...)):
+    """
+    Variante multipart de /api/parse-markdown pour les très gros fichiers : le fichier envoyé (déjà
+    mis en tampon sur disque par le serveur au-delà de 1 Mo) est parsé en flux, morceau par morceau.
+    """
+    logger.info("POST /api/parse-markdown/upload (filename=%s)", file.filename)
+    try:
+        result = await run_in_threadpool(mcd_service.parse_markdown_stream, file.file)
+        PAYLOAD_BYTES.set(file.file.tell(), route="/api/parse-markdown/upload")
+        logger.info("parse-markdown/upload OK: %s entités", result["parsed"]["metadata"]["total_entities"])
+        return FastJSONResponse(result)
+    except Exception as e:
+        logger.exception("parse-markdown/upload ERROR: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        await file.close()
+
+
 @router.post("/parse-mots-codes", response_model=Dict)
 def parse_mots_codes(req: ParseMotsCodesRequest):
     """Parse un texte « mots codés » (style Mocodo) et retourne le format canvas pour l'UI."""
@@ -92,14 +201,30 @@ def parse_mots_codes(req: ParseMotsCodesRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/validate", response_model=Dict)
-def validate_mcd(req: ValidateMcdRequest):
-    """Valide une structure MCD et retourne la liste des erreurs."""
-    logger.info("POST /api/validate (mcd keys=%s)", list((req.mcd or {}).keys()))
+@router.post("/validate", response_model=Dict, openapi_extra=_body_doc(ValidateMcdRequest))
+def validate_mcd(body: Dict = Depends(json_body(mcd=optional(dict), session_id=optional(str)))):
+    """
+    Valide une structure MCD et retourne la liste des erreurs.
+    Avec session_id (session ouverte par POST /api/sessions), retourne la validation de la session,
+    tenue à jour par l'IncrementalValidator à chaque PATCH : seules les règles touchées par les
+    modifications ont été réévaluées, le MCD n'est ni renvoyé ni revalidé en entier.
+    Sans session, le MCD fourni est validé en entier (requête sans état).
+    """
+    session_id = body["session_id"]
+    if session_id is not None:
+        logger.info("POST /api/validate session=%s", session_id)
+        try:
+            return FastJSONResponse(mcd_service.validate_compile_session(session_id))
+        except SessionNotFoundError:
+            raise HTTPException(status_code=404, detail="Session inconnue ou expirée.")
+    mcd = body["mcd"]
+    if mcd is None:
+        raise HTTPException(status_code=422, detail="Champ « mcd » manquant ou invalide (attendu : dict).")
+    logger.info("POST /api/validate (mcd keys=%s)", list(mcd.keys()))
     try:
-        errors = mcd_service.validate_mcd(req.mcd)
+        errors = mcd_service.validate_mcd(mcd)
         logger.info("validate OK: valid=%s errors=%s", len(errors) == 0, len(errors))
-        return {"valid": len(errors) == 0, "errors": errors}
+        return FastJSONResponse({"valid": len(errors) == 0, "errors": errors})
     except Exception as e:
         logger.exception("validate ERROR: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
@@ -145,60 +270,285 @@ def validate_association_after_update(req: ValidateAssociationAfterUpdateRequest
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/to-mld", response_model=Dict)
-def to_mld(req: McdToMldRequest):
-    """Convertit un MCD (format canvas) en MLD."""
+@router.post("/validate-batch", response_model=Dict, openapi_extra=_body_doc(ValidateBatchRequest))
+def validate_batch(body: Dict = Depends(json_body(mcd=dict, operations=list, apply=False))):
+    """Valide plusieurs opérations (associations, liens, rubriques) en un seul appel : un résultat par opération."""
+    logger.info("POST /api/validate-batch operations=%s apply=%s", len(body["operations"]), body["apply"])
     try:
-        logger.info("POST /api/to-mld entities=%s associations=%s", len(req.mcd.get("entities") or []), len(req.mcd.get("associations") or []))
-        return mcd_service.mcd_to_mld(req.mcd)
+        return FastJSONResponse(mcd_service.validate_operations(body["mcd"], body["operations"], apply=body["apply"]))
+    except Exception as e:
+        logger.exception("validate-batch ERROR: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/to-mld", response_model=Dict, openapi_extra=_body_doc(McdToMldRequest))
+def to_mld(request: Request, body: Dict = Depends(json_body(mcd=dict))):
+    """Convertit un MCD (format canvas) en MLD (ETag / 304 si inchangé)."""
+    mcd = body["mcd"]
+    try:
+        logger.info("POST /api/to-mld entities=%s associations=%s", len(mcd.get("entities") or []), len(mcd.get("associations") or []))
+        prepared, digest = mcd_service.prepare_mcd(mcd)
+        etag = mcd_service.digest_etag(digest, "mld")
+        return _not_modified(request, etag) or FastJSONResponse(
+            mcd_service.prepared_mcd_to_mld(prepared, digest), headers={"ETag": etag}
+        )
     except Exception as e:
         logger.exception("to-mld ERROR: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/to-mld-text", response_model=Dict)
-def to_mld_text(req: McdToMldRequest):
+@router.post("/to-mld-text", response_model=Dict, openapi_extra=_body_doc(McdToMldRequest))
+def to_mld_text(request: Request, body: Dict = Depends(json_body(mcd=dict))):
     """Export MLD textuel (format lisible : format lisible)."""
     try:
-        text = mcd_service.mcd_to_mld_text(req.mcd)
-        return {"mld_text": text}
+        prepared, digest = mcd_service.prepare_mcd(body["mcd"])
+        etag = mcd_service.digest_etag(digest, "mld_text")
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        text = mcd_service.prepared_mcd_to_mld_text(prepared, digest)
+        return FastJSONResponse({"mld_text": text}, headers={"ETag": etag})
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/to-mpd", response_model=Dict)
-def to_mpd(req: McdToMpdRequest):
+@router.post("/to-mpd", response_model=Dict, openapi_extra=_body_doc(McdToMpdRequest))
+def to_mpd(request: Request, body: Dict = Depends(json_body(mcd=dict, dbms="mysql"))):
     """Convertit un MCD (format canvas) en MPD (Modèle Physique de Données). dbms: mysql, postgresql, sqlite, sqlserver."""
-    logger.info("POST /api/to-mpd dbms=%s", req.dbms)
+    logger.info("POST /api/to-mpd dbms=%s", body["dbms"])
     try:
-        mpd = mcd_service.mcd_to_mpd(req.mcd, dbms=req.dbms)
-        return {"mpd": mpd}
+        prepared, digest = mcd_service.prepare_mcd(body["mcd"])
+        etag = mcd_service.digest_etag(digest, "mpd", body["dbms"])
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        mpd = mcd_service.prepared_mcd_to_mpd(prepared, digest, dbms=body["dbms"])
+        return FastJSONResponse({"mpd": mpd}, headers={"ETag": etag})
     except Exception as e:
         logger.exception("to-mpd ERROR: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/to-sql", response_model=Dict)
-def to_sql(req: McdToSqlRequest):
+@router.post("/to-sql", response_model=Dict, openapi_extra=_body_doc(McdToSqlRequest))
+async def to_sql(request: Request, body: Dict = Depends(json_body(mcd=dict, dbms="mysql"))):
     """Convertit un MCD en script SQL. Retourne sql, sql_original (types non traduits), translations (liste des conversions automatiques)."""
-    logger.info("POST /api/to-sql dbms=%s", req.dbms)
+    mcd, dbms = body["mcd"], body["dbms"]
+    logger.info("POST /api/to-sql dbms=%s", dbms)
     try:
-        result = mcd_service.mcd_to_sql(req.mcd, dbms=req.dbms)
+        # MCD normalisé et empreinte calculés une seule fois : ETag, cache et génération
+        prepared, digest = await run_in_threadpool(mcd_service.prepare_mcd, mcd)
+        etag = mcd_service.digest_etag(digest, "sql", dbms)
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            logger.info("to-sql 304 (ETag inchangé)")
+            return not_modified
+        if len(mcd.get("entities") or []) < OFFLOAD_MIN_ENTITIES:
+            result = await run_in_threadpool(mcd_service.prepared_mcd_to_sql, prepared, digest, dbms)
+        else:
+            # Gros modèle : génération dans le pool de processus, sauf si déjà en cache
+            result = mcd_service.cached_sql(digest, dbms)
+            if result is None:
+                result = await offloader.run("to-sql", mcd_service.prepared_mcd_to_sql, prepared, digest, dbms)
+                mcd_service.remember_sql(digest, dbms, result)
         logger.info("to-sql OK (sql length=%s, translations=%s)", len(result.get("sql") or ""), len(result.get("translations") or []))
-        return result
+        return FastJSONResponse(result, headers={"ETag": etag})
+    except OffloadRejected as e:
+        raise _rejected(e)
     except Exception as e:
         logger.exception("to-sql ERROR: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/to-sql/stream", openapi_extra=_body_doc(McdToSqlStreamRequest))
+def to_sql_stream(request: Request, body: Dict = Depends(json_body(mcd=dict, dbms="mysql", use_original=False))):
+    """Script SQL d'un MCD en flux (text/plain), pour les très gros schémas : même texte que le champ sql de /to-sql."""
+    mcd, dbms, use_original = body["mcd"], body["dbms"], body["use_original"]
+    logger.info("POST /api/to-sql/stream dbms=%s use_original=%s", dbms, use_original)
+    try:
+        prepared, digest = mcd_service.prepare_mcd(mcd)
+        etag = mcd_service.digest_etag(digest, "sql-original" if use_original else "sql", dbms)
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        chunks = mcd_service.prepared_mcd_to_sql_stream(prepared, digest, dbms, use_original=use_original)
+        return StreamingResponse(chunks, media_type="text/plain; charset=utf-8", headers={"ETag": etag})
+    except Exception as e:
+        logger.exception("to-sql/stream ERROR: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/compile", response_model=Dict, openapi_extra=_body_doc(CompileRequest))
+def compile_mcd(request: Request, body: Dict = Depends(json_body(mcd=dict, dialects=optional(list)))):
+    """Compile un MCD en une passe : MLD, MLD textuel, puis MPD + SQL pour chaque SGBD (changement de SGBD sans aller-retour)."""
+    dialects = body["dialects"]
+    logger.info("POST /api/compile dialects=%s", dialects or "all")
+    try:
+        variant = ",".join(dict.fromkeys(dialects)) if dialects else None
+        prepared, digest = mcd_service.prepare_mcd(body["mcd"])
+        etag = mcd_service.digest_etag(digest, "compile", variant)
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        result = mcd_service.prepared_compile_mcd(prepared, digest, dialects=dialects)
+        logger.info("compile OK: %s tables, %s SGBD", len(result["mld"].get("tables") or {}), len(result["dialects"]))
+        return FastJSONResponse(result, headers={"ETag": etag})
+    except Exception as e:
+        logger.exception("compile ERROR: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/index-plan", response_model=Dict, openapi_extra=_body_doc(McdToMpdRequest))
+def index_plan(body: Dict = Depends(json_body(mcd=dict, dbms="mysql"))):
+    """Index du MPD retenus et écartés (couverts par la clé primaire, une unicité ou un autre index), avec justification."""
+    logger.info("POST /api/index-plan dbms=%s", body["dbms"])
+    try:
+        return FastJSONResponse(mcd_service.index_plan(body["mcd"], body["dbms"]))
+    except Exception as e:
+        logger.exception("index-plan ERROR: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/volumetry", response_model=Dict, openapi_extra=_body_doc(VolumetryRequest))
+def volumetry(body: Dict = Depends(json_body(mcd=dict, dbms="mysql", rows=optional(dict), fanout=optional(dict),
+                                    default_rows=optional(int)))):
+    """Volumétrie estimée du MPD : lignes, largeur de ligne, taille des tables et des index par SGBD."""
+    logger.info("POST /api/volumetry dbms=%s", body["dbms"])
+    try:
+        return FastJSONResponse(mcd_service.volumetry(
+            body["mcd"], body["dbms"], body["rows"], body["fanout"], body["default_rows"],
+        ))
+    except Exception as e:
+        logger.exception("volumetry ERROR: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/test-data", openapi_extra=_body_doc(SyntheticDataRequest))
+def synthetic_data(body: Dict = Depends(json_body(mcd=dict, dbms="mysql", format="insert", rows=optional(dict),
+                                             fanout=optional(dict), default_rows=optional(int), seed=0))):
+    """Données de test du MPD en flux (text/plain) : INSERT multi-lignes ou COPY, intégrité référentielle respectée."""
+    dbms, fmt = body["dbms"], body["format"]
+    logger.info("POST /api/test-data dbms=%s format=%s", dbms, fmt)
+    try:
+        chunks = mcd_service.synthetic_data_stream(
+            body["mcd"], dbms, fmt, body["rows"], body["fanout"], body["default_rows"], body["seed"],
+        )
+        return StreamingResponse(chunks, media_type="text/plain; charset=utf-8")
+    except Exception as e:
+        logger.exception("test-data ERROR: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/diff", response_model=Dict, openapi_extra=_body_doc(DiffRequest))
+def diff_mcd(body: Dict = Depends(json_body(old_mcd=optional(dict), new_mcd=dict, dbms="mysql"))):
+    """Différence entre deux versions d'un MCD et script de migration (ALTER TABLE, index...) pour le SGBD."""
+    dbms = body["dbms"]
+    logger.info("POST /api/diff dbms=%s", dbms)
+    try:
+        result = mcd_service.diff_mcd(body["old_mcd"], body["new_mcd"], dbms)
+        logger.info("diff OK: %s instructions", result["statements"])
+        return FastJSONResponse(result)
+    except Exception as e:
+        logger.exception("diff ERROR: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/sessions", response_model=Dict, openapi_extra=_body_doc(CreateSessionRequest))
+def create_session(body: Dict = Depends(json_body(mcd=dict, dbms="mysql"))):
+    """Ouvre une session de compilation incrémentale : le serveur garde le MCD compilé."""
+    logger.info("POST /api/sessions dbms=%s", body["dbms"])
+    try:
+        return FastJSONResponse(mcd_service.create_compile_session(body["mcd"], dbms=body["dbms"]))
+    except Exception as e:
+        logger.exception("sessions ERROR: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.patch("/sessions/{session_id}", response_model=Dict)
+def patch_session(session_id: str, req: PatchSessionRequest):
+    """Applique un delta JSON Patch et retourne uniquement les tables / FK / fragments SQL modifiés."""
+    logger.info("PATCH /api/sessions/%s ops=%s base_version=%s", session_id, len(req.ops), req.base_version)
+    try:
+        return mcd_service.patch_compile_session(session_id, req.ops, base_version=req.base_version)
+    except SessionNotFoundError:
+        raise HTTPException(status_code=404, detail="Session inconnue ou expirée.")
+    except SessionVersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.exception("sessions patch ERROR: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/sessions/{session_id}", response_model=Dict)
+def get_session(session_id: str):
+    """État complet de la session (MLD, SQL) pour resynchroniser le client."""
+    try:
+        return mcd_service.get_compile_session(session_id)
+    except SessionNotFoundError:
+        raise HTTPException(status_code=404, detail="Session inconnue ou expirée.")
+
+
+@router.delete("/sessions/{session_id}", response_model=Dict)
+def delete_session(session_id: str):
+    """Ferme la session."""
+    try:
+        mcd_service.delete_compile_session(session_id)
+    except SessionNotFoundError:
+        raise HTTPException(status_code=404, detail="Session inconnue ou expirée.")
+    return {"deleted": session_id}
+
+
 @router.post("/analyze-data", response_model=Dict)
-def analyze_data(req: AnalyzeDataRequest):
-    """Analyse des données brutes (JSON/CSV-like) et retourne un MCD."""
+async def analyze_data(req: AnalyzeDataRequest):
+    """Analyse des données brutes (JSON/CSV-like) et retourne un MCD (pool de processus)."""
     logger.info("POST /api/analyze-data format_type=%s", req.format_type)
     try:
-        mcd = mcd_service.analyze_data(req.data, format_type=req.format_type)
+        mcd = await offloader.run("analyze-data", mcd_service.analyze_data, req.data, req.format_type)
         logger.info("analyze-data OK")
         return {"mcd": mcd}
+    except OffloadRejected as e:
+        raise _rejected(e)
     except Exception as e:
         logger.exception("analyze-data ERROR: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post(
+    "/import-sql",
+    response_model=Dict,
+    openapi_extra={"requestBody": {"required": True, "content": {"text/plain": {"schema": {"type": "string"}}}}},
+)
+async def import_sql(request: Request):
+    """
+    Rétro-conception d'un script SQL (corps text/plain, dump mysqldump / pg_dump accepté) en MCD canvas.
+    Le corps est lu et analysé en flux : seules les instructions CREATE / ALTER TABLE sont conservées.
+    """
+    logger.info("POST /api/import-sql")
+    importer = DdlImport()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            text = decoder.decode(chunk)
+            if text:
+                await run_in_threadpool(importer.feed, text)
+        await run_in_threadpool(importer.feed, decoder.decode(b"", final=True))
+        PAYLOAD_BYTES.set(size, route="/api/import-sql")
+        result = await run_in_threadpool(importer.result)
+        logger.info("import-sql OK: %s", result["stats"])
+        return FastJSONResponse(result)
+    except Exception as e:
+        logger.exception("import-sql ERROR: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/offload/stats", response_model=Dict)
+def offload_stats():
+    """État du pool de processus et des files d'attente par route (en cours, en attente, refus)."""
+    return offloader.stats()
+
+
+@router.get("/compile-cache/stats", response_model=Dict)
+def compile_cache_stats():
+    """Statistiques du cache de compilation MCD → MLD → MPD → SQL (hits, misses, taille)."""
+    return mcd_service.compile_cache_stats()
@@ -6,69 +6,35 @@ Centralise toutes les règles Barrel pour :
 - Création d'une association (nom, unicité, contraintes)
 - Ajout d'un lien association–entité (cardinalités, table de correspondance, rubriques)
 - Mise à jour d'une association (attributs vs cardinalités 1,1)
+- Lot d'opérations validées contre un même index (validate_operations)
 
 Source : analyse du binaire Barrel (messages d'erreur, chaînes).
 """
 
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Union
 
+from api.services.mcd_index import McdIndex, McdIndexOverlay
 from api.services.merise_rules import (
     MCD_CARDINALITIES_SET,
     normalize_cardinality,
     is_valid_cardinality,
+    is_table_de_correspondance,
 )
 
 
-# --- Constantes Barrel ---
-def _entity_names(mcd: Dict) -> set:
-    return {(e.get("name") or "").strip() for e in (mcd.get("entities") or []) if (e.get("name") or "").strip()}
+AnyIndex = Union[McdIndex, McdIndexOverlay]
 
+# Opérations acceptées par validate_operations
+OPERATION_TYPES = ("create_association", "add_link", "update_association")
 
-def _association_names(mcd: Dict) -> set:
-    return {(a.get("name") or "").strip() for a in (mcd.get("associations") or []) if (a.get("name") or "").strip()}
 
-
-def _get_association(mcd: Dict, name: str) -> Optional[Dict]:
-    name = (name or "").strip()
-    for a in mcd.get("associations") or []:
-        if (a.get("name") or "").strip() == name:
-            return a
-    return None
-
-
-def _association_has_attributes(assoc: Dict) -> bool:
-    """True si l'association est porteuse de rubriques (Barrel)."""
-    attrs = assoc.get("attributes") or []
-    return isinstance(attrs, list) and len(attrs) > 0
-
-
-def _links_for_association(mcd: Dict, association_name: str) -> List[Dict]:
-    return [
-        link for link in (mcd.get("association_links") or [])
-        if (link.get("association") or "").strip() == (association_name or "").strip()
-    ]
-
-
-def _is_table_de_correspondance(mcd: Dict, association_name: str) -> bool:
-    """
-    Barrel : une association « gérant une table de correspondance » est une association n-n
-    (tous les liens ont max = n des deux côtés). Seules ces associations peuvent être
-    porteuses de rubriques avec certaines cardinalités.
-    """
-    links = _links_for_association(mcd, association_name)
-    if len(links) < 2:
-        return False
-    many_cards = ("0,n", "1,n")
-    for link in links:
-        c_ent = normalize_cardinality(link.get("card_entity", link.get("cardinality", "1,n")))
-        c_assoc = normalize_cardinality(link.get("card_assoc", link.get("cardinality", "1,n")))
-        if c_ent not in many_cards or c_assoc not in many_cards:
-            return False
-    return True
+def _index(mcd: Dict, index: Optional[AnyIndex]) -> AnyIndex:
+    """Index fourni par l'appelant (partagé entre plusieurs validations), sinon construit."""
+    return index if index is not None else McdIndex.from_mcd(mcd)
 
 
 # --- Création d'association (Barrel) ---
-def validate_create_association(mcd: Dict, name: str) -> List[str]:
+def validate_create_association(mcd: Dict, name: str, index: Optional[AnyIndex] = None) -> List[str]:
     """
     Valide la création d'une nouvelle association (règles Barrel).
     Retourne la liste des erreurs (vide si autorisé).
@@ -78,8 +44,7 @@ def validate_create_association(mcd: Dict, name: str) -> List[str]:
     if not trimmed:
         errors.append("Le nom de l'association ne peut pas être vide.")
         return errors
-    existing = _association_names(mcd)
-    if trimmed in existing:
+    if trimmed in _index(mcd, index).association_names:
         errors.append(f"Une association nommée « {trimmed} » existe déjà.")
     return errors
 
@@ -91,6 +56,7 @@ def validate_add_link(
     entity_name: str,
     card_entity: str,
     card_assoc: str,
+    index: Optional[AnyIndex] = None,
 ) -> List[str]:
     """
     Valide l'ajout d'un lien entre une association et une entité (règles Barrel).
@@ -106,17 +72,15 @@ def validate_add_link(
     if errors:
         return errors
 
-    entity_names = _entity_names(mcd)
-    assoc_names = _association_names(mcd)
+    idx = _index(mcd, index)
 
-    if a not in assoc_names:
+    if a not in idx.association_names:
         errors.append(f"L'association « {a} » n'existe pas.")
-    if e not in entity_names:
+    if e not in idx.entity_names:
         errors.append(f"L'entité « {e} » n'existe pas.")
 
     # Lien doublon
-    links = mcd.get("association_links") or []
-    if any((l.get("association") or "").strip() == a and (l.get("entity") or "").strip() == e for l in links):
+    if idx.has_link(a, e):
         errors.append(f"Un lien entre l'association « {a} » et l'entité « {e} » existe déjà.")
 
     # Cardinalités valides (0,1 | 1,1 | 0,n | 1,n)
@@ -128,8 +92,7 @@ def validate_add_link(
         errors.append(f"Cardinalité côté association invalide (attendu : 0,1 | 1,1 | 0,n | 1,n).")
 
     # Règle Barrel : la cardinalité 1,1 côté association est interdite lorsque l'association est porteuse de rubriques
-    assoc = _get_association(mcd, a)
-    if assoc and _association_has_attributes(assoc) and c_assoc == "1,1":
+    if idx.association_has_attributes(a) and c_assoc == "1,1":
         errors.append(
             "La cardinalité 1,1 côté association est interdite lorsque l'association est porteuse de rubriques."
         )
@@ -147,6 +110,7 @@ def validate_association_after_update(
     mcd: Dict,
     association_name: str,
     new_attributes: Optional[List[Dict]] = None,
+    index: Optional[AnyIndex] = None,
 ) -> List[str]:
     """
     Après mise à jour d'une association (ex. ajout de rubriques), vérifie les règles Barrel :
@@ -155,19 +119,20 @@ def validate_association_after_update(
     """
     errors = []
     a = (association_name or "").strip()
-    assoc = _get_association(mcd, a)
+    idx = _index(mcd, index)
+    assoc = idx.association(a)
     if not assoc:
         return errors
     attrs = new_attributes if new_attributes is not None else (assoc.get("attributes") or [])
     if not (isinstance(attrs, list) and len(attrs) > 0):
         return errors
     # Règle Barrel : seules les associations n-n peuvent avoir des rubriques
-    if not _is_table_de_correspondance(mcd, a):
+    if not is_table_de_correspondance(idx, a):
         errors.append(
             "Seules les associations gérant une table de correspondance peuvent être porteuses de rubriques. "
             f"L'association « {a} » doit avoir au moins deux liens avec cardinalités 0,n ou 1,n des deux côtés."
         )
-    for link in _links_for_association(mcd, a):
+    for link in idx.links_for_association(a):
         c_assoc = normalize_cardinality(link.get("card_assoc", link.get("cardinality", "1,n")))
         if c_assoc == "1,1":
             errors.append(
@@ -178,6 +143,93 @@ def validate_association_after_update(
     return errors
 
 
+# --- Lot d'opérations (glisser une association sur plusieurs entités, ...) ---
+# Champs de chaque opération : noms (chaînes) et listes d'attributs, vérifiés avant les règles Barrel
+_OPERATION_FIELDS = {
+    "create_association": (("name",), ("attributes",)),
+    "add_link": (("association_name", "entity_name"), ()),
+    "update_association": (("association_name",), ("new_attributes",)),
+}
+
+
+def _field_type_errors(op: Dict, kind: str) -> List[str]:
+    """Erreurs des champs présents mais mal typés (l'opération n'est alors ni validée ni appliquée)."""
+    names, lists = _OPERATION_FIELDS[kind] if kind in OPERATION_TYPES else ((), ())
+    errors = [f"Le champ « {f} » doit être une chaîne de caractères."
+              for f in names if op.get(f) is not None and not isinstance(op[f], str)]
+    errors += [f"Le champ « {f} » doit être une liste."
+               for f in lists if op.get(f) is not None and not isinstance(op[f], list)]
+    return errors
+
+
+def _validate_operation(mcd: Dict, op: Dict, idx: AnyIndex) -> List[str]:
+    kind = op.get("op")
+    type_errors = _field_type_errors(op, kind)
+    if type_errors:
+        return type_errors
+    if kind == "create_association":
+        return validate_create_association(mcd, op.get("name"), index=idx)
+    if kind == "add_link":
+        return validate_add_link(
+            mcd,
+            op.get("association_name"),
+            op.get("entity_name"),
+            op.get("card_entity") or "1,n",
+            op.get("card_assoc") or "1,n",
+            index=idx,
+        )
+    if kind == "update_association":
+        return validate_association_after_update(mcd, op.get("association_name"), op.get("new_attributes"), index=idx)
+    return [f"Opération inconnue « {kind} » (attendu : {', '.join(OPERATION_TYPES)})."]
+
+
+def _apply_operation(op: Dict, idx: McdIndexOverlay) -> McdIndexOverlay:
+    kind = op.get("op")
+    if kind == "create_association":
+        return idx.with_association({"name": op["name"].strip(), "attributes": list(op.get("attributes") or [])})
+    if kind == "add_link":
+        return idx.with_link({
+            "association": op["association_name"].strip(),
+            "entity": op["entity_name"].strip(),
+            "card_entity": normalize_cardinality(op.get("card_entity") or "1,n"),
+            "card_assoc": normalize_cardinality(op.get("card_assoc") or "1,n"),
+        })
+    if op.get("new_attributes") is not None:
+        return idx.with_attributes(op["association_name"], op["new_attributes"])
+    return idx
+
+
+def validate_operations(
+    mcd: Dict,
+    operations: List[Dict],
+    apply: bool = False,
+    index: Optional[McdIndex] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Valide un lot d'opérations sur un même MCD, indexé une seule fois.
+    operations : {"op": "create_association", "name"}
+               | {"op": "add_link", "association_name", "entity_name", "card_entity", "card_assoc"}
+               | {"op": "update_association", "association_name", "new_attributes"}
+    Si apply : chaque opération valide est appliquée (sans modifier mcd) avant de valider la suivante,
+    ex. création d'une association puis de ses liens.
+    Retourne un résultat par opération : {op, valid, errors, applied}.
+    """
+    idx: AnyIndex = _index(mcd, index)
+    if apply:
+        idx = McdIndexOverlay(idx)
+    results = []
+    for op in operations:
+        if not isinstance(op, dict):
+            results.append({"op": None, "valid": False, "errors": ["Chaque opération doit être un objet."], "applied": False})
+            continue
+        errors = _validate_operation(mcd, op, idx)
+        applied = apply and not errors
+        if applied:
+            idx = _apply_operation(op, idx)
+        results.append({"op": op.get("op"), "valid": not errors, "errors": errors, "applied": applied})
+    return results
+
+
 # --- Résumé des règles Barrel implémentées ---
 def get_barrel_association_rules_summary() -> List[str]:
     """Retourne un résumé des règles Barrel appliquées (pour doc / UI)."""
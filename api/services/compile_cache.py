@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de compilation adressé par contenu pour la chaîne MCD → MLD → MPD → SQL.
+
+La clé est une empreinte SHA-256 du MCD normalisé (format ModelConverter) :
+deux MCD canvas qui ne diffèrent que par la position des formes produisent
+la même clé. Éviction LRU bornée en nombre d'entrées, compteurs hits/misses.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# Incrémenter quand la sortie du converter change : invalide les clés existantes.
+CACHE_SCHEMA_VERSION = "1"
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get("BARREL_COMPILE_CACHE_SIZE", "256"))
+
+
+def mcd_digest(converter_mcd: Dict) -> str:
+    """
+    Empreinte canonique d'un MCD au format ModelConverter.
+    Sérialisation JSON triée (indépendante de l'ordre des clés des dicts), complétée par l'ordre
+    des entités et de l'héritage : il fixe l'ordre des tables, clés étrangères et contraintes générées.
+    """
+    order = {key: list(value) for key, value in converter_mcd.items() if isinstance(value, dict)}
+    payload = json.dumps(
+        [converter_mcd, order],
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    h = hashlib.sha256(CACHE_SCHEMA_VERSION.encode("ascii"))
+    h.update(payload.encode("utf-8"))
+    return h.hexdigest()
+
+
+class CompileCache:
+    """
+    Cache LRU borné et thread-safe (les routes sync tournent dans le thread pool).
+    Les valeurs sont partagées entre appels : les appelants ne doivent pas les muter.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max(0, int(max_entries))
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retourne la valeur associée à key (et la marque récente), None si absente."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Ajoute ou remplace une entrée ; évince les plus anciennes au-delà de max_entries."""
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Vide le cache et remet les compteurs à zéro."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs pour supervision (hits, misses, taux de hit, taille)."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
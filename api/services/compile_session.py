@@ -0,0 +1,440 @@
+# -*- coding: utf-8 -*-
+"""
+Sessions de compilation incrémentale (MCD canvas → MLD → MPD → SQL).
+
+Le serveur conserve le dernier MCD compilé ; le client envoie des deltas JSON Patch
+(entité renommée, attribut ajouté, cardinalité de lien modifiée, ...).
+Seules les entités touchées sont reconverties, seules les tables dont le MLD a changé
+repassent par generate_mpd / la génération SQL, et la réponse est un delta
+(tables, clés étrangères, contraintes et fragments SQL ajoutés / retirés).
+La validation Merise / CIF est tenue à jour de la même façon (IncrementalValidator).
+"""
+
+import copy
+import operator
+import os
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, List, Optional, Set, Tuple
+
+from api.services.incremental_validation import IncrementalValidator
+from api.services.json_patch import apply_json_patch, revert_json_patch
+from api.services.mcd_service import (
+    SUPPORTED_DBMS,
+    _canvas_entity_to_converter_format,
+    _converter_mcd,
+)
+from views.index_planner import TableIndexInputs, table_index_inputs
+from views.model_ir import Constraint, Mld, Mpd, Table
+from views.physical_design import referenced_tables
+
+DEFAULT_MAX_SESSIONS = int(os.environ.get("BARREL_MAX_SESSIONS", "64"))
+DEFAULT_SESSION_TTL = float(os.environ.get("BARREL_SESSION_TTL", "1800"))
+
+
+class SessionNotFoundError(KeyError):
+    """Session inconnue ou expirée."""
+
+
+class SessionVersionConflict(ValueError):
+    """Le delta a été calculé sur une autre version que celle du serveur."""
+
+
+def _entity_key(e: Any) -> Optional[str]:
+    """Nom sous lequel l'entité canvas apparaît dans le format ModelConverter."""
+    if not isinstance(e, dict):
+        return None
+    return e.get("name", "Sans nom") or "Sans nom"
+
+
+def _multiset_delta(old: Iterable[Hashable], new: Iterable[Hashable]) -> Dict[str, List]:
+    old_c, new_c = Counter(old), Counter(new)
+    return {
+        "added": list((new_c - old_c).elements()),
+        "removed": list((old_c - new_c).elements()),
+    }
+
+
+def _record_delta(old: List, new: List) -> Dict[str, List]:
+    """
+    _multiset_delta de deux listes d'enregistrements du MLD : préfixe et suffixe communs écartés
+    par comparaison directe, seule la partie modifiée est hachée.
+    """
+    start, size = 0, min(len(old), len(new))
+    while start < size and old[start] == new[start]:
+        start += 1
+    end_old, end_new = len(old), len(new)
+    while end_old > start and end_new > start and old[end_old - 1] == new[end_new - 1]:
+        end_old -= 1
+        end_new -= 1
+    return _multiset_delta(old[start:end_old], new[start:end_new])
+
+
+class CompileSession:
+    """MCD canvas compilé côté serveur, mis à jour par deltas JSON Patch."""
+
+    def __init__(self, session_id: str, canvas_mcd: Dict, dbms: str = "mysql"):
+        from views.model_converter import ModelConverter
+        if not isinstance(canvas_mcd, dict):
+            raise ValueError(f"mcd data doit être un dict, reçu: {type(canvas_mcd)}")
+        if dbms not in SUPPORTED_DBMS:
+            raise ValueError(f"SGBD non supporté : {dbms} (attendu : {', '.join(SUPPORTED_DBMS)}).")
+        self.session_id = session_id
+        self.dbms = dbms
+        self.version = 0
+        self.canvas = copy.deepcopy(canvas_mcd)
+        self.lock = threading.Lock()
+        self.last_access = time.monotonic()
+        self._converter = ModelConverter()
+        self._entities: Dict[str, Dict] = {}
+        self._entity_tables: Dict[str, Tuple[Table, List[Constraint]]] = {}
+        self.mld = Mld()
+        self._mpd_tables: Dict[str, Table] = {}
+        self._index_inputs: Dict[str, TableIndexInputs] = {}
+        self._referenced: FrozenSet[str] = frozenset()
+        self._translations: Dict[str, List[Dict]] = {}
+        self._table_sql: Dict[str, Dict[str, Any]] = {}
+        # Tables d'entités avant ajout des colonnes FK, et colonnes FK ajoutées par l'assemblage
+        self._base_tables: Dict[str, Table] = {}
+        self._extra_columns: Dict[str, List] = {}
+        self._inheritance_constraints: List[Constraint] = []
+        self._unique_names: Counter = Counter()  # noms des contraintes d'unicité des entités
+        self._entity_edits_only = False
+        self._compile(None)
+        self.validator = IncrementalValidator(self.canvas)
+
+    # --- Compilation ---
+
+    def _compile(self, dirty: Optional[Set[str]], structure_changed: bool = True) -> Dict:
+        """
+        Recompile le MCD. dirty = noms d'entités modifiées (None : tout recompiler) ;
+        structure_changed = associations, liens ou héritage touchés par le patch.
+        Retourne le delta par rapport à la compilation précédente.
+        """
+        converter = self._converter
+        entities_dict: Dict[str, Dict] = {}
+        for e in self.canvas.get("entities") or []:
+            name = _entity_key(e)
+            if name is not None and e.get("is_fictive") is True:
+                continue
+            if dirty is None or name is None or name in dirty or name not in self._entities:
+                converted = _canvas_entity_to_converter_format(e)
+                if converted is not None:
+                    entities_dict[converted["name"]] = converted
+            else:
+                entities_dict[name] = self._entities[name]
+
+        entity_tables: Dict[str, Tuple[Table, List[Constraint]]] = {}
+        for name, entity in entities_dict.items():
+            cached = self._entity_tables.get(name)
+            if cached is None or dirty is None or name in dirty:
+                cached = converter._entity_to_table(entity)
+            entity_tables[name] = cached
+        same_entities = list(entities_dict) == list(self._entities)
+        old_entity_tables = self._entity_tables
+        self._entities = entities_dict
+        self._entity_tables = entity_tables
+
+        if dirty is not None and not structure_changed and same_entities and self._entity_edits_only:
+            # Mêmes entités, mêmes relations : clés étrangères inchangées, seules les tables des entités
+            # modifiées sont reconstruites (colonnes de clés étrangères de la compilation précédente)
+            return self._apply_entity_edits([name for name in dirty if name in entity_tables], old_entity_tables)
+
+        mcd = _converter_mcd(self.canvas, entities_dict)
+        mld = converter._assemble_mld(
+            # Copie des tables d'entités : les associations y ajoutent des colonnes FK
+            ((table.copy(), uniques) for table, uniques in entity_tables.values()),
+            mcd["associations"],
+            mcd["inheritance"],
+        )
+        bases: Dict[str, Table] = {}
+        for table, _ in entity_tables.values():
+            assembled = mld.tables.get(table.name)
+            # Table d'entité telle quelle + colonnes FK ajoutées (sinon : nom partagé, table de liaison homonyme)
+            if (assembled is not None and table.name not in bases and len(assembled.columns) >= len(table.columns)
+                    and all(map(operator.is_, assembled.columns, table.columns))):
+                bases[table.name] = table
+        self._entity_edits_only = len(bases) == len(entity_tables)
+        return self._apply_mld(mld, bases)
+
+    def _apply_entity_edits(self, names: List[str], old_entity_tables: Dict[str, Tuple[Table, List[Constraint]]]) -> Dict:
+        """Reconstruit les tables des entités modifiées (mêmes noms, mêmes relations) ; O(entités modifiées)."""
+        old = self.mld
+        mld = Mld()
+        mld.tables = dict(old.tables)
+        mld.foreign_keys = old.foreign_keys
+        bases: Dict[str, Table] = {}
+        old_uniques: List[Constraint] = []
+        new_uniques: List[Constraint] = []
+        for name in names:
+            base, uniques = self._entity_tables[name]
+            table = base.copy()
+            for column in self._extra_columns.get(base.name, ()):
+                table.add_column(column)
+            mld.tables[base.name] = table
+            bases[base.name] = base
+            if uniques != old_entity_tables[name][1]:
+                old_uniques += old_entity_tables[name][1]
+                new_uniques += uniques
+        if not old_uniques and not new_uniques:
+            mld.constraints = old.constraints
+            mld._constraint_names = old._constraint_names
+            return self._apply_mld(mld, bases, candidates=set(bases))
+
+        # Contraintes dans l'ordre de _assemble_mld : unicité des entités, puis héritage
+        for _, uniques in self._entity_tables.values():
+            for constraint in uniques:
+                mld.add_constraint(constraint)
+        for constraint in self._inheritance_constraints:
+            mld.add_constraint(constraint, unique=False)
+        old_names = Counter(c.get("constraint_name") for c in old_uniques)
+        new_names = Counter(c.get("constraint_name") for c in new_uniques)
+        names_in_use = self._unique_names
+        self._unique_names = names_in_use - old_names + new_names
+        # Noms propres aux entités modifiées (add_constraint ne garde que le premier de chaque nom) :
+        # le delta des contraintes est celui de leurs contraintes d'unicité
+        local = (all(count == 1 and names_in_use[n] == 1 for n, count in old_names.items())
+                 and all(count == 1 and self._unique_names[n] == 1 for n, count in new_names.items())
+                 and not any(c.get("constraint_name") in new_names or c.get("constraint_name") in old_names
+                             for c in self._inheritance_constraints))
+        return self._apply_mld(mld, bases, candidates=set(bases),
+                               constraint_delta=_multiset_delta(old_uniques, new_uniques) if local else None)
+
+    def _apply_mld(self, mld: Mld, bases: Dict[str, Table], candidates: Optional[Set[str]] = None,
+                   constraint_delta: Optional[Dict[str, List]] = None) -> Dict:
+        """
+        Remplace le MLD courant ; ne régénère MPD et SQL que pour les tables modifiées.
+        bases : table d'entité de chaque table d'entité du MLD (avant ajout des colonnes FK) ;
+        candidates : tables susceptibles d'avoir changé (None : toutes) ;
+        constraint_delta : delta des contraintes déjà connu (sinon calculé). Les deltas de clés étrangères
+        et de contraintes sont calculés par multiensembles (Counter), sans comparaison deux à deux.
+        """
+        old = self.mld
+        old_tables = old.tables
+        fk_delta = _record_delta(old.foreign_keys, mld.foreign_keys) \
+            if mld.foreign_keys is not old.foreign_keys else {"added": [], "removed": []}
+        if constraint_delta is None:
+            constraint_delta = _record_delta(old.constraints, mld.constraints) \
+                if mld.constraints is not old.constraints else {"added": [], "removed": []}
+        # Les index d'une table dépendent aussi de ses clés étrangères et contraintes d'unicité,
+        # ses options physiques des clés étrangères qui la référencent
+        if fk_delta["added"] or fk_delta["removed"] or constraint_delta["added"] or constraint_delta["removed"]:
+            index_inputs = table_index_inputs(mld)
+            referenced = referenced_tables(mld)
+            if candidates is not None:
+                candidates = candidates | {r.get("table") for r in constraint_delta["added"] + constraint_delta["removed"]}
+        else:
+            index_inputs = self._index_inputs
+            referenced = self._referenced
+
+        extra_columns = {name: mld.tables[name].columns[len(base.columns):] for name, base in bases.items()}
+        upserted = {}
+        for name in (mld.tables if candidates is None else candidates):
+            table = mld.tables.get(name)
+            if table is None:
+                continue
+            base = bases.get(name)
+            old_base = self._base_tables.get(name)
+            if base is not None:
+                changed = (old_base is None or (base is not old_base and base != old_base)
+                           or extra_columns[name] != self._extra_columns.get(name))
+            else:
+                changed = old_base is not None or old_tables.get(name) != table
+            if (changed or name not in self._mpd_tables
+                    or self._index_inputs.get(name) != index_inputs.get(name)
+                    or (name in referenced) != (name in self._referenced)):
+                upserted[name] = table
+        removed = [name for name in old_tables if name not in mld.tables] if candidates is None else []
+
+        converter = self._converter
+        sql_tables = {}
+        for name in removed:
+            self._mpd_tables.pop(name, None)
+            self._translations.pop(name, None)
+            self._table_sql.pop(name, None)
+            self._base_tables.pop(name, None)
+            self._extra_columns.pop(name, None)
+        for name, table in upserted.items():
+            translations: List[Dict] = []
+            mpd_table = converter._mpd_table(name, table, self.dbms, translations, index_inputs.get(name),
+                                             name in referenced)
+            fragment = {
+                "create": converter._create_table_sql(name, mpd_table, self.dbms),
+                "create_original": converter._create_table_sql(name, mpd_table, self.dbms, use_original=True),
+                "indexes": converter._index_sql(name, mpd_table),
+                "translations": translations,
+            }
+            self._mpd_tables[name] = mpd_table
+            self._translations[name] = translations
+            self._table_sql[name] = fragment
+            sql_tables[name] = fragment
+
+        if candidates is None:
+            self._base_tables = dict(bases)
+            self._extra_columns = extra_columns
+            entity_uniques = {id(c) for _, uniques in self._entity_tables.values() for c in uniques}
+            self._inheritance_constraints = [c for c in mld.constraints if id(c) not in entity_uniques]
+            self._unique_names = Counter(c.get("constraint_name") for _, uniques in self._entity_tables.values()
+                                         for c in uniques)
+        else:
+            self._base_tables.update(bases)
+            self._extra_columns.update(extra_columns)
+        self._index_inputs = index_inputs
+        self._referenced = referenced
+        self.mld = mld
+
+        return {
+            "session_id": self.session_id,
+            "tables": {"upserted": {name: t.to_dict() for name, t in upserted.items()}, "removed": removed},
+            "table_order": list(mld.tables) if candidates is None and list(old_tables) != list(mld.tables) else None,
+            "foreign_keys": {
+                "added": [fk.to_dict() for fk in fk_delta["added"]],
+                "removed": [fk.to_dict() for fk in fk_delta["removed"]],
+            },
+            "constraints": {
+                "added": [c.to_dict() for c in constraint_delta["added"]],
+                "removed": [c.to_dict() for c in constraint_delta["removed"]],
+            },
+            "sql": {
+                "tables": sql_tables,
+                "removed_tables": removed,
+                # Fragments communs à l'ancien et au nouveau MLD identiques : delta des seuls éléments changés
+                "foreign_keys": _multiset_delta(
+                    [converter._foreign_key_sql(fk) for fk in fk_delta["removed"]],
+                    [converter._foreign_key_sql(fk) for fk in fk_delta["added"]],
+                ),
+                "constraints": _multiset_delta(
+                    self._unique_sql(constraint_delta["removed"]), self._unique_sql(constraint_delta["added"])
+                ),
+            },
+        }
+
+    def _unique_sql(self, constraints: List[Constraint]) -> List[str]:
+        return [self._converter._unique_constraint_sql(c) for c in constraints if c.get("constraint_name")]
+
+    # --- API publique ---
+
+    def apply_patch(self, operations: List[Dict], base_version: Optional[int] = None) -> Dict:
+        """
+        Applique un delta JSON Patch au MCD canvas de la session et recompile
+        uniquement ce qui en dépend. Retourne le delta MLD / SQL et la validation mise à jour.
+        """
+        with self.lock:
+            self.last_access = time.monotonic()
+            if base_version is not None and base_version != self.version:
+                raise SessionVersionConflict(
+                    f"Version {base_version} obsolète (version serveur : {self.version}) ; resynchroniser la session."
+                )
+            undo_log: List[Tuple] = []
+            changes = apply_json_patch(self.canvas, operations, undo_log=undo_log)
+            dirty: Optional[Set[str]] = set()
+            structure_changed = False
+            for change in changes:
+                if change.collection not in ("entities", "*"):
+                    structure_changed = True  # associations, liens et héritage : MLD réassemblé
+                    continue
+                if change.full:
+                    dirty = None
+                    break
+                for item in (change.before, change.after):
+                    name = _entity_key(item)
+                    if name is not None:
+                        dirty.add(name)
+            try:
+                delta = self._compile(dirty, structure_changed)
+            except Exception as e:
+                revert_json_patch(undo_log)
+                self._compile(None)
+                raise ValueError(f"Recompilation impossible après le patch : {e}") from e
+            delta["validation"] = self.validator.apply(changes)
+            self.version += 1
+            delta["version"] = self.version
+            return delta
+
+    def mpd(self) -> Dict:
+        """MPD complet de la session (identique à ModelConverter.generate_mpd sur le MLD courant)."""
+        mpd = Mpd(self.dbms)
+        mpd.tables = {name: self._mpd_tables[name] for name in self.mld.tables}
+        mpd.type_translations = [t for name in self.mld.tables for t in self._translations[name]]
+        mpd.foreign_keys = self.mld.foreign_keys
+        mpd.constraints = self.mld.constraints
+        return mpd.to_dict()
+
+    def sql(self, use_original: bool = False) -> str:
+        """Script SQL complet reconstitué à partir des fragments (identique à generate_sql_from_mpd)."""
+        key = "create_original" if use_original else "create"
+        tables = self.mld.tables
+        parts = [self._table_sql[name][key] for name in tables]
+        parts.extend(self._converter._foreign_key_sql(fk) for fk in self.mld.foreign_keys)
+        for name in tables:
+            parts.extend(self._table_sql[name]["indexes"])
+        parts.extend(self._unique_sql(self.mld.constraints))
+        return "\n\n".join(parts)
+
+    def validation(self) -> Dict:
+        """Validation courante du MCD de la session, tenue à jour patch par patch (pas de revalidation complète)."""
+        with self.lock:
+            self.last_access = time.monotonic()
+            errors = self.validator.errors()
+            return {"valid": not errors, "errors": errors, "version": self.version}
+
+    def snapshot(self) -> Dict:
+        """État complet de la session (création, resynchronisation du client)."""
+        with self.lock:
+            self.last_access = time.monotonic()
+            mpd = self.mpd()
+            errors = self.validator.errors()
+            return {
+                "session_id": self.session_id,
+                "version": self.version,
+                "dbms": self.dbms,
+                "mld": self.mld.to_dict(),
+                "sql": self.sql(),
+                "sql_original": self.sql(use_original=True),
+                "translations": mpd["type_translations"],
+                "validation": {"valid": not errors, "errors": errors},
+            }
+
+
+class SessionStore:
+    """Sessions en mémoire, bornées en nombre (LRU) et expirées après inactivité."""
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS, ttl_seconds: float = DEFAULT_SESSION_TTL):
+        self.max_sessions = max(1, int(max_sessions))
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, CompileSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge(self) -> None:
+        now = time.monotonic()
+        expired = [sid for sid, s in self._sessions.items() if now - s.last_access > self.ttl_seconds]
+        for sid in expired:
+            del self._sessions[sid]
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def create(self, canvas_mcd: Dict, dbms: str = "mysql") -> CompileSession:
+        session = CompileSession(uuid.uuid4().hex, canvas_mcd, dbms=dbms)
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self._purge()
+        return session
+
+    def get(self, session_id: str) -> CompileSession:
+        with self._lock:
+            self._purge()
+            session = self._sessions.get(session_id)
+            if session is None:
+                raise SessionNotFoundError(session_id)
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            if self._sessions.pop(session_id, None) is None:
+                raise SessionNotFoundError(session_id)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
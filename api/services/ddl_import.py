@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Rétro-conception : script SQL (DDL, dump complet accepté) → MCD au format canvas.
+
+Le script est lu en flux par views.ddl_scanner (seules les instructions CREATE / ALTER TABLE
+sont conservées), puis le schéma obtenu est remonté en MCD selon les règles Merise inverses :
+- table dont la clé primaire est exactement couverte par 2 clés étrangères ou plus, et que rien
+  ne référence → association n,n (table de liaison), ses autres colonnes en rubriques ;
+- clé étrangère égale à la clé primaire → lien d'héritage (enfant → parent) ;
+- autre clé étrangère → association binaire : 1,1 (0,1 si colonnes nullables) côté table
+  porteuse, 0,n côté table référencée (0,1 si les colonnes sont uniques) ;
+- toute autre table → entité ; les colonnes de clé étrangère ne sont pas reprises en attributs.
+
+Sortie compatible avec le format canvas Flutter (entities, associations, association_links, inheritance_links).
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+from api.services.merise_rules import normalize_cardinality
+from views.ddl_scanner import DdlSchema, DdlStatementSplitter
+
+_SPACING_X = 250
+_SPACING_Y = 200
+
+
+class DdlImport:
+    """Import incrémental : feed(texte) au fil de la lecture, puis result()."""
+
+    def __init__(self):
+        self.schema = DdlSchema()
+        self.splitter = DdlStatementSplitter()
+
+    def feed(self, text: str) -> None:
+        for statement in self.splitter.feed(text):
+            self.schema.add_statement(statement)
+
+    def result(self) -> Dict:
+        """{"canvas": MCD canvas, "stats": compteurs}. Termine la lecture."""
+        for statement in self.splitter.close():
+            self.schema.add_statement(statement)
+        canvas = schema_to_canvas(self.schema)
+        return {
+            "canvas": canvas,
+            "stats": {
+                "statements": self.splitter.statements,
+                "ddl_statements": self.splitter.kept,
+                "tables": len(self.schema.tables),
+                "foreign_keys": len(self.schema.foreign_keys),
+                "entities": len(canvas["entities"]),
+                "associations": len(canvas["associations"]),
+                "inheritance_links": len(canvas["inheritance_links"]),
+            },
+        }
+
+
+def import_sql_ddl(content: str) -> Dict:
+    """Import d'un script SQL complet (texte) ; voir DdlImport.result."""
+    importer = DdlImport()
+    importer.feed(content)
+    return importer.result()
+
+
+def _lower_set(columns: List[str]) -> frozenset:
+    return frozenset(c.lower() for c in columns)
+
+
+def _canvas_attribute(column: Dict) -> Dict:
+    return {
+        "name": column["name"],
+        "type": column["type"] or "VARCHAR(255)",
+        "is_primary_key": column["primary_key"],
+        "nullable": column["nullable"],
+        "is_unique": column["unique"],
+        "auto_increment": column["auto_increment"],
+        "default_value": column["default"],
+    }
+
+
+class _Names:
+    """Noms d'associations uniques (suffixe _2, _3... en cas de collision, entités comprises)."""
+
+    def __init__(self, taken):
+        self.taken = {n.lower() for n in taken}
+
+    def unique(self, name: str) -> str:
+        candidate, i = name, 2
+        while candidate.lower() in self.taken:
+            candidate, i = f"{name}_{i}", i + 1
+        self.taken.add(candidate.lower())
+        return candidate
+
+
+def _classify(schema: DdlSchema) -> Tuple[Dict[str, List[Dict]], set, Dict[str, Dict]]:
+    """Clés étrangères valides par table, tables de liaison, clé étrangère d'héritage par table enfant."""
+    fks_by_table: Dict[str, List[Dict]] = {}
+    referenced = set()
+    for fk in schema.foreign_keys:
+        if fk["table"] in schema.tables and fk["referenced_table"] in schema.tables and fk["columns"]:
+            fks_by_table.setdefault(fk["table"], []).append(fk)
+            referenced.add(fk["referenced_table"])
+    junctions = set()
+    inheritance: Dict[str, Dict] = {}
+    for key, fks in fks_by_table.items():
+        pk = _lower_set(schema.tables[key]["primary_key"])
+        if len(pk) >= 2 and len(fks) >= 2 and key not in referenced:
+            if all(_lower_set(fk["columns"]) <= pk for fk in fks) and \
+                    frozenset().union(*(_lower_set(fk["columns"]) for fk in fks)) == pk:
+                junctions.add(key)
+                continue
+        parents = [fk for fk in fks if pk and _lower_set(fk["columns"]) == pk and fk["referenced_table"] != key]
+        if len(parents) == 1:
+            inheritance[key] = parents[0]
+    return fks_by_table, junctions, inheritance
+
+
+def _fk_cardinalities(table: Dict, fk: Dict) -> Tuple[str, str]:
+    """(cardinalité côté table porteuse, côté table référencée)."""
+    columns = _lower_set(fk["columns"])
+    nullable = any(c["nullable"] for c in table["columns"] if c["name"].lower() in columns)
+    unique = columns == _lower_set(table["primary_key"]) or any(_lower_set(u) == columns for u in table["unique"])
+    return ("0,1" if nullable else "1,1"), ("0,1" if unique else "0,n")
+
+
+def _grid_position(i: int, columns: int, top: float) -> Dict[str, float]:
+    return {"x": float(100 + (i % columns) * _SPACING_X), "y": float(top + (i // columns) * _SPACING_Y)}
+
+
+def schema_to_canvas(schema: DdlSchema) -> Dict:
+    """Schéma DDL → MCD canvas (voir le docstring du module pour les règles)."""
+    fks_by_table, junctions, inheritance = _classify(schema)
+    entity_keys = [k for k in schema.tables if k not in junctions]
+    columns = max(4, math.ceil(math.sqrt(len(entity_keys) or 1)))
+    names = _Names(schema.tables[k]["name"] for k in entity_keys)
+
+    entities_list: List[Dict] = []
+    for i, key in enumerate(entity_keys):
+        table = schema.tables[key]
+        fk_columns = {c.lower() for fk in fks_by_table.get(key, ()) for c in fk["columns"]}
+        parent_fk = inheritance.get(key)
+        # Colonnes de clé étrangère portées par les associations, sauf si elles identifient l'entité
+        hidden = fk_columns - (_lower_set(table["primary_key"]) if parent_fk is None else frozenset())
+        entities_list.append({
+            "name": table["name"],
+            "position": _grid_position(i, columns, 100),
+            "attributes": [_canvas_attribute(c) for c in table["columns"] if c["name"].lower() not in hidden],
+            "is_weak": False,
+            "is_fictive": False,
+            "parent_entity": schema.tables[parent_fk["referenced_table"]]["name"] if parent_fk else None,
+        })
+
+    associations: List[Tuple[str, List[Tuple[str, str]], List[Dict]]] = []  # (nom, [(entité, card)], rubriques)
+    for key in schema.tables:
+        table = schema.tables[key]
+        fks = fks_by_table.get(key, ())
+        if key in junctions:
+            pk = _lower_set(table["primary_key"])
+            associations.append((
+                names.unique(table["name"]),
+                [(schema.tables[fk["referenced_table"]]["name"], "0,n") for fk in fks],
+                [_canvas_attribute(c) for c in table["columns"] if c["name"].lower() not in pk],
+            ))
+            continue
+        for fk in fks:
+            if inheritance.get(key) is fk:
+                continue
+            card_table, card_ref = _fk_cardinalities(table, fk)
+            referenced = schema.tables[fk["referenced_table"]]["name"]
+            associations.append((
+                names.unique(fk["name"] or f"{table['name']}_{referenced}"),
+                [(table["name"], card_table), (referenced, card_ref)],
+                [],
+            ))
+
+    top = 100 + (math.ceil(len(entity_keys) / columns) + 1) * _SPACING_Y
+    associations_list: List[Dict] = []
+    association_links_list: List[Dict] = []
+    for i, (name, members, attributes) in enumerate(associations):
+        associations_list.append({
+            "name": name,
+            "position": _grid_position(i, columns, top),
+            "attributes": attributes,
+            "entities": [entity for entity, _ in members],
+            "cardinalities": {entity: normalize_cardinality(card) for entity, card in members},
+        })
+        for entity, card in members:
+            association_links_list.append({"association": name, "entity": entity, "cardinality": normalize_cardinality(card)})
+
+    return {
+        "entities": entities_list,
+        "associations": associations_list,
+        "association_links": association_links_list,
+        "inheritance_links": [
+            {"parent": schema.tables[fk["referenced_table"]]["name"], "child": schema.tables[key]["name"]}
+            for key, fk in inheritance.items()
+        ],
+    }
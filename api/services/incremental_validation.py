@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+"""
+Validation incrémentale d'un MCD canvas pendant l'édition (sessions de compilation).
+
+IncrementalValidator conserve, pour chaque entité / association / lien, les données
+dont dépendent les règles de merise_rules, et les erreurs regroupées par règle et par
+portée (nom d'entité, nom d'association, objet). Après un patch, seules les portées
+touchées par les PatchChange sont réévaluées : doublons de noms, entités reliées,
+cardinalités, 1,1 interdit avec rubriques, rubriques réservées aux associations n-n,
+rubriques (doublons, types), entité sans association. L'héritage et les CIF, petits,
+sont recalculés entièrement quand leur collection change.
+
+Le résultat est le même multi-ensemble d'erreurs que mcd_service.validate_mcd ;
+les erreurs sont ordonnées par règle, comme dans merise_rules.validate_mcd.
+"""
+
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from api.services.cif_service import validate_mcd_with_cif
+from api.services.json_patch import TRACKED_COLLECTIONS, PatchChange
+from api.services.mcd_index import _attribute_names, norm_name
+from api.services.merise_rules import (
+    _association_entities_errors,
+    _attributes_require_n_n_error,
+    _duplicate_attributes,
+    _entity_without_association_error,
+    _has_attributes,
+    _link_cardinality_errors,
+    _links_are_n_n,
+    _missing_types,
+    _name_errors,
+    _one_one_with_attributes_errors,
+    validate_inheritance_no_cycle,
+)
+
+# Règles dans l'ordre de merise_rules.validate_mcd (puis CIF, comme mcd_service.validate_mcd)
+RULES = (
+    "entity_names",
+    "association_names",
+    "association_entities",
+    "cardinalities",
+    "one_one_with_attributes",
+    "attributes_require_n_n",
+    "attribute_duplicates",
+    "attribute_types",
+    "entity_association",
+    "inheritance",
+    "cif",
+)
+
+
+class _Entity:
+    __slots__ = ("obj", "key")
+
+    def __init__(self, obj: Dict):
+        self.obj = obj
+        self.key = norm_name(obj.get("name"))
+
+
+class _Association:
+    __slots__ = ("obj", "key", "link_key", "has_attributes", "refs")
+
+    def __init__(self, obj: Dict):
+        self.obj = obj
+        self.key = norm_name(obj.get("name"))
+        # Nom sous lequel validate_association_entities cherche les liens de l'association
+        self.link_key = norm_name(obj.get("name", "Association"))
+        self.has_attributes = _has_attributes(obj)
+        self.refs = tuple(e for e in (obj.get("entities") or []) if isinstance(e, str))
+
+
+class _Link:
+    __slots__ = ("obj", "association", "entity")
+
+    def __init__(self, obj: Dict):
+        self.obj = obj
+        self.association = norm_name(obj.get("association"))
+        self.entity = norm_name(obj.get("entity"))
+
+
+def _add_member(groups: Dict[str, Dict[int, Any]], key: str, item: Any) -> None:
+    groups.setdefault(key, {})[id(item.obj)] = item
+
+
+def _remove_member(groups: Dict[str, Dict[int, Any]], key: str, item: Any) -> None:
+    members = groups.get(key)
+    if members is not None:
+        members.pop(id(item.obj), None)
+        if not members:
+            del groups[key]
+
+
+class IncrementalValidator:
+    """
+    Validateur à état d'un MCD canvas modifié sur place (CompileSession.canvas).
+    apply(changes) réévalue les règles touchées par les PatchChange d'un patch déjà appliqué.
+    """
+
+    def __init__(self, mcd: Dict):
+        self.mcd = mcd
+        self.rebuild()
+
+    # --- Construction ---
+
+    def rebuild(self) -> None:
+        """Réindexe tout le MCD et réévalue toutes les règles."""
+        self._entities: Dict[int, _Entity] = {}
+        self._associations: Dict[int, _Association] = {}
+        self._links: Dict[int, _Link] = {}
+        self._entity_count: Counter = Counter()
+        self._entity_names: Set[str] = set()
+        self._association_count: Counter = Counter()
+        self._assocs_by_key: Dict[str, Dict[int, _Association]] = {}
+        self._assocs_by_link_key: Dict[str, Dict[int, _Association]] = {}
+        self._assocs_by_ref: Dict[str, Dict[int, _Association]] = {}
+        self._links_by_association: Dict[str, Dict[int, _Link]] = {}
+        self._links_by_entity: Dict[str, Dict[int, _Link]] = {}
+        self._errors: Dict[str, Dict[Any, List[str]]] = {rule: {} for rule in RULES}
+        self._added: Counter = Counter()
+        self._removed: Counter = Counter()
+        self._reset_dirty()
+        for collection in ("entities", "associations", "association_links"):
+            for obj in self._items(collection):
+                self._add(collection, obj)
+        self._refresh()
+        self._refresh_inheritance()
+        self._refresh_cif()
+        self._added.clear()
+        self._removed.clear()
+
+    def _items(self, collection: str) -> List[Dict]:
+        items = self.mcd.get(collection) or []
+        return [obj for obj in items if isinstance(obj, dict)] if isinstance(items, list) else []
+
+    def _reset_dirty(self) -> None:
+        self._dirty_entity_keys: Set[str] = set()
+        self._dirty_association_keys: Set[str] = set()
+        self._dirty_associations: Dict[int, _Association] = {}
+        self._had_entities = bool(self._entity_names)
+
+    # --- Suivi des objets ---
+
+    def _add(self, collection: str, obj: Dict) -> None:
+        if collection == "entities":
+            item = _Entity(obj)
+            self._entities[id(obj)] = item
+            self._entity_count[item.key] += 1
+            if item.key:
+                self._entity_names.add(item.key)
+            self._dirty_entity_keys.add(item.key)
+            self._set("attribute_duplicates", id(obj), _duplicate_attributes(
+                "l'entité", item.key or "Entité", _attribute_names(obj)))
+            self._set("attribute_types", id(obj), _missing_types(
+                "l'entité", item.key or "Entité", obj.get("attributes")))
+        elif collection == "associations":
+            item = _Association(obj)
+            self._associations[id(obj)] = item
+            self._association_count[item.key] += 1
+            _add_member(self._assocs_by_key, item.key, item)
+            _add_member(self._assocs_by_link_key, item.link_key, item)
+            for ref in item.refs:
+                _add_member(self._assocs_by_ref, ref, item)
+            self._dirty_association_keys.add(item.key)
+            self._dirty_associations[id(obj)] = item
+            self._set("attribute_duplicates", id(obj), _duplicate_attributes(
+                "l'association", item.key or "Association", _attribute_names(obj)))
+            self._set("attribute_types", id(obj), _missing_types(
+                "l'association", item.key or "Association", obj.get("attributes")))
+        elif collection == "association_links":
+            item = _Link(obj)
+            self._links[id(obj)] = item
+            _add_member(self._links_by_association, item.association, item)
+            if item.entity:
+                _add_member(self._links_by_entity, item.entity, item)
+            self._dirty_association_keys.add(item.association)
+            self._dirty_entity_keys.add(item.entity)
+            self._set("cardinalities", id(obj), _link_cardinality_errors(obj))
+
+    def _discard(self, collection: str, obj: Any) -> None:
+        """Retire l'objet suivi (identité) ; sans effet s'il n'est pas suivi."""
+        if collection == "entities":
+            item = self._entities.pop(id(obj), None)
+            if item is None:
+                return
+            self._entity_count[item.key] -= 1
+            if not self._entity_count[item.key]:
+                del self._entity_count[item.key]
+                self._entity_names.discard(item.key)
+            self._dirty_entity_keys.add(item.key)
+        elif collection == "associations":
+            item = self._associations.pop(id(obj), None)
+            if item is None:
+                return
+            self._association_count[item.key] -= 1
+            if not self._association_count[item.key]:
+                del self._association_count[item.key]
+            _remove_member(self._assocs_by_key, item.key, item)
+            _remove_member(self._assocs_by_link_key, item.link_key, item)
+            for ref in item.refs:
+                _remove_member(self._assocs_by_ref, ref, item)
+            self._dirty_association_keys.add(item.key)
+            self._dirty_associations.pop(id(obj), None)
+            self._set("association_entities", id(obj), [])
+        elif collection == "association_links":
+            item = self._links.pop(id(obj), None)
+            if item is None:
+                return
+            _remove_member(self._links_by_association, item.association, item)
+            if item.entity:
+                _remove_member(self._links_by_entity, item.entity, item)
+            self._dirty_association_keys.add(item.association)
+            self._dirty_entity_keys.add(item.entity)
+            self._set("cardinalities", id(obj), [])
+        else:
+            return
+        self._set("attribute_duplicates", id(obj), [])
+        self._set("attribute_types", id(obj), [])
+
+    # --- Erreurs ---
+
+    def _set(self, rule: str, scope: Any, errors: List[str]) -> None:
+        bucket = self._errors[rule]
+        old = bucket.get(scope, [])
+        if old == errors:
+            return
+        self._removed.update(old)
+        self._added.update(errors)
+        if errors:
+            bucket[scope] = errors
+        else:
+            del bucket[scope]
+
+    def _refresh(self) -> None:
+        """Réévalue les portées marquées depuis le dernier appel."""
+        entity_names = self._entity_names
+        if bool(entity_names) != self._had_entities:
+            # validate_association_entities ne signale les entités inconnues que si le MCD en a
+            self._dirty_associations.update(self._associations)
+        for key in self._dirty_entity_keys:
+            # Entités ajoutées / retirées / renommées : les associations qui y font référence sont à revoir
+            for item in self._assocs_by_ref.get(key, {}).values():
+                self._dirty_associations[id(item.obj)] = item
+            for link in self._links_by_entity.get(key, {}).values():
+                self._dirty_association_keys.add(link.association)
+
+        for key in self._dirty_entity_keys:
+            count = self._entity_count.get(key, 0)
+            self._set("entity_names", key, [
+                e for i in range(count) for e in _name_errors("entity", key, i > 0)
+            ])
+            missing = bool(key) and count > 0 and not self._links_by_entity.get(key)
+            self._set("entity_association", key, [_entity_without_association_error(key)] if missing else [])
+
+        for key in self._dirty_association_keys:
+            count = self._association_count.get(key, 0)
+            self._set("association_names", key, [
+                e for i in range(count) for e in _name_errors("association", key, i > 0)
+            ])
+            links = self._association_links(key)
+            with_attributes = [a for a in self._assocs_by_key.get(key, {}).values() if a.has_attributes] if key else []
+            self._set("one_one_with_attributes", key,
+                      _one_one_with_attributes_errors(key, links) if with_attributes else [])
+            n_n = _links_are_n_n(links) if with_attributes else True
+            self._set("attributes_require_n_n", key,
+                      [] if n_n else [_attributes_require_n_n_error(key)] * len(with_attributes))
+            for item in self._assocs_by_link_key.get(key, {}).values():
+                self._dirty_associations[id(item.obj)] = item
+
+        positions: Optional[Dict[int, int]] = None
+        for scope, item in self._dirty_associations.items():
+            links = self._association_links(item.link_key)
+            if not item.refs and len({link.get("entity") for link in links}) > 2:
+                # Association n-aire : seules les deux premières entités (ordre des liens) sont vérifiées
+                if positions is None:
+                    positions = {id(link): i for i, link in enumerate(self._items("association_links"))}
+                links = tuple(sorted(links, key=lambda link: positions.get(id(link), -1)))
+            self._set("association_entities", scope, _association_entities_errors(item.obj, links, entity_names))
+        self._reset_dirty()
+
+    def _association_links(self, key: str) -> Tuple[Dict, ...]:
+        return tuple(link.obj for link in self._links_by_association.get(key, {}).values())
+
+    def _refresh_inheritance(self) -> None:
+        self._set("inheritance", None, validate_inheritance_no_cycle(self._items("inheritance_links")))
+
+    def _refresh_cif(self) -> None:
+        cif_constraints = self.mcd.get("cif_constraints") or []
+        errors = validate_mcd_with_cif([], [], [], cif_constraints=cif_constraints) if cif_constraints else []
+        self._set("cif", None, errors)
+
+    # --- API publique ---
+
+    def apply(self, changes: Iterable[PatchChange]) -> Dict[str, Any]:
+        """
+        Prend en compte les PatchChange d'un patch appliqué à self.mcd.
+        Retourne {valid, errors, added, removed} (added / removed : erreurs apparues / disparues).
+        """
+        changes = list(changes)
+        if any(c.full and (c.collection in TRACKED_COLLECTIONS or c.collection == "*") for c in changes):
+            old = Counter(self.errors())
+            self.rebuild()
+            return self._result(old)
+        self._added.clear()
+        self._removed.clear()
+        inheritance = cif = False
+        for change in changes:
+            if change.full:
+                cif = cif or change.collection == "cif_constraints"
+                continue
+            if change.collection == "inheritance_links":
+                inheritance = True
+                continue
+            for obj in (change.before, change.after):
+                if obj is not None:
+                    self._discard(change.collection, obj)
+            if isinstance(change.after, dict):
+                self._add(change.collection, change.after)
+        self._refresh()
+        if inheritance:
+            self._refresh_inheritance()
+        if cif:
+            self._refresh_cif()
+        return self._result()
+
+    def _result(self, old: Optional[Counter] = None) -> Dict[str, Any]:
+        errors = self.errors()
+        if old is None:
+            added, removed = self._added - self._removed, self._removed - self._added
+        else:
+            new = Counter(errors)
+            added, removed = new - old, old - new
+        return {
+            "valid": not errors,
+            "errors": errors,
+            "added": list(added.elements()),
+            "removed": list(removed.elements()),
+        }
+
+    def errors(self) -> List[str]:
+        """Erreurs courantes, ordonnées par règle."""
+        return [e for rule in RULES for errors in self._errors[rule].values() for e in errors]
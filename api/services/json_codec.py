@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Encodage / décodage JSON rapide pour les gros MCD (plusieurs Mo).
+
+orjson est utilisé s'il est installé (dépendance optionnelle), sinon le module json
+standard avec une sérialisation compacte. Dans les deux cas la sortie est du JSON UTF-8.
+check_fields contrôle les champs de premier niveau d'un corps décodé (api.fast_json.json_body).
+"""
+
+import json
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def _default(obj: Any) -> Any:
+    """Types hors JSON (ensembles, types NumPy/pandas, dates...) : listes ou chaînes."""
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=str)
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(obj: Any) -> bytes:
+        """Sérialise obj en JSON (bytes UTF-8)."""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    def loads(data: Any) -> Any:
+        """Désérialise du JSON (bytes ou str)."""
+        return orjson.loads(data)
+else:
+    def dumps(obj: Any) -> bytes:
+        """Sérialise obj en JSON (bytes UTF-8)."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+    def loads(data: Any) -> Any:
+        """Désérialise du JSON (bytes ou str)."""
+        return json.loads(data)
+
+
+class _Optional:
+    def __init__(self, spec: type):
+        self.spec = spec
+
+
+def optional(spec: type) -> _Optional:
+    """Champ facultatif typé pour check_fields : absent / null (None) ou valeur du type spec."""
+    return _Optional(spec)
+
+
+def _matches(value: Any, spec: type) -> bool:
+    """isinstance strict pour les booléens JSON : true n'est pas un entier, 0 n'est pas un booléen."""
+    if spec is bool or isinstance(value, bool):
+        return spec is bool and isinstance(value, bool)
+    if spec is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, spec)
+
+
+def check_fields(body: Dict[str, Any], fields: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Vérifie les champs de premier niveau de body et complète les valeurs par défaut (body modifié).
+    fields : nom → type (champ obligatoire), optional(type) (None par défaut), ou valeur par défaut
+    (type(défaut) exigé si le champ est fourni). ValueError si un champ est absent ou mal typé.
+    """
+    for name, spec in fields.items():
+        value = body.get(name)
+        if isinstance(spec, type):
+            expected, required = spec, True
+        elif isinstance(spec, _Optional):
+            expected, required = spec.spec, False
+        else:
+            expected, required = type(spec), False
+            if value is None:
+                body[name] = spec
+                continue
+        if value is None and not required:
+            body[name] = None
+        elif not _matches(value, expected):
+            raise ValueError(f"Champ « {name} » manquant ou invalide (attendu : {expected.__name__}).")
+    return body
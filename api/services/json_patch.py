@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Application de deltas « JSON Patch » (RFC 6902, sous-ensemble) sur un MCD canvas.
+
+Opérations supportées : add, remove, replace, test.
+Le patch est atomique : en cas d'erreur, les opérations déjà appliquées sont annulées.
+Chaque opération portant sur une collection du MCD (entities, associations, ...)
+est résumée par un PatchChange, utilisé pour ne recalculer que ce qui a changé.
+"""
+
+import copy
+from typing import Any, Dict, List, Optional, Tuple
+
+# Collections du MCD canvas dont on suit les éléments modifiés
+TRACKED_COLLECTIONS = ("entities", "associations", "association_links", "inheritance_links")
+
+
+class PatchChange:
+    """
+    Modification d'un élément d'une collection du MCD.
+    - before : copie de l'élément avant modification (None si ajouté)
+    - after : élément vivant après modification (None si supprimé)
+    - full : True si la collection entière (ou une clé hors collection suivie) a été remplacée
+    """
+
+    __slots__ = ("collection", "before", "after", "full")
+
+    def __init__(self, collection: str, before: Optional[Any] = None, after: Optional[Any] = None, full: bool = False):
+        self.collection = collection
+        self.before = before
+        self.after = after
+        self.full = full
+
+    def __repr__(self) -> str:
+        return f"PatchChange({self.collection!r}, full={self.full})"
+
+
+def parse_pointer(path: str) -> List[str]:
+    """Découpe un JSON Pointer (« /entities/0/name ») en segments décodés (~1 → /, ~0 → ~)."""
+    if path == "":
+        return []
+    if not isinstance(path, str) or not path.startswith("/"):
+        raise ValueError(f"Chemin JSON Pointer invalide : « {path} ».")
+    return [p.replace("~1", "/").replace("~0", "~") for p in path[1:].split("/")]
+
+
+def _list_index(container: List, token: str, allow_end: bool) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit():
+        raise ValueError(f"Index de liste invalide : « {token} ».")
+    idx = int(token)
+    limit = len(container) if allow_end else len(container) - 1
+    if idx > limit:
+        raise ValueError(f"Index hors limites : {idx}.")
+    return idx
+
+
+def _resolve_parent(doc: Any, tokens: List[str]) -> Tuple[Any, str]:
+    node = doc
+    for token in tokens[:-1]:
+        if isinstance(node, list):
+            node = node[_list_index(node, token, allow_end=False)]
+        elif isinstance(node, dict):
+            if token not in node:
+                raise ValueError(f"Chemin inexistant : « {token} ».")
+            node = node[token]
+        else:
+            raise ValueError(f"Chemin invalide au segment « {token} ».")
+    return node, tokens[-1]
+
+
+def _get(doc: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        return doc
+    parent, key = _resolve_parent(doc, tokens)
+    if isinstance(parent, list):
+        return parent[_list_index(parent, key, allow_end=False)]
+    if isinstance(parent, dict) and key in parent:
+        return parent[key]
+    raise ValueError(f"Chemin inexistant : « {key} ».")
+
+
+def _add(doc: Any, tokens: List[str], value: Any) -> Tuple:
+    parent, key = _resolve_parent(doc, tokens)
+    if isinstance(parent, list):
+        idx = _list_index(parent, key, allow_end=True)
+        parent.insert(idx, value)
+        return ("remove_index", parent, idx)
+    if isinstance(parent, dict):
+        if key in parent:
+            old = parent[key]
+            parent[key] = value
+            return ("set", parent, key, old)
+        parent[key] = value
+        return ("del", parent, key)
+    raise ValueError(f"Impossible d'ajouter sous « {key} ».")
+
+
+def _remove(doc: Any, tokens: List[str]) -> Tuple:
+    parent, key = _resolve_parent(doc, tokens)
+    if isinstance(parent, list):
+        idx = _list_index(parent, key, allow_end=False)
+        old = parent.pop(idx)
+        return ("insert", parent, idx, old)
+    if isinstance(parent, dict) and key in parent:
+        old = parent.pop(key)
+        return ("set", parent, key, old)
+    raise ValueError(f"Chemin inexistant : « {key} ».")
+
+
+def _replace(doc: Any, tokens: List[str], value: Any) -> Tuple:
+    parent, key = _resolve_parent(doc, tokens)
+    if isinstance(parent, list):
+        idx = _list_index(parent, key, allow_end=False)
+        old = parent[idx]
+        parent[idx] = value
+        return ("set", parent, idx, old)
+    if isinstance(parent, dict) and key in parent:
+        old = parent[key]
+        parent[key] = value
+        return ("set", parent, key, old)
+    raise ValueError(f"Chemin inexistant : « {key} ».")
+
+
+def _undo(entry: Tuple) -> None:
+    kind = entry[0]
+    if kind == "remove_index":
+        entry[1].pop(entry[2])
+    elif kind == "insert":
+        entry[1].insert(entry[2], entry[3])
+    elif kind == "set":
+        entry[1][entry[2]] = entry[3]
+    elif kind == "del":
+        del entry[1][entry[2]]
+
+
+def _change_for(doc: Dict, op: str, tokens: List[str]) -> PatchChange:
+    """Prépare le PatchChange d'une opération (avant application)."""
+    if not tokens:
+        return PatchChange("*", full=True)
+    collection = tokens[0]
+    if collection not in TRACKED_COLLECTIONS or len(tokens) == 1:
+        return PatchChange(collection, full=True)
+    items = doc.get(collection)
+    if not isinstance(items, list):
+        return PatchChange(collection, full=True)
+    if len(tokens) == 2:
+        if op == "add":
+            return PatchChange(collection)
+        return PatchChange(collection, before=items[_list_index(items, tokens[1], allow_end=False)])
+    item = items[_list_index(items, tokens[1], allow_end=False)]
+    return PatchChange(collection, before=copy.deepcopy(item), after=item)
+
+
+def revert_json_patch(undo_log: List[Tuple]) -> None:
+    """Annule un patch appliqué à partir de son journal d'annulation (voir apply_json_patch)."""
+    for entry in reversed(undo_log):
+        _undo(entry)
+    del undo_log[:]
+
+
+def apply_json_patch(doc: Dict, operations: List[Dict], undo_log: Optional[List[Tuple]] = None) -> List[PatchChange]:
+    """
+    Applique les opérations sur doc (modifié sur place) et retourne les PatchChange.
+    Lève ValueError (patch annulé) si une opération est invalide ou si un « test » échoue.
+    Si undo_log est fourni, il reçoit le journal permettant d'annuler le patch plus tard
+    (revert_json_patch), par exemple si la recompilation qui suit échoue.
+    """
+    if not isinstance(operations, list):
+        raise ValueError("Le patch doit être une liste d'opérations.")
+    if undo_log is None:
+        undo_log = []
+    changes: List[PatchChange] = []
+    try:
+        for operation in operations:
+            if not isinstance(operation, dict):
+                raise ValueError("Chaque opération du patch doit être un objet.")
+            op = operation.get("op")
+            tokens = parse_pointer(operation.get("path", ""))
+            if op == "test":
+                if _get(doc, tokens) != operation.get("value"):
+                    raise ValueError(f"Test échoué sur « {operation.get('path')} ».")
+                continue
+            if op not in ("add", "remove", "replace"):
+                raise ValueError(f"Opération de patch non supportée : « {op} ».")
+            if not tokens:
+                raise ValueError("Le remplacement du document entier n'est pas supporté ; recréer la session.")
+            if op != "remove" and "value" not in operation:
+                raise ValueError(f"Opération « {op} » sans valeur.")
+            change = _change_for(doc, op, tokens)
+            if op == "add":
+                undo_log.append(_add(doc, tokens, operation["value"]))
+            elif op == "remove":
+                undo_log.append(_remove(doc, tokens))
+            else:
+                undo_log.append(_replace(doc, tokens, operation["value"]))
+            if not change.full and len(tokens) == 2:
+                change.after = None if op == "remove" else operation["value"]
+            changes.append(change)
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        revert_json_patch(undo_log)
+        raise ValueError(f"Patch invalide : {e}") from e
+    return changes
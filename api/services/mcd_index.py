@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Index immuable d'un MCD canvas, construit une fois par requête et partagé par les validateurs
+(merise_rules, association_logic).
+
+Un seul parcours des listes entities / associations / association_links / inheritance_links
+fournit : recherche par nom normalisé (strip), liens groupés par association et par entité,
+ensembles de noms et rubriques. Les règles deviennent ainsi linéaires en taille du MCD
+au lieu de re-parcourir les liens pour chaque association.
+
+L'index ne copie pas les objets du MCD : ne pas modifier le MCD pendant son utilisation.
+"""
+
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+
+def norm_name(value: Any) -> str:
+    """Nom normalisé tel que comparé par les règles (espaces de bord retirés, "" si absent)."""
+    return (value or "").strip()
+
+
+def _attribute_names(obj: Dict) -> Tuple[str, ...]:
+    """Noms de rubriques non vides (ordre d'origine, doublons conservés)."""
+    attrs = obj.get("attributes") or []
+    if not isinstance(attrs, list):
+        return ()
+    return tuple(n for n in (norm_name(a.get("name")) if isinstance(a, dict) else "" for a in attrs) if n)
+
+
+def _group(pairs) -> Mapping[str, Tuple[Dict, ...]]:
+    grouped: Dict[str, List[Dict]] = {}
+    for key, item in pairs:
+        grouped.setdefault(key, []).append(item)
+    return MappingProxyType({k: tuple(v) for k, v in grouped.items()})
+
+
+class McdIndex:
+    """Vue indexée, en lecture seule, d'un MCD au format canvas."""
+
+    __slots__ = (
+        "entities", "associations", "links", "inheritance_links",
+        "entity_keys", "association_keys",
+        "entity_attributes", "association_attributes",
+        "entity_names", "association_names",
+        "_entity_by_name", "_association_by_name",
+        "_links_by_association", "_links_by_entity", "_link_pairs",
+    )
+
+    def __init__(
+        self,
+        entities: Optional[List[Dict]] = None,
+        associations: Optional[List[Dict]] = None,
+        association_links: Optional[List[Dict]] = None,
+        inheritance_links: Optional[List[Dict]] = None,
+    ):
+        entities = tuple(entities or ())
+        associations = tuple(associations or ())
+        links = tuple(association_links or ())
+        set_ = object.__setattr__
+        set_(self, "entities", entities)
+        set_(self, "associations", associations)
+        set_(self, "links", links)
+        set_(self, "inheritance_links", tuple(inheritance_links or ()))
+        # Noms normalisés, parallèles aux listes ("" : objet sans nom)
+        set_(self, "entity_keys", tuple(norm_name(e.get("name")) for e in entities))
+        set_(self, "association_keys", tuple(norm_name(a.get("name")) for a in associations))
+        # Rubriques normalisées, parallèles aux listes
+        set_(self, "entity_attributes", tuple(_attribute_names(e) for e in entities))
+        set_(self, "association_attributes", tuple(_attribute_names(a) for a in associations))
+        set_(self, "entity_names", frozenset(k for k in self.entity_keys if k))
+        set_(self, "association_names", frozenset(k for k in self.association_keys if k))
+
+        entity_by_name: Dict[str, Dict] = {}
+        for key, e in zip(self.entity_keys, entities):
+            if key and key not in entity_by_name:
+                entity_by_name[key] = e
+        association_by_name: Dict[str, Dict] = {}
+        for key, a in zip(self.association_keys, associations):
+            if key and key not in association_by_name:
+                association_by_name[key] = a
+        set_(self, "_entity_by_name", MappingProxyType(entity_by_name))
+        set_(self, "_association_by_name", MappingProxyType(association_by_name))
+
+        link_keys = [(norm_name(l.get("association")), norm_name(l.get("entity"))) for l in links]
+        set_(self, "_links_by_association", _group((a, l) for (a, _), l in zip(link_keys, links)))
+        set_(self, "_links_by_entity", _group((e, l) for (_, e), l in zip(link_keys, links) if e))
+        set_(self, "_link_pairs", frozenset(link_keys))
+
+    @classmethod
+    def from_mcd(cls, mcd: Optional[Dict]) -> "McdIndex":
+        """Index d'un MCD canvas (dict avec entities, associations, association_links, inheritance_links)."""
+        mcd = mcd or {}
+        return cls(
+            mcd.get("entities"),
+            mcd.get("associations"),
+            mcd.get("association_links"),
+            mcd.get("inheritance_links"),
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("McdIndex est immuable.")
+
+    # --- Recherche ---
+
+    def entity(self, name: str) -> Optional[Dict]:
+        """Première entité portant ce nom (normalisé), None sinon."""
+        return self._entity_by_name.get(norm_name(name))
+
+    def association(self, name: str) -> Optional[Dict]:
+        """Première association portant ce nom (normalisé), None sinon."""
+        return self._association_by_name.get(norm_name(name))
+
+    def links_for_association(self, name: str) -> Tuple[Dict, ...]:
+        """Liens association–entité d'une association (ordre d'origine)."""
+        return self._links_by_association.get(norm_name(name), ())
+
+    def links_for_entity(self, name: str) -> Tuple[Dict, ...]:
+        """Liens association–entité d'une entité (ordre d'origine)."""
+        return self._links_by_entity.get(norm_name(name), ())
+
+    def has_link(self, association_name: str, entity_name: str) -> bool:
+        """True si un lien relie déjà cette association à cette entité."""
+        return (norm_name(association_name), norm_name(entity_name)) in self._link_pairs
+
+    def linked_entity_names(self) -> FrozenSet[str]:
+        """Noms des entités reliées à au moins une association."""
+        return frozenset(self._links_by_entity)
+
+    def association_has_attributes(self, name: str) -> bool:
+        """True si l'association (première de ce nom) est porteuse de rubriques."""
+        attrs = (self.association(name) or {}).get("attributes") or []
+        return isinstance(attrs, list) and len(attrs) > 0
+
+    def __repr__(self) -> str:
+        return (f"McdIndex({len(self.entities)} entités, {len(self.associations)} associations, "
+                f"{len(self.links)} liens)")
+
+
+class _NameUnion:
+    """Ensemble de noms de l'index de base augmenté de noms ajoutés (test d'appartenance seulement)."""
+
+    __slots__ = ("_base", "_extra")
+
+    def __init__(self, base: FrozenSet[str], extra: FrozenSet[str]):
+        self._base = base
+        self._extra = extra
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._base or name in self._extra
+
+    def __iter__(self):
+        yield from self._base
+        yield from (n for n in self._extra if n not in self._base)
+
+    def __len__(self) -> int:
+        return len(self._base) + len(self._extra - self._base)
+
+
+class McdIndexOverlay:
+    """
+    McdIndex augmenté d'associations / liens ajoutés et de rubriques modifiées,
+    sans réindexer le MCD : utilisé pour valider un lot d'opérations appliquées
+    l'une après l'autre (association_logic.validate_operations).
+    Chaque with_* retourne un nouvel overlay ; l'index de base n'est pas modifié.
+    """
+
+    __slots__ = ("base", "_associations", "_links", "_attributes", "association_names", "entity_names")
+
+    def __init__(
+        self,
+        base: McdIndex,
+        associations: Tuple[Dict, ...] = (),
+        links: Tuple[Dict, ...] = (),
+        attributes: Optional[Mapping[str, List[Dict]]] = None,
+    ):
+        self.base = base
+        self._associations = associations
+        self._links = links
+        self._attributes = dict(attributes or {})
+        self.entity_names = base.entity_names
+        self.association_names = _NameUnion(
+            base.association_names, frozenset(norm_name(a.get("name")) for a in associations) - {""}
+        )
+
+    def with_association(self, association: Dict) -> "McdIndexOverlay":
+        return McdIndexOverlay(self.base, self._associations + (association,), self._links, self._attributes)
+
+    def with_link(self, link: Dict) -> "McdIndexOverlay":
+        return McdIndexOverlay(self.base, self._associations, self._links + (link,), self._attributes)
+
+    def with_attributes(self, association_name: str, attributes: List[Dict]) -> "McdIndexOverlay":
+        overrides = dict(self._attributes)
+        overrides[norm_name(association_name)] = attributes
+        return McdIndexOverlay(self.base, self._associations, self._links, overrides)
+
+    def association(self, name: str) -> Optional[Dict]:
+        key = norm_name(name)
+        found = self.base.association(key)
+        if found is None:
+            found = next((a for a in self._associations if norm_name(a.get("name")) == key), None)
+        if found is not None and key in self._attributes:
+            found = dict(found, attributes=self._attributes[key])
+        return found
+
+    def links_for_association(self, name: str) -> Tuple[Dict, ...]:
+        key = norm_name(name)
+        added = tuple(l for l in self._links if norm_name(l.get("association")) == key)
+        return self.base.links_for_association(key) + added
+
+    def has_link(self, association_name: str, entity_name: str) -> bool:
+        if self.base.has_link(association_name, entity_name):
+            return True
+        pair = (norm_name(association_name), norm_name(entity_name))
+        return any((norm_name(l.get("association")), norm_name(l.get("entity"))) == pair for l in self._links)
+
+    def association_has_attributes(self, name: str) -> bool:
+        attrs = (self.association(name) or {}).get("attributes") or []
+        return isinstance(attrs, list) and len(attrs) > 0
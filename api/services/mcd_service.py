@@ -6,13 +6,17 @@ model_converter et expose parse markdown, validate, mcd->mld, mld->sql.
 Logique métier alignée sur les règles Merise (voir api.services.merise_rules).
 """
 
+import codecs
 import sys
 import os
 ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, ROOT)
 
-from typing import Dict, List, Any, Optional
+from typing import BinaryIO, Dict, List, Any, Optional, Callable, Iterable, Iterator, Tuple
 
+from api.services.compile_cache import CompileCache, mcd_digest
+from api.services.mcd_index import McdIndex
+from api.services.metrics import MODEL_SIZE, stage
 from api.services.merise_rules import (
     normalize_cardinality,
     validate_mcd as merise_validate_mcd,
@@ -22,8 +26,21 @@ from api.services.association_logic import (
     validate_create_association as logic_validate_create_association,
     validate_add_link as logic_validate_add_link,
     validate_association_after_update as logic_validate_association_after_update,
+    validate_operations as logic_validate_operations,
 )
 
+SUPPORTED_DBMS = ("mysql", "postgresql", "sqlite", "sqlserver")
+
+# Cache partagé par les routes /to-mld, /to-mld-text, /to-mpd, /to-sql :
+# le client Flutter renvoie souvent le même MCD à chaque rafraîchissement des panneaux.
+_compile_cache = CompileCache()
+
+# Processus pour la conversion MCD -> MLD des gros MCD (0 = série, voir views.mld_sharding)
+MLD_WORKERS = int(os.environ.get("BARREL_MLD_WORKERS", "0"))
+
+# Taille (caractères) des morceaux envoyés par mcd_to_sql_stream
+SQL_STREAM_CHUNK_SIZE = int(os.environ.get("BARREL_SQL_STREAM_CHUNK_SIZE", "65536"))
+
 
 def _canvas_mcd_to_converter_format(data: Dict, exclude_fictive: bool = True) -> Dict:
     """
@@ -41,44 +58,69 @@ def _canvas_mcd_to_converter_format(data: Dict, exclude_fictive: bool = True) ->
     _log.info("_canvas_mcd_to_converter_format: %s entités, %s associations", len(raw_entities), len(raw_associations))
     entities_dict = {}
     for e in raw_entities:
-        if not isinstance(e, dict):
-            _log.warning("_canvas_mcd_to_converter_format: entité ignorée (pas un dict): %s", type(e))
-            continue
-        if exclude_fictive and e.get("is_fictive") is True:
-            continue
-        name = e.get("name", "Sans nom") or "Sans nom"
-        if not name:
-            _log.warning("_canvas_mcd_to_converter_format: entité sans nom ignorée")
-            continue
-        attrs = []
-        for a in e.get("attributes") or []:
-            if isinstance(a, dict):
-                attrs.append({
-                    "name": a.get("name", ""),
-                    "type": a.get("type", "VARCHAR(255)"),
-                    "primary_key": a.get("is_primary_key", a.get("primary_key", False)),
-                    "description": a.get("description", ""),
-                    "nullable": a.get("nullable", True),
-                    "default_value": a.get("default_value"),
-                    "size": a.get("size"),
-                    "precision": a.get("precision"),
-                    "scale": a.get("scale"),
-                    "is_unique": a.get("is_unique", False),
-                    "auto_increment": a.get("auto_increment", False),
-                })
-        entities_dict[name] = {"name": name, "attributes": attrs}
+        converted = _canvas_entity_to_converter_format(e, exclude_fictive)
+        if converted is not None:
+            entities_dict[converted["name"]] = converted
+    return _converter_mcd(data, entities_dict, exclude_fictive)
+
+
+def _canvas_entity_to_converter_format(e: Any, exclude_fictive: bool = True) -> Optional[Dict]:
+    """Convertit une entité canvas vers le format ModelConverter ; None si elle est ignorée."""
+    import logging
+    _log = logging.getLogger(__name__)
+    if not isinstance(e, dict):
+        _log.warning("_canvas_mcd_to_converter_format: entité ignorée (pas un dict): %s", type(e))
+        return None
+    if exclude_fictive and e.get("is_fictive") is True:
+        return None
+    name = e.get("name", "Sans nom") or "Sans nom"
+    if not name:
+        _log.warning("_canvas_mcd_to_converter_format: entité sans nom ignorée")
+        return None
+    attrs = []
+    for a in e.get("attributes") or []:
+        if isinstance(a, dict):
+            attrs.append({
+                "name": a.get("name", ""),
+                "type": a.get("type", "VARCHAR(255)"),
+                "primary_key": a.get("is_primary_key", a.get("primary_key", False)),
+                "description": a.get("description", ""),
+                "nullable": a.get("nullable", True),
+                "default_value": a.get("default_value"),
+                "size": a.get("size"),
+                "precision": a.get("precision"),
+                "scale": a.get("scale"),
+                "is_unique": a.get("is_unique", False),
+                "auto_increment": a.get("auto_increment", False),
+            })
+    converted = {"name": name, "attributes": attrs}
+    # Indications de volumétrie, reprises seulement si renseignées (clé de cache inchangée sinon)
+    for hint in ("estimated_rows", "partition_by"):
+        if e.get(hint) is not None:
+            converted[hint] = e[hint]
+    return converted
+
+
+def _converter_mcd(data: Dict, entities_dict: Dict, exclude_fictive: bool = True) -> Dict:
+    """Complète les entités déjà converties avec les relations et l'héritage du MCD canvas."""
+    import logging
+    _log = logging.getLogger(__name__)
+    # Liens regroupés par association une seule fois (évite un parcours de tous les liens par association)
+    links_by_association: Dict[Any, List[Dict]] = {}
+    for l in data.get("association_links") or []:
+        links_by_association.setdefault(l.get("association"), []).append(l)
 
     # Construire les relations (uniquement entre entités présentes dans entities_dict)
     relations = []
-    for a in raw_associations:
+    for a in data.get("associations") or []:
         if not isinstance(a, dict):
             _log.warning("_canvas_mcd_to_converter_format: association ignorée (pas un dict)")
             continue
         name = a.get("name", "Association") or "Association"
         entities = list(a.get("entities") or [])
         cardinalities = dict(a.get("cardinalities") or {})
-        if not entities and data.get("association_links"):
-            links_to_this = [l for l in data["association_links"] if l.get("association") == name]
+        if not entities and links_by_association:
+            links_to_this = links_by_association.get(name, [])
             for link in links_to_this:
                 ent = link.get("entity")
                 if ent and ent not in entities:
@@ -136,11 +178,64 @@ def _canvas_mcd_to_converter_format(data: Dict, exclude_fictive: bool = True) ->
     return mcd
 
 
+MARKDOWN_CHUNK_BYTES = 64 * 1024
+
+
 def parse_markdown(content: str) -> Dict[str, Any]:
     """Parse du Markdown vers structure MCD (entités + associations)."""
     from views.markdown_mcd_parser import MarkdownMCDParser
     parser = MarkdownMCDParser(verbose=False)
-    return parser.parse_markdown(content)
+    with stage("markdown_parse"):
+        return parser.parse_markdown(content)
+
+
+def _markdown_canvas_result(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "parsed": parsed,
+        "canvas": markdown_to_canvas_format(parsed),
+        "precision_score": parsed.get("metadata", {}).get("precision_score", 0.0),
+    }
+
+
+def parse_markdown_for_canvas(content: str) -> Dict[str, Any]:
+    """Parse Markdown + conversion au format canvas (réponse de /api/parse-markdown, picklable pour le pool)."""
+    return _markdown_canvas_result(parse_markdown(content))
+
+
+def parse_markdown_stream(stream: BinaryIO, encoding: str = "utf-8") -> Dict[str, Any]:
+    """
+    Parse en flux un Markdown binaire (upload, fichier ouvert en 'rb') par morceaux de MARKDOWN_CHUNK_BYTES,
+    puis conversion au format canvas : la mémoire reste proportionnelle au MCD, pas au texte.
+    """
+    from views.markdown_mcd_parser import MarkdownMCDParser
+    parser = MarkdownMCDParser(verbose=False)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    with stage("markdown_parse"):
+        for chunk in iter(lambda: stream.read(MARKDOWN_CHUNK_BYTES), b""):
+            parser.feed(decoder.decode(chunk))
+        parser.feed(decoder.decode(b"", final=True))
+        parsed = parser.close()
+    return _markdown_canvas_result(parsed)
+
+
+# Sections Markdown déjà analysées, partagées par les prévisualisations (clé : empreinte de la section)
+MARKDOWN_SECTION_CACHE_SIZE = int(os.environ.get("BARREL_MARKDOWN_SECTION_CACHE_SIZE", "50000"))
+_markdown_sections = CompileCache(MARKDOWN_SECTION_CACHE_SIZE)
+
+
+def parse_markdown_preview(content: str) -> Dict[str, Any]:
+    """
+    Parse Markdown incrémental pour la prévisualisation en direct (/api/parse-markdown/preview) :
+    seules les sections ## / ### absentes du cache sont analysées. Même réponse que
+    parse_markdown_for_canvas, plus "sections" (sections du document, sections réanalysées).
+    """
+    from views.markdown_mcd_parser import IncrementalMarkdownParser
+    parser = IncrementalMarkdownParser(cache=_markdown_sections)
+    with stage("markdown_parse"):
+        parsed = parser.parse_markdown(content)
+    result = _markdown_canvas_result(parsed)
+    result["sections"] = parser.last_stats
+    return result
 
 
 def parse_mots_codes(content: str) -> Dict[str, Any]:
@@ -197,6 +292,21 @@ def validate_association_after_update(
     )
 
 
+def validate_operations(mcd_structure: Dict, operations: List[Dict], apply: bool = False) -> Dict[str, Any]:
+    """
+    Valide un lot d'opérations (création d'association, ajout de lien, mise à jour de rubriques)
+    contre un seul index du MCD ; si apply, chaque opération valide est prise en compte par les suivantes.
+    apply doit être un booléen JSON (la chaîne "false" est refusée, pas interprétée comme vraie).
+    """
+    if not isinstance(operations, list):
+        raise ValueError("operations doit être une liste.")
+    if not isinstance(apply, bool):
+        raise ValueError("apply doit être un booléen (true ou false).")
+    with stage("batch_validation"):
+        results = logic_validate_operations(mcd_structure or {}, operations, apply=apply)
+    return {"valid": all(r["valid"] for r in results), "results": results}
+
+
 def validate_mcd(mcd_structure: Dict) -> List[str]:
     """
     Valide la structure MCD (format canvas) : règles Merise + CIF si présentes.
@@ -205,21 +315,22 @@ def validate_mcd(mcd_structure: Dict) -> List[str]:
     entities = mcd_structure.get("entities", [])
     associations = mcd_structure.get("associations", [])
     association_links = mcd_structure.get("association_links", [])
-    inheritance_links = mcd_structure.get("inheritance_links", [])
-    errors = list(merise_validate_mcd(
-        entities=entities,
-        associations=associations,
-        association_links=association_links,
-        inheritance_links=inheritance_links,
-    ))
-    cif_constraints = mcd_structure.get("cif_constraints") or []
-    if cif_constraints:
-        errors.extend(validate_mcd_with_cif(
+    with stage("merise_validation"):
+        index = McdIndex.from_mcd(mcd_structure)
+        errors = list(merise_validate_mcd(
             entities=entities,
             associations=associations,
-            association_links=association_links,
-            cif_constraints=cif_constraints,
+            index=index,
         ))
+    cif_constraints = mcd_structure.get("cif_constraints") or []
+    if cif_constraints:
+        with stage("cif_validation"):
+            errors.extend(validate_mcd_with_cif(
+                entities=entities,
+                associations=associations,
+                association_links=association_links,
+                cif_constraints=cif_constraints,
+            ))
     return errors
 
 
@@ -302,45 +413,91 @@ def markdown_to_canvas_format(parsed: Dict) -> Dict:
     }
 
 
-def mcd_to_mld(canvas_mcd: Dict) -> Dict:
-    """Convertit MCD (format canvas) en MLD."""
+def _normalize_for_compile(canvas_mcd: Dict) -> Tuple[Dict, str]:
+    """Normalise le MCD canvas (format ModelConverter) et calcule sa clé de cache."""
+    with stage("normalize"):
+        mcd = _canvas_mcd_to_converter_format(canvas_mcd)
+        digest = mcd_digest(mcd)
+    MODEL_SIZE.set(len(mcd["entities"]), kind="entities")
+    MODEL_SIZE.set(len(mcd["associations"]), kind="associations")
+    return mcd, digest
+
+
+def _cached(kind: str, digest: str, dbms: Optional[str], build: Callable[[], Any]) -> Any:
+    """Retourne l'artefact (kind, dbms) du MCD d'empreinte digest, en le construisant si absent."""
+    key = (kind, dbms, digest)
+    value = _compile_cache.get(key)
+    if value is None:
+        value = build()
+        _compile_cache.put(key, value)
+    return value
+
+
+def compile_cache_stats() -> Dict[str, Any]:
+    """Statistiques du cache de compilation (hits, misses, taille)."""
+    return _compile_cache.stats()
+
+
+def clear_compile_cache() -> None:
+    """Vide le cache de compilation."""
+    _compile_cache.clear()
+
+
+def _build_mld(mcd: Dict):
     import logging
     _log = logging.getLogger(__name__)
-    try:
-        mcd = _canvas_mcd_to_converter_format(canvas_mcd)
-        _log.info("mcd_to_mld: format converti -> %s entités, %s relations", len(mcd.get("entities") or {}), len(mcd.get("associations") or []))
-    except Exception as e:
-        _log.exception("mcd_to_mld _canvas_mcd_to_converter_format: %s", e)
-        raise
-    from views.model_converter import ModelConverter, ConversionType
+    from views.model_converter import ModelConverter
     converter = ModelConverter()
     try:
-        mld = converter.convert_model(mcd, ConversionType.MCD_TO_MLD)
-        _log.info("mcd_to_mld: MLD généré -> %s tables, %s FK", len(mld.get("tables") or {}), len(mld.get("foreign_keys") or []))
+        with stage("mld"):
+            mld = converter.build_mld(mcd, workers=MLD_WORKERS)
+        _log.info("mcd_to_mld: MLD généré -> %s tables, %s FK", len(mld.tables), len(mld.foreign_keys))
         return mld
     except Exception as e:
         _log.exception("mcd_to_mld convert_model: %s", e)
         raise
 
 
-def mcd_to_mld_text(canvas_mcd: Dict) -> str:
-    """
-    Export MLD textuel (inspiration Barrel : « Exporter le MLD textuel »).
-    Retourne une représentation lisible du MLD : tables, colonnes, clés étrangères.
-    """
-    mld = mcd_to_mld(canvas_mcd)
+def _mld_for(mcd: Dict, digest: str):
+    """MLD (views.model_ir.Mld) du MCD, mis en cache ; sérialisé en dict seulement pour l'API."""
+    return _cached("mld_ir", digest, None, lambda: _build_mld(mcd))
+
+
+def _mld_dict_for(mcd: Dict, digest: str) -> Dict:
+    return _cached("mld", digest, None, lambda: _mld_for(mcd, digest).to_dict())
+
+
+def mcd_to_mld(canvas_mcd: Dict) -> Dict:
+    """Convertit MCD (format canvas) en MLD. Le résultat est mis en cache : ne pas le modifier."""
+    import logging
+    _log = logging.getLogger(__name__)
+    try:
+        mcd, digest = _normalize_for_compile(canvas_mcd)
+        _log.info("mcd_to_mld: format converti -> %s entités, %s relations", len(mcd.get("entities") or {}), len(mcd.get("associations") or []))
+    except Exception as e:
+        _log.exception("mcd_to_mld _canvas_mcd_to_converter_format: %s", e)
+        raise
+    return prepared_mcd_to_mld(mcd, digest)
+
+
+def prepared_mcd_to_mld(mcd: Dict, digest: str) -> Dict:
+    """mcd_to_mld sur un MCD déjà normalisé (prepare_mcd)."""
+    return _mld_dict_for(mcd, digest)
+
+
+def _mld_text(mld) -> str:
     lines = ["MLD (Modèle Logique de Données)", "=" * 40, ""]
-    for table_name, table in sorted(mld.get("tables", {}).items()):
+    for table_name, table in sorted(mld.tables.items()):
         lines.append(f"Table: {table_name}")
-        pk_list = table.get("primary_key") or []
-        for col in table.get("columns", []):
+        pk_list = table.primary_key or []
+        for col in table.columns:
             name = col.get("name", "")
             typ = col.get("type", "")
             pk = " (PK)" if name in pk_list else ""
             nullable = "" if col.get("nullable", True) else " NOT NULL"
             lines.append(f"  - {name} ({typ}{nullable}{pk})")
         lines.append("")
-    fks = mld.get("foreign_keys") or []
+    fks = mld.foreign_keys
     if fks:
         lines.append("Clés étrangères:")
         for fk in fks:
@@ -352,6 +509,20 @@ def mcd_to_mld_text(canvas_mcd: Dict) -> str:
     return "\n".join(lines)
 
 
+def mcd_to_mld_text(canvas_mcd: Dict) -> str:
+    """
+    Export MLD textuel (inspiration Barrel : « Exporter le MLD textuel »).
+    Retourne une représentation lisible du MLD : tables, colonnes, clés étrangères.
+    """
+    mcd, digest = _normalize_for_compile(canvas_mcd)
+    return prepared_mcd_to_mld_text(mcd, digest)
+
+
+def prepared_mcd_to_mld_text(mcd: Dict, digest: str) -> str:
+    """mcd_to_mld_text sur un MCD déjà normalisé (prepare_mcd)."""
+    return _cached("mld_text", digest, None, lambda: _mld_text(_mld_for(mcd, digest)))
+
+
 def mld_to_sql(mld: Dict) -> str:
     """Convertit MLD en script SQL."""
     from views.model_converter import ModelConverter
@@ -359,14 +530,50 @@ def mld_to_sql(mld: Dict) -> str:
     return converter._convert_to_sql(mld)
 
 
+def _build_mpd(mld, dbms: str):
+    from views.model_converter import ModelConverter
+    with stage("mpd"):
+        return ModelConverter().build_mpd(mld, dbms=dbms)
+
+
+def _mpd_for(mcd: Dict, digest: str, dbms: str):
+    """MPD (views.model_ir.Mpd) du MCD pour le SGBD, mis en cache."""
+    if dbms not in SUPPORTED_DBMS:
+        dbms = "mysql"
+    return _cached("mpd_ir", digest, dbms, lambda: _build_mpd(_mld_for(mcd, digest), dbms))
+
+
+def _mpd_dict_for(mcd: Dict, digest: str, dbms: str) -> Dict:
+    if dbms not in SUPPORTED_DBMS:
+        dbms = "mysql"
+    return _cached("mpd", digest, dbms, lambda: _mpd_for(mcd, digest, dbms).to_dict())
+
+
 def mcd_to_mpd(canvas_mcd: Dict, dbms: str = "mysql") -> Dict:
     """Convertit MCD (format canvas) en MPD (Modèle Physique de Données). dbms: mysql, postgresql, sqlite, sqlserver."""
+    mcd, digest = _normalize_for_compile(canvas_mcd)
+    return prepared_mcd_to_mpd(mcd, digest, dbms)
+
+
+def prepared_mcd_to_mpd(mcd: Dict, digest: str, dbms: str = "mysql") -> Dict:
+    """mcd_to_mpd sur un MCD déjà normalisé (prepare_mcd)."""
+    return _mpd_dict_for(mcd, digest, dbms)
+
+
+def _build_sql(mcd: Dict, digest: str, dbms: str) -> Dict:
     from views.model_converter import ModelConverter
-    mld = mcd_to_mld(canvas_mcd)
     converter = ModelConverter()
-    if dbms in ("mysql", "postgresql", "sqlite", "sqlserver"):
-        return converter.generate_mpd(mld, dbms=dbms)
-    return converter.generate_mpd(mld, dbms="mysql")
+    if dbms in SUPPORTED_DBMS:
+        mpd = _mpd_for(mcd, digest, dbms)
+        with stage("sql"):
+            sql = converter.generate_sql_from_mpd(mpd)
+            sql_original = converter.generate_sql_from_mpd(mpd, use_original=True)
+        translations = mpd.type_translations
+        return {"sql": sql, "sql_original": sql_original, "translations": translations}
+    mld = _mld_dict_for(mcd, digest)
+    with stage("sql"):
+        fallback = mld_to_sql(mld)
+    return {"sql": fallback, "sql_original": fallback, "translations": []}
 
 
 def mcd_to_sql(canvas_mcd: Dict, dbms: str = "mysql") -> Dict:
@@ -375,17 +582,249 @@ def mcd_to_sql(canvas_mcd: Dict, dbms: str = "mysql") -> Dict:
     Retourne: sql (version traduite pour le SGBD), sql_original (types du modèle sans traduction),
     translations (liste des {table, column, original_type, translated_type}) pour afficher une bulle d'info.
     """
+    mcd, digest = _normalize_for_compile(canvas_mcd)
+    return prepared_mcd_to_sql(mcd, digest, dbms)
+
+
+def prepare_mcd(canvas_mcd: Dict) -> Tuple[Dict, str]:
+    """
+    MCD canvas normalisé (format ModelConverter) et son empreinte, à calculer une fois par requête
+    puis à passer à digest_etag, cached_sql / remember_sql et aux variantes prepared_* (MLD, MPD, SQL, compile).
+    """
+    return _normalize_for_compile(canvas_mcd)
+
+
+def prepared_mcd_to_sql(mcd: Dict, digest: str, dbms: str = "mysql") -> Dict:
+    """mcd_to_sql sur un MCD déjà normalisé (prepare_mcd) ; exécutable dans le pool de processus."""
+    return _cached("sql", digest, dbms, lambda: _build_sql(mcd, digest, dbms))
+
+
+def _sql_chunks(statements: Iterable[str], chunk_size: int) -> Iterator[str]:
+    """Regroupe les instructions (séparées comme dans le script complet) en morceaux d'environ chunk_size caractères."""
+    from views.model_converter import SQL_SEPARATOR
+    buffer: List[str] = []
+    size = 0
+    for i, statement in enumerate(statements):
+        if i:
+            buffer.append(SQL_SEPARATOR)
+            size += len(SQL_SEPARATOR)
+        buffer.append(statement)
+        size += len(statement)
+        if size >= chunk_size:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def mcd_to_sql_stream(canvas_mcd: Dict, dbms: str = "mysql", use_original: bool = False,
+                      chunk_size: Optional[int] = None) -> Iterator[str]:
+    """
+    Script SQL du MCD en flux (morceaux de texte), pour les très gros schémas : même texte que
+    mcd_to_sql(...)["sql"] (ou "sql_original" si use_original), sans construire le script en mémoire.
+    Le MPD est construit (ou lu en cache) avant le retour : une erreur de conversion est levée ici,
+    pas pendant l'itération.
+    """
+    mcd, digest = _normalize_for_compile(canvas_mcd)
+    return prepared_mcd_to_sql_stream(mcd, digest, dbms, use_original, chunk_size)
+
+
+def prepared_mcd_to_sql_stream(mcd: Dict, digest: str, dbms: str = "mysql", use_original: bool = False,
+                               chunk_size: Optional[int] = None) -> Iterator[str]:
+    """mcd_to_sql_stream sur un MCD déjà normalisé (prepare_mcd)."""
     from views.model_converter import ModelConverter
-    mld = mcd_to_mld(canvas_mcd)
+    chunk_size = chunk_size or SQL_STREAM_CHUNK_SIZE
+    cached = _compile_cache.get(("sql", dbms, digest))
+    if cached is not None:
+        text = cached["sql_original" if use_original else "sql"]
+        return (text[i:i + chunk_size] for i in range(0, len(text), chunk_size))
     converter = ModelConverter()
-    if dbms in ("mysql", "postgresql", "sqlite", "sqlserver"):
-        mpd = converter.generate_mpd(mld, dbms=dbms)
-        sql = converter.generate_sql_from_mpd(mpd)
-        sql_original = converter.generate_sql_from_mpd(mpd, use_original=True)
-        translations = mpd.get("type_translations") or []
-        return {"sql": sql, "sql_original": sql_original, "translations": translations}
-    fallback = mld_to_sql(mld)
-    return {"sql": fallback, "sql_original": fallback, "translations": []}
+    if dbms in SUPPORTED_DBMS:
+        statements = converter.iter_sql_from_mpd(_mpd_for(mcd, digest, dbms), use_original=use_original)
+    else:
+        statements = converter._iter_mld_sql(_mld_dict_for(mcd, digest))
+    return _sql_chunks(statements, chunk_size)
+
+
+def index_plan(canvas_mcd: Dict, dbms: str = "mysql") -> Dict:
+    """
+    Plan d'index du MPD : chaque index candidat, retenu ou écarté, avec sa justification.
+    Retourne: indexes (liste de {table, name, columns, kept, reason}), kept, skipped.
+    """
+    from views.index_planner import plan_indexes
+    mcd, digest = _normalize_for_compile(canvas_mcd)
+    decisions = [d.to_dict() for d in plan_indexes(_mpd_for(mcd, digest, dbms))]
+    kept = sum(1 for d in decisions if d["kept"])
+    return {"indexes": decisions, "kept": kept, "skipped": len(decisions) - kept}
+
+
+def _fanout_hints(canvas_mcd: Dict) -> Dict[str, float]:
+    """Fan-out porté par les associations du canvas (association.fanout)."""
+    return {
+        a["name"]: a["fanout"] for a in canvas_mcd.get("associations") or []
+        if isinstance(a, dict) and a.get("name") and a.get("fanout") is not None
+    }
+
+
+def volumetry(canvas_mcd: Dict, dbms: str = "mysql", rows: Optional[Dict[str, float]] = None,
+              fanout: Optional[Dict[str, float]] = None, default_rows: Optional[int] = None) -> Dict:
+    """
+    Volumétrie estimée du MPD (views.volumetry) : lignes, largeur de ligne, taille des données et des index.
+    rows / fanout complètent (et remplacent) les estimations portées par le canvas
+    (entité.estimated_rows, association.fanout).
+    """
+    from views.volumetry import estimate_volumetry
+    if dbms not in SUPPORTED_DBMS:
+        raise ValueError(f"SGBD non supporté : {dbms} (attendu : {', '.join(SUPPORTED_DBMS)}).")
+    mcd, digest = _normalize_for_compile(canvas_mcd)
+    hinted_fanout = _fanout_hints(canvas_mcd)
+    hinted_fanout.update(fanout or {})
+    with stage("volumetry"):
+        return estimate_volumetry(_mpd_for(mcd, digest, dbms), mcd, rows, hinted_fanout, default_rows)
+
+
+def synthetic_data_stream(canvas_mcd: Dict, dbms: str = "mysql", fmt: str = "insert",
+                     rows: Optional[Dict[str, float]] = None, fanout: Optional[Dict[str, float]] = None,
+                     default_rows: Optional[int] = None, seed: int = 0) -> Iterator[str]:
+    """
+    Données de test du MPD en flux (views.data_generator) : script INSERT multi-lignes, ou COPY pour PostgreSQL.
+    Nombre de lignes comme volumetry (rows, fanout et indications du canvas). Le MPD est construit et le
+    format vérifié avant le retour : une erreur est levée ici, pas pendant l'itération.
+    """
+    from views.data_generator import DataGenerator
+    if dbms not in SUPPORTED_DBMS:
+        raise ValueError(f"SGBD non supporté : {dbms} (attendu : {', '.join(SUPPORTED_DBMS)}).")
+    mcd, digest = _normalize_for_compile(canvas_mcd)
+    hinted_fanout = _fanout_hints(canvas_mcd)
+    hinted_fanout.update(fanout or {})
+    generator = DataGenerator(_mpd_for(mcd, digest, dbms), mcd, rows, hinted_fanout, default_rows, seed)
+    return generator.iter_sql(fmt)
+
+
+def _schema_index_for(mcd: Dict, digest: str, dbms: str):
+    """Empreintes du MPD (views.schema_diff.SchemaIndex), mises en cache avec lui."""
+    from views.schema_diff import SchemaIndex
+    return _cached("schema_index", digest, dbms, lambda: SchemaIndex(_mpd_for(mcd, digest, dbms)))
+
+
+def diff_mcd(old_canvas_mcd: Optional[Dict], new_canvas_mcd: Dict, dbms: str = "mysql") -> Dict:
+    """
+    Différence entre deux versions d'un MCD (format canvas) et script de migration pour le SGBD.
+    old_canvas_mcd vide ou None : migration = création complète du schéma.
+    Retourne: diff (tables, colonnes, clés étrangères, contraintes, index ajoutés / supprimés / modifiés),
+    sql (script de migration), statements (nombre d'instructions).
+    """
+    if dbms not in SUPPORTED_DBMS:
+        raise ValueError(f"SGBD non supporté : {dbms} (attendu : {', '.join(SUPPORTED_DBMS)}).")
+    from views.model_converter import SQL_SEPARATOR
+    from views.schema_diff import MigrationWriter, diff_schemas
+    new_mcd, new_digest = _normalize_for_compile(new_canvas_mcd)
+    new_index = _schema_index_for(new_mcd, new_digest, dbms)
+    if old_canvas_mcd:
+        old_mcd, old_digest = _normalize_for_compile(old_canvas_mcd)
+        old_index = _schema_index_for(old_mcd, old_digest, dbms)
+    else:
+        old_digest, old_index = "", None
+
+    def build() -> Dict:
+        with stage("diff"):
+            diff = diff_schemas(old_index, new_index)
+            statements = list(MigrationWriter().iter_sql(diff))
+        return {"diff": diff.to_dict(), "sql": SQL_SEPARATOR.join(statements), "statements": len(statements)}
+
+    return _cached("diff", f"{old_digest}:{new_digest}", dbms, build)
+
+
+def artifact_etag(canvas_mcd: Dict, kind: str, variant: Optional[str] = None) -> str:
+    """
+    ETag fort (entre guillemets) d'un artefact compilé, dérivé de la clé du cache de compilation :
+    même MCD normalisé + même artefact (kind, variant = SGBD...) → même ETag, sans rien compiler.
+    """
+    _, digest = _normalize_for_compile(canvas_mcd)
+    return digest_etag(digest, kind, variant)
+
+
+def digest_etag(digest: str, kind: str, variant: Optional[str] = None) -> str:
+    """artifact_etag à partir de l'empreinte déjà calculée (prepare_mcd)."""
+    return f'"{kind}-{variant or "all"}-{digest[:40]}"'
+
+
+def cached_sql(digest: str, dbms: str = "mysql") -> Optional[Dict]:
+    """Résultat de mcd_to_sql pour l'empreinte digest s'il est déjà en cache, sans le calculer (None sinon)."""
+    return _compile_cache.get(("sql", dbms, digest))
+
+
+def remember_sql(digest: str, dbms: str, result: Dict) -> None:
+    """Met en cache un résultat de mcd_to_sql calculé ailleurs (pool de processus)."""
+    _compile_cache.put(("sql", dbms, digest), result)
+
+
+def compile_mcd(canvas_mcd: Dict, dialects: Optional[List[str]] = None) -> Dict:
+    """
+    Compilation en une passe : normalise le MCD canvas une fois, construit le MLD une fois,
+    puis décline MPD et SQL pour chaque SGBD demandé (tous par défaut).
+    Retourne: mld, mld_text, dialects = {dbms: {mpd, sql, sql_original, translations}}.
+    """
+    mcd, digest = _normalize_for_compile(canvas_mcd)
+    return prepared_compile_mcd(mcd, digest, dialects)
+
+
+def prepared_compile_mcd(mcd: Dict, digest: str, dialects: Optional[List[str]] = None) -> Dict:
+    """compile_mcd sur un MCD déjà normalisé (prepare_mcd)."""
+    requested = list(dialects) if dialects else list(SUPPORTED_DBMS)
+    unknown = [d for d in requested if d not in SUPPORTED_DBMS]
+    if unknown:
+        raise ValueError(f"SGBD non supporté(s) : {', '.join(unknown)} (attendu : {', '.join(SUPPORTED_DBMS)}).")
+    mld = _mld_for(mcd, digest)
+    result = {
+        "mld": _mld_dict_for(mcd, digest),
+        "mld_text": _cached("mld_text", digest, None, lambda: _mld_text(mld)),
+        "dialects": {},
+    }
+    for dbms in dict.fromkeys(requested):
+        sql = _cached("sql", digest, dbms, lambda: _build_sql(mcd, digest, dbms))
+        result["dialects"][dbms] = {"mpd": _mpd_dict_for(mcd, digest, dbms), **sql}
+    return result
+
+
+# Sessions de compilation incrémentale (créées à la demande : compile_session importe ce module)
+_sessions = None
+
+
+def _session_store():
+    from api.services.compile_session import SessionStore
+    global _sessions
+    if _sessions is None:
+        _sessions = SessionStore()
+    return _sessions
+
+
+def create_compile_session(canvas_mcd: Dict, dbms: str = "mysql") -> Dict:
+    """Ouvre une session de compilation incrémentale ; retourne l'état complet (session_id, version, mld, sql)."""
+    return _session_store().create(canvas_mcd, dbms=dbms).snapshot()
+
+
+def patch_compile_session(session_id: str, operations: List[Dict], base_version: Optional[int] = None) -> Dict:
+    """
+    Applique un delta JSON Patch au MCD de la session.
+    Retourne uniquement ce qui a changé (tables, FK, contraintes, fragments SQL).
+    """
+    return _session_store().get(session_id).apply_patch(operations, base_version=base_version)
+
+
+def get_compile_session(session_id: str) -> Dict:
+    """État complet de la session (resynchronisation après conflit de version)."""
+    return _session_store().get(session_id).snapshot()
+
+
+def validate_compile_session(session_id: str) -> Dict:
+    """Validation courante du MCD de la session (IncrementalValidator) : valid, errors, version."""
+    return _session_store().get(session_id).validation()
+
+
+def delete_compile_session(session_id: str) -> None:
+    """Ferme la session."""
+    _session_store().delete(session_id)
 
 
 def analyze_data(data: Any, format_type: str = "json") -> Dict:
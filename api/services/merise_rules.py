@@ -8,7 +8,9 @@ Ce module centralise les constantes et règles pour :
 - Passage MCD → MLD (entité → table ; association n-n → table de liaison ; 1-n → clé étrangère)
 """
 
-from typing import Dict, List, Any, Optional, Tuple
+from typing import AbstractSet, Dict, List, Any, Optional, Sequence, Tuple
+
+from api.services.mcd_index import McdIndex
 
 # --- Cardinalités MCD Merise (min,max) avec min ∈ {0,1}, max ∈ {1,n} ---
 MCD_CARDINALITIES = ("0,1", "1,1", "0,n", "1,n")
@@ -38,33 +40,39 @@ def is_valid_cardinality(c: str) -> bool:
 
 
 # --- Règles de validation MCD ---
+# Chaque règle accepte un McdIndex (construit une fois par validate_mcd) ; sans index,
+# elle en construit un à partir des listes reçues.
+
+def _name_errors(kind: str, name: str, seen: bool) -> List[str]:
+    """Erreur d'une occurrence de nom d'entité / d'association (vide, ou déjà vue)."""
+    if not name:
+        return ["Une entité sans nom n'est pas autorisée." if kind == "entity"
+                else "Une association sans nom n'est pas autorisée."]
+    if seen:
+        return [f"Entité en double : « {name} »." if kind == "entity" else f"Association en double : « {name} »."]
+    return []
+
 
-def validate_entity_names_unique(entities: List[Dict]) -> List[str]:
+def validate_entity_names_unique(entities: List[Dict], index: Optional[McdIndex] = None) -> List[str]:
     """Erreurs si noms d'entités dupliqués."""
+    if index is None:
+        index = McdIndex(entities=entities)
     errors = []
     seen = set()
-    for e in entities:
-        name = (e.get("name") or "").strip()
-        if not name:
-            errors.append("Une entité sans nom n'est pas autorisée.")
-            continue
-        if name in seen:
-            errors.append(f"Entité en double : « {name} ».")
+    for name in index.entity_keys:
+        errors.extend(_name_errors("entity", name, name in seen))
         seen.add(name)
     return errors
 
 
-def validate_association_names_unique(associations: List[Dict]) -> List[str]:
+def validate_association_names_unique(associations: List[Dict], index: Optional[McdIndex] = None) -> List[str]:
     """Erreurs si noms d'associations dupliqués."""
+    if index is None:
+        index = McdIndex(associations=associations)
     errors = []
     seen = set()
-    for a in associations:
-        name = (a.get("name") or "").strip()
-        if not name:
-            errors.append("Une association sans nom n'est pas autorisée.")
-            continue
-        if name in seen:
-            errors.append(f"Association en double : « {name} ».")
+    for name in index.association_keys:
+        errors.extend(_name_errors("association", name, name in seen))
         seen.add(name)
     return errors
 
@@ -73,87 +81,112 @@ def validate_association_entities(
     associations: List[Dict],
     association_links: Optional[List[Dict]] = None,
     entity_names: Optional[set] = None,
+    index: Optional[McdIndex] = None,
 ) -> List[str]:
     """
     Vérifie que chaque association relie au moins une entité (réflexive) ou deux entités.
     Si association_links est fourni, on déduit les entités liées depuis les liens.
     """
+    if index is None:
+        index = McdIndex(associations=associations, association_links=association_links)
     errors = []
     entity_names = entity_names or set()
+    for a in index.associations:
+        links = index.links_for_association(a.get("name", "Association"))
+        errors.extend(_association_entities_errors(a, links, entity_names))
+    return errors
 
-    for a in associations:
-        name = a.get("name", "Association")
-        entities = list(a.get("entities") or [])
-        if not entities and association_links:
-            entities = list({
-                link["entity"]
-                for link in association_links
-                if link.get("association") == name
-            })
-
-        if not entities:
-            errors.append(f"L'association « {name} » ne relie aucune entité.")
-        elif len(entities) == 1:
-            if entity_names and entities[0] not in entity_names:
-                errors.append(f"L'association « {name} » référence l'entité inconnue « {entities[0]} ».")
-        else:
-            for ent in entities[:2]:
-                if entity_names and ent not in entity_names:
-                    errors.append(f"L'association « {name} » référence l'entité inconnue « {ent} ».")
 
+def _association_entities_errors(a: Dict, links: Sequence[Dict], entity_names: AbstractSet[str]) -> List[str]:
+    """Entités reliées par une association (champ entities, sinon ses liens) : au moins une, et connues."""
+    errors = []
+    name = a.get("name", "Association")
+    entities = list(a.get("entities") or [])
+    if not entities:
+        entities = list(dict.fromkeys(link["entity"] for link in links if "entity" in link))
+
+    if not entities:
+        errors.append(f"L'association « {name} » ne relie aucune entité.")
+    elif len(entities) == 1:
+        if entity_names and entities[0] not in entity_names:
+            errors.append(f"L'association « {name} » référence l'entité inconnue « {entities[0]} ».")
+    else:
+        for ent in entities[:2]:
+            if entity_names and ent not in entity_names:
+                errors.append(f"L'association « {name} » référence l'entité inconnue « {ent} ».")
     return errors
 
 
 def validate_cardinalities_on_links(
     association_links: List[Dict],
+    index: Optional[McdIndex] = None,
 ) -> List[str]:
     """Erreurs si une cardinalité de lien n'est pas une des 4 MCD (côté entité et/ou association)."""
     errors = []
-    for link in association_links:
-        card_entity = link.get("card_entity", link.get("cardinality", "1,n"))
-        card_assoc = link.get("card_assoc", link.get("cardinality", "1,n"))
-        bad_entity = not is_valid_cardinality(card_entity)
-        bad_assoc = not is_valid_cardinality(card_assoc)
-        if bad_entity and bad_assoc and card_entity == card_assoc:
-            errors.append(f"Cardinalité invalide « {card_entity} » (attendu : 0,1 | 1,1 | 0,n | 1,n).")
-        else:
-            if bad_entity:
-                errors.append(f"Cardinalité côté entité invalide « {card_entity} » (attendu : 0,1 | 1,1 | 0,n | 1,n).")
-            if bad_assoc:
-                errors.append(f"Cardinalité côté association invalide « {card_assoc} » (attendu : 0,1 | 1,1 | 0,n | 1,n).")
+    for link in (index.links if index is not None else association_links):
+        errors.extend(_link_cardinality_errors(link))
     return errors
 
 
+def _link_cardinality_errors(link: Dict) -> List[str]:
+    card_entity = link.get("card_entity", link.get("cardinality", "1,n"))
+    card_assoc = link.get("card_assoc", link.get("cardinality", "1,n"))
+    bad_entity = not is_valid_cardinality(card_entity)
+    bad_assoc = not is_valid_cardinality(card_assoc)
+    if bad_entity and bad_assoc and card_entity == card_assoc:
+        return [f"Cardinalité invalide « {card_entity} » (attendu : 0,1 | 1,1 | 0,n | 1,n)."]
+    errors = []
+    if bad_entity:
+        errors.append(f"Cardinalité côté entité invalide « {card_entity} » (attendu : 0,1 | 1,1 | 0,n | 1,n).")
+    if bad_assoc:
+        errors.append(f"Cardinalité côté association invalide « {card_assoc} » (attendu : 0,1 | 1,1 | 0,n | 1,n).")
+    return errors
+
+
+def _has_attributes(obj: Dict) -> bool:
+    attrs = obj.get("attributes") or []
+    return isinstance(attrs, list) and len(attrs) > 0
+
+
 def validate_cardinality_1_1_no_attributes(
     associations: List[Dict],
     association_links: List[Dict],
+    index: Optional[McdIndex] = None,
 ) -> List[str]:
     """
     Règle Barrel : la cardinalité 1,1 côté association est interdite lorsque l'association est porteuse de rubriques.
     Une association avec des attributs ne peut pas avoir de lien en 1,1 côté association.
     """
+    if index is None:
+        index = McdIndex(associations=associations, association_links=association_links)
     errors = []
-    assoc_with_attrs = set()
-    for a in associations:
-        name = (a.get("name") or "").strip()
-        if not name:
-            continue
-        attrs = a.get("attributes") or []
-        if isinstance(attrs, list) and len(attrs) > 0:
-            assoc_with_attrs.add(name)
-    for link in association_links:
-        assoc_name = (link.get("association") or "").strip()
-        card_assoc = normalize_cardinality(link.get("card_assoc", link.get("cardinality", "1,n")))
-        if assoc_name in assoc_with_attrs and card_assoc == "1,1":
-            errors.append(
-                f"La cardinalité 1,1 côté association est interdite lorsque l'association « {assoc_name} » est porteuse de rubriques (attributs)."
-            )
+    seen = set()
+    # ordre des associations (et non d'un set) : messages stables d'un processus à l'autre
+    for name, a in zip(index.association_keys, index.associations):
+        if name and name not in seen and _has_attributes(a):
+            seen.add(name)
+            errors.extend(_one_one_with_attributes_errors(name, index.links_for_association(name)))
     return errors
 
 
-def _association_is_table_correspondance(association_name: str, association_links: List[Dict]) -> bool:
-    """True si l'association est n-n (tous les liens ont max = n des deux côtés)."""
-    links = [l for l in association_links if (l.get("association") or "").strip() == (association_name or "").strip()]
+def _one_one_with_attributes_errors(assoc_name: str, links: Sequence[Dict]) -> List[str]:
+    """Une erreur par lien 1,1 côté association d'une association porteuse de rubriques."""
+    return [
+        f"La cardinalité 1,1 côté association est interdite lorsque l'association « {assoc_name} » est porteuse de rubriques (attributs)."
+        for link in links
+        if normalize_cardinality(link.get("card_assoc", link.get("cardinality", "1,n"))) == "1,1"
+    ]
+
+
+def is_table_de_correspondance(index: McdIndex, association_name: str) -> bool:
+    """
+    True si l'association est n-n (au moins deux liens, tous avec max = n des deux côtés) :
+    une association « gérant une table de correspondance » (Barrel).
+    """
+    return _links_are_n_n(index.links_for_association(association_name))
+
+
+def _links_are_n_n(links: Sequence[Dict]) -> bool:
     if len(links) < 2:
         return False
     many_cards = ("0,n", "1,n")
@@ -168,141 +201,129 @@ def _association_is_table_correspondance(association_name: str, association_link
 def validate_association_with_attributes_must_be_n_n(
     associations: List[Dict],
     association_links: List[Dict],
+    index: Optional[McdIndex] = None,
 ) -> List[str]:
     """
     Règle Barrel : seules les associations gérant une table de correspondance (n-n) peuvent être porteuses de rubriques.
     Si une association a des attributs, tous ses liens doivent être en 0,n ou 1,n des deux côtés.
     """
+    if index is None:
+        index = McdIndex(associations=associations, association_links=association_links)
     errors = []
-    for a in associations:
-        name = (a.get("name") or "").strip()
-        if not name:
+    for name, a in zip(index.association_keys, index.associations):
+        if not name or not _has_attributes(a):
             continue
-        attrs = a.get("attributes") or []
-        if not (isinstance(attrs, list) and len(attrs) > 0):
-            continue
-        if not _association_is_table_correspondance(name, association_links):
-            errors.append(
-                f"Seules les associations gérant une table de correspondance peuvent être porteuses de rubriques. "
-                f"L'association « {name} » a des attributs mais n'est pas n-n (ou n'a pas au moins deux liens en 0,n ou 1,n)."
-            )
+        if not is_table_de_correspondance(index, name):
+            errors.append(_attributes_require_n_n_error(name))
     return errors
 
 
+def _attributes_require_n_n_error(name: str) -> str:
+    return (
+        f"Seules les associations gérant une table de correspondance peuvent être porteuses de rubriques. "
+        f"L'association « {name} » a des attributs mais n'est pas n-n (ou n'a pas au moins deux liens en 0,n ou 1,n)."
+    )
+
+
 def validate_attribute_names_no_duplicates(
     entities: List[Dict],
     associations: List[Dict],
+    index: Optional[McdIndex] = None,
 ) -> List[str]:
     """
     Règle Barrel : il ne doit pas y avoir de doublons dans les rubriques (attributs) d'une même entité ou association.
     """
+    if index is None:
+        index = McdIndex(entities=entities, associations=associations)
     errors = []
-    for e in entities:
-        name = (e.get("name") or "").strip() or "Entité"
-        attrs = e.get("attributes") or []
-        if not isinstance(attrs, list):
-            continue
-        names = []
-        for a in attrs:
-            n = (a.get("name") or "").strip() if isinstance(a, dict) else ""
-            if n:
-                names.append(n)
-        if len(names) != len(set(names)):
-            seen = set()
-            for n in names:
-                if n in seen:
-                    errors.append(f"Il existe des doublons dans les rubriques de l'entité « {name} ».")
-                    break
-                seen.add(n)
-    for a in associations:
-        name = (a.get("name") or "").strip() or "Association"
-        attrs = a.get("attributes") or []
-        if not isinstance(attrs, list):
+    for name, names in zip(index.entity_keys, index.entity_attributes):
+        errors.extend(_duplicate_attributes("l'entité", name or "Entité", names))
+    for name, names in zip(index.association_keys, index.association_attributes):
+        errors.extend(_duplicate_attributes("l'association", name or "Association", names))
+    return errors
+
+
+def _duplicate_attributes(kind: str, name: str, attribute_names: Sequence[str]) -> List[str]:
+    if len(attribute_names) != len(set(attribute_names)):
+        return [f"Il existe des doublons dans les rubriques de {kind} « {name} »."]
+    return []
+
+
+def _missing_types(kind: str, name: str, attrs: Any) -> List[str]:
+    errors = []
+    for a in attrs or []:
+        if not isinstance(a, dict):
             continue
-        names = []
-        for x in attrs:
-            n = (x.get("name") or "").strip() if isinstance(x, dict) else ""
-            if n:
-                names.append(n)
-        if len(names) != len(set(names)):
-            seen = set()
-            for n in names:
-                if n in seen:
-                    errors.append(f"Il existe des doublons dans les rubriques de l'association « {name} ».")
-                    break
-                seen.add(n)
+        attr_name = (a.get("name") or "").strip()
+        if attr_name and not (a.get("type") or "").strip():
+            errors.append(f"Type de la rubrique manquant : « {attr_name} » dans {kind} « {name} ».")
     return errors
 
 
 def validate_attribute_type_present(
     entities: List[Dict],
     associations: List[Dict],
+    index: Optional[McdIndex] = None,
 ) -> List[str]:
     """
     Règle Barrel : chaque rubrique (attribut) doit avoir un type.
     """
+    if index is None:
+        index = McdIndex(entities=entities, associations=associations)
     errors = []
-    for e in entities:
-        name = (e.get("name") or "").strip() or "Entité"
-        for i, a in enumerate(e.get("attributes") or []):
-            if not isinstance(a, dict):
-                continue
-            attr_name = (a.get("name") or "").strip()
-            if not attr_name:
-                continue
-            if not (a.get("type") or "").strip():
-                errors.append(f"Type de la rubrique manquant : « {attr_name} » dans l'entité « {name} ».")
-    for a in associations:
-        name = (a.get("name") or "").strip() or "Association"
-        for x in a.get("attributes") or []:
-            if not isinstance(x, dict):
-                continue
-            attr_name = (x.get("name") or "").strip()
-            if not attr_name:
-                continue
-            if not (x.get("type") or "").strip():
-                errors.append(f"Type de la rubrique manquant : « {attr_name} » dans l'association « {name} ».")
+    for name, e in zip(index.entity_keys, index.entities):
+        errors.extend(_missing_types("l'entité", name or "Entité", e.get("attributes")))
+    for name, a in zip(index.association_keys, index.associations):
+        errors.extend(_missing_types("l'association", name or "Association", a.get("attributes")))
     return errors
 
 
 def validate_entity_has_at_least_one_association(
     entities: List[Dict],
     association_links: List[Dict],
+    index: Optional[McdIndex] = None,
 ) -> List[str]:
     """
     Règle Barrel : chaque entité doit être reliée à au moins une association (l'entité nécessite au moins une association).
     """
+    if index is None:
+        index = McdIndex(entities=entities, association_links=association_links)
     errors = []
-    entity_names = {(e.get("name") or "").strip() for e in entities if (e.get("name") or "").strip()}
-    linked_entities = { (link.get("entity") or "").strip() for link in association_links if (link.get("entity") or "").strip() }
-    for name in entity_names:
-        if name not in linked_entities:
-            errors.append(f"L'entité « {name} » nécessite au moins une association.")
+    for name in dict.fromkeys(k for k in index.entity_keys if k):
+        if not index.links_for_entity(name):
+            errors.append(_entity_without_association_error(name))
     return errors
 
 
-def validate_inheritance_no_cycle(inheritance_links: List[Dict]) -> List[str]:
-    """Erreurs si héritage avec cycle (enfant → … → enfant)."""
+def _entity_without_association_error(name: str) -> str:
+    return f"L'entité « {name} » nécessite au moins une association."
+
+
+def validate_inheritance_no_cycle(inheritance_links: List[Dict], index: Optional[McdIndex] = None) -> List[str]:
+    """Erreurs si héritage avec cycle (enfant → … → enfant). Chaque cycle est signalé une fois."""
     errors = []
     child_to_parent: Dict[str, str] = {}
-    for link in inheritance_links:
+    for link in (index.inheritance_links if index is not None else inheritance_links):
         child = (link.get("child") or "").strip()
         parent = (link.get("parent") or "").strip()
         if child and parent:
             child_to_parent[child] = parent
 
-    visited = set()
+    # Chaque enfant a un seul parent : on suit la chaîne, chaque nœud n'est parcouru qu'une fois
+    done = set()
     for start in child_to_parent:
+        path: List[str] = []
+        on_path: Dict[str, int] = {}
         node = start
-        path = []
-        while node and node not in visited:
-            if node in path:
-                errors.append(f"Cycle d'héritage détecté : {' → '.join(path + [node])}.")
+        while node and node not in done:
+            if node in on_path:
+                cycle = path[on_path[node]:] + [node]
+                errors.append(f"Cycle d'héritage détecté : {' → '.join(cycle)}.")
                 break
+            on_path[node] = len(path)
             path.append(node)
-            visited.add(node)
             node = child_to_parent.get(node)
-        visited.clear()
+        done.update(path)
 
     return errors
 
@@ -312,28 +333,29 @@ def validate_mcd(
     associations: List[Dict],
     association_links: Optional[List[Dict]] = None,
     inheritance_links: Optional[List[Dict]] = None,
+    index: Optional[McdIndex] = None,
 ) -> List[str]:
     """
     Valide un MCD selon les règles Merise.
     Retourne la liste des messages d'erreur (vide si valide).
+    Toutes les règles partagent le même McdIndex : validation linéaire en taille du MCD.
     """
-    association_links = association_links or []
-    inheritance_links = inheritance_links or []
-    entity_names = {(e.get("name") or "").strip() for e in entities if (e.get("name") or "").strip()}
+    if index is None:
+        index = McdIndex(entities, associations, association_links, inheritance_links)
 
     errors = []
-    errors.extend(validate_entity_names_unique(entities))
-    errors.extend(validate_association_names_unique(associations))
+    errors.extend(validate_entity_names_unique(index.entities, index=index))
+    errors.extend(validate_association_names_unique(index.associations, index=index))
     errors.extend(validate_association_entities(
-        associations, association_links=association_links, entity_names=entity_names
+        index.associations, association_links=list(index.links), entity_names=index.entity_names, index=index
     ))
-    errors.extend(validate_cardinalities_on_links(association_links))
-    errors.extend(validate_cardinality_1_1_no_attributes(associations, association_links))
-    errors.extend(validate_association_with_attributes_must_be_n_n(associations, association_links))
-    errors.extend(validate_attribute_names_no_duplicates(entities, associations))
-    errors.extend(validate_attribute_type_present(entities, associations))
-    errors.extend(validate_entity_has_at_least_one_association(entities, association_links))
-    errors.extend(validate_inheritance_no_cycle(inheritance_links))
+    errors.extend(validate_cardinalities_on_links(index.links, index=index))
+    errors.extend(validate_cardinality_1_1_no_attributes(index.associations, index.links, index=index))
+    errors.extend(validate_association_with_attributes_must_be_n_n(index.associations, index.links, index=index))
+    errors.extend(validate_attribute_names_no_duplicates(index.entities, index.associations, index=index))
+    errors.extend(validate_attribute_type_present(index.entities, index.associations, index=index))
+    errors.extend(validate_entity_has_at_least_one_association(index.entities, index.links, index=index))
+    errors.extend(validate_inheritance_no_cycle(index.inheritance_links, index=index))
     return errors
 
 
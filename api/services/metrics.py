@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentation de la chaîne MCD → MLD → MPD → SQL, exposée au format texte Prometheus.
+
+- barrel_stage_duration_seconds{stage} : histogramme de latence par étape
+  (normalize, mld, mpd, sql, merise_validation, cif_validation, batch_validation,
+  markdown_parse) ;
+- barrel_request_payload_bytes{route} : taille du dernier corps de requête reçu ;
+- barrel_model_size{kind} : nombre d'entités / associations du dernier MCD compilé.
+
+Sans dépendance : un registre minimal suffit pour /metrics. Les mesures faites dans
+un processus du pool (api.services.offload) sont rapatriées par run_collecting / merge.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Bornes (secondes) adaptées à des étapes de quelques ms à quelques s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_LabelKey = Tuple[Tuple[str, str], ...]
+
+# Observations capturées dans un processus du pool (None : pas de capture)
+_capture: Optional[List[Tuple[str, _LabelKey, float]]] = None
+
+
+def _label_key(labels: Dict[str, Any]) -> _LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: _LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+    def _record(self, key: _LabelKey, value: float) -> None:
+        raise NotImplementedError
+
+    def _observe(self, key: _LabelKey, value: float) -> None:
+        self._record(key, value)
+        if _capture is not None:
+            _capture.append((self.name, key, value))
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Histogram(_Metric):
+    """Histogramme cumulatif (buckets le=..., _sum, _count)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[_LabelKey, List[float]] = {}  # counts par bucket + [sum, count]
+
+    def observe(self, value: float, **labels: Any) -> None:
+        self._observe(_label_key(labels), value)
+
+    def _record(self, key: _LabelKey, value: float) -> None:
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def _samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0.0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', _format_value(bound))])} {_format_value(cumulative)}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {_format_value(series[-1])}")
+        return lines
+
+    def snapshot(self, **labels: Any) -> Dict[str, float]:
+        """count et sum d'une série (tests, diagnostic)."""
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return {"count": series[-1], "sum": series[-2]} if series else {"count": 0, "sum": 0.0}
+
+
+class Gauge(_Metric):
+    """Valeur instantanée (dernière valeur observée)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[_LabelKey, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._observe(_label_key(labels), value)
+
+    def get(self, **labels: Any) -> Optional[float]:
+        return self._values.get(_label_key(labels))
+
+    def _record(self, key: _LabelKey, value: float) -> None:
+        with self._lock:
+            self._values[key] = float(value)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in sorted(self._values.items())]
+
+
+class Registry:
+    """Ensemble des métriques exposées sur /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Exposition au format texte Prometheus (version 0.0.4)."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "barrel_stage_duration_seconds", "Durée des étapes de la chaîne MCD -> MLD -> MPD -> SQL.",
+))
+PAYLOAD_BYTES = REGISTRY.register(Gauge(
+    "barrel_request_payload_bytes", "Taille du dernier corps de requête reçu, par route.",
+))
+MODEL_SIZE = REGISTRY.register(Gauge(
+    "barrel_model_size", "Taille du dernier MCD normalisé (entités, associations).",
+))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Mesure la durée du bloc dans barrel_stage_duration_seconds{stage=name}."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.observe(time.perf_counter() - start, stage=name)
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def run_collecting(fn: Callable, *args: Any) -> Tuple[Any, List[Tuple[str, _LabelKey, float]]]:
+    """
+    Exécute fn(*args) dans un processus du pool en capturant les mesures,
+    pour que le processus serveur les intègre (merge).
+    """
+    global _capture
+    _capture = []
+    try:
+        result = fn(*args)
+        return result, _capture
+    finally:
+        _capture = None
+
+
+def merge(observations: List[Tuple[str, _LabelKey, float]]) -> None:
+    """Intègre au registre les mesures rapportées par un processus du pool."""
+    for name, key, value in observations:
+        metric = REGISTRY.get(name)
+        if metric is not None:
+            metric._record(key, value)
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Délégation des traitements lourds (analyse de données, parsing Markdown, SQL de gros modèles)
+à un pool de processus, avec une limite de concurrence par route.
+
+Les routes sync tournent dans le thread pool de Starlette : un traitement CPU long
+y garde le GIL et bloque toutes les autres requêtes (y compris /health).
+Ici, chaque route lourde dispose d'un nombre maximal d'exécutions simultanées
+et d'une file d'attente bornée :
+- file pleine → OffloadRejected 429 (le client doit réessayer plus tard) ;
+- attente trop longue ou pool indisponible → OffloadRejected 503.
+
+Configuration (variables d'environnement) :
+- BARREL_PROCESS_WORKERS : taille du pool (0 = pas de pool, exécution dans un thread) ;
+- BARREL_OFFLOAD_QUEUE_TIMEOUT : attente maximale d'une place, en secondes ;
+- BARREL_OFFLOAD_MIN_ENTITIES : taille de MCD à partir de laquelle to-sql est délégué.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from api.services import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = int(os.environ.get("BARREL_PROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+DEFAULT_QUEUE_TIMEOUT = float(os.environ.get("BARREL_OFFLOAD_QUEUE_TIMEOUT", "30"))
+# En dessous, la génération SQL reste dans le thread de la requête (et profite du cache de compilation)
+OFFLOAD_MIN_ENTITIES = int(os.environ.get("BARREL_OFFLOAD_MIN_ENTITIES", "200"))
+
+# Limites par route : (exécutions simultanées, requêtes en attente)
+DEFAULT_ROUTE_LIMITS = {
+    "analyze-data": (2, 8),
+    "parse-markdown": (4, 16),
+    "to-sql": (2, 8),
+}
+
+
+class OffloadRejected(Exception):
+    """Requête refusée par la contre-pression (status_code 429 ou 503)."""
+
+    def __init__(self, message: str, status_code: int, retry_after: int = 1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class RouteLimiter:
+    """Limite de concurrence d'une route : max_concurrent en cours, max_queue en attente."""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float = DEFAULT_QUEUE_TIMEOUT):
+        self.name = name
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_queue = max(0, int(max_queue))
+        self.queue_timeout = queue_timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.running = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.completed = 0
+
+    def _sem(self) -> asyncio.Semaphore:
+        # Créé à la première utilisation, dans la boucle d'événements du serveur
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    async def run(self, call: Callable[[], "asyncio.Future"]) -> Any:
+        """Exécute call() (coroutine factory) en respectant la limite ; lève OffloadRejected sinon."""
+        sem = self._sem()
+        if self.running >= self.max_concurrent and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise OffloadRejected(
+                f"Trop de requêtes « {self.name} » en attente ({self.waiting}) ; réessayer plus tard.", 429
+            )
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(sem.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise OffloadRejected(
+                f"Service « {self.name} » saturé (attente > {self.queue_timeout:g} s).", 503,
+                retry_after=max(1, int(self.queue_timeout)),
+            )
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            return await call()
+        finally:
+            self.running -= 1
+            self.completed += 1
+            sem.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "completed": self.completed,
+        }
+
+
+class Offloader:
+    """Pool de processus créé à la demande + limiteurs par route."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, route_limits: Optional[Dict[str, tuple]] = None,
+                 queue_timeout: float = DEFAULT_QUEUE_TIMEOUT):
+        self.workers = max(0, int(workers))
+        self.queue_timeout = queue_timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self.limiters: Dict[str, RouteLimiter] = {}
+        for name, (concurrent, queue) in (route_limits or DEFAULT_ROUTE_LIMITS).items():
+            self.configure_route(name, concurrent, queue)
+
+    def configure_route(self, name: str, max_concurrent: int, max_queue: int) -> None:
+        """Définit (ou redéfinit) la limite de concurrence d'une route."""
+        self.limiters[name] = RouteLimiter(name, max_concurrent, max_queue, self.queue_timeout)
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers == 0:
+            return None  # exécuteur par défaut de la boucle (threads)
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn : pas de fork d'un serveur multi-thread (verrous hérités)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    async def run(self, route: str, fn: Callable, *args: Any) -> Any:
+        """
+        Exécute fn(*args) dans le pool (fn et args doivent être picklables),
+        sous la limite de la route. Les exceptions de fn sont propagées telles quelles.
+        """
+        limiter = self.limiters.get(route)
+        if limiter is None:
+            limiter = self.limiters.setdefault(route, RouteLimiter(route, self.workers or 1, 0, self.queue_timeout))
+        loop = asyncio.get_running_loop()
+
+        async def call():
+            executor = self._executor()
+            try:
+                if executor is None:
+                    return await loop.run_in_executor(None, fn, *args)
+                # Les mesures par étape faites dans le processus fils sont rapatriées ici
+                result, observations = await loop.run_in_executor(executor, metrics.run_collecting, fn, *args)
+                metrics.merge(observations)
+                return result
+            except BrokenProcessPool as e:
+                logger.error("offload %s: pool de processus cassé (%s), recréation", route, e)
+                self._reset_pool()
+                raise OffloadRejected(f"Service « {route} » momentanément indisponible.", 503)
+
+        return await limiter.run(call)
+
+    def _reset_pool(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        """Arrête le pool (arrêt du serveur)."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "pool_started": self._pool is not None,
+            "routes": {name: limiter.stats() for name, limiter in self.limiters.items()},
+        }
+
+
+offloader = Offloader()
@@ -44,9 +44,10 @@ class ApiClient {
     }
   }
 
-  /// POST /api/parse-markdown
-  Future<Map<String, dynamic>> parseMarkdown(String content) async {
-    return post('/api/parse-markdown', {'content': content});
+  /// POST /api/parse-markdown (ou /api/parse-markdown/preview pour l'aperçu en direct :
+  /// seules les sections ## / ### modifiées sont réanalysées côté serveur)
+  Future<Map<String, dynamic>> parseMarkdown(String content, {bool preview = false}) async {
+    return post(preview ? '/api/parse-markdown/preview' : '/api/parse-markdown', {'content': content});
   }
 
   /// POST /api/parse-mots-codes — mots codés format BarrelMCD → format canvas
@@ -1464,10 +1464,10 @@ class McdState extends ChangeNotifier {
     return _associations[index]['name'] as String?;
   }
 
-  Future<Map<String, dynamic>?> parseMarkdown(String content) async {
+  Future<Map<String, dynamic>?> parseMarkdown(String content, {bool preview = false}) async {
     setError(null);
     try {
-      final r = await _api.parseMarkdown(content);
+      final r = await _api.parseMarkdown(content, preview: preview);
       final canvas = r['canvas'] as Map<String, dynamic>?;
       if (canvas != null) loadFromCanvasFormat(canvas);
       return r;
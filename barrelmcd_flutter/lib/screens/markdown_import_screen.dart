@@ -53,7 +53,7 @@ class _MarkdownImportScreenState extends State<MarkdownImportScreen> with Single
     final state = context.read<McdState>();
     final Map<String, dynamic>? r = _format == _ImportFormat.motsCodes
         ? await state.parseMotsCodes(content)
-        : await state.parseMarkdown(content);
+        : await state.parseMarkdown(content, preview: true);
     if (r == null) return;
     setState(() {
       _parsedResult = r;
@@ -8,18 +8,167 @@ et générer des MCD complets de grande taille.
 """
 
 import argparse
+import contextlib
+import glob
+import hashlib
+import io
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 import json
 import time
 
 # Ajouter le répertoire parent au path pour les imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from views.markdown_mcd_parser import MarkdownMCDParser
-from views.model_converter import ModelConverter
+from views.index_planner import plan_indexes
+from views.data_generator import DataGenerator
+from views.file_watcher import make_watcher, stat_snapshot
+from views.markdown_mcd_parser import MarkdownMCDParser, merge_mcd_structures
+from views.model_converter import ModelConverter, write_sql
+from views.model_ir import Mpd
+from views.schema_diff import MigrationWriter, diff_schemas
+from views.volumetry import estimate_volumetry, format_bytes
+
+
+class _SqlStats:
+    """Statistiques du script SQL pour le rapport, calculées instruction par instruction."""
+    
+    def __init__(self):
+        self.length = 0
+        self.newlines = 0
+        self.tables = 0
+        self.foreign_keys = 0
+        self.indexes = 0
+        self._statements = 0
+    
+    @classmethod
+    def of(cls, sql: str) -> Dict:
+        return {
+            "length": len(sql),
+            "lines": sql.count("\n") + 1,
+            "tables": sql.count("CREATE TABLE"),
+            "foreign_keys": sql.count("FOREIGN KEY"),
+            "indexes": sql.count("CREATE INDEX"),
+        }
+    
+    def count(self, statements):
+        """Laisse passer les instructions en les comptant (séparateur « \\n\\n » entre deux instructions)."""
+        for statement in statements:
+            if self._statements:
+                self.length += 2
+                self.newlines += 2
+            self._statements += 1
+            stats = self.of(statement)
+            self.length += stats["length"]
+            self.newlines += stats["lines"] - 1
+            self.tables += stats["tables"]
+            self.foreign_keys += stats["foreign_keys"]
+            self.indexes += stats["indexes"]
+            yield statement
+    
+    def as_dict(self) -> Dict:
+        return {
+            "length": self.length,
+            "lines": self.newlines + 1,
+            "tables": self.tables,
+            "foreign_keys": self.foreign_keys,
+            "indexes": self.indexes,
+        }
+
+
+MARKDOWN_SUFFIXES = (".md", ".markdown")
+
+
+def _is_glob(entry: str) -> bool:
+    return any(c in entry for c in "*?[")
+
+
+def collect_markdown_files(inputs: List[str]) -> List[str]:
+    """Fichiers markdown des entrées : fichiers, répertoires (parcourus récursivement) et motifs glob, sans doublons."""
+    files = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            for root, dirs, names in os.walk(entry):
+                dirs.sort()
+                files.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith(MARKDOWN_SUFFIXES))
+        elif _is_glob(entry):
+            files.extend(sorted(p for p in glob.glob(entry, recursive=True) if os.path.isfile(p)))
+        else:
+            files.append(entry)
+    seen = set()
+    return [f for f in files if not (os.path.abspath(f) in seen or seen.add(os.path.abspath(f)))]
+
+
+def batch_base_names(files: List[str]) -> List[str]:
+    """Noms de sortie par fichier : le nom du fichier, préfixé de son chemin relatif si deux fichiers ont le même."""
+    stems = [Path(f).stem for f in files]
+    if len(set(stems)) == len(stems):
+        return stems
+    root = os.path.commonpath([os.path.abspath(os.path.dirname(f)) for f in files])
+    return [
+        os.path.splitext(os.path.relpath(os.path.abspath(f), root))[0].replace(os.sep, "_") if stems.count(stem) > 1 else stem
+        for f, stem in zip(files, stems)
+    ]
+
+
+def _batch_convert(task: Tuple) -> Dict:
+    """
+    Conversion d'un fichier du lot (exécutée dans un processus du pool) : parse, MLD / MPD / SQL, sorties.
+    La sortie console de la conversion est capturée ; en cas d'erreur, ses lignes ❌ forment le message.
+    """
+    input_file, output_dir, base_name, dbms, volumetry, data_format = task
+    result = {"file": input_file, "base_name": base_name, "error": None, "mcd": None}
+    output = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output):
+            cli = MarkdownMCDCLI()
+            mcd_structure = cli.parse_markdown_file(input_file)
+            parsed = time.perf_counter()
+            models = cli.generate_models(mcd_structure, dbms=dbms, stream_sql=True)
+            if volumetry:
+                models["volumetry"] = volumetry
+            cli.save_outputs(models, output_dir, base_name)
+            if data_format:
+                cli.save_test_data(models, output_dir, base_name, data_format)
+        result.update(parse_s=parsed - start, compile_s=time.perf_counter() - parsed, mcd=mcd_structure)
+    except (Exception, SystemExit) as e:  # les étapes du CLI terminent par sys.exit(1) en cas d'erreur
+        errors = [line[1:].strip() for line in output.getvalue().splitlines() if line.startswith("❌")]
+        result["error"] = "; ".join(errors) or f"{type(e).__name__}: {e}"
+    result["total_s"] = time.perf_counter() - start
+    return result
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def write_if_changed(path: str, text: str, written: Dict[str, str]) -> bool:
+    """
+    Écrit text dans path si son empreinte diffère du contenu actuel (written : empreintes des sorties connues,
+    complété à la première rencontre par celle du fichier sur disque). Écriture atomique (fichier temporaire
+    puis os.replace) : un lecteur ne voit jamais de sortie à moitié écrite. Retourne True si path a été écrit.
+    """
+    data = text.encode("utf-8")
+    digest = _digest(data)
+    if path not in written:
+        try:
+            with open(path, "rb") as f:
+                written[path] = _digest(f.read())
+        except OSError:
+            written[path] = None
+    if written[path] == digest:
+        return False
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    written[path] = digest
+    return True
 
 
 class MarkdownMCDCLI:
@@ -55,13 +204,34 @@ class MarkdownMCDCLI:
             print(f"❌ Erreur lors du chargement: {e}")
             sys.exit(1)
     
-    def parse_markdown_to_mcd(self, markdown_content: str) -> Dict:
-        """Parse le contenu markdown vers MCD avec gestion des gros fichiers"""
+    def parse_markdown_file(self, file_path: str) -> Dict:
+        """
+        Parse un fichier markdown ligne par ligne (sans le charger en mémoire) avec un parseur neuf :
+        la mémoire reste proportionnelle au MCD, quelle que soit la taille du fichier.
+        """
+        try:
+            file_size = os.path.getsize(file_path)
+            print(f"📁 Lecture en flux du fichier: {file_path}")
+            print(f"📊 Taille du fichier: {file_size:,} octets ({file_size/1024:.1f} KB)")
+            
+            self.parser = MarkdownMCDParser()
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return self.parse_markdown_to_mcd(f)
+            
+        except FileNotFoundError:
+            print(f"❌ Erreur: Fichier '{file_path}' non trouvé")
+            sys.exit(1)
+    
+    def parse_markdown_to_mcd(self, markdown_content: Union[str, Iterable[str]]) -> Dict:
+        """Parse le contenu markdown (texte ou flux de lignes, ex. fichier ouvert) vers MCD"""
         print("🔄 Parsing du markdown vers MCD...")
         start_time = time.time()
         
         try:
-            mcd_structure = self.parser.parse_markdown(markdown_content)
+            if isinstance(markdown_content, str):
+                mcd_structure = self.parser.parse_markdown(markdown_content)
+            else:
+                mcd_structure = self.parser.parse_lines(markdown_content)
             
             parsing_time = time.time() - start_time
             print(f"✅ Parsing terminé en {parsing_time:.2f}s")
@@ -96,27 +266,26 @@ class MarkdownMCDCLI:
             print(f"❌ Erreur lors du parsing: {e}")
             sys.exit(1)
     
-    def generate_models(self, mcd_structure: Dict, output_format: str = "all") -> Dict:
-        """Génère les modèles MLD, MPD et SQL à partir du MCD"""
+    def generate_models(self, mcd_structure: Dict, output_format: str = "all", stream_sql: bool = False,
+                        dbms: str = "mysql") -> Dict:
+        """Génère les modèles MLD, MPD et SQL à partir du MCD (SQL laissé à save_outputs si stream_sql)"""
         print("🔄 Génération des modèles...")
         start_time = time.time()
         
         models = {"mcd": mcd_structure}
         
         try:
-            # Conversion MCD -> MLD
-            print("  📊 Génération MLD...")
-            mld_structure = self.converter._convert_to_mld(mcd_structure)
-            models["mld"] = mld_structure
+            # Conversion MCD -> MLD -> MPD (représentation intermédiaire, sérialisée une seule fois)
+            print("  📊 Génération MLD / MPD...")
+            models.update(self.compile_models(mcd_structure, dbms))
+            mld_structure = models["mld"]
+            mpd_structure = models["mpd"]
             
-            # Conversion MLD -> MPD
-            print("  📊 Génération MPD...")
-            mpd_structure = self.converter.generate_mpd(mld_structure, "mysql")
-            models["mpd"] = mpd_structure
-            
-            # Génération SQL
-            print("  📊 Génération SQL...")
-            sql_script = self.converter.generate_sql_from_mpd(mpd_structure)
+            # Génération SQL (en flux : écrit directement dans le fichier par save_outputs)
+            sql_script = None
+            if not stream_sql:
+                print("  📊 Génération SQL...")
+                sql_script = self.converter.generate_sql_from_mpd(self._mpd(models))
             models["sql"] = sql_script
             
             generation_time = time.time() - start_time
@@ -127,7 +296,8 @@ class MarkdownMCDCLI:
             print(f"   • Tables MLD: {len(mld_structure.get('tables', {}))}")
             print(f"   • Clés étrangères MLD: {len(mld_structure.get('foreign_keys', []))}")
             print(f"   • Tables MPD: {len(mpd_structure.get('tables', {}))}")
-            print(f"   • Longueur SQL: {len(sql_script)} caractères")
+            if sql_script is not None:
+                print(f"   • Longueur SQL: {len(sql_script)} caractères")
             
             return models
             
@@ -135,8 +305,23 @@ class MarkdownMCDCLI:
             print(f"❌ Erreur lors de la génération: {e}")
             sys.exit(1)
     
-    def save_outputs(self, models: Dict, output_dir: str, base_name: str):
-        """Sauvegarde les modèles générés dans différents formats"""
+    def compile_models(self, mcd_structure: Dict, dbms: str = "mysql") -> Dict:
+        """
+        {"mcd", "mld", "mpd", "mpd_ir"} : MLD / MPD construits en représentation intermédiaire (views.model_ir)
+        et sérialisés une fois ; mpd_ir (Mpd) sert au SQL, à la migration et aux données de test.
+        """
+        mld = self.converter.build_mld(mcd_structure)
+        mpd = self.converter.build_mpd(mld, dbms)
+        return {"mcd": mcd_structure, "mld": mld.to_dict(), "mpd": mpd.to_dict(), "mpd_ir": mpd}
+    
+    @staticmethod
+    def _mpd(models: Dict):
+        """Mpd des modèles (mpd_ir de compile_models), sinon le MPD au format dict"""
+        mpd = models.get("mpd_ir")
+        return models["mpd"] if mpd is None else mpd
+    
+    def save_outputs(self, models: Dict, output_dir: str, base_name: str, sql_out: Optional[str] = None):
+        """Sauvegarde les modèles générés dans différents formats (SQL dans sql_out s'il est donné)"""
         print(f"💾 Sauvegarde des modèles dans: {output_dir}")
         
         # Créer le répertoire de sortie
@@ -161,10 +346,15 @@ class MarkdownMCDCLI:
                 json.dump(models["mpd"], f, indent=2, ensure_ascii=False)
             print(f"✅ MPD sauvegardé: {mpd_file}")
             
-            # Sauvegarder le SQL
-            sql_file = os.path.join(output_dir, f"{base_name}.sql")
+            # Sauvegarder le SQL (généré en flux s'il n'a pas été construit en mémoire)
+            sql_file = sql_out or os.path.join(output_dir, f"{base_name}.sql")
             with open(sql_file, 'w', encoding='utf-8') as f:
-                f.write(models["sql"])
+                if models["sql"] is None:
+                    stats = _SqlStats()
+                    write_sql(stats.count(self.converter.iter_sql_from_mpd(self._mpd(models))), f)
+                    models["sql_stats"] = stats.as_dict()
+                else:
+                    f.write(models["sql"])
             print(f"✅ SQL sauvegardé: {sql_file}")
             
             # Créer un rapport de génération
@@ -176,88 +366,191 @@ class MarkdownMCDCLI:
             print(f"❌ Erreur lors de la sauvegarde: {e}")
             sys.exit(1)
     
+    def save_migration(self, old_mcd: Dict, models: Dict, output_dir: str, base_name: str) -> str:
+        """Écrit le script de migration de l'ancien MCD vers le nouveau (même SGBD que le MPD généré)"""
+        print("🔄 Calcul de la migration...")
+        start_time = time.time()
+        dbms = models["mpd"].get("dbms", "mysql")
+        old_mpd = self.converter.build_mpd(self.converter.build_mld(old_mcd), dbms)
+        diff = diff_schemas(old_mpd, self._mpd(models))
+        migration_file = os.path.join(output_dir, f"{base_name}_migration.sql")
+        with open(migration_file, 'w', encoding='utf-8') as f:
+            write_sql(MigrationWriter(self.converter).iter_sql(diff), f)
+        print(f"✅ Migration calculée en {time.time() - start_time:.2f}s ({dbms})")
+        print(f"   • Tables ajoutées: {len(diff.added_tables)}")
+        print(f"   • Tables supprimées: {len(diff.dropped_tables)}")
+        print(f"   • Tables modifiées: {len(diff.altered_tables)}")
+        if diff.is_empty():
+            print("   • Aucun changement de schéma")
+        print(f"✅ Migration sauvegardée: {migration_file}")
+        return migration_file
+
+    def save_test_data(self, models: Dict, output_dir: str, base_name: str, fmt: str) -> str:
+        """
+        Écrit des données de test du MPD (lignes par table : --volumetry) : <nom>_data.sql (insert, copy)
+        ou <nom>_data/ (un CSV par table et load.sql), en flux.
+        """
+        print("🔄 Génération des données de test...")
+        start_time = time.time()
+        hints = models.get("volumetry") or {}
+        generator = DataGenerator(self._mpd(models), models["mcd"], hints.get("rows"), hints.get("fanout"),
+                                  hints.get("default_rows"))
+        if fmt == "csv":
+            target = os.path.join(output_dir, f"{base_name}_data")
+            generator.write_csv(target)
+        else:
+            target = os.path.join(output_dir, f"{base_name}_data.sql")
+            with open(target, 'w', encoding='utf-8') as f:
+                generator.write_sql(f, fmt)
+        print(f"✅ Données générées en {time.time() - start_time:.2f}s")
+        for table in generator.plan():
+            print(f"   • {table['table']}: {table['rows']:,} lignes")
+        for note in generator.notes:
+            print(f"   ⚠️  {note}")
+        print(f"✅ Données sauvegardées: {target}")
+        return target
+
     def _generate_report(self, models: Dict, report_file: str):
         """Génère un rapport détaillé de la conversion"""
+        with open(report_file, 'w', encoding='utf-8') as f:
+            self._write_report(models, f)
+    
+    def render_outputs(self, models: Dict, base_name: str) -> Dict[str, str]:
+        """Contenu des sorties de save_outputs par nom de fichier, sans écriture ni affichage (mode --watch)"""
+        outputs = {}
+        for key in ("mcd", "mld", "mpd"):
+            outputs[f"{base_name}_{key}.json"] = json.dumps(models[key], indent=2, ensure_ascii=False)
+        sql = io.StringIO()
+        stats = _SqlStats()
+        write_sql(stats.count(self.converter.iter_sql_from_mpd(self._mpd(models))), sql)
+        models["sql_stats"] = stats.as_dict()
+        outputs[f"{base_name}.sql"] = sql.getvalue()
+        report = io.StringIO()
+        self._write_report(models, report)
+        outputs[f"{base_name}_report.txt"] = report.getvalue()
+        return outputs
+    
+    def _write_report(self, models: Dict, f):
+        """Écrit le rapport détaillé de la conversion dans le fichier texte f"""
         mcd = models["mcd"]
         mld = models["mld"]
         mpd = models["mpd"]
-        sql = models["sql"]
+        sql_stats = models.get("sql_stats") or _SqlStats.of(models["sql"])
         
-        with open(report_file, 'w', encoding='utf-8') as f:
-            f.write("=" * 60 + "\n")
-            f.write("RAPPORT DE CONVERSION MARKDOWN -> MCD\n")
-            f.write("=" * 60 + "\n\n")
-            
-            # Statistiques MCD
-            f.write("📊 STATISTIQUES MCD\n")
-            f.write("-" * 30 + "\n")
-            f.write(f"Entités: {len(mcd.get('entities', {}))}\n")
-            f.write(f"Associations: {len(mcd.get('associations', []))}\n")
-            f.write(f"Score de précision: {mcd.get('metadata', {}).get('precision_score', 0):.1f}%\n\n")
-            
-            # Détails des entités
-            f.write("📋 ENTITÉS DÉTECTÉES\n")
-            f.write("-" * 30 + "\n")
-            for entity_name, entity in mcd.get('entities', {}).items():
-                attrs = entity.get('attributes', [])
-                f.write(f"• {entity_name}: {len(attrs)} attributs\n")
-                for attr in attrs:
-                    f.write(f"  - {attr['name']} ({attr['type']})\n")
-            f.write("\n")
-            
-            # Détails des associations
-            f.write("🔗 ASSOCIATIONS DÉTECTÉES\n")
-            f.write("-" * 30 + "\n")
-            for assoc in mcd.get('associations', []):
-                f.write(f"• {assoc['entity1']} <-> {assoc['entity2']}: {assoc['name']}\n")
-                f.write(f"  Cardinalités: {assoc['cardinality1']} / {assoc['cardinality2']}\n")
-            f.write("\n")
-            
-            # Statistiques MLD
-            f.write("📊 STATISTIQUES MLD\n")
-            f.write("-" * 30 + "\n")
-            f.write(f"Tables: {len(mld.get('tables', {}))}\n")
-            f.write(f"Clés étrangères: {len(mld.get('foreign_keys', []))}\n")
-            f.write(f"Contraintes: {len(mld.get('constraints', []))}\n\n")
-            
-            # Statistiques MPD
-            f.write("📊 STATISTIQUES MPD\n")
-            f.write("-" * 30 + "\n")
-            f.write(f"Tables: {len(mpd.get('tables', {}))}\n")
-            f.write(f"Index: {len(mpd.get('indexes', []))}\n")
-            f.write(f"SGBD: {mpd.get('dbms', 'mysql')}\n\n")
-            
-            # Statistiques SQL
-            f.write("📊 STATISTIQUES SQL\n")
-            f.write("-" * 30 + "\n")
-            f.write(f"Longueur du script: {len(sql)} caractères\n")
-            f.write(f"Nombre de lignes: {sql.count(chr(10)) + 1}\n")
-            f.write(f"Tables créées: {sql.count('CREATE TABLE')}\n")
-            f.write(f"Clés étrangères: {sql.count('FOREIGN KEY')}\n")
-            f.write(f"Index créés: {sql.count('CREATE INDEX')}\n")
-    
-    def run(self, input_file: str, output_dir: str = "output", format_only: str = "all"):
-        """Exécute le processus complet d'import"""
+        f.write("=" * 60 + "\n")
+        f.write("RAPPORT DE CONVERSION MARKDOWN -> MCD\n")
+        f.write("=" * 60 + "\n\n")
+        
+        # Statistiques MCD
+        f.write("📊 STATISTIQUES MCD\n")
+        f.write("-" * 30 + "\n")
+        f.write(f"Entités: {len(mcd.get('entities', {}))}\n")
+        f.write(f"Associations: {len(mcd.get('associations', []))}\n")
+        f.write(f"Score de précision: {mcd.get('metadata', {}).get('precision_score', 0):.1f}%\n\n")
+        
+        # Détails des entités
+        f.write("📋 ENTITÉS DÉTECTÉES\n")
+        f.write("-" * 30 + "\n")
+        for entity_name, entity in mcd.get('entities', {}).items():
+            attrs = entity.get('attributes', [])
+            f.write(f"• {entity_name}: {len(attrs)} attributs\n")
+            for attr in attrs:
+                f.write(f"  - {attr['name']} ({attr['type']})\n")
+        f.write("\n")
+        
+        # Détails des associations
+        f.write("🔗 ASSOCIATIONS DÉTECTÉES\n")
+        f.write("-" * 30 + "\n")
+        for assoc in mcd.get('associations', []):
+            f.write(f"• {assoc['entity1']} <-> {assoc['entity2']}: {assoc['name']}\n")
+            f.write(f"  Cardinalités: {assoc['cardinality1']} / {assoc['cardinality2']}\n")
+        f.write("\n")
+        
+        # Statistiques MLD
+        f.write("📊 STATISTIQUES MLD\n")
+        f.write("-" * 30 + "\n")
+        f.write(f"Tables: {len(mld.get('tables', {}))}\n")
+        f.write(f"Clés étrangères: {len(mld.get('foreign_keys', []))}\n")
+        f.write(f"Contraintes: {len(mld.get('constraints', []))}\n\n")
+        
+        # Statistiques MPD
+        f.write("📊 STATISTIQUES MPD\n")
+        f.write("-" * 30 + "\n")
+        f.write(f"Tables: {len(mpd.get('tables', {}))}\n")
+        f.write(f"Index: {len(mpd.get('indexes', []))}\n")
+        f.write(f"SGBD: {mpd.get('dbms', 'mysql')}\n\n")
+        
+        # Statistiques SQL
+        f.write("📊 STATISTIQUES SQL\n")
+        f.write("-" * 30 + "\n")
+        f.write(f"Longueur du script: {sql_stats['length']} caractères\n")
+        f.write(f"Nombre de lignes: {sql_stats['lines']}\n")
+        f.write(f"Tables créées: {sql_stats['tables']}\n")
+        f.write(f"Clés étrangères: {sql_stats['foreign_keys']}\n")
+        f.write(f"Index créés: {sql_stats['indexes']}\n\n")
+        
+        # Plan d'index (retenus et écartés, avec justification)
+        f.write("🗂️ PLAN D'INDEX\n")
+        f.write("-" * 30 + "\n")
+        for decision in plan_indexes(Mpd.from_dict(mpd)):
+            status = "+" if decision.kept else "-"
+            f.write(f"{status} {decision.table}({', '.join(decision.columns)}): {decision.reason}\n")
+        f.write("\n")
+        
+        # Volumétrie estimée (lignes par entité / fan-out par association : --volumetry)
+        hints = models.get("volumetry") or {}
+        volumetry = estimate_volumetry(Mpd.from_dict(mpd), mcd, hints.get("rows"), hints.get("fanout"),
+                                       hints.get("default_rows"))
+        f.write("📦 VOLUMÉTRIE ESTIMÉE\n")
+        f.write("-" * 30 + "\n")
+        for table in volumetry["tables"]:
+            f.write(f"• {table['table']}: {table['rows']:,} lignes ({table['rows_source']}), "
+                    f"{table['row_bytes']} o/ligne, données {format_bytes(table['data_bytes'])}, "
+                    f"index {format_bytes(table['index_bytes'])}\n")
+        total = volumetry["total"]
+        f.write(f"Total: {total['rows']:,} lignes, données {format_bytes(total['data_bytes'])}, "
+                f"index {format_bytes(total['index_bytes'])}, soit {format_bytes(total['total_bytes'])}\n")
+
+    def run(self, input_file: str, output_dir: str = "output", format_only: str = "all", sql_out: Optional[str] = None,
+            dbms: str = "mysql", diff_from: Optional[str] = None, volumetry: Optional[str] = None,
+            data_format: Optional[str] = None):
+        """
+        Exécute le processus complet d'import (SQL écrit en flux dans sql_out s'il est donné).
+        diff_from : ancienne version du fichier markdown, pour écrire le script de migration.
+        volumetry : fichier JSON {"rows": {entité: lignes}, "fanout": {association: liens moyens}, "default_rows": n}
+        pour la volumétrie du rapport et les données de test.
+        data_format : données de test à générer (insert, copy, csv).
+        """
         print("🚀 BARRELMCD - IMPORT MARKDOWN CLI")
         print("=" * 50)
         
-        # Vérifier que le fichier d'entrée existe
-        if not os.path.exists(input_file):
-            print(f"❌ Erreur: Fichier '{input_file}' non trouvé")
-            sys.exit(1)
-        
-        # Charger le fichier markdown
-        markdown_content = self.load_markdown_file(input_file)
+        # Vérifier que les fichiers d'entrée existent
+        for path in (input_file, diff_from, volumetry):
+            if path and not os.path.exists(path):
+                print(f"❌ Erreur: Fichier '{path}' non trouvé")
+                sys.exit(1)
         
-        # Parser vers MCD
-        mcd_structure = self.parse_markdown_to_mcd(markdown_content)
+        # Parser le fichier markdown vers MCD (lecture en flux)
+        mcd_structure = self.parse_markdown_file(input_file)
         
         # Générer les modèles
-        models = self.generate_models(mcd_structure, format_only)
+        models = self.generate_models(mcd_structure, format_only, stream_sql=sql_out is not None, dbms=dbms)
+        if volumetry:
+            with open(volumetry, 'r', encoding='utf-8') as f:
+                models["volumetry"] = json.load(f)
         
         # Sauvegarder les résultats
         base_name = Path(input_file).stem
-        self.save_outputs(models, output_dir, base_name)
+        self.save_outputs(models, output_dir, base_name, sql_out)
+        
+        # Script de migration depuis l'ancienne version
+        if diff_from:
+            old_mcd = self.parse_markdown_file(diff_from)
+            self.save_migration(old_mcd, models, output_dir, base_name)
+        
+        # Données de test pour les tests de charge
+        if data_format:
+            self.save_test_data(models, output_dir, base_name, data_format)
         
         print("\n🎉 CONVERSION TERMINÉE AVEC SUCCÈS!")
         print(f"📁 Résultats sauvegardés dans: {output_dir}")
@@ -265,8 +558,314 @@ class MarkdownMCDCLI:
         print(f"   • {base_name}_mcd.json")
         print(f"   • {base_name}_mld.json") 
         print(f"   • {base_name}_mpd.json")
-        print(f"   • {base_name}.sql")
+        print(f"   • {sql_out or base_name + '.sql'}")
         print(f"   • {base_name}_report.txt")
+        if diff_from:
+            print(f"   • {base_name}_migration.sql")
+        if data_format:
+            print(f"   • {base_name}_data/" if data_format == "csv" else f"   • {base_name}_data.sql")
+
+
+    def run_batch(self, inputs: List[str], output_dir: str = "output", dbms: str = "mysql",
+                  volumetry: Optional[str] = None, data_format: Optional[str] = None,
+                  jobs: Optional[int] = None, merged_name: str = "merged") -> List[Dict]:
+        """
+        Importe un lot de fichiers markdown (fichiers, répertoires, motifs glob) dans un pool de processus :
+        sorties par fichier dans output_dir, MCD fusionné <merged_name>_mcd.json et tableau récapitulatif
+        (<merged_name>_summary.txt). jobs : processus (défaut : nombre de cœurs ; 1 = dans ce processus).
+        """
+        print("🚀 BARRELMCD - IMPORT MARKDOWN CLI (LOT)")
+        print("=" * 50)
+        
+        files = collect_markdown_files(inputs)
+        missing = [f for f in files if not os.path.isfile(f)]
+        if missing or not files:
+            print(f"❌ Erreur: Fichier(s) non trouvé(s): {', '.join(missing) or ', '.join(inputs)}")
+            sys.exit(1)
+        if volumetry and not os.path.exists(volumetry):
+            print(f"❌ Erreur: Fichier '{volumetry}' non trouvé")
+            sys.exit(1)
+        hints = None
+        if volumetry:
+            with open(volumetry, 'r', encoding='utf-8') as f:
+                hints = json.load(f)
+        names = batch_base_names(files)
+        if merged_name in names:
+            print(f"❌ Erreur: '{merged_name}' est déjà le nom d'un fichier du lot (voir --merged)")
+            sys.exit(1)
+        
+        os.makedirs(output_dir, exist_ok=True)
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(files)))
+        tasks = [(f, output_dir, name, dbms, hints, data_format) for f, name in zip(files, names)]
+        print(f"📁 {len(files)} fichiers, {jobs} processus")
+        start_time = time.perf_counter()
+        results = self._convert_batch(tasks, jobs)
+        elapsed = time.perf_counter() - start_time
+        
+        converted = [r for r in results if r["error"] is None]
+        if converted:
+            merged = merge_mcd_structures([(r["file"], r["mcd"]) for r in converted])
+            merged_file = os.path.join(output_dir, f"{merged_name}_mcd.json")
+            with open(merged_file, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, indent=2, ensure_ascii=False)
+            print(f"✅ MCD fusionné sauvegardé: {merged_file}")
+            for conflict in merged["metadata"]["conflicts"]:
+                print(f"   ⚠️  {conflict}")
+        
+        summary = self._batch_summary(results, elapsed, jobs)
+        summary_file = os.path.join(output_dir, f"{merged_name}_summary.txt")
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            f.write(summary + "\n")
+        print()
+        print(summary)
+        print(f"\n📄 Récapitulatif sauvegardé: {summary_file}")
+        if len(converted) < len(results):
+            sys.exit(1)
+        return results
+    
+    def _convert_batch(self, tasks: List[Tuple], jobs: int) -> List[Dict]:
+        """Convertit les fichiers en parallèle (repli en série si le pool est indisponible) ; résultats dans l'ordre du lot."""
+        if jobs > 1:
+            try:
+                results = {}
+                with ProcessPoolExecutor(max_workers=jobs) as pool:
+                    futures = {pool.submit(_batch_convert, task): i for i, task in enumerate(tasks)}
+                    for future in as_completed(futures):
+                        results[futures[future]] = result = future.result()
+                        self._print_batch_progress(result, len(results), len(tasks))
+                return [results[i] for i in range(len(tasks))]
+            except (BrokenProcessPool, OSError) as e:
+                print(f"⚠️  Pool de processus indisponible ({e}), conversion en série")
+        results = []
+        for task in tasks:
+            results.append(_batch_convert(task))
+            self._print_batch_progress(results[-1], len(results), len(tasks))
+        return results
+    
+    @staticmethod
+    def _print_batch_progress(result: Dict, done: int, total: int):
+        status = "✅" if result["error"] is None else "❌"
+        print(f"{status} [{done}/{total}] {result['file']} ({result['total_s']:.2f}s)")
+    
+    @staticmethod
+    def _batch_summary(results: List[Dict], elapsed: float, jobs: int) -> str:
+        """Tableau récapitulatif du lot : temps et score de précision par fichier, débit total."""
+        width = max([len("Fichier")] + [len(r["file"]) for r in results])
+        lines = [
+            f"{'Fichier':<{width}}  {'Entités':>7}  {'Assoc.':>6}  {'Score':>6}  "
+            f"{'Parse':>7}  {'Compil.':>7}  {'Total':>7}  Statut",
+            "-" * (width + 62),
+        ]
+        for r in results:
+            if r["error"] is None:
+                mcd = r["mcd"]
+                lines.append(
+                    f"{r['file']:<{width}}  {len(mcd['entities']):>7}  {len(mcd['associations']):>6}  "
+                    f"{mcd['metadata']['precision_score']:>5.1f}%  {r['parse_s']:>6.2f}s  "
+                    f"{r['compile_s']:>6.2f}s  {r['total_s']:>6.2f}s  OK"
+                )
+            else:
+                lines.append(f"{r['file']:<{width}}  {'-':>7}  {'-':>6}  {'-':>6}  {'-':>7}  {'-':>7}  "
+                             f"{r['total_s']:>6.2f}s  ERREUR: {r['error']}")
+        failed = sum(1 for r in results if r["error"] is not None)
+        lines.append("-" * (width + 62))
+        lines.append(f"{len(results)} fichiers ({failed} en erreur) en {elapsed:.2f}s avec {jobs} processus, "
+                     f"{len(results) / elapsed if elapsed else 0:.1f} fichiers/s")
+        return "\n".join(lines)
+    
+    def run_watch(self, inputs: List[str], output_dir: str = "output", dbms: str = "mysql",
+                  volumetry: Optional[str] = None, data_format: Optional[str] = None, batch: bool = False,
+                  merged_name: str = "merged"):
+        """
+        Mode --watch : compile les entrées puis les surveille (inotify si inotify_simple est installé,
+        sinon scrutation toutes les BARREL_WATCH_INTERVAL secondes) et recompile les fichiers modifiés.
+        """
+        print("🚀 BARRELMCD - IMPORT MARKDOWN CLI (SURVEILLANCE)")
+        print("=" * 50)
+        
+        if volumetry and not os.path.exists(volumetry):
+            print(f"❌ Erreur: Fichier '{volumetry}' non trouvé")
+            sys.exit(1)
+        hints = None
+        if volumetry:
+            with open(volumetry, 'r', encoding='utf-8') as f:
+                hints = json.load(f)
+        session = WatchSession(self, inputs, output_dir, dbms, hints, data_format, batch, merged_name)
+        if merged_name in batch_base_names(session.files() or ["-"]) and batch:
+            print(f"❌ Erreur: '{merged_name}' est déjà le nom d'un fichier du lot (voir --merged)")
+            sys.exit(1)
+        session.watch()
+
+
+class WatchSession:
+    """
+    Recompilation incrémentale du mode --watch. À chaque refresh() :
+    - seuls les fichiers dont (mtime, taille) a changé sont relus, et seuls ceux dont le contenu a changé
+      sont re-parsés ;
+    - MLD / MPD en cache réutilisés si le MCD obtenu est identique (ex. édition d'un commentaire) ;
+    - seules les sorties dont l'empreinte a changé sont réécrites (write_if_changed) ;
+    - en mode lot, MCD fusionné recalculé à partir des MCD en cache.
+    """
+    
+    def __init__(self, cli: MarkdownMCDCLI, inputs: List[str], output_dir: str = "output", dbms: str = "mysql",
+                 volumetry: Optional[Dict] = None, data_format: Optional[str] = None, batch: bool = False,
+                 merged_name: str = "merged"):
+        self.cli = cli
+        self.inputs = inputs
+        self.output_dir = output_dir
+        self.dbms = dbms
+        self.volumetry = volumetry
+        self.data_format = data_format
+        self.batch = batch
+        self.merged_name = merged_name
+        self._stats = {}    # fichier -> (mtime_ns, taille)
+        self._sources = {}  # fichier -> empreinte du markdown
+        self._models = {}   # fichier -> (empreinte du MCD, modèles)
+        self._names = {}    # fichier -> nom de base des sorties
+        self._errors = {}   # fichier -> dernière erreur de conversion
+        self._written = {}  # sortie -> empreinte du contenu écrit
+    
+    def files(self) -> List[str]:
+        """Fichiers markdown surveillés (ré-évalués à chaque refresh : fichiers ajoutés ou supprimés)"""
+        return [f for f in collect_markdown_files(self.inputs) if os.path.isfile(f)]
+    
+    def directories(self) -> List[str]:
+        """Répertoires à surveiller : les répertoires d'entrée, sinon ceux des fichiers (sauvegarde par renommage)"""
+        dirs = set()
+        for entry in self.inputs:
+            if os.path.isdir(entry):
+                dirs.add(entry)
+            elif _is_glob(entry):
+                parts = []
+                for part in entry.split(os.sep):
+                    if _is_glob(part):
+                        break
+                    parts.append(part)
+                dirs.add(os.sep.join(parts) or ".")
+            else:
+                dirs.add(os.path.dirname(entry) or ".")
+        return sorted(d for d in dirs if os.path.isdir(d))
+    
+    def refresh(self) -> Dict:
+        """
+        Recompile ce qui a changé depuis le dernier appel : sorties par fichier d'abord, puis MCD fusionné
+        (proportionnel à tout le lot). Retourne {"changed", "reparsed", "recompiled", "removed", "written",
+        "errors", "outputs_seconds" (sorties par fichier à jour), "seconds" (total)}.
+        """
+        start = time.perf_counter()
+        report = {"changed": [], "reparsed": [], "recompiled": [], "removed": [], "written": [], "errors": {}}
+        files = self.files()
+        snapshot = stat_snapshot(files)
+        files = [f for f in files if f in snapshot]
+        report["removed"] = [f for f in self._stats if f not in snapshot]
+        for f in report["removed"]:
+            for cache in (self._stats, self._sources, self._models, self._names, self._errors):
+                cache.pop(f, None)
+        
+        names = dict(zip(files, batch_base_names(files))) if files else {}
+        dirty = set()
+        for f in files:
+            if self._stats.get(f) == snapshot[f]:
+                continue
+            report["changed"].append(f)
+            self._stats[f] = snapshot[f]
+            try:
+                with open(f, "rb") as fh:
+                    data = fh.read()
+            except OSError as e:  # supprimé entre stat et lecture : vu au prochain refresh
+                self._stats.pop(f, None)
+                report["errors"][f] = str(e)
+                continue
+            digest = _digest(data)
+            if self._sources.get(f) == digest:
+                continue
+            self._sources[f] = digest
+            report["reparsed"].append(f)
+            try:
+                if self._compile(f, data.decode("utf-8")):
+                    report["recompiled"].append(f)
+                    dirty.add(f)
+                self._errors.pop(f, None)
+            except Exception as e:
+                self._errors[f] = f"{type(e).__name__}: {e}"
+        for f in files:
+            if f in self._models and self._names.get(f) != names[f]:
+                self._names[f] = names[f]
+                dirty.add(f)
+        
+        for f in files:
+            if f in dirty:
+                report["written"] += self._save(f)
+        report["outputs_seconds"] = time.perf_counter() - start
+        if self.batch and (dirty or report["removed"]):
+            converted = [(f, self._models[f][1]["mcd"]) for f in files if f in self._models]
+            if converted:
+                merged = json.dumps(merge_mcd_structures(converted), indent=2, ensure_ascii=False)
+                merged_file = os.path.join(self.output_dir, f"{self.merged_name}_mcd.json")
+                if write_if_changed(merged_file, merged, self._written):
+                    report["written"].append(merged_file)
+        report["errors"].update((f, self._errors[f]) for f in report["reparsed"] if f in self._errors)
+        report["seconds"] = time.perf_counter() - start
+        return report
+    
+    def _compile(self, input_file: str, content: str) -> bool:
+        """Parse le fichier ; MLD / MPD recalculés si le MCD a changé. Retourne True s'ils l'ont été."""
+        mcd = MarkdownMCDParser().parse_markdown(content)
+        digest = _digest(json.dumps(mcd, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        cached = self._models.get(input_file)
+        if cached and cached[0] == digest:
+            return False
+        models = self.cli.compile_models(mcd, self.dbms)
+        models["sql"] = None
+        if self.volumetry:
+            models["volumetry"] = self.volumetry
+        self._models[input_file] = (digest, models)
+        return True
+    
+    def _save(self, input_file: str) -> List[str]:
+        """Écrit les sorties modifiées du fichier (et ses données de test) ; retourne les chemins écrits"""
+        models = self._models[input_file][1]
+        base_name = self._names.get(input_file) or Path(input_file).stem
+        self._names[input_file] = base_name
+        os.makedirs(self.output_dir, exist_ok=True)
+        written = []
+        for name, text in self.cli.render_outputs(models, base_name).items():
+            path = os.path.join(self.output_dir, name)
+            if write_if_changed(path, text, self._written):
+                written.append(path)
+        if self.data_format:
+            with contextlib.redirect_stdout(io.StringIO()):
+                written.append(self.cli.save_test_data(models, self.output_dir, base_name, self.data_format))
+        return written
+    
+    def watch(self, watcher=None):
+        """Compilation initiale puis boucle de surveillance jusqu'à Ctrl+C"""
+        watcher = watcher or make_watcher(self.directories())
+        self._print_refresh(self.refresh(), initial=True)
+        print(f"👀 Surveillance de {len(self._stats)} fichier(s) ({watcher.kind}), Ctrl+C pour arrêter")
+        try:
+            while True:
+                watcher.wait()
+                report = self.refresh()
+                if report["changed"] or report["removed"]:
+                    self._print_refresh(report)
+        except KeyboardInterrupt:
+            print("\n⏹️  Surveillance arrêtée")
+        finally:
+            watcher.close()
+    
+    @staticmethod
+    def _print_refresh(report: Dict, initial: bool = False):
+        label = "Compilation initiale" if initial else f"{len(report['changed'])} fichier(s) modifié(s)"
+        print(f"🔄 {label} : {len(report['reparsed'])} re-parsé(s), {len(report['recompiled'])} recompilé(s), "
+              f"{len(report['written'])} sortie(s) réécrite(s), à jour en {report['outputs_seconds'] * 1000:.0f} ms "
+              f"(total {report['seconds'] * 1000:.0f} ms)")
+        for path in report["written"]:
+            print(f"   ✅ {path}")
+        for path in report["removed"]:
+            print(f"   🗑️  {path} supprimé (sorties conservées)")
+        for path, error in report["errors"].items():
+            print(f"   ❌ {path}: {error}")
 
 
 def main():
@@ -279,12 +878,21 @@ Exemples d'utilisation:
   python cli_markdown_import.py fichier.md
   python cli_markdown_import.py fichier.md -o ./sortie
   python cli_markdown_import.py fichier.md --format mcd-only
+  python cli_markdown_import.py fichier.md --out schema.sql
+  python cli_markdown_import.py v2.md --diff-from v1.md --dbms postgresql
+  python cli_markdown_import.py fichier.md --volumetry volumes.json
+  python cli_markdown_import.py fichier.md --volumetry volumes.json --data copy --dbms postgresql
+  python cli_markdown_import.py docs/specs/ -j 8 --dbms postgresql
+  python cli_markdown_import.py "specs/**/*.md" -o ./sortie --merged domaine
+  python cli_markdown_import.py docs/specs/ --watch
         """
     )
     
     parser.add_argument(
-        "input_file",
-        help="Fichier markdown à convertir"
+        "inputs",
+        nargs="+",
+        metavar="ENTRÉE",
+        help="Fichier markdown à convertir ; plusieurs fichiers, un répertoire ou un motif glob : mode lot"
     )
     
     parser.add_argument(
@@ -300,6 +908,55 @@ Exemples d'utilisation:
         help="Format de sortie (défaut: all)"
     )
     
+    parser.add_argument(
+        "--out",
+        help="Fichier SQL écrit en flux, sans construire le script en mémoire (défaut: <sortie>/<nom>.sql)"
+    )
+    
+    parser.add_argument(
+        "--dbms",
+        choices=["mysql", "postgresql", "sqlite", "sqlserver"],
+        default="mysql",
+        help="SGBD cible du MPD, du SQL et de la migration (défaut: mysql)"
+    )
+    
+    parser.add_argument(
+        "--diff-from",
+        metavar="ANCIEN.md",
+        help="Ancienne version du markdown : écrit <sortie>/<nom>_migration.sql (ALTER TABLE, index...)"
+    )
+    
+    parser.add_argument(
+        "--volumetry",
+        metavar="VOLUMES.json",
+        help='Estimations pour la volumétrie du rapport : {"rows": {entité: lignes}, "fanout": {association: liens moyens}}'
+    )
+    
+    parser.add_argument(
+        "--data",
+        choices=["insert", "copy", "csv"],
+        help="Données de test : <nom>_data.sql (INSERT, COPY PostgreSQL) ou <nom>_data/ (CSV + load.sql)"
+    )
+    
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        help="Mode lot : nombre de processus (défaut : nombre de cœurs)"
+    )
+    
+    parser.add_argument(
+        "--merged",
+        default="merged",
+        metavar="NOM",
+        help="Mode lot : nom du MCD fusionné <sortie>/<NOM>_mcd.json et du récapitulatif (défaut: merged)"
+    )
+    
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Surveille les entrées et recompile les fichiers modifiés (sorties inchangées non réécrites)"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -310,7 +967,19 @@ Exemples d'utilisation:
     
     # Créer et exécuter le CLI
     cli = MarkdownMCDCLI()
-    cli.run(args.input_file, args.output, args.format)
+    batch = len(args.inputs) > 1 or os.path.isdir(args.inputs[0]) or _is_glob(args.inputs[0])
+    if args.watch:
+        if args.out or args.diff_from:
+            parser.error("--out et --diff-from ne s'appliquent pas au mode --watch")
+        cli.run_watch(args.inputs, args.output, args.dbms, args.volumetry, args.data, batch, args.merged)
+        return
+    if not batch:
+        cli.run(args.inputs[0], args.output, args.format, args.out, args.dbms, args.diff_from, args.volumetry,
+                args.data)
+        return
+    if args.out or args.diff_from:
+        parser.error("--out et --diff-from ne s'appliquent qu'à un seul fichier")
+    cli.run_batch(args.inputs, args.output, args.dbms, args.volumetry, args.data, args.jobs, args.merged)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la représentation intermédiaire MLD / MPD (views.model_ir) sur un modèle synthétique.
+
+Mesure, sur --tables tables de --columns colonnes au total (une association 1,n par table) :
+- le temps et le pic mémoire (tracemalloc) de MCD → MLD → MPD ;
+- la mémoire retenue par le MLD + MPD sous forme d'IR et sous forme de dicts (ancien format) ;
+- le coût d'un delta de clés étrangères par appartenance à une liste et par Counter (hash des enregistrements).
+
+Sur un arbre antérieur à l'IR (ModelConverter sans build_mld), seul le pipeline dict est mesuré :
+lancer le script sur les deux arbres pour comparer.
+
+Usage : python scripts/bench_ir.py [--tables 500] [--columns 10000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from views.model_converter import ModelConverter
+
+TYPES = ("VARCHAR(255)", "INTEGER", "DECIMAL(10,2)", "TEXT", "DATE", "BOOLEAN")
+
+
+def synthetic_mcd(n_tables: int, n_columns: int) -> dict:
+    """MCD au format ModelConverter : n_tables entités, colonnes réparties, chaîne d'associations 1,n."""
+    per_table = max(1, n_columns // n_tables)
+    entities = {}
+    associations = []
+    for t in range(n_tables):
+        name = f"entite{t}"
+        entities[name] = {"name": name, "attributes": [
+            {"name": f"c{i}", "type": TYPES[i % len(TYPES)], "is_primary_key": i == 0} for i in range(per_table)
+        ]}
+        if t:
+            associations.append({"name": f"lien{t}", "entity1": name, "entity2": f"entite{t - 1}",
+                                 "cardinality1": "1,1", "cardinality2": "0,n"})
+    return {"entities": entities, "associations": associations, "inheritance": {}}
+
+
+def _measure(fn, repeat: int):
+    """(meilleur temps, pic mémoire du dernier passage, résultat)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def _retained(fn) -> int:
+    """Mémoire encore allouée par le résultat de fn."""
+    tracemalloc.start()
+    result = fn()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tables", type=int, default=500)
+    parser.add_argument("--columns", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    mcd = synthetic_mcd(args.tables, args.columns)
+    converter = ModelConverter()
+    print(f"{args.tables} tables, {args.columns} colonnes")
+
+    def dict_pipeline():
+        mld = converter._convert_to_mld(mcd)
+        return mld, converter.generate_mpd(mld, "postgresql")
+
+    elapsed, peak, _ = _measure(dict_pipeline, args.repeat)
+    print(f"  pipeline dict (MCD → MLD → MPD) : {elapsed:7.3f} s, pic {peak / 2**20:6.1f} Mo")
+    if not hasattr(converter, "build_mld"):
+        return
+
+    def ir_pipeline():
+        mld = converter.build_mld(mcd)
+        return mld, converter.build_mpd(mld, "postgresql")
+
+    elapsed, peak, (mld, mpd) = _measure(ir_pipeline, args.repeat)
+    print(f"  pipeline IR   (MCD → MLD → MPD) : {elapsed:7.3f} s, pic {peak / 2**20:6.1f} Mo")
+    ir_size = _retained(ir_pipeline)
+    dict_size = _retained(lambda: (mld.to_dict(), mpd.to_dict()))
+    print(f"  MLD + MPD retenus : IR {ir_size / 2**20:6.1f} Mo, dicts {dict_size / 2**20:6.1f} Mo "
+          f"(x{dict_size / ir_size:.1f})")
+
+    old = list(mpd.foreign_keys)
+    new = [fk.copy() for fk in old]
+    new[len(new) // 2].set("column", "renommee")
+    start = time.perf_counter()
+    listed = [fk for fk in new if fk not in old]
+    by_list = time.perf_counter() - start
+    start = time.perf_counter()
+    counted = list((Counter(new) - Counter(old)).elements())
+    by_counter = time.perf_counter() - start
+    assert listed == counted
+    print(f"  delta de {len(old)} clés étrangères : liste {by_list * 1e3:8.2f} ms, Counter {by_counter * 1e3:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
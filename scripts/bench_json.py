@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark du chemin JSON de l'API sur un MCD synthétique de 1 000 entités.
+
+Compare, pour le corps de /api/to-mld (décodage de la requête) et sa réponse (MLD) :
+- chemin par défaut : json.loads + validation pydantic Dict[str, Any] + jsonable_encoder + json.dumps ;
+- chemin rapide : api.services.json_codec (orjson si installé), sans validation récursive.
+
+Usage : python scripts/bench_json.py [--entities 1000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from api.services import json_codec, mcd_service
+
+
+def synthetic_mcd(n_entities: int) -> dict:
+    """MCD canvas : n entités de 8 attributs, chaînées par des associations 1,1 / 0,n."""
+    entities, associations, links = [], [], []
+    for i in range(n_entities):
+        entities.append({
+            "name": f"Entite{i}",
+            "position": {"x": float(i % 40) * 220.0, "y": float(i // 40) * 180.0},
+            "attributes": [
+                {"name": "id", "type": "INTEGER", "is_primary_key": True},
+                {"name": "libelle", "type": "VARCHAR(100)", "is_unique": i % 5 == 0},
+                {"name": "description", "type": "TEXT"},
+                {"name": "montant", "type": "DECIMAL(10,2)"},
+                {"name": "quantite", "type": "INTEGER"},
+                {"name": "cree_le", "type": "DATETIME"},
+                {"name": "actif", "type": "BOOLEAN"},
+                {"name": "code_interne", "type": "VARCHAR(20)"},
+            ],
+        })
+        if i:
+            name = f"Lien{i}"
+            associations.append({"name": name, "attributes": [], "position": {"x": 0.0, "y": 0.0}})
+            links.append({"association": name, "entity": f"Entite{i - 1}", "card_entity": "0,n"})
+            links.append({"association": name, "entity": f"Entite{i}", "card_entity": "1,1"})
+    return {"entities": entities, "associations": associations, "association_links": links}
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark JSON (chemin par défaut vs chemin rapide).")
+    ap.add_argument("--entities", type=int, default=1000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    request = {"mcd": synthetic_mcd(args.entities)}
+    raw = json.dumps(request).encode("utf-8")
+    mld = mcd_service.mcd_to_mld(request["mcd"])
+    print(f"MCD : {args.entities} entités, corps {len(raw) / 1e6:.2f} Mo ; backend rapide : {json_codec.BACKEND}")
+
+    results = {}
+    try:
+        from pydantic import BaseModel
+        from fastapi.encoders import jsonable_encoder
+        from typing import Any, Dict
+
+        class McdToMldRequest(BaseModel):
+            mcd: Dict[str, Any]
+
+        def default_decode():
+            McdToMldRequest(**json.loads(raw))
+
+        def default_encode():
+            json.dumps(jsonable_encoder(mld), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+        results["défaut"] = (_best(default_decode, args.repeat), _best(default_encode, args.repeat))
+    except ImportError:
+        print("pydantic / fastapi non installés : chemin par défaut mesuré sans validation ni jsonable_encoder.")
+        results["json standard"] = (
+            _best(lambda: json.loads(raw), args.repeat),
+            _best(lambda: json.dumps(mld, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), args.repeat),
+        )
+
+    def fast_decode():
+        body = json_codec.loads(raw)
+        assert isinstance(body.get("mcd"), dict)
+
+    results["rapide"] = (_best(fast_decode, args.repeat), _best(lambda: json_codec.dumps(mld), args.repeat))
+
+    print(f"{'chemin':<16}{'décodage (ms)':>16}{'encodage (ms)':>16}")
+    for name, (dec, enc) in results.items():
+        print(f"{name:<16}{dec * 1000:>16.1f}{enc * 1000:>16.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark du parseur Markdown → MCD (views.markdown_mcd_parser) sur un corpus synthétique.
+
+Le corpus est généré ligne par ligne (1k / 10k / 100k entités par défaut) : entités de 5 attributs
+typés, une association binaire par entité avec sa description et ses cardinalités, un héritage
+toutes les 50 entités. Mesure le débit de MarkdownMCDParser.parse_lines en lignes par seconde.
+
+Usage : python scripts/bench_markdown.py [--entities 1000 10000 100000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Iterator, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from views.markdown_mcd_parser import MarkdownMCDParser
+
+ATTRIBUTES = (
+    "- libelle (varchar(80)) : libellé NOT NULL",
+    "- montant (decimal(10,2)) : montant TTC",
+    "- cree_le (datetime) : date de création",
+    "- code (varchar(20)) : code UNIQUE",
+    "- actif (boolean) : DEFAULT 'true'",
+)
+CARDINALITIES = ("0,n", "1,n", "0,1", "1,1")
+
+
+def synthetic_markdown(n_entities: int) -> Iterator[str]:
+    """Lignes d'une spécification Markdown de n_entities entités (générées à la demande)."""
+    yield "# Modèle synthétique"
+    for i in range(n_entities):
+        yield ""
+        yield f"## Entite{i}"
+        if i and i % 50 == 0:
+            yield f"Entite{i} hérite de Entite{i - 1}"
+        yield from ATTRIBUTES
+        if i:
+            yield ""
+            yield f"## Entite{i} <-> Entite{i - 1} : Lien{i}"
+            yield f"**Entite{i} est liée à Entite{i - 1}**"
+            yield f"Entite{i} : {CARDINALITIES[i % 4]}"
+            yield f"Entite{i - 1} : {CARDINALITIES[(i + 1) % 4]}"
+
+
+def _best(lines: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        parser = MarkdownMCDParser()
+        start = time.perf_counter()
+        parser.parse_lines(lines)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entities", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for n_entities in args.entities:
+        lines = list(synthetic_markdown(n_entities))
+        elapsed = _best(lines, args.repeat)
+        print(f"{n_entities:>7} entités, {len(lines):>8} lignes : {elapsed:7.3f} s, "
+              f"{len(lines) / elapsed:>10,.0f} lignes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark de la traduction des types (views.model_converter) sur un modèle synthétique.
+
+Mesure le coût par colonne :
+- de _convert_type_to_sql (type MCD → SQL) et de _translate_type_for_dbms (SQL → SGBD, 4 dialectes),
+  sans mémo (analyse à chaque appel) puis avec le mémo ;
+- de ModelConverter.build_mpd complet (MLD → MPD, 4 dialectes).
+
+Usage : python scripts/bench_types.py [--columns 10000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from views import model_converter
+from views.model_converter import ModelConverter
+
+DIALECTS = ("mysql", "postgresql", "sqlite", "sqlserver")
+TYPES = (
+    "VARCHAR(255)", "VARCHAR(100)", "INTEGER", "INT", "DECIMAL(10,2)", "DECIMAL", "TEXT", "DATE",
+    "DATETIME", "DATETIME2", "BOOLEAN", "VARCHAR2(30)", "NVARCHAR(50)", "NCHAR(3)", "SERIAL", "BIGINT",
+)
+
+
+def synthetic_columns(n_columns: int, seed: int = 1):
+    """(type MCD, size, precision, scale) de n colonnes, tirés parmi quelques dizaines de types courants."""
+    rnd = random.Random(seed)
+    return [
+        (rnd.choice(TYPES), rnd.choice((None, None, 40)), rnd.choice((None, 12)), rnd.choice((None, 3)))
+        for _ in range(n_columns)
+    ]
+
+
+def synthetic_mcd(n_columns: int, per_table: int = 20) -> dict:
+    """MCD au format ModelConverter : tables de per_table colonnes."""
+    columns = synthetic_columns(n_columns)
+    entities = {}
+    for start in range(0, n_columns, per_table):
+        name = f"entite{start // per_table}"
+        entities[name] = {"name": name, "attributes": [
+            {"name": f"c{i}", "type": t, "size": size, "precision": precision, "scale": scale}
+            for i, (t, size, precision, scale) in enumerate(columns[start:start + per_table])
+        ]}
+    return {"entities": entities, "associations": [], "inheritance": {}}
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--columns", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    columns = synthetic_columns(args.columns)
+    n_calls = len(columns) * len(DIALECTS)
+
+    def uncached():
+        for t, size, precision, scale in columns:
+            sql_type = model_converter._convert_type_to_sql_memo.__wrapped__(t)
+            for dbms in DIALECTS:
+                model_converter._translate_type(sql_type, dbms, size, precision, scale)
+
+    def memoized():
+        for t, size, precision, scale in columns:
+            sql_type = model_converter.convert_type_to_sql(t)
+            for dbms in DIALECTS:
+                model_converter.translate_type_for_dbms(sql_type, dbms, size, precision, scale)
+
+    converter = ModelConverter()
+    mld = converter.build_mld(synthetic_mcd(args.columns))
+
+    def build_mpd():
+        for dbms in DIALECTS:
+            converter.build_mpd(mld, dbms)
+
+    before = _best(uncached, args.repeat)
+    after = _best(memoized, args.repeat)
+    mpd = _best(build_mpd, args.repeat)
+    info = model_converter._translate_type_memo.cache_info()
+    print(f"{args.columns} colonnes x {len(DIALECTS)} SGBD ({n_calls} traductions)")
+    print(f"  sans mémo : {before * 1e6 / n_calls:8.3f} µs / colonne·SGBD")
+    print(f"  avec mémo : {after * 1e6 / n_calls:8.3f} µs / colonne·SGBD  (x{before / after:.1f})")
+    print(f"  build_mpd : {mpd * 1e6 / n_calls:8.3f} µs / colonne·SGBD")
+    print(f"  mémo : {info.currsize} entrées, {info.hits} hits, {info.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
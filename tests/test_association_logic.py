@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la validation par lot des opérations sur les associations (api.services.association_logic).
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from api.services import mcd_service
+from api.services.association_logic import (
+    validate_add_link,
+    validate_association_after_update,
+    validate_create_association,
+    validate_operations,
+)
+
+
+def _mcd():
+    return {
+        "entities": [{"name": "Client"}, {"name": "Commande"}, {"name": "Produit"}],
+        "associations": [{"name": "Passe", "attributes": []}],
+        "association_links": [
+            {"association": "Passe", "entity": "Client", "card_entity": "0,n", "card_assoc": "1,1"},
+        ],
+    }
+
+
+def test_batch_matches_individual_calls():
+    """Sans application, chaque résultat est celui de l'appel unitaire correspondant."""
+    mcd = _mcd()
+    operations = [
+        {"op": "create_association", "name": "Passe"},
+        {"op": "add_link", "association_name": "Passe", "entity_name": "Client"},
+        {"op": "add_link", "association_name": "Passe", "entity_name": "Commande", "card_entity": "1,1"},
+        {"op": "update_association", "association_name": "Passe", "new_attributes": [{"name": "date"}]},
+        {"op": "rename"},
+    ]
+    results = validate_operations(mcd, operations)
+    assert results[0]["errors"] == validate_create_association(mcd, "Passe")
+    assert results[1]["errors"] == validate_add_link(mcd, "Passe", "Client", "1,n", "1,n")
+    assert results[2]["valid"] and results[2]["errors"] == []
+    assert results[3]["errors"] == validate_association_after_update(mcd, "Passe", [{"name": "date"}])
+    assert not results[4]["valid"] and "Opération inconnue" in results[4]["errors"][0]
+    assert not any(r["applied"] for r in results)
+
+
+def test_batch_apply_in_sequence():
+    """Avec apply, une association créée puis reliée à plusieurs entités est vue par les opérations suivantes."""
+    mcd = _mcd()
+    results = validate_operations(mcd, [
+        {"op": "create_association", "name": "Contient"},
+        {"op": "add_link", "association_name": "Contient", "entity_name": "Commande", "card_entity": "1,n", "card_assoc": "0,n"},
+        {"op": "add_link", "association_name": "Contient", "entity_name": "Produit", "card_entity": "0,n", "card_assoc": "0,n"},
+        {"op": "add_link", "association_name": "Contient", "entity_name": "Produit"},
+        {"op": "update_association", "association_name": "Contient", "new_attributes": [{"name": "quantite"}]},
+        {"op": "create_association", "name": "Contient"},
+    ], apply=True)
+    assert [r["valid"] for r in results] == [True, True, True, False, True, False]
+    assert "existe déjà" in results[3]["errors"][0]
+    assert [r["applied"] for r in results] == [True, True, True, False, True, False]
+    # Le MCD d'origine n'est pas modifié
+    assert mcd == _mcd()
+    # Association porteuse de rubriques dans le lot : un lien 1,1 côté association est refusé
+    refused = validate_operations(mcd, [
+        {"op": "create_association", "name": "Note", "attributes": [{"name": "valeur"}]},
+        {"op": "add_link", "association_name": "Note", "entity_name": "Client", "card_assoc": "1,1"},
+    ], apply=True)
+    assert refused[0]["valid"] and not refused[1]["valid"]
+
+
+def test_batch_apply_skips_invalid_operations():
+    """Une opération refusée n'est pas appliquée : les rubriques refusées n'interdisent pas le lien 1,1 suivant."""
+    results = validate_operations(_mcd(), [
+        {"op": "update_association", "association_name": "Passe", "new_attributes": [{"name": "date"}]},
+        {"op": "add_link", "association_name": "Passe", "entity_name": "Commande", "card_assoc": "1,1"},
+    ], apply=True)
+    assert not results[0]["valid"] and not results[0]["applied"]
+    assert results[1]["valid"]
+
+
+def test_batch_rejects_mistyped_fields():
+    """Nom non textuel ou attributs hors liste : opération invalide et non appliquée, le reste du lot est traité."""
+    results = validate_operations(_mcd(), [
+        {"op": "create_association", "name": 42},
+        {"op": "add_link", "association_name": "Passe", "entity_name": ["Client"]},
+        {"op": "update_association", "association_name": {"nom": "Passe"}},
+        {"op": "create_association", "name": "Livre", "attributes": "titre"},
+        {"op": ["create_association"]},
+        {"op": "create_association", "name": "Livre"},
+    ], apply=True)
+    assert [r["valid"] for r in results] == [False, False, False, False, False, True]
+    assert [r["applied"] for r in results] == [False, False, False, False, False, True]
+    assert "entity_name" in results[1]["errors"][0]
+    assert "liste" in results[3]["errors"][0]
+
+
+def test_service_batch_requires_boolean_apply():
+    """mcd_service.validate_operations : apply non booléen (ex. la chaîne "false") refusé (400 côté route)."""
+    operations = [{"op": "create_association", "name": "Livre"}]
+    assert mcd_service.validate_operations(_mcd(), operations, apply=False)["results"][0]["applied"] is False
+    for value in ("false", "true", 0, 1, None):
+        with pytest.raises(ValueError):
+            mcd_service.validate_operations(_mcd(), operations, apply=value)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de l'import markdown par lot du CLI (cli_markdown_import.run_batch) et de la fusion des MCD.
+"""
+
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from cli_markdown_import import MarkdownMCDCLI, batch_base_names, collect_markdown_files
+from views.markdown_mcd_parser import MarkdownMCDParser, merge_mcd_structures
+
+SHOP = """## Client
+- nom (varchar(50))
+
+## Commande
+- montant (decimal(10,2))
+
+## Client <-> Commande : Passer
+Client : 0,n
+Commande : 1,1
+"""
+
+
+def _specs(tmp_path):
+    (tmp_path / "a").mkdir(parents=True)
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "shop.md").write_text(SHOP, encoding="utf-8")
+    (tmp_path / "b" / "shop.md").write_text(SHOP.replace("0,n", "1,n") + "\n## Fournisseur\n- nom (varchar)\n",
+                                            encoding="utf-8")
+    (tmp_path / "b" / "notes.txt").write_text("pas du markdown", encoding="utf-8")
+    return tmp_path
+
+
+def test_collect_files_and_unique_names(tmp_path):
+    """Répertoires parcourus (.md seulement), motifs glob, doublons retirés ; noms de sortie distincts."""
+    root = _specs(tmp_path)
+    files = collect_markdown_files([str(root), str(root / "a" / "*.md")])
+    assert [os.path.relpath(f, str(root)) for f in files] == [os.path.join("a", "shop.md"), os.path.join("b", "shop.md")]
+    assert batch_base_names(files) == ["a_shop", "b_shop"]
+    assert batch_base_names(["x/un.md", "y/deux.md"]) == ["un", "deux"]
+
+
+def test_merge_keeps_first_definition_and_reports_conflicts():
+    """Entités réunies (attributs ajoutés), associations dédoublonnées, cardinalités divergentes signalées."""
+    first = MarkdownMCDParser().parse_markdown(SHOP)
+    second = MarkdownMCDParser().parse_markdown(SHOP.replace("0,n", "1,n").replace("- nom (varchar(50))", "- email (varchar)"))
+    merged = merge_mcd_structures([("a.md", first), ("b.md", second)])
+    assert [a["name"] for a in merged["entities"]["Client"]["attributes"]] == ["nom", "email"]
+    assert len(merged["associations"]) == 1 and merged["associations"][0]["cardinality1"] == "0,n"
+    assert merged["metadata"]["sources"] == ["a.md", "b.md"]
+    assert len(merged["metadata"]["conflicts"]) == 1
+    assert first["entities"]["Client"]["attributes"][0]["name"] == "nom"  # entrées non modifiées
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_batch_outputs_and_summary(tmp_path, jobs):
+    """Sorties par fichier, MCD fusionné et récapitulatif ; même résultat en série et en parallèle."""
+    root = _specs(tmp_path / "specs")
+    out = tmp_path / "out"
+    results = MarkdownMCDCLI().run_batch([str(root)], str(out), dbms="postgresql", jobs=jobs)
+    assert [r["error"] for r in results] == [None, None]
+    for name in ("a_shop", "b_shop"):
+        assert "CREATE TABLE" in (out / f"{name}.sql").read_text(encoding="utf-8")
+    merged = json.loads((out / "merged_mcd.json").read_text(encoding="utf-8"))
+    assert sorted(merged["entities"]) == ["Client", "Commande", "Fournisseur"]
+    summary = (out / "merged_summary.txt").read_text(encoding="utf-8")
+    assert "2 fichiers (0 en erreur)" in summary and "100.0%" in summary
+
+
+def test_run_batch_reports_failures(tmp_path):
+    """Un fichier illisible : les autres sont convertis, l'erreur figure au récapitulatif, code de sortie 1."""
+    root = _specs(tmp_path / "specs")
+    (root / "b" / "bad.md").write_bytes(b"\xff## X\n")
+    with pytest.raises(SystemExit):
+        MarkdownMCDCLI().run_batch([str(root)], str(tmp_path / "out"), jobs=1)
+    summary = (tmp_path / "out" / "merged_summary.txt").read_text(encoding="utf-8")
+    assert "ERREUR: Erreur lors du parsing" in summary
+    assert (tmp_path / "out" / "merged_mcd.json").exists()
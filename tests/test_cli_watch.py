@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du mode --watch du CLI (cli_markdown_import.WatchSession, write_if_changed, views.file_watcher).
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from cli_markdown_import import MarkdownMCDCLI, WatchSession, write_if_changed
+from views.file_watcher import PollingWatcher, make_watcher, stat_snapshot
+
+BOUTIQUE = """## Client
+- nom (varchar(50)) NOT NULL
+
+## Commande
+- montant (decimal(10,2))
+
+### Client et Commande : Passer
+Client : 0,n
+Commande : 1,1
+"""
+
+CATALOGUE = """## Produit
+- libelle (varchar(80))
+"""
+
+
+def _edit(path, content):
+    """Réécrit path avec un mtime forcé différent (résolution du système de fichiers)."""
+    before = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.utime(path, ns=(before + 10 ** 9, before + 10 ** 9))
+
+
+def _mtimes(directory):
+    return {name: os.stat(os.path.join(directory, name)).st_mtime_ns for name in os.listdir(directory)}
+
+
+@pytest.fixture
+def specs(tmp_path):
+    directory = tmp_path / "specs"
+    directory.mkdir()
+    _edit(str(directory / "boutique.md"), BOUTIQUE)
+    _edit(str(directory / "catalogue.md"), CATALOGUE)
+    return directory
+
+
+def test_write_if_changed_compares_content(tmp_path):
+    """Contenu identique à celui du disque : pas de réécriture, même après redémarrage (empreintes vides)."""
+    path = str(tmp_path / "schema.sql")
+    written = {}
+    assert write_if_changed(path, "CREATE TABLE t;", written)
+    assert not write_if_changed(path, "CREATE TABLE t;", written)
+    assert not write_if_changed(path, "CREATE TABLE t;", {})
+    assert write_if_changed(path, "CREATE TABLE u;", written)
+    assert open(path, encoding="utf-8").read() == "CREATE TABLE u;"
+    assert os.listdir(str(tmp_path)) == ["schema.sql"]
+
+
+def test_only_changed_file_outputs_are_rewritten(specs, tmp_path):
+    """Lot surveillé : seul le fichier modifié est re-parsé, seules ses sorties et le MCD fusionné sont réécrits."""
+    output = str(tmp_path / "out")
+    session = WatchSession(MarkdownMCDCLI(), [str(specs)], output, batch=True)
+    first = session.refresh()
+    assert len(first["recompiled"]) == 2 and len(first["written"]) == 11
+    assert session.refresh()["changed"] == []
+    before = _mtimes(output)
+
+    _edit(str(specs / "catalogue.md"), CATALOGUE + "- prix (decimal(10,2))\n")
+    report = session.refresh()
+    assert report["reparsed"] == [str(specs / "catalogue.md")]
+    assert sorted(os.path.basename(p) for p in report["written"]) == [
+        "catalogue.sql", "catalogue_mcd.json", "catalogue_mld.json", "catalogue_mpd.json", "catalogue_report.txt",
+        "merged_mcd.json",
+    ]
+    after = _mtimes(output)
+    assert all(after[name] == before[name] for name in before if name.startswith("boutique"))
+    assert "prix" in open(os.path.join(output, "catalogue.sql"), encoding="utf-8").read()
+
+
+def test_unchanged_mcd_reuses_models(specs, tmp_path):
+    """Fichier touché sans changement, ou changement sans effet sur le MCD : rien n'est recompilé ni réécrit."""
+    session = WatchSession(MarkdownMCDCLI(), [str(specs / "boutique.md")], str(tmp_path / "out"))
+    session.refresh()
+    _edit(str(specs / "boutique.md"), BOUTIQUE)
+    report = session.refresh()
+    assert report["changed"] and not report["reparsed"]
+    _edit(str(specs / "boutique.md"), "# Boutique en ligne\n\n" + BOUTIQUE)
+    report = session.refresh()
+    assert report["reparsed"] and not report["recompiled"] and not report["written"]
+
+
+def test_compile_models_matches_dict_pipeline():
+    """MLD / MPD construits une fois : mêmes dicts que _convert_to_mld / generate_mpd, même SQL que depuis le dict."""
+    cli = MarkdownMCDCLI()
+    mcd = cli.parse_markdown_to_mcd(BOUTIQUE)
+    models = cli.compile_models(mcd, "postgresql")
+    mld = cli.converter._convert_to_mld(mcd)
+    assert models["mld"] == mld
+    assert models["mpd"] == cli.converter.generate_mpd(mld, "postgresql")
+    assert cli.converter.generate_sql_from_mpd(models["mpd_ir"]) == cli.converter.generate_sql_from_mpd(models["mpd"])
+
+
+def test_added_and_removed_files(specs, tmp_path):
+    """Fichier ajouté : compilé ; fichier supprimé : retiré du MCD fusionné, ses sorties conservées."""
+    output = str(tmp_path / "out")
+    session = WatchSession(MarkdownMCDCLI(), [str(specs)], output, batch=True)
+    session.refresh()
+    _edit(str(specs / "stock.md"), "## Entrepot\n- ville (varchar(40))\n")
+    assert os.path.basename(session.refresh()["recompiled"][0]) == "stock.md"
+    os.remove(str(specs / "catalogue.md"))
+    report = session.refresh()
+    assert report["removed"] == [str(specs / "catalogue.md")]
+    merged = open(os.path.join(output, "merged_mcd.json"), encoding="utf-8").read()
+    assert "Entrepot" in merged and "Produit" not in merged
+    assert os.path.exists(os.path.join(output, "catalogue.sql"))
+
+
+def test_parse_error_keeps_previous_outputs(specs, tmp_path):
+    """Erreur de conversion : signalée, sorties précédentes conservées, nouvelle tentative à la prochaine édition."""
+    output = str(tmp_path / "out")
+    session = WatchSession(MarkdownMCDCLI(), [str(specs / "catalogue.md")], output)
+    session.refresh()
+    with open(str(specs / "catalogue.md"), "wb") as f:
+        f.write(b"## Produit\n- libell\xe9 (varchar)\n")
+    os.utime(str(specs / "catalogue.md"), ns=(1, 1))
+    report = session.refresh()
+    assert "UnicodeDecodeError" in report["errors"][str(specs / "catalogue.md")]
+    assert "libelle" in open(os.path.join(output, "catalogue.sql"), encoding="utf-8").read()
+    _edit(str(specs / "catalogue.md"), CATALOGUE)
+    assert session.refresh()["errors"] == {}
+
+
+def test_watcher_fallback_and_snapshot(specs):
+    """Sans inotify_simple : repli sur la scrutation ; stat_snapshot ignore les fichiers absents."""
+    watcher = make_watcher([str(specs)], interval=0.01)
+    assert watcher.kind in ("inotify", "polling")
+    watcher.close()
+    assert PollingWatcher(0.01).kind == "polling"
+    snapshot = stat_snapshot([str(specs / "boutique.md"), str(specs / "absent.md")])
+    assert list(snapshot) == [str(specs / "boutique.md")]
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du cache de compilation (api.services.compile_cache) et de son usage par mcd_service.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from api.services.compile_cache import CompileCache, mcd_digest
+from api.services import mcd_service
+
+
+def _canvas(x=100.0):
+    return {
+        "entities": [
+            {"name": "Client", "position": {"x": x, "y": 0.0}, "attributes": [{"name": "nom", "type": "VARCHAR(50)"}]},
+            {"name": "Commande", "position": {"x": 300.0, "y": 0.0}, "attributes": [{"name": "date", "type": "DATE"}]},
+        ],
+        "associations": [{"name": "Passe", "attributes": []}],
+        "association_links": [
+            {"association": "Passe", "entity": "Client", "card_entity": "1,1"},
+            {"association": "Passe", "entity": "Commande", "card_entity": "0,n"},
+        ],
+    }
+
+
+def test_lru_eviction_and_counters():
+    """Au-delà de max_entries, l'entrée la moins récemment utilisée est évincée."""
+    cache = CompileCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "a" devient la plus récente
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3 and stats["misses"] == 1
+
+
+def test_digest_ignores_key_order():
+    """L'empreinte est canonique : l'ordre des clés ne compte pas."""
+    assert mcd_digest({"a": 1, "b": [1, 2]}) == mcd_digest({"b": [1, 2], "a": 1})
+    assert mcd_digest({"a": 1}) != mcd_digest({"a": 2})
+
+
+def test_digest_keeps_entity_order():
+    """L'ordre des entités fixe celui des tables générées : il fait partie de l'empreinte."""
+    client = {"name": "Client", "attributes": []}
+    produit = {"name": "Produit", "attributes": []}
+    first = {"entities": {"Client": client, "Produit": produit}, "associations": [], "inheritance": {}}
+    second = {"entities": {"Produit": produit, "Client": client}, "associations": [], "inheritance": {}}
+    assert mcd_digest(first) != mcd_digest(second)
+
+
+def test_mcd_service_reuses_compiled_mld():
+    """Même MCD (positions différentes) → même MLD servi depuis le cache."""
+    mcd_service.clear_compile_cache()
+    first = mcd_service.mcd_to_mld(_canvas(100.0))
+    second = mcd_service.mcd_to_mld(_canvas(250.0))
+    assert second is first
+    stats = mcd_service.compile_cache_stats()
+    assert stats["hits"] >= 1
+
+
+def test_mcd_service_sql_keyed_by_dbms():
+    """Le SQL est mis en cache par SGBD."""
+    mcd_service.clear_compile_cache()
+    mysql = mcd_service.mcd_to_sql(_canvas(), dbms="mysql")
+    pg = mcd_service.mcd_to_sql(_canvas(), dbms="postgresql")
+    assert "ENGINE=InnoDB" in mysql["sql"]
+    assert "ENGINE=InnoDB" not in pg["sql"]
+    assert mcd_service.mcd_to_sql(_canvas(), dbms="mysql") is mysql
+
+
+def test_compile_mcd_all_dialects_matches_single_routes():
+    """/compile produit les mêmes artefacts que les routes unitaires, pour chaque SGBD."""
+    mcd_service.clear_compile_cache()
+    result = mcd_service.compile_mcd(_canvas())
+    assert set(result["dialects"]) == set(mcd_service.SUPPORTED_DBMS)
+    assert result["mld"] == mcd_service.mcd_to_mld(_canvas())
+    assert result["mld_text"] == mcd_service.mcd_to_mld_text(_canvas())
+    for dbms, artifacts in result["dialects"].items():
+        assert artifacts["sql"] == mcd_service.mcd_to_sql(_canvas(), dbms=dbms)["sql"]
+        assert artifacts["mpd"] == mcd_service.mcd_to_mpd(_canvas(), dbms=dbms)
+
+
+def test_compile_mcd_rejects_unknown_dialect():
+    with pytest.raises(ValueError):
+        mcd_service.compile_mcd(_canvas(), dialects=["oracle"])
+
+
+def test_prepared_variants_normalize_once(monkeypatch):
+    """Variantes prepared_* (routes /to-mld, /to-mld-text, /to-mpd, /to-sql/stream, /compile) : pas de seconde normalisation."""
+    mcd_service.clear_compile_cache()
+    expected = mcd_service.compile_mcd(_canvas(), dialects=["postgresql"])
+    stream = "".join(mcd_service.mcd_to_sql_stream(_canvas(), "postgresql", use_original=True))
+    mcd_service.clear_compile_cache()
+    calls = []
+    normalize = mcd_service._canvas_mcd_to_converter_format
+    monkeypatch.setattr(mcd_service, "_canvas_mcd_to_converter_format", lambda c: calls.append(1) or normalize(c))
+    prepared, digest = mcd_service.prepare_mcd(_canvas())
+    assert mcd_service.digest_etag(digest, "mld") == mcd_service.artifact_etag(_canvas(), "mld")
+    calls.clear()
+    assert mcd_service.prepared_mcd_to_mld(prepared, digest) == expected["mld"]
+    assert mcd_service.prepared_mcd_to_mld_text(prepared, digest) == expected["mld_text"]
+    assert mcd_service.prepared_mcd_to_mpd(prepared, digest, "postgresql") == expected["dialects"]["postgresql"]["mpd"]
+    assert "".join(mcd_service.prepared_mcd_to_sql_stream(prepared, digest, "postgresql", use_original=True)) == stream
+    assert mcd_service.prepared_compile_mcd(prepared, digest, ["postgresql"]) == expected
+    with pytest.raises(ValueError):
+        mcd_service.prepared_compile_mcd(prepared, digest, ["oracle"])
+    assert calls == []
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Tests des sessions de compilation incrémentale (api.services.compile_session, api.services.json_patch).
+Après chaque delta, le résultat doit être identique à une compilation complète du MCD.
+"""
+
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from api.services import mcd_service
+from api.services.compile_session import CompileSession, SessionStore, SessionNotFoundError, SessionVersionConflict
+from api.services.json_patch import apply_json_patch
+from views import model_ir
+from views.model_converter import ModelConverter
+
+
+def _canvas():
+    return {
+        "entities": [
+            {"name": "Client", "attributes": [
+                {"name": "id", "type": "INTEGER", "is_primary_key": True},
+                {"name": "nom", "type": "VARCHAR(50)", "is_unique": True},
+            ]},
+            {"name": "Commande", "attributes": [{"name": "date", "type": "DATE"}]},
+            {"name": "Produit", "attributes": [{"name": "libelle", "type": "TEXT"}]},
+        ],
+        "associations": [{"name": "Passe", "attributes": []}, {"name": "Contient", "attributes": []}],
+        "association_links": [
+            {"association": "Passe", "entity": "Client", "card_entity": "0,n"},
+            {"association": "Passe", "entity": "Commande", "card_entity": "1,1"},
+            {"association": "Contient", "entity": "Commande", "card_entity": "1,n"},
+            {"association": "Contient", "entity": "Produit", "card_entity": "0,n"},
+        ],
+    }
+
+
+def _assert_matches_full_compile(session):
+    expected = mcd_service.mcd_to_sql(session.canvas, session.dbms)
+    assert session.sql() == expected["sql"]
+    assert session.sql(use_original=True) == expected["sql_original"]
+    assert session.mld.to_dict() == mcd_service.mcd_to_mld(session.canvas)
+    assert session.mpd() == mcd_service.mcd_to_mpd(session.canvas, session.dbms)
+
+
+@pytest.mark.parametrize("dbms", ["mysql", "postgresql", "sqlite", "sqlserver"])
+def test_initial_compile_matches_full_compile(dbms):
+    """À l'ouverture, la session produit exactement le SQL de mcd_to_sql."""
+    _assert_matches_full_compile(CompileSession("s", _canvas(), dbms=dbms))
+
+
+def test_add_attribute_only_touches_one_table():
+    """Ajouter un attribut ne régénère que la table de l'entité concernée."""
+    session = CompileSession("s", _canvas())
+    delta = session.apply_patch([
+        {"op": "add", "path": "/entities/2/attributes/-", "value": {"name": "prix", "type": "DECIMAL(10,2)"}},
+    ])
+    assert delta["version"] == 1
+    assert list(delta["tables"]["upserted"]) == ["produit"]
+    assert list(delta["sql"]["tables"]) == ["produit"]
+    assert delta["foreign_keys"] == {"added": [], "removed": []}
+    _assert_matches_full_compile(session)
+
+
+def test_rename_entity_and_change_cardinality():
+    """Renommage d'entité et changement de cardinalité : delta cohérent avec une compilation complète."""
+    session = CompileSession("s", _canvas(), dbms="postgresql")
+    delta = session.apply_patch([
+        {"op": "replace", "path": "/entities/0/name", "value": "Acheteur"},
+        {"op": "replace", "path": "/association_links/0/entity", "value": "Acheteur"},
+    ])
+    assert "client" in delta["tables"]["removed"]
+    assert "acheteur" in delta["tables"]["upserted"]
+    _assert_matches_full_compile(session)
+
+    session.apply_patch([{"op": "replace", "path": "/association_links/1/card_entity", "value": "0,n"}])
+    _assert_matches_full_compile(session)
+
+
+def test_remove_entity():
+    """Supprimer une entité retire sa table et ses clés étrangères."""
+    session = CompileSession("s", _canvas())
+    delta = session.apply_patch([{"op": "remove", "path": "/entities/2"}])
+    assert "produit" in delta["tables"]["removed"]
+    assert delta["foreign_keys"]["removed"]
+    _assert_matches_full_compile(session)
+
+
+def test_invalid_patch_is_rolled_back():
+    """Un patch invalide (ou un test échoué) laisse la session inchangée."""
+    session = CompileSession("s", _canvas())
+    sql_before = session.sql()
+    with pytest.raises(ValueError):
+        session.apply_patch([
+            {"op": "replace", "path": "/entities/0/name", "value": "X"},
+            {"op": "test", "path": "/entities/1/name", "value": "Autre"},
+        ])
+    assert session.canvas["entities"][0]["name"] == "Client"
+    assert session.version == 0
+    assert session.sql() == sql_before
+
+
+def test_version_conflict_and_store():
+    """base_version obsolète → conflit ; session supprimée → introuvable."""
+    store = SessionStore(max_sessions=2)
+    session = store.create(_canvas())
+    session.apply_patch([{"op": "replace", "path": "/entities/1/name", "value": "Achat"}], base_version=0)
+    with pytest.raises(SessionVersionConflict):
+        session.apply_patch([], base_version=0)
+    assert store.get(session.session_id) is session
+    store.delete(session.session_id)
+    with pytest.raises(SessionNotFoundError):
+        store.get(session.session_id)
+
+
+def test_json_patch_pointer_escaping():
+    """Les segments ~1 et ~0 sont décodés selon RFC 6901."""
+    doc = {"entities": [], "meta": {"a/b": 1}}
+    apply_json_patch(doc, [{"op": "replace", "path": "/meta/a~1b", "value": 2}])
+    assert doc["meta"]["a/b"] == 2
+
+
+def _large_canvas(n):
+    """n entités en chaîne (1,1 / 0,n, une association n,n sur trois), une contrainte d'unicité par entité."""
+    canvas = {"entities": [], "associations": [], "association_links": [], "inheritance_links": []}
+    for i in range(n):
+        canvas["entities"].append({"name": f"Entite{i}", "attributes": [
+            {"name": "id", "type": "INTEGER", "is_primary_key": True},
+            {"name": "code", "type": "VARCHAR(20)", "is_unique": True},
+            {"name": "libelle", "type": "VARCHAR(80)"},
+        ]})
+        if i:
+            canvas["associations"].append({"name": f"Lien{i}", "attributes": []})
+            canvas["association_links"] += [
+                {"association": f"Lien{i}", "entity": f"Entite{i}", "card_entity": "1,n" if i % 3 == 0 else "1,1"},
+                {"association": f"Lien{i}", "entity": f"Entite{i - 1}", "card_entity": "0,n"},
+            ]
+    return canvas
+
+
+def _count_calls(monkeypatch, counts, owner, name):
+    original = getattr(owner, name)
+
+    def counted(*args, **kwargs):
+        counts[name] = counts.get(name, 0) + 1
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(owner, name, counted)
+
+
+@pytest.mark.parametrize("patch", [
+    [{"op": "replace", "path": "/entities/{i}/attributes/2/name", "value": "intitule"}],
+    [{"op": "replace", "path": "/entities/{i}/attributes/1/name", "value": "reference"}],
+    [{"op": "add", "path": "/entities/{i}/attributes/-", "value": {"name": "prix", "type": "DECIMAL(10,2)"}}],
+])
+def test_entity_edit_cost_does_not_grow_with_model_size(monkeypatch, patch):
+    """Modifier une entité : même nombre de conversions, comparaisons et hachages à 40 et à 640 entités."""
+    costs = []
+    for n in (40, 640):
+        session = CompileSession("s", _large_canvas(n))
+        counts = {}
+        for name in ("__eq__", "key"):
+            _count_calls(monkeypatch, counts, model_ir._Record, name)
+        for record in (model_ir.Column, model_ir.Index, model_ir.ForeignKey, model_ir.Constraint, model_ir.Table):
+            _count_calls(monkeypatch, counts, record, "copy")
+        for name in ("_entity_to_table", "_mpd_table", "_foreign_key_sql", "_unique_constraint_sql"):
+            _count_calls(monkeypatch, counts, ModelConverter, name)
+        operations = [dict(op, path=op["path"].format(i=n // 2)) for op in patch]
+        delta = session.apply_patch(operations)
+        monkeypatch.undo()
+        assert list(delta["tables"]["upserted"]) == [f"entite{n // 2}"]
+        costs.append(counts)
+        _assert_matches_full_compile(session)
+    assert costs[0] == costs[1]
+
+
+def test_structural_edit_regenerates_only_reached_tables(monkeypatch):
+    """Changer une cardinalité : seules les tables atteintes repassent par le MPD, quelle que soit la taille."""
+    calls = []
+    for n in (40, 640):
+        session = CompileSession("s", _large_canvas(n))
+        counts = {}
+        _count_calls(monkeypatch, counts, ModelConverter, "_mpd_table")
+        delta = session.apply_patch([{"op": "replace", "path": f"/association_links/{n - 1}/card_entity", "value": "1,n"}])
+        monkeypatch.undo()
+        calls.append(counts["_mpd_table"])
+        assert len(delta["tables"]["upserted"]) == counts["_mpd_table"]
+        _assert_matches_full_compile(session)
+    assert calls[0] == calls[1] <= 2
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_patches_match_full_compile(seed):
+    """Suite aléatoire de deltas (attributs, unicité, renommages, cardinalités, héritage) : identique à mcd_to_sql."""
+    rnd = random.Random(seed)
+    session = CompileSession("s", _large_canvas(12), dbms=rnd.choice(["mysql", "postgresql", "sqlite", "sqlserver"]))
+    for step in range(40):
+        entities = session.canvas["entities"]
+        i = rnd.randrange(len(entities))
+        kind = rnd.randrange(7)
+        if kind == 0:
+            patch = [{"op": "replace", "path": f"/entities/{i}/attributes/2/name", "value": f"nom{step}"}]
+        elif kind == 1:
+            patch = [{"op": "add", "path": f"/entities/{i}/attributes/2/is_unique", "value": rnd.random() < 0.5}]
+        elif kind == 2:
+            patch = [{"op": "add", "path": f"/entities/{i}/attributes/-",
+                      "value": {"name": rnd.choice(["date", "code", "prix"]), "type": "DATE", "is_unique": True}}]
+        elif kind == 3:
+            old, new = entities[i]["name"], rnd.choice(["Entite0", "Client", f"E{step}"])
+            patch = [{"op": "replace", "path": f"/entities/{i}/name", "value": new}]
+            patch += [{"op": "replace", "path": f"/association_links/{j}/entity", "value": new}
+                      for j, link in enumerate(session.canvas["association_links"]) if link["entity"] == old]
+        elif kind == 4 and session.canvas["association_links"]:
+            j = rnd.randrange(len(session.canvas["association_links"]))
+            patch = [{"op": "replace", "path": f"/association_links/{j}/card_entity",
+                      "value": rnd.choice(["0,1", "1,1", "0,n", "1,n"])}]
+        elif kind == 5:
+            child, parent = rnd.sample([e["name"] for e in entities], 2)
+            patch = [{"op": "add", "path": "/inheritance_links/-", "value": {"child": child, "parent": parent}}]
+        else:
+            patch = [{"op": "add", "path": f"/entities/{i}/is_fictive", "value": rnd.random() < 0.3}]
+        session.apply_patch(patch)
+        _assert_matches_full_compile(session)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la compression des réponses (api.compression) et des ETags d'artefacts compilés.
+"""
+
+import sys
+import os
+import asyncio
+import gzip
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.compression import CompressionMiddleware, etag_matches
+from api.services import mcd_service
+
+
+def _call(app, accept_encoding=b"gzip", if_none_match=None):
+    """Exécute le middleware ASGI sur une requête GET et retourne (start, corps concaténé)."""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    headers = [(b"accept-encoding", accept_encoding)]
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match))
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": headers}
+    asyncio.new_event_loop().run_until_complete(CompressionMiddleware(app, minimum_size=100)(scope, receive, send))
+    start = sent[0]
+    return start, b"".join(m.get("body", b"") for m in sent[1:])
+
+
+def _app(chunks, etag=b'"sql-mysql-abc"', status=200):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"), (b"etag", etag)]})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+    return app
+
+
+def test_large_response_is_gzipped_with_suffixed_etag():
+    """Au-delà du seuil : corps gzip, Vary et ETag propre à la représentation compressée."""
+    body = b"CREATE TABLE client (id INTEGER);\n" * 50
+    start, payload = _call(_app([body]))
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"etag"] == b'"sql-mysql-abc-gzip"'
+    assert b"Accept-Encoding" in headers[b"vary"]
+    assert int(headers[b"content-length"]) == len(payload)
+    assert gzip.decompress(payload) == body
+
+
+def test_small_or_unaccepted_response_untouched():
+    """Sous le seuil, ou sans Accept-Encoding compatible : réponse inchangée."""
+    start, payload = _call(_app([b"{}"]))
+    assert b"content-encoding" not in dict(start["headers"])
+    assert payload == b"{}"
+    start, payload = _call(_app([b"x" * 500]), accept_encoding=b"identity")
+    assert payload == b"x" * 500
+
+
+def test_vary_on_every_negotiable_response():
+    """Vary: Accept-Encoding aussi sur les réponses non compressées (petites, identity, 304)."""
+    for app, accept in ((_app([b"{}"]), b"gzip"), (_app([b"x" * 500]), b"identity"),
+                        (_app([b"x" * 500]), b""), (_app([b""], status=304), b"gzip")):
+        start, _ = _call(app, accept_encoding=accept)
+        assert dict(start["headers"])[b"vary"] == b"Accept-Encoding"
+
+
+def test_not_modified_keeps_representation_etag():
+    """304 : même ETag suffixé que le 200 compressé ; ETag nu si le client détient la version non compressée."""
+    not_modified = _app([b""], status=304)
+    for held in (b'"sql-mysql-abc-gzip"', b"*"):
+        start, _ = _call(not_modified, if_none_match=held)
+        assert dict(start["headers"])[b"etag"] == b'"sql-mysql-abc-gzip"'
+    start, _ = _call(not_modified, if_none_match=b'"sql-mysql-abc"')
+    assert dict(start["headers"])[b"etag"] == b'"sql-mysql-abc"'
+    start, _ = _call(not_modified, accept_encoding=b"identity", if_none_match=b'"sql-mysql-abc"')
+    assert dict(start["headers"])[b"etag"] == b'"sql-mysql-abc"'
+
+
+def test_streaming_response_is_compressed_incrementally():
+    """Réponse en flux : compressée morceau par morceau, sans Content-Length."""
+    chunks = [b"INSERT INTO t VALUES (%d);\n" % i for i in range(200)]
+    start, payload = _call(_app(chunks))
+    headers = dict(start["headers"])
+    assert b"content-length" not in headers
+    assert gzip.decompress(payload) == b"".join(chunks)
+
+
+def test_etag_matching_and_artifact_etag():
+    """L'ETag dépend du MCD normalisé et du SGBD ; If-None-Match accepte les variantes compressées."""
+    canvas = {"entities": [{"name": "Client", "position": {"x": 1}, "attributes": [{"name": "nom", "type": "TEXT"}]}]}
+    moved = {"entities": [{"name": "Client", "position": {"x": 9}, "attributes": [{"name": "nom", "type": "TEXT"}]}]}
+    etag = mcd_service.artifact_etag(canvas, "sql", "mysql")
+    assert etag == mcd_service.artifact_etag(moved, "sql", "mysql")
+    assert etag != mcd_service.artifact_etag(canvas, "sql", "postgresql")
+    assert etag_matches(etag, etag)
+    assert etag_matches('W/"x", ' + etag[:-1] + '-gzip"', etag)
+    assert not etag_matches('"autre"', etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du générateur de données de test (views.data_generator, mcd_service.synthetic_data_stream).
+"""
+
+import csv
+import io
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from api.services import mcd_service
+from views import data_generator
+from views.data_generator import DataGenerator
+from views.model_converter import ModelConverter
+
+
+def _mcd():
+    return {
+        "entities": {
+            "client": {"name": "client", "attributes": [
+                {"name": "id", "type": "integer", "primary_key": True, "auto_increment": True},
+                {"name": "email", "type": "varchar", "is_unique": True},
+                {"name": "solde", "type": "decimal"},
+            ]},
+            "commande": {"name": "commande", "attributes": [
+                {"name": "id", "type": "integer", "primary_key": True},
+                {"name": "passee_le", "type": "datetime"},
+            ]},
+            "produit": {"name": "produit", "attributes": [
+                {"name": "code", "type": "varchar"},
+            ]},
+        },
+        "associations": [
+            {"name": "passe", "entity1": "client", "entity2": "commande", "cardinality1": "1,1", "cardinality2": "0,n"},
+            {"name": "contient", "entity1": "commande", "entity2": "produit", "cardinality1": "0,n", "cardinality2": "1,n"},
+        ],
+        "inheritance": {},
+    }
+
+
+def _generator(dbms="postgresql", rows=None, fanout=None):
+    converter = ModelConverter()
+    mpd = converter.build_mpd(converter.build_mld(_mcd()), dbms)
+    return DataGenerator(mpd, _mcd(), rows or {"client": 50, "commande": 400, "produit": 30}, fanout or {"contient": 4})
+
+
+def _table(generator, name):
+    return [row for batch in generator.iter_batches(name) for row in batch]
+
+
+def test_foreign_key_order_and_row_counts():
+    """Tables référencées d'abord ; table de liaison = commandes x fan-out."""
+    generator = _generator()
+    order = generator.order
+    assert order.index("client") < order.index("commande") < order.index("contient")
+    assert order.index("produit") < order.index("contient")
+    assert {t["table"]: t["rows"] for t in generator.plan()} == {
+        "client": 50, "produit": 30, "commande": 400, "contient": 1600,
+    }
+
+
+def test_keys_unique_and_referential_integrity(monkeypatch):
+    """Clés primaires et d'unicité distinctes, clés étrangères présentes chez le parent, sur plusieurs lots."""
+    monkeypatch.setattr(data_generator, "BATCH_ROWS", 64)
+    generator = _generator()
+    clients = _table(generator, "client")
+    commandes = _table(generator, "commande")
+    contient = _table(generator, "contient")
+    assert len({r[0] for r in clients}) == len(clients) == 50
+    assert len({r[1] for r in clients}) == 50
+    client_ids = {r[0] for r in clients}
+    columns = generator.columns("commande")
+    fk = columns.index("client_id")
+    assert all(r[fk] is None or r[fk] in client_ids for r in commandes)
+    assert len(set(contient)) == len(contient)
+    assert {r[1] for r in contient} == {r[0] for r in _table(generator, "produit")}
+    assert {r[0] for r in contient} <= {r[0] for r in commandes}
+
+
+def _build(mcd, rows, dbms="postgresql"):
+    converter = ModelConverter()
+    return DataGenerator(converter.build_mpd(converter.build_mld(mcd), dbms), mcd, rows)
+
+
+def test_reflexive_association_without_pairs():
+    """Association n,n réflexive : clé sur une seule colonne, pas de couples, valeurs distinctes."""
+    mcd = {
+        "entities": {"employe": {"name": "employe", "attributes": [
+            {"name": "id", "type": "integer", "primary_key": True}, {"name": "nom", "type": "varchar"},
+        ]}},
+        "associations": [{"name": "encadre", "entity1": "Employe", "entity2": "Employe",
+                          "cardinality1": "0,n", "cardinality2": "0,n"}],
+        "inheritance": {},
+    }
+    generator = _build(mcd, {"employe": 10, "encadre": 30})
+    assert any("réflexive" in note for note in generator.notes)
+    assert {t["table"]: t["rows"] for t in generator.plan()}["encadre"] == 10
+    rows = _table(generator, "encadre")
+    assert len({r[0] for r in rows}) == len(rows) == 10
+    assert "-- encadre : 10 lignes" in "".join(generator.iter_sql())
+
+
+def test_unique_foreign_key_capped_at_parent_rows():
+    """Héritage : uk_<enfant>_parent unique sur la clé étrangère, enfant ramené au nombre de parents."""
+    mcd = {
+        "entities": {
+            "personne": {"name": "personne", "attributes": [{"name": "id", "type": "integer", "primary_key": True}]},
+            "salarie": {"name": "salarie", "attributes": [
+                {"name": "id", "type": "integer", "primary_key": True}, {"name": "salaire", "type": "decimal"},
+            ]},
+        },
+        "associations": [],
+        "inheritance": {"salarie": "personne"},
+    }
+    generator = _build(mcd, {"personne": 20, "salarie": 50})
+    assert {t["table"]: t["rows"] for t in generator.plan()}["salarie"] == 20
+    fk = generator.columns("salarie").index("personne_id")
+    rows = _table(generator, "salarie")
+    assert len({r[fk] for r in rows}) == len(rows) == 20
+
+
+def test_generation_is_deterministic():
+    """Même graine : mêmes données, quel que soit le découpage en lots."""
+    assert _table(_generator(), "commande") == _table(_generator(), "commande")
+
+
+def test_copy_and_insert_formats():
+    """COPY (PostgreSQL) en CSV terminé par \\. ; INSERT SQL Server encadré par IDENTITY_INSERT."""
+    out = io.StringIO()
+    _generator(rows={"client": 3, "commande": 5, "produit": 2}).write_sql(out, "copy")
+    text = out.getvalue()
+    assert "COPY client (id, email, solde) FROM STDIN WITH (FORMAT csv);\n1,email_1," in text
+    assert text.count("\\.\n") == 4
+    assert "SELECT setval(pg_get_serial_sequence('client', 'id'), 3);" in text
+    sql = "".join(_generator("sqlserver", rows={"client": 3, "commande": 5, "produit": 2}).iter_sql("insert"))
+    assert "SET IDENTITY_INSERT client ON;\nINSERT INTO client (id, email, solde) VALUES\n(1, 'email_1', '" in sql
+    with pytest.raises(ValueError):
+        _generator("mysql").iter_sql("copy")
+
+
+def test_csv_directory_and_load_script(tmp_path):
+    """Un CSV par table (en-tête, NULL = \\N pour MySQL) et LOAD DATA dans l'ordre des clés étrangères."""
+    generator = _generator("mysql", rows={"client": 10, "commande": 200, "produit": 5})
+    paths = generator.write_csv(str(tmp_path))
+    assert list(paths) == generator.order
+    with open(paths["commande"], encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == generator.columns("commande") and len(rows) == 201
+    script = (tmp_path / "load.sql").read_text(encoding="utf-8").splitlines()
+    assert script[0].startswith("LOAD DATA LOCAL INFILE 'client.csv' INTO TABLE client")
+
+
+def test_service_stream_uses_canvas_fanout():
+    """mcd_service.synthetic_data_stream : fan-out porté par l'association du canvas."""
+    canvas = {
+        "entities": [
+            {"name": "A", "estimated_rows": 4, "attributes": [{"name": "id", "type": "INTEGER", "is_primary_key": True}]},
+            {"name": "B", "estimated_rows": 3, "attributes": [{"name": "id", "type": "INTEGER", "is_primary_key": True}]},
+        ],
+        "associations": [{"name": "lie", "entities": ["A", "B"], "cardinalities": {"A": "0,n", "B": "0,n"}, "fanout": 2}],
+    }
+    text = "".join(mcd_service.synthetic_data_stream(canvas, "sqlite"))
+    assert "-- lie : 8 lignes" in text
+    with pytest.raises(ValueError):
+        mcd_service.synthetic_data_stream(canvas, "sqlite", fmt="xml")
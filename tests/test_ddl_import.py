@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la rétro-conception SQL → MCD : lecture en flux des scripts (views.ddl_scanner)
+et remontée du schéma au format canvas (api.services.ddl_import).
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from api.services.ddl_import import DdlImport, import_sql_ddl
+from views.ddl_scanner import DdlStatementSplitter, iter_ddl_statements, parse_column, scan_ddl
+
+MYSQL_DUMP = """-- MySQL dump 10.13
+/*!40101 SET @OLD_CHARACTER_SET_CLIENT=@@CHARACTER_SET_CLIENT */;
+DROP TABLE IF EXISTS `client`;
+CREATE TABLE `client` (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
+  `nom` varchar(100) NOT NULL DEFAULT 'a;b',
+  `key` varchar(10) DEFAULT NULL COMMENT 'clé ; test',
+  `email` varchar(255) DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uk_email` (`email`),
+  KEY `idx_nom` (`nom`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+INSERT INTO `client` VALUES (1,'x;y','it\\'s',NULL),(2,'CREATE TABLE fake (id int);','',NULL);
+CREATE TABLE `commande` (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
+  `client_id` int(11) NOT NULL,
+  `total` decimal(10,2) DEFAULT '0.00',
+  PRIMARY KEY (`id`),
+  CONSTRAINT `fk_commande_client` FOREIGN KEY (`client_id`) REFERENCES `client` (`id`) ON DELETE CASCADE
+);
+CREATE TABLE `produit` (`id` int NOT NULL, `prix` decimal(8,2), PRIMARY KEY (`id`));
+CREATE TABLE `contient` (
+  `commande_id` int NOT NULL, `produit_id` int NOT NULL, `quantite` int,
+  PRIMARY KEY (`commande_id`,`produit_id`),
+  FOREIGN KEY (`commande_id`) REFERENCES `commande` (`id`),
+  FOREIGN KEY (`produit_id`) REFERENCES `produit` (`id`)
+);
+CREATE TABLE `client_pro` (`id` int NOT NULL PRIMARY KEY REFERENCES client(id), `siret` char(14));
+"""
+
+PG_DUMP = """--
+-- PostgreSQL database dump
+SET statement_timeout = 0;
+CREATE FUNCTION public.f() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+  CREATE TABLE inside_fn (id int);
+  RETURN NEW;
+END;
+$$;
+CREATE TABLE public.auteur (
+    id integer NOT NULL,
+    nom character varying(80) NOT NULL,
+    cree timestamp with time zone DEFAULT now()
+);
+CREATE TABLE public.livre (
+    id bigint NOT NULL,
+    auteur_id integer,
+    titre text
+);
+COPY public.livre (id, auteur_id, titre) FROM stdin;
+1\t1\tL'ALTER TABLE ; d'un livre
+2\t\\N\tCREATE TABLE piege (id int);
+\\.
+ALTER TABLE ONLY public.auteur
+    ADD CONSTRAINT auteur_pkey PRIMARY KEY (id);
+ALTER TABLE ONLY public.livre
+    ADD CONSTRAINT livre_pkey PRIMARY KEY (id);
+ALTER TABLE ONLY public.livre
+    ADD CONSTRAINT livre_auteur_id_fkey FOREIGN KEY (auteur_id) REFERENCES public.auteur(id);
+ALTER TABLE public.livre OWNER TO admin;
+"""
+
+MSSQL_SCRIPT = """CREATE TABLE [dbo].[Pays] (
+  [Id] [int] IDENTITY(1,1) NOT NULL,
+  [Nom] [nvarchar](50) NULL,
+  CONSTRAINT [PK_Pays] PRIMARY KEY CLUSTERED ([Id] ASC) WITH (PAD_INDEX = OFF) ON [PRIMARY]
+) ON [PRIMARY]
+GO
+"""
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("script", [MYSQL_DUMP, PG_DUMP, MSSQL_SCRIPT])
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_chunked_feed_matches_whole_text(script, size):
+    """Le découpage en instructions ne dépend pas de la taille des morceaux lus."""
+    expected = list(iter_ddl_statements(script))
+    assert list(iter_ddl_statements(_chunks(script, size))) == expected
+
+
+def test_mysqldump_keeps_only_table_ddl():
+    """Les INSERT, SET, DROP et commentaires sont ignorés, même s'ils contiennent du DDL en littéral."""
+    schema, splitter = scan_ddl(MYSQL_DUMP)
+    assert set(schema.tables) == {"client", "commande", "produit", "contient", "client_pro"}
+    assert splitter.kept == 5
+    assert splitter.statements > splitter.kept
+    client = schema.tables["client"]
+    assert [c["name"] for c in client["columns"]] == ["id", "nom", "key", "email"]
+    assert client["primary_key"] == ["id"]
+    assert ["email"] in client["unique"]
+    assert client["columns"][0]["auto_increment"]
+
+
+def test_pg_dump_copy_data_and_alter_constraints():
+    """Les données COPY ... FROM stdin sont sautées ; les clés arrivent par ALTER TABLE."""
+    schema, _ = scan_ddl(PG_DUMP)
+    assert set(schema.tables) == {"auteur", "livre"}
+    assert schema.tables["livre"]["primary_key"] == ["id"]
+    assert schema.foreign_keys == [{
+        "table": "livre", "name": "livre_auteur_id_fkey", "columns": ["auteur_id"],
+        "referenced_table": "auteur", "referenced_columns": ["id"],
+    }]
+
+
+def test_sql_server_brackets_and_go():
+    """Identifiants entre crochets, séparateur GO, options physiques ignorées."""
+    schema, _ = scan_ddl(MSSQL_SCRIPT)
+    pays = schema.tables["pays"]
+    assert pays["name"] == "Pays"
+    assert pays["primary_key"] == ["Id"]
+    assert [c["type"] for c in pays["columns"]] == ["INT", "NVARCHAR(50)"]
+
+
+def test_parse_column_options():
+    """Type, nullabilité, défaut et référence en ligne."""
+    column = parse_column("`total` decimal(10,2) NOT NULL DEFAULT '0.00' REFERENCES caisse(id)")
+    assert column["name"] == "total"
+    assert column["type"] == "DECIMAL(10,2)"
+    assert column["nullable"] is False
+    assert column["default"] == "0.00"
+    assert column["references"] == ("caisse", ["id"])
+
+
+def test_schema_to_canvas_merise_rules():
+    """Table de liaison → association n,n ; FK = PK → héritage ; autre FK → association 1,1 / 0,n."""
+    canvas = import_sql_ddl(MYSQL_DUMP)["canvas"]
+    entities = {e["name"]: e for e in canvas["entities"]}
+    assert set(entities) == {"client", "commande", "produit", "client_pro"}
+    assert canvas["inheritance_links"] == [{"parent": "client", "child": "client_pro"}]
+    assert entities["client_pro"]["parent_entity"] == "client"
+    # Colonne de clé étrangère portée par l'association, pas par l'entité
+    assert "client_id" not in [a["name"] for a in entities["commande"]["attributes"]]
+
+    associations = {a["name"]: a for a in canvas["associations"]}
+    contient = associations["contient"]
+    assert set(contient["entities"]) == {"commande", "produit"}
+    assert set(contient["cardinalities"].values()) == {"0,n"}
+    assert [a["name"] for a in contient["attributes"]] == ["quantite"]
+    passe = associations["fk_commande_client"]
+    assert passe["cardinalities"] == {"commande": "1,1", "client": "0,n"}
+    assert len(canvas["association_links"]) == 4
+
+
+def test_incremental_import_stats():
+    """DdlImport.feed au fil de la lecture donne le même résultat qu'un import en une fois."""
+    importer = DdlImport()
+    for chunk in _chunks(PG_DUMP, 5):
+        importer.feed(chunk)
+    result = importer.result()
+    assert result == import_sql_ddl(PG_DUMP)
+    assert result["stats"]["tables"] == 2
+    assert result["stats"]["foreign_keys"] == 1
+    assert result["stats"]["associations"] == 1
+
+
+def test_splitter_close_flushes_unterminated_statement():
+    """Une dernière instruction sans point-virgule est rendue par close()."""
+    splitter = DdlStatementSplitter()
+    assert splitter.feed("CREATE TABLE t (id int)") == []
+    assert len(splitter.close()) == 1
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la validation incrémentale (api.services.incremental_validation).
+Après chaque patch, les erreurs doivent être celles d'une validation complète (mcd_service.validate_mcd).
+"""
+
+import sys
+import os
+import random
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from api.services import mcd_service
+from api.services.incremental_validation import IncrementalValidator
+from api.services.json_patch import apply_json_patch
+
+NAMES = ["Client", "Commande", "Produit", " Client ", ""]
+CARDS = ["0,1", "1,1", "0,n", "1,n", "2,n"]
+
+
+def _canvas():
+    return {
+        "entities": [
+            {"name": "Client", "attributes": [{"name": "id", "type": "INTEGER"}]},
+            {"name": "Commande", "attributes": [{"name": "date", "type": ""}]},
+            {"name": "Produit", "attributes": []},
+        ],
+        "associations": [
+            {"name": "Passe", "attributes": [{"name": "montant", "type": "DECIMAL"}]},
+            {"name": "Contient", "entities": ["Commande", "Produit"], "attributes": []},
+        ],
+        "association_links": [
+            {"association": "Passe", "entity": "Client", "card_entity": "0,n", "card_assoc": "1,1"},
+            {"association": "Passe", "entity": "Commande", "card_entity": "1,1", "card_assoc": "0,n"},
+            {"association": "Contient", "entity": "Commande", "card_entity": "1,n", "card_assoc": "1,n"},
+        ],
+        "inheritance_links": [{"child": "Client", "parent": "Produit"}],
+    }
+
+
+def _assert_matches_full(validator, mcd):
+    assert Counter(validator.errors()) == Counter(mcd_service.validate_mcd(mcd))
+
+
+def _random_operation(rng, mcd):
+    kind = rng.choice(["entities", "associations", "association_links", "inheritance_links"])
+    items = mcd[kind]
+    choice = rng.random()
+    if kind == "entities":
+        new = {"name": rng.choice(NAMES), "attributes": [{"name": "a", "type": rng.choice(["INT", ""])}]}
+    elif kind == "associations":
+        new = {"name": rng.choice(["Passe", "Contient", "Lie"]), "attributes": []}
+        if rng.random() < 0.5:
+            new["attributes"] = [{"name": "x", "type": "INT"}, {"name": "x", "type": "INT"}]
+    elif kind == "association_links":
+        new = {"association": rng.choice(["Passe", "Contient", "Lie"]), "entity": rng.choice(NAMES),
+               "card_entity": rng.choice(CARDS), "card_assoc": rng.choice(CARDS)}
+    else:
+        new = {"child": rng.choice(NAMES[:3]), "parent": rng.choice(NAMES[:3])}
+    if not items or choice < 0.3:
+        return {"op": "add", "path": f"/{kind}/-", "value": new}
+    idx = rng.randrange(len(items))
+    if choice < 0.45:
+        return {"op": "remove", "path": f"/{kind}/{idx}"}
+    if choice < 0.6:
+        return {"op": "replace", "path": f"/{kind}/{idx}", "value": new}
+    field = {"entities": "name", "associations": "name", "association_links": "card_assoc",
+             "inheritance_links": "parent"}[kind]
+    return {"op": "replace", "path": f"/{kind}/{idx}/{field}", "value": next(iter(new.values()))
+            if kind != "association_links" else rng.choice(CARDS)}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_patches_match_full_validation(seed):
+    """Séquences aléatoires de patchs : même multi-ensemble d'erreurs que la validation complète."""
+    rng = random.Random(seed)
+    mcd = _canvas()
+    validator = IncrementalValidator(mcd)
+    _assert_matches_full(validator, mcd)
+    for _ in range(40):
+        operations = [_random_operation(rng, mcd) for _ in range(rng.randint(1, 3))]
+        try:
+            changes = apply_json_patch(mcd, operations)
+        except ValueError:
+            continue
+        before = Counter(validator.errors())
+        result = validator.apply(changes)
+        _assert_matches_full(validator, mcd)
+        after = Counter(result["errors"])
+        assert Counter(result["added"]) == after - before
+        assert Counter(result["removed"]) == before - after
+        assert result["valid"] == (not result["errors"])
+
+
+def test_attributes_on_one_one_association_reported_and_cleared():
+    """Rubriques sur une association avec lien 1,1 : erreurs levées puis retirées quand les rubriques disparaissent."""
+    mcd = _canvas()
+    validator = IncrementalValidator(mcd)
+    assert any("1,1 côté association" in e for e in validator.errors())
+    result = validator.apply(apply_json_patch(mcd, [
+        {"op": "replace", "path": "/associations/0/attributes", "value": []},
+    ]))
+    assert not any("1,1 côté association" in e for e in result["errors"])
+    assert any("Passe" in e for e in result["removed"])
+    _assert_matches_full(validator, mcd)
+
+
+def test_full_collection_replace_and_cif():
+    """Remplacement d'une collection entière et CIF : revalidation complète."""
+    mcd = _canvas()
+    validator = IncrementalValidator(mcd)
+    validator.apply(apply_json_patch(mcd, [{"op": "replace", "path": "/entities", "value": []}]))
+    _assert_matches_full(validator, mcd)
+    validator.apply(apply_json_patch(mcd, [{"op": "add", "path": "/cif_constraints", "value": [
+        {"name": "X", "type": "inter_association", "associations": ["Passe"]},
+    ]}]))
+    _assert_matches_full(validator, mcd)
+
+
+def test_session_validation_is_incremental(monkeypatch):
+    """mcd_service.validate_compile_session : erreurs de la session à jour après un patch, sans validation complète."""
+    session = mcd_service.create_compile_session(_canvas())
+    mcd = _canvas()
+    ops = [{"op": "replace", "path": "/associations/0/attributes", "value": []}]
+    apply_json_patch(mcd, ops)
+    expected = mcd_service.validate_mcd(mcd)
+    mcd_service.patch_compile_session(session["session_id"], ops)
+
+    def full_validation(_):
+        raise AssertionError("validation complète appelée")
+
+    monkeypatch.setattr(mcd_service, "validate_mcd", full_validation)
+    result = mcd_service.validate_compile_session(session["session_id"])
+    assert Counter(result["errors"]) == Counter(expected)
+    assert result["valid"] == (not expected) and result["version"] == 1
+    mcd_service.delete_compile_session(session["session_id"])
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du planificateur d'index du MPD (views.index_planner) et de son branchement
+dans ModelConverter.build_mpd, les sessions de compilation et mcd_service.index_plan.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.services import mcd_service
+from api.services.compile_session import CompileSession
+from views.index_planner import plan_indexes, plan_table_indexes
+from views.model_converter import ModelConverter
+from views.model_ir import Column, Table
+
+
+def _mcd():
+    return {
+        "entities": {
+            "produit": {"name": "produit", "attributes": [
+                {"name": "code", "type": "varchar"},
+                {"name": "nom", "type": "varchar"},
+                {"name": "email", "type": "varchar", "is_unique": True},
+            ]},
+            "commande": {"name": "commande", "attributes": [
+                {"name": "id", "type": "integer"},
+                {"name": "date_creation", "type": "date"},
+            ]},
+        },
+        "associations": [
+            {"name": "contient", "entity1": "commande", "entity2": "produit", "cardinality1": "0,n", "cardinality2": "1,n"},
+        ],
+        "inheritance": {},
+    }
+
+
+def _indexes(mpd, table):
+    return {tuple(i.columns): i for i in mpd.tables[table].indexes}
+
+
+def test_primary_key_and_unique_cover_search_columns():
+    """code (clé primaire) et email (unique) ne reçoivent pas d'index en double."""
+    converter = ModelConverter()
+    mpd = converter.build_mpd(converter.build_mld(_mcd()), "mysql")
+    assert list(_indexes(mpd, "produit")) == [("nom",)]
+    skipped = {tuple(d.columns): d.reason for d in plan_indexes(mpd) if d.table == "produit" and not d.kept}
+    assert skipped[("code",)].endswith("couvert par clé primaire")
+    assert "contrainte d'unicité (email)" in skipped[("email",)]
+
+
+def test_junction_table_gets_reverse_composite_only():
+    """Table de liaison : index inverse (produit_id, commande_id), aucun index à une colonne."""
+    converter = ModelConverter()
+    mpd = converter.build_mpd(converter.build_mld(_mcd()), "postgresql")
+    contient = mpd.tables["contient"]
+    assert contient.primary_key == ["commande_id", "produit_id"]
+    indexes = _indexes(mpd, "contient")
+    assert list(indexes) == [("produit_id", "commande_id")]
+    assert indexes[("produit_id", "commande_id")].reason.startswith("table de liaison")
+    sql = converter.generate_sql_from_mpd(mpd)
+    assert "CREATE INDEX idx_contient_produit_id_commande_id ON contient (produit_id, commande_id);" in sql
+    assert "idx_contient_commande_id" not in sql
+
+
+def test_prefix_of_longer_index_is_skipped():
+    """Un candidat préfixe d'un index retenu plus long est écarté, quel que soit l'ordre des candidats."""
+    table = Table("lien", [Column(name="a_id"), Column(name="b_id"), Column(name="c_id")],
+                  primary_key=["a_id", "b_id", "c_id"])
+    decisions = plan_table_indexes(table, ((("a_id", "a"), ("b_id", "b"), ("c_id", "c")), ()))
+    kept = [d.columns for d in decisions if d.kept]
+    assert kept == [["b_id", "a_id", "c_id"], ["c_id", "a_id", "b_id"]]
+    assert all(not d.kept for d in decisions if len(d.columns) == 1)
+
+
+def test_foreign_key_index_uses_declared_keys():
+    """Seules les vraies clés étrangères sont indexées (plus d'index sur tout *_id)."""
+    table = Table("t", [Column(name="id"), Column(name="parent_id"), Column(name="ext_id")], primary_key=["id"])
+    decisions = plan_table_indexes(table, ((("parent_id", "parent"),), ()))
+    assert [(d.columns, d.kept) for d in decisions] == [(["parent_id"], True)]
+    assert decisions[0].index().to_dict() == {
+        "name": "idx_t_parent_id", "columns": ["parent_id"], "type": "BTREE", "reason": "clé étrangère vers parent",
+    }
+
+
+def test_session_refreshes_indexes_when_uniqueness_changes():
+    """Session : rendre un attribut unique retire son index, sans autre changement de la table."""
+    canvas = {"entities": [{"name": "Client", "attributes": [
+        {"name": "id", "type": "INTEGER", "is_primary_key": True},
+        {"name": "email", "type": "VARCHAR(255)"},
+    ]}]}
+    session = CompileSession("s1", canvas, "mysql")
+    assert [i["columns"] for i in session.mpd()["tables"]["client"]["indexes"]] == [["email"]]
+    session.apply_patch([{"op": "add", "path": "/entities/0/attributes/1/is_unique", "value": True}])
+    converter = ModelConverter()
+    mcd = mcd_service._canvas_mcd_to_converter_format(session.canvas)
+    assert session.mpd() == converter.generate_mpd(converter.build_mld(mcd), "mysql")
+    assert session.mpd()["tables"]["client"]["indexes"] == []
+
+
+def test_service_index_plan():
+    """mcd_service.index_plan : décisions retenues et écartées, comptées."""
+    canvas = {"entities": [{"name": "Pays", "attributes": [
+        {"name": "code", "type": "CHAR(2)", "is_primary_key": True}, {"name": "nom", "type": "VARCHAR(80)"},
+    ]}]}
+    plan = mcd_service.index_plan(canvas, "sqlite")
+    assert (plan["kept"], plan["skipped"]) == (1, 1)
+    assert [d["columns"] for d in plan["indexes"] if d["kept"]] == [["nom"]]
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du codec JSON rapide (api.services.json_codec) : même contenu que le json standard.
+"""
+
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from api.services import json_codec, mcd_service
+from api.services.json_codec import check_fields, optional
+
+
+def test_roundtrip_matches_stdlib():
+    """Un MLD encodé puis décodé est identique à celui du json standard."""
+    canvas = {"entities": [{"name": "Élève", "attributes": [{"name": "nom", "type": "VARCHAR(50)"}]}]}
+    mld = mcd_service.mcd_to_mld(canvas)
+    encoded = json_codec.dumps(mld)
+    assert isinstance(encoded, bytes)
+    assert json_codec.loads(encoded) == json.loads(json.dumps(mld))
+    assert "Élève".lower().encode("utf-8") in encoded  # UTF-8, pas d'échappement \\u
+
+
+def test_non_json_types():
+    """Ensembles et clés non chaînes sont sérialisés au lieu de lever une erreur."""
+    data = json_codec.loads(json_codec.dumps({"tags": {"b", "a"}, 1: "un"}))
+    assert data == {"tags": ["a", "b"], "1": "un"}
+
+
+def test_check_fields_types_and_defaults():
+    """Champs de premier niveau : défauts complétés, type du défaut exigé (booléen strict), None réservé à optional."""
+    fields = dict(mcd=dict, dbms="mysql", use_original=False, seed=0, dialects=optional(list))
+    body = check_fields({"mcd": {}}, fields)
+    assert body == {"mcd": {}, "dbms": "mysql", "use_original": False, "seed": 0, "dialects": None}
+    assert check_fields({"mcd": {}, "dbms": None, "dialects": ["mysql"]}, fields)["dbms"] == "mysql"
+    for invalid in ({}, {"mcd": []}, {"mcd": {}, "dialects": "mysql"}, {"mcd": {}, "dbms": ["mysql"]},
+                    {"mcd": {}, "dbms": 123}, {"mcd": {}, "dbms": {"a": 1}}, {"mcd": {}, "use_original": "false"},
+                    {"mcd": {}, "use_original": 0}, {"mcd": {}, "seed": True}, {"mcd": {}, "seed": "1"}):
+        with pytest.raises(ValueError):
+            check_fields(invalid, fields)
+    assert check_fields({"rows": {"a": 1}}, dict(rows=optional(dict), ratio=0.5))["ratio"] == 0.5
+    assert check_fields({"ratio": 2}, dict(ratio=0.5))["ratio"] == 2
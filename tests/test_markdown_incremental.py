@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du re-parse incrémental par section (views.markdown_mcd_parser.IncrementalMarkdownParser,
+mcd_service.parse_markdown_preview).
+"""
+
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from api.services import mcd_service
+from views.markdown_mcd_parser import IncrementalMarkdownParser, MarkdownMCDParser, split_sections
+
+DOCUMENT = """# Boutique
+
+## Client
+- nom (varchar(50)) NOT NULL
+- email (varchar) UNIQUE
+
+## Commande
+- montant (decimal(10,2))
+
+### Client et Commande : Passer
+**Un client passe des commandes**
+Client : 0,n
+Commande : 1,1
+
+## Express hérite de Commande
+- delai (integer)
+"""
+
+LINES = [
+    "## Client", "## Produit", "  ## Commande  ", "### Client et Commande : Passer", "## Client <-> Produit : Voir",
+    "## Voiture hérite de Vehicule", "- nom (varchar(50)) NOT NULL", "-x : 1,n", "Client : 0,n", "1,1 : Commande",
+    "**desc**", "Chien extends Animal", "", "## ", "#### y", "\t### A - B : L", "## Client\r",
+]
+
+
+def test_split_sections_keeps_text():
+    """Préambule puis une section par titre ## / ### ; le texte recollé est inchangé."""
+    sections = split_sections(DOCUMENT)
+    assert "".join(sections) == DOCUMENT
+    assert [s.split("\n")[0] for s in sections] == [
+        "# Boutique", "## Client", "## Commande", "### Client et Commande : Passer", "## Express hérite de Commande",
+    ]
+    assert split_sections("## \n#### x\n- a") == ["## \n#### x\n- a"]
+
+
+def test_only_modified_sections_are_reparsed():
+    """Une section modifiée : une seule réanalyse, même résultat qu'un parse complet."""
+    parser = IncrementalMarkdownParser()
+    assert parser.parse_markdown(DOCUMENT) == MarkdownMCDParser().parse_markdown(DOCUMENT)
+    assert parser.last_stats == {"sections": 5, "reparsed": 5}
+    edited = DOCUMENT.replace("- montant (decimal(10,2))", "- montant (decimal(12,2))\n- statut (varchar)")
+    result = parser.parse_markdown(edited)
+    assert parser.last_stats == {"sections": 5, "reparsed": 1}
+    assert result == MarkdownMCDParser().parse_markdown(edited)
+    # héritage recalculé : Express reçoit les attributs modifiés de Commande
+    assert [a["name"] for a in result["entities"]["Express"]["attributes"]] == ["delai", "montant", "statut"]
+
+
+def test_results_are_not_shared_between_parses():
+    """Modifier le résultat d'un parse ne touche pas le cache des sections."""
+    parser = IncrementalMarkdownParser()
+    parser.parse_markdown(DOCUMENT)["entities"]["Client"]["attributes"][0]["constraints"].append("X")
+    assert parser.parse_markdown(DOCUMENT) == MarkdownMCDParser().parse_markdown(DOCUMENT)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_edits_match_full_parse(seed):
+    """Suite d'éditions aléatoires (contexte porté d'une section à l'autre compris) : identique au parse complet."""
+    rnd = random.Random(seed)
+    parser = IncrementalMarkdownParser()
+    lines = [rnd.choice(LINES) for _ in range(30)]
+    for _ in range(60):
+        position = rnd.randrange(len(lines) + 1)
+        if rnd.random() < 0.5 or len(lines) < 2:
+            lines.insert(position, rnd.choice(LINES))
+        else:
+            del lines[min(position, len(lines) - 1)]
+        document = "\n".join(lines)
+        assert parser.parse_markdown(document) == MarkdownMCDParser().parse_markdown(document)
+
+
+def test_service_preview_shares_section_cache():
+    """mcd_service.parse_markdown_preview : même réponse que /parse-markdown, sections en cache partagé."""
+    first = mcd_service.parse_markdown_preview(DOCUMENT)
+    second = mcd_service.parse_markdown_preview(DOCUMENT + "## Fournisseur\n- nom (varchar)\n")
+    assert {k: v for k, v in first.items() if k != "sections"} == mcd_service.parse_markdown_for_canvas(DOCUMENT)
+    assert second["sections"] == {"sections": 6, "reparsed": 1}
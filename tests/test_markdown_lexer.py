@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du lexer du parseur Markdown (views.markdown_mcd_parser.classify_line) et du log différé.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from views import markdown_mcd_parser
+from views.markdown_mcd_parser import MarkdownMCDParser, classify_line
+
+
+@pytest.mark.parametrize("line, kind", [
+    ("## Client", markdown_mcd_parser.LINE_ENTITY),
+    ("## Client <-> Commande : Passer", markdown_mcd_parser.LINE_ASSOCIATION_H2),
+    ("### Client et Commande : Passer", markdown_mcd_parser.LINE_ASSOCIATION),
+    ("- nom (varchar(50))", markdown_mcd_parser.LINE_ATTRIBUTE),
+    ("Client : 0,n", markdown_mcd_parser.LINE_CARDINALITY),
+    ("**Client : 1,n**", markdown_mcd_parser.LINE_CARDINALITY),  # la cardinalité l'emporte sur la description
+    ("-x : 1,1", markdown_mcd_parser.LINE_CARDINALITY),
+    ("**Un client passe des commandes**", markdown_mcd_parser.LINE_DESCRIPTION),
+    ("Chien EXTENDS Animal", markdown_mcd_parser.LINE_INHERITANCE),
+    ("# Titre", None),
+    ("Texte libre : sans cardinalité", None),
+])
+def test_classify_line(line, kind):
+    """Un seul type par ligne, dans l'ordre de priorité du parseur."""
+    assert classify_line(line) == kind
+
+
+def test_disabled_log_does_not_format(capsys):
+    """verbose=False : les arguments du log ne sont pas formatés ; verbose=True : message %-formaté."""
+    class Explosive:
+        def __str__(self):
+            raise AssertionError("formaté alors que verbose=False")
+
+    MarkdownMCDParser().log("valeur %s", Explosive())
+    MarkdownMCDParser(verbose=True).log("score %.1f%%", 87.25)
+    assert capsys.readouterr().out == "🔍 DEBUG: score 87.2%\n"
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du parsing Markdown en flux (MarkdownMCDParser.parse_lines / feed, mcd_service.parse_markdown_stream).
+"""
+
+import io
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from api.services import mcd_service
+from views.markdown_mcd_parser import MarkdownMCDParser
+
+MARKDOWN = """# Boutique
+
+## Client
+- nom (varchar) : nom du client
+- email (varchar) : adresse électronique
+
+## Commande
+- date_commande (date) : date de passage
+- montant (decimal) : total TTC
+
+## Client <-> Commande : Passer
+**Un client passe des commandes**
+Client : 0,n
+Commande : 1,1
+
+## Express
+Express hérite de Commande
+- délai (integer) : délai garanti
+"""
+
+
+def _parse(**kwargs):
+    return MarkdownMCDParser(**kwargs).parse_markdown(MARKDOWN)
+
+
+def test_parse_lines_matches_parse_markdown(tmp_path):
+    """Fichier ouvert (fins de ligne CRLF comprises) : même structure que le texte complet."""
+    path = tmp_path / "mcd.md"
+    path.write_bytes(MARKDOWN.replace("\n", "\r\n").encode("utf-8"))
+    with open(str(path), encoding="utf-8", newline="") as f:
+        streamed = MarkdownMCDParser().parse_lines(f)
+    assert streamed == _parse()
+    assert set(streamed["entities"]) == {"Client", "Commande", "Express"}
+
+
+@pytest.mark.parametrize("size", [1, 7, 64])
+def test_feed_arbitrary_chunks(size):
+    """Découpage arbitraire du texte (au milieu des lignes) : même résultat, dernière ligne sans \\n comprise."""
+    text = MARKDOWN.rstrip("\n")
+    parser = MarkdownMCDParser()
+    for start in range(0, len(text), size):
+        parser.feed(text[start:start + size])
+    assert parser.close() == _parse()
+
+
+def test_service_stream_decodes_split_characters(monkeypatch):
+    """Caractères UTF-8 multi-octets coupés entre deux morceaux : décodage incrémental, format canvas."""
+    monkeypatch.setattr(mcd_service, "MARKDOWN_CHUNK_BYTES", 5)
+    result = mcd_service.parse_markdown_stream(io.BytesIO(MARKDOWN.encode("utf-8")))
+    expected = mcd_service.parse_markdown_for_canvas(MARKDOWN)
+    assert result == expected
+    assert "délai" in [a["name"] for a in result["parsed"]["entities"]["Express"]["attributes"]]
@@ -81,6 +81,16 @@ def test_validate_cardinality_1_1_no_attributes():
     assert any("1,1" in e and "rubriques" in e for e in errors)
 
 
+def test_validate_cardinality_1_1_no_attributes_follows_association_order():
+    """Erreurs dans l'ordre des associations (indépendant de PYTHONHASHSEED), une fois par nom."""
+    names = ["Zeta", "Alpha", "Mu", "Beta", "Omega", "Kappa"]
+    associations = [{"name": n, "attributes": [{"name": "qte", "type": "INT"}]} for n in names + ["Alpha"]]
+    links = [{"association": n, "entity": "E1", "card_entity": "1,n", "card_assoc": "1,1"} for n in names]
+    errors = validate_cardinality_1_1_no_attributes(associations, links)
+    assert len(errors) == len(names)
+    assert [next(n for n in names if f"« {n.lower()} »" in e.lower()) for e in errors] == names
+
+
 def test_validate_association_with_attributes_must_be_n_n():
     """Association avec attributs mais pas n-n (ex. un seul lien 1,n-0,1) → erreur."""
     associations = [{"name": "Liaison", "attributes": [{"name": "qte", "type": "INT"}]}]
@@ -125,3 +135,34 @@ def test_validate_mcd_full_barrel_rules():
     assert any("doublons" in e for e in errors)
     assert any("Type de la rubrique manquant" in e for e in errors)
     assert any("Orpheline" in e and "au moins une association" in e for e in errors)
+
+
+def test_validate_inheritance_cycle_detected_once():
+    """Cycle d'héritage (A → B → A) signalé une seule fois ; chaîne sans cycle acceptée."""
+    from api.services.merise_rules import validate_inheritance_no_cycle
+    errors = validate_inheritance_no_cycle([
+        {"child": "A", "parent": "B"},
+        {"child": "B", "parent": "A"},
+        {"child": "C", "parent": "A"},
+    ])
+    assert len(errors) == 1 and "Cycle d'héritage" in errors[0]
+    assert not validate_inheritance_no_cycle([{"child": "A", "parent": "B"}, {"child": "B", "parent": "C"}])
+
+
+def test_rules_share_mcd_index():
+    """Les règles acceptent un McdIndex partagé et donnent le même résultat qu'avec les listes."""
+    from api.services.mcd_index import McdIndex
+    entities = [{"name": "E1", "attributes": []}, {"name": "E2", "attributes": []}]
+    associations = [{"name": "R", "attributes": [{"name": "qte", "type": "INT"}]}]
+    links = [
+        {"association": "R", "entity": "E1", "card_entity": "1,n", "card_assoc": "1,1"},
+        {"association": " R ", "entity": "E2", "card_entity": "0,n", "card_assoc": "0,n"},
+    ]
+    index = McdIndex(entities, associations, links)
+    assert index.links_for_association("R") == tuple(links)
+    assert index.has_link("R", "E2") and not index.has_link("R", "E3")
+    assert validate_mcd(entities, associations, links) == validate_mcd(entities, associations, index=index)
+    assert validate_cardinality_1_1_no_attributes(associations, links, index=index)
+    assert validate_association_with_attributes_must_be_n_n(associations, links, index=index)
+    with pytest.raises(AttributeError):
+        index.entities = ()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de l'instrumentation par étape (api.services.metrics) et de l'exposition Prometheus.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.services import mcd_service, metrics
+from api.services.metrics import Gauge, Histogram, Registry
+
+
+def test_histogram_exposition_format():
+    """Buckets cumulatifs, _sum et _count au format texte Prometheus."""
+    registry = Registry()
+    h = registry.register(Histogram("t_seconds", "Test.", buckets=(0.1, 1.0)))
+    h.observe(0.05, stage="a")
+    h.observe(0.5, stage="a")
+    h.observe(3.0, stage="a")
+    text = registry.render()
+    assert "# TYPE t_seconds histogram" in text
+    assert 't_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 't_seconds_bucket{stage="a",le="1"} 2' in text
+    assert 't_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 't_seconds_count{stage="a"} 3' in text
+
+
+def test_gauge_escapes_labels():
+    """Les valeurs de labels sont échappées (guillemets, antislash)."""
+    registry = Registry()
+    g = registry.register(Gauge("t_bytes", "Test."))
+    g.set(42, route='/a"b')
+    assert 't_bytes{route="/a\\"b"} 42' in registry.render()
+
+
+def test_pipeline_stages_are_timed():
+    """Une compilation alimente les étapes normalize, mld, mpd, sql et la taille du modèle."""
+    mcd_service.clear_compile_cache()
+    before = {s: metrics.STAGE_DURATION.snapshot(stage=s)["count"] for s in ("normalize", "mld", "mpd", "sql")}
+    canvas = {"entities": [{"name": "Metrique", "attributes": [{"name": "valeur", "type": "FLOAT"}]}]}
+    mcd_service.mcd_to_sql(canvas, "sqlite")
+    for s, count in before.items():
+        assert metrics.STAGE_DURATION.snapshot(stage=s)["count"] > count, s
+    assert metrics.MODEL_SIZE.get(kind="entities") == 1
+    assert "barrel_stage_duration_seconds_bucket" in metrics.render()
+
+
+def test_run_collecting_and_merge():
+    """Les mesures capturées (processus du pool) sont réintégrées au registre."""
+    before = metrics.STAGE_DURATION.snapshot(stage="markdown_parse")["count"]
+    result, observations = metrics.run_collecting(mcd_service.parse_markdown, "## Client\n- nom (TEXT)\n")
+    assert result["entities"]
+    assert any(name == "barrel_stage_duration_seconds" for name, _, _ in observations)
+    metrics.merge(observations)
+    assert metrics.STAGE_DURATION.snapshot(stage="markdown_parse")["count"] == before + 2
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la conversion MCD -> MLD parallèle par composantes connexes (views.mld_sharding).
+Le MLD doit être identique (ordre compris) à celui de la conversion série.
+"""
+
+import json
+import random
+import sys
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from views.mld_sharding import build_mld_parallel, split_components
+from views.model_converter import ModelConverter
+
+CARDS = ["0,1", "1,1", "0,n", "1,n", "n,n"]
+
+
+def _random_mcd(rng, n_entities=40):
+    """MCD en plusieurs domaines, avec collisions de noms (tables de liaison, casse, contraintes)."""
+    names = [f"E{i}" for i in range(n_entities)] + ["e0", "E1_E2", "Lien", "e3_e4"]
+    entities = {}
+    for name in names:
+        attrs = [{"name": rng.choice(["id", "code", "nom", "x"]), "type": rng.choice(["INT", "VARCHAR", "DECIMAL"]),
+                  "is_unique": rng.random() < 0.3} for _ in range(rng.randint(1, 3))]
+        entities[name + ("" if name not in entities else "_bis")] = {"name": name, "attributes": attrs}
+    associations = []
+    for _ in range(n_entities):
+        domain = rng.randrange(4)
+        pool = [n for i, n in enumerate(names) if i % 4 == domain] or names
+        associations.append({
+            "name": rng.choice(["Lien", "E0", "Passe", "", "e5 e6", f"A{rng.randrange(99)}"]),
+            "entity1": rng.choice(pool), "entity2": rng.choice(pool + ["Absente"]),
+            "cardinality1": rng.choice(CARDS), "cardinality2": rng.choice(CARDS),
+            "attributes": [{"name": "q", "type": "INT"}],
+        })
+    inheritance = {rng.choice(names): rng.choice(names) for _ in range(n_entities // 8)}
+    return {"entities": entities, "associations": associations, "inheritance": inheritance}
+
+
+@pytest.mark.parametrize("seed", range(15))
+def test_parallel_matches_serial(seed):
+    """Composantes converties séparément puis fusionnées : même MLD que la conversion série."""
+    converter = ModelConverter()
+    mcd = _random_mcd(random.Random(seed))
+    serial = json.dumps(converter.build_mld(mcd).to_dict())
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        parallel = build_mld_parallel(converter, mcd, workers=3, executor=executor)
+    assert json.dumps(parallel.to_dict()) == serial
+    assert len(split_components(converter, mcd)) > 1
+
+
+def test_process_pool_and_small_models():
+    """Vrai pool de processus ; un petit MCD sans executor reste en série."""
+    converter = ModelConverter()
+    mcd = _random_mcd(random.Random(99), n_entities=80)
+    serial = converter.build_mld(mcd).to_dict()
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        assert build_mld_parallel(converter, mcd, workers=2, executor=executor).to_dict() == serial
+    assert converter.build_mld(mcd, workers=4).to_dict() == serial
+    assert converter.build_mld({"entities": {}, "associations": []}, workers=4).to_dict() == \
+        {"tables": {}, "foreign_keys": [], "constraints": []}
+
+
+def test_junction_table_names_match_created_table():
+    """ModelConverter.junction_table_names : n,n seulement, nom de l'association puis entité1_entité2."""
+    converter = ModelConverter()
+    suit = {"name": "Suit (cours)", "entity1": "Eleve", "entity2": "Cours", "cardinality1": "0,n", "cardinality2": "1,n"}
+    assert converter.junction_table_names(suit) == ("suit_cours", "eleve_cours")
+    assert converter.junction_table_names(dict(suit, cardinality1="1,1")) == ()
+    mcd = {"entities": {n: {"name": n, "attributes": [{"name": "id", "type": "INT"}]} for n in ("Eleve", "Cours")},
+           "associations": [suit, dict(suit, name="Suit cours")]}
+    assert list(converter.build_mld(mcd).tables) == ["eleve", "cours", "suit_cours", "eleve_cours"]
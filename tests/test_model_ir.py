@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la représentation intermédiaire MLD / MPD (views.model_ir).
+"""
+
+import sys
+import os
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from views.model_ir import Column, Constraint, ForeignKey, Index, Mld, Mpd, Table
+
+TABLE = {
+    "name": "commande",
+    "columns": [
+        {"name": "id", "type": "INTEGER", "nullable": False, "auto_increment": True},
+        {"name": "montant", "type": "DECIMAL", "precision": 10, "scale": 2, "commentaire": "TTC"},
+    ],
+    "primary_key": ["id"],
+    "indexes": [{"name": "idx_montant", "columns": ["montant"], "type": "BTREE"}],
+    "physical": {"fillfactor": 90},
+}
+
+
+def test_to_dict_round_trip_keeps_absent_and_extra_fields():
+    """from_dict / to_dict : champs absents non ajoutés, clés inconnues conservées (extra)."""
+    table = Table.from_dict(TABLE)
+    assert table.to_dict() == TABLE
+    assert "size" not in table.column("id").to_dict()
+    assert table.column("montant").extra == {"commentaire": "TTC"}
+    mld = {
+        "tables": {"commande": TABLE},
+        "foreign_keys": [{"table": "commande", "column": "client_id", "referenced_table": "client",
+                          "referenced_column": "id", "constraint_name": "fk_commande_client"}],
+        "constraints": [{"table": "commande", "constraint_name": "uq_ref", "columns": ["ref"]}],
+    }
+    assert Mld.from_dict(mld).to_dict() == mld
+    mpd = Mpd.from_dict(dict(mld, dbms="postgresql")).to_dict()
+    assert mpd["dbms"] == "postgresql" and mpd["tables"] == mld["tables"]
+
+
+def test_get_and_getitem_match_dict_access():
+    """get / record[champ] : mêmes réponses que sur le dict ; KeyError pour un champ absent."""
+    column = Column.from_dict(TABLE["columns"][1])
+    for key, value in TABLE["columns"][1].items():
+        assert column[key] == column.get(key) == value
+    assert column.get("size") is None and column.get("size", 0) == 0
+    assert column.has("commentaire") and not column.has("default")
+    with pytest.raises(KeyError):
+        column["size"]
+    with pytest.raises(KeyError):
+        column["inconnu"]
+
+
+def test_copy_is_independent():
+    """copy : champs et extra copiés ; Table.copy copie les listes de colonnes et de clé primaire."""
+    column = Column(name="nom", type="VARCHAR", extra_info=1)
+    clone = column.copy()
+    clone.set("type", "TEXT")
+    clone.set("extra_info", 2)
+    assert column.get("type") == "VARCHAR" and column.get("extra_info") == 1
+    table = Table.from_dict(TABLE)
+    copy = table.copy()
+    copy.add_column(Column(name="statut", type="VARCHAR"))
+    copy.primary_key.append("statut")
+    assert [c.name for c in table.columns] == ["id", "montant"] and table.primary_key == ["id"]
+    assert copy.column("statut") is not None and table.column("statut") is None
+    assert copy.columns[0] is table.columns[0]
+
+
+def test_equality_and_hash():
+    """Égalité par valeurs (champ absent ≠ champ à None), hash cohérent avec l'égalité."""
+    fk = dict(table="a", column="b_id", referenced_table="b", referenced_column="id", constraint_name="fk_a_b")
+    assert ForeignKey(**fk) == ForeignKey(**fk) and hash(ForeignKey(**fk)) == hash(ForeignKey(**fk))
+    assert ForeignKey(**fk) != ForeignKey(**dict(fk, column="c_id"))
+    assert Column(name="x") != Column(name="x", size=None)
+    assert Column(name="x") != Index(name="x")
+    assert Column(name="x", commentaire=[1]) == Column(name="x", commentaire=[1])
+    assert Table.from_dict(TABLE) == Table.from_dict(TABLE)
+    assert hash(Table.from_dict(TABLE)) == hash(Table.from_dict(TABLE))
+    assert Table.from_dict(TABLE) != Table.from_dict(dict(TABLE, primary_key=["montant"]))
+    constraints = [Constraint(table="a", constraint_name="uq", columns=["x", "y"])] * 2
+    delta = Counter(constraints) - Counter([Constraint(table="a", constraint_name="uq", columns=["x", "y"])])
+    assert list(delta.elements()) == constraints[:1]
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la délégation des routes lourdes (api.services.offload) : pool de processus,
+limite de concurrence par route et contre-pression 429 / 503.
+"""
+
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from api.services import mcd_service
+from api.services.offload import Offloader, OffloadRejected, RouteLimiter
+
+
+def _run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_queue_full_returns_429():
+    """Au-delà de max_concurrent en cours + max_queue en attente, la requête est refusée (429)."""
+    limiter = RouteLimiter("lourde", max_concurrent=1, max_queue=1, queue_timeout=5)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "ok"
+
+        first = asyncio.ensure_future(limiter.run(slow))
+        second = asyncio.ensure_future(limiter.run(slow))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert limiter.running == 1 and limiter.waiting == 1
+        with pytest.raises(OffloadRejected) as exc:
+            await limiter.run(slow)
+        release.set()
+        assert await first == "ok" and await second == "ok"
+        return exc.value
+
+    rejected = _run(scenario())
+    assert rejected.status_code == 429
+    assert limiter.stats()["rejected"] == 1 and limiter.stats()["completed"] == 2
+
+
+def test_queue_timeout_returns_503():
+    """Une attente plus longue que queue_timeout est refusée (503)."""
+    limiter = RouteLimiter("lourde", max_concurrent=1, max_queue=4, queue_timeout=0.05)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+
+        first = asyncio.ensure_future(limiter.run(slow))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        try:
+            with pytest.raises(OffloadRejected) as exc:
+                await limiter.run(slow)
+        finally:
+            release.set()
+            await first
+        return exc.value
+
+    assert _run(scenario()).status_code == 503
+
+
+def test_thread_mode_runs_service():
+    """workers=0 : exécution dans un thread, même résultat que l'appel direct."""
+    offloader = Offloader(workers=0)
+    content = "## Client\n- id (INTEGER) PK\n- nom (VARCHAR(50))\n"
+    result = _run(offloader.run("parse-markdown", mcd_service.parse_markdown_for_canvas, content))
+    assert result == mcd_service.parse_markdown_for_canvas(content)
+
+
+def test_process_pool_runs_service():
+    """Le pool de processus exécute une fonction de service et propage ses exceptions."""
+    offloader = Offloader(workers=1)
+    try:
+        canvas = {"entities": [{"name": "Client", "attributes": [{"name": "nom", "type": "VARCHAR(50)"}]}]}
+        prepared, digest = mcd_service.prepare_mcd(canvas)
+        result = _run(offloader.run("to-sql", mcd_service.prepared_mcd_to_sql, prepared, digest, "postgresql"))
+        assert result["sql"] == mcd_service.mcd_to_sql(canvas, "postgresql")["sql"]
+        with pytest.raises(ValueError):
+            _run(offloader.run("to-sql", mcd_service.compile_mcd, canvas, ["oracle"]))
+    finally:
+        offloader.shutdown()
+
+
+def test_offloaded_sql_normalizes_once(monkeypatch):
+    """Chemin /to-sql délégué : le MCD est normalisé une fois pour l'ETag, le cache et la génération."""
+    mcd_service.clear_compile_cache()
+    canvas = {"entities": [{"name": "Client", "attributes": [{"name": "nom", "type": "VARCHAR(50)"}]}]}
+    expected = mcd_service.mcd_to_sql(canvas, "mysql")
+    mcd_service.clear_compile_cache()
+    calls = []
+    normalize = mcd_service._canvas_mcd_to_converter_format
+    monkeypatch.setattr(mcd_service, "_canvas_mcd_to_converter_format", lambda c: calls.append(1) or normalize(c))
+    prepared, digest = mcd_service.prepare_mcd(canvas)
+    assert mcd_service.digest_etag(digest, "sql", "mysql") == mcd_service.artifact_etag(canvas, "sql", "mysql")
+    calls.clear()
+    assert mcd_service.cached_sql(digest, "mysql") is None
+    result = _run(Offloader(workers=0).run("to-sql", mcd_service.prepared_mcd_to_sql, prepared, digest, "mysql"))
+    mcd_service.remember_sql(digest, "mysql", result)
+    assert result == expected and mcd_service.cached_sql(digest, "mysql") is result
+    assert calls == []
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Tests des options physiques des tables volumineuses (views.physical_design) et de leur SQL par SGBD.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.services import mcd_service
+from api.services.compile_session import CompileSession
+from views.model_converter import ModelConverter
+
+
+def _mcd(rows=500_000_000):
+    return {
+        "entities": {
+            "client": {"name": "client", "attributes": [
+                {"name": "id", "type": "integer", "primary_key": True},
+                {"name": "nom", "type": "varchar"},
+            ]},
+            "evenement": {"name": "evenement", "estimated_rows": rows, "attributes": [
+                {"name": "id", "type": "integer", "primary_key": True},
+                {"name": "date_creation", "type": "date"},
+            ]},
+            "mesure": {"name": "mesure", "estimated_rows": rows, "attributes": [
+                {"name": "id", "type": "integer", "primary_key": True},
+                {"name": "valeur", "type": "decimal"},
+            ]},
+        },
+        "associations": [
+            {"name": "concerne", "entity1": "client", "entity2": "evenement", "cardinality1": "1,1", "cardinality2": "0,n"},
+            {"name": "releve", "entity1": "client", "entity2": "mesure", "cardinality1": "1,1", "cardinality2": "0,n"},
+        ],
+        "inheritance": {},
+    }
+
+
+def _sql(mcd, dbms):
+    converter = ModelConverter()
+    mpd = converter.build_mpd(converter.build_mld(mcd), dbms)
+    return mpd, converter.generate_sql_from_mpd(mpd)
+
+
+def test_small_tables_are_unchanged():
+    """Sous le seuil de volumétrie : aucune option physique, SQL identique à l'absence d'indication."""
+    mcd = _mcd(rows=1000)
+    mpd, sql = _sql(mcd, "postgresql")
+    assert mpd.tables["evenement"].get("physical") is None
+    for entity in mcd["entities"].values():
+        entity.pop("estimated_rows", None)
+    assert sql == _sql(mcd, "postgresql")[1]
+
+
+def test_postgresql_range_and_hash_partitioning():
+    """PostgreSQL : RANGE sur la colonne date, HASH sur la clé étrangère, clé primaire étendue."""
+    mpd, sql = _sql(_mcd(), "postgresql")
+    assert mpd.tables["evenement"].primary_key == ["id", "date_creation"]
+    assert ") PARTITION BY RANGE (date_creation);" in sql
+    assert "CREATE TABLE evenement_default PARTITION OF evenement DEFAULT;" in sql
+    assert ") PARTITION BY HASH (client_id);" in sql
+    assert "CREATE TABLE mesure_p15 PARTITION OF mesure FOR VALUES WITH (MODULUS 16, REMAINDER 15);" in sql
+    assert "CREATE INDEX idx_evenement_client_id ON evenement (client_id) INCLUDE (date_creation);" in sql
+    assert "    date_creation DATE NOT NULL," in sql
+
+
+def test_sqlserver_clustered_index_and_fillfactor():
+    """SQL Server : fonction / schéma de partition, clé primaire NONCLUSTERED, index cluster, FILLFACTOR."""
+    mpd, sql = _sql(_mcd(), "sqlserver")
+    assert "CREATE PARTITION FUNCTION pf_evenement (DATE) AS RANGE RIGHT FOR VALUES ();" in sql
+    assert "    PRIMARY KEY NONCLUSTERED (id, date_creation) WITH (FILLFACTOR = 90)\n) ON ps_evenement (date_creation);" in sql
+    assert ("CREATE CLUSTERED INDEX cix_evenement ON evenement (date_creation, id) WITH (FILLFACTOR = 90) "
+            "ON ps_evenement (date_creation);") in sql
+    assert "idx_evenement_date_creation" not in sql
+    assert mpd.tables["mesure"].physical["partition"] is None
+    assert "    PRIMARY KEY (id) WITH (FILLFACTOR = 90)\n);" in sql
+
+
+def test_mysql_and_referenced_tables_are_not_partitioned():
+    """MySQL : pas de partitionnement avec clés étrangères ; table référencée jamais partitionnée."""
+    mpd, sql = _sql(_mcd(), "mysql")
+    assert "PARTITION" not in sql
+    assert "InnoDB partitionnée" in mpd.tables["mesure"].physical["notes"][0]
+    mcd = _mcd()
+    mcd["entities"]["client"]["estimated_rows"] = 500_000_000
+    mcd["entities"]["client"]["partition_by"] = "nom"
+    mpd, _ = _sql(mcd, "postgresql")
+    assert mpd.tables["client"].physical["notes"][-1].endswith("table référencée par une clé étrangère")
+
+
+def test_canvas_hints_reach_session_and_service():
+    """estimated_rows du canvas : MPD du service et de la session de compilation identiques."""
+    canvas = {"entities": [{"name": "Journal", "estimated_rows": 200_000_000, "attributes": [
+        {"name": "id", "type": "INTEGER", "is_primary_key": True}, {"name": "cree_le", "type": "TIMESTAMP"},
+    ]}]}
+    sql = mcd_service.mcd_to_sql(canvas, "mysql")["sql"]
+    assert "PARTITION BY RANGE (UNIX_TIMESTAMP(cree_le)) (PARTITION p_max VALUES LESS THAN MAXVALUE)" in sql
+    session = CompileSession("s1", canvas, "mysql")
+    assert session.sql() == sql
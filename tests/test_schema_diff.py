@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du diff de schémas et des scripts de migration par SGBD (views.schema_diff, mcd_service.diff_mcd).
+"""
+
+import copy
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from api.services import mcd_service
+from views.model_converter import ModelConverter
+from views.schema_diff import MigrationWriter, diff_schemas, migration_sql, schema_index
+
+
+def _mcd():
+    return {
+        "entities": {
+            "client": {"name": "client", "attributes": [
+                {"name": "id", "type": "integer", "primary_key": True},
+                {"name": "nom", "type": "varchar"},
+                {"name": "remise", "type": "integer"},
+            ]},
+            "commande": {"name": "commande", "attributes": [
+                {"name": "id", "type": "integer", "primary_key": True},
+                {"name": "total", "type": "decimal"},
+            ]},
+        },
+        "associations": [
+            {"name": "passe", "entity1": "commande", "entity2": "client", "cardinality1": "1,1", "cardinality2": "0,n"},
+        ],
+        "inheritance": {},
+    }
+
+
+def _mpd(mcd, dbms):
+    converter = ModelConverter()
+    return converter.build_mpd(converter.build_mld(mcd), dbms)
+
+
+def _evolved():
+    mcd = _mcd()
+    attributes = mcd["entities"]["client"]["attributes"]
+    attributes.append({"name": "email", "type": "varchar"})
+    attributes[2]["type"] = "decimal"
+    return mcd
+
+
+@pytest.mark.parametrize("dbms", ["mysql", "postgresql", "sqlite", "sqlserver"])
+def test_identical_schemas_give_empty_migration(dbms):
+    """Deux compilations du même MCD : aucune différence, aucune instruction."""
+    diff = diff_schemas(_mpd(_mcd(), dbms), _mpd(_mcd(), dbms).to_dict())
+    assert diff.is_empty()
+    assert MigrationWriter().sql(diff) == ""
+
+
+def test_added_and_altered_columns_per_dialect():
+    """Colonne ajoutée et type modifié : syntaxe ALTER TABLE propre à chaque SGBD."""
+    expected = {
+        "mysql": ["ALTER TABLE client ADD COLUMN email VARCHAR(255);",
+                  "ALTER TABLE client MODIFY COLUMN remise DECIMAL(10,2);"],
+        "postgresql": ["ALTER TABLE client ADD COLUMN email VARCHAR(255);",
+                       "ALTER TABLE client ALTER COLUMN remise TYPE DECIMAL(10,2);"],
+        "sqlserver": ["ALTER TABLE client ADD email VARCHAR(255);",
+                      "ALTER TABLE client ALTER COLUMN remise DECIMAL(10,2) NULL;"],
+    }
+    for dbms, statements in expected.items():
+        diff = diff_schemas(_mpd(_mcd(), dbms), _mpd(_evolved(), dbms))
+        assert [t.name for t in diff.altered_tables] == ["client"]
+        sql = list(MigrationWriter().iter_sql(diff))
+        assert sql[:2] == statements
+        assert "CREATE INDEX idx_client_email ON client (email);" in sql
+
+
+def test_sqlite_rebuilds_altered_table():
+    """SQLite : modification de colonne par reconstruction de la table, index recréés."""
+    sql = list(MigrationWriter().iter_sql(diff_schemas(_mpd(_mcd(), "sqlite"), _mpd(_evolved(), "sqlite"))))
+    assert sql[0].startswith("CREATE TABLE client__barrel_new (")
+    assert sql[1] == ("INSERT INTO client__barrel_new (id, nom, remise, commande_id) "
+                      "SELECT id, nom, remise, commande_id FROM client;")
+    assert sql[2:4] == ["DROP TABLE client;", "ALTER TABLE client__barrel_new RENAME TO client;"]
+    assert "CREATE INDEX idx_client_nom ON client (nom);" in sql
+
+
+def test_dropped_table_drops_foreign_keys_first():
+    """Table supprimée : clés étrangères qui la référencent supprimées avant DROP TABLE."""
+    new = _mcd()
+    del new["entities"]["commande"]
+    new["associations"] = []
+    sql = list(MigrationWriter().iter_sql(diff_schemas(_mpd(_mcd(), "mysql"), _mpd(new, "mysql"))))
+    fk = "ALTER TABLE client DROP FOREIGN KEY fk_client_commande;"
+    assert fk in sql and "DROP TABLE commande;" in sql
+    assert sql.index(fk) < sql.index("DROP TABLE commande;")
+    assert "ALTER TABLE client DROP COLUMN commande_id;" in sql
+
+
+def test_empty_old_schema_is_full_creation():
+    """Sans ancien schéma, la migration est le script de création complet."""
+    mpd = _mpd(_mcd(), "postgresql")
+    assert migration_sql(None, mpd) == ModelConverter().generate_sql_from_mpd(mpd)
+
+
+def test_schema_index_reuse_and_primary_key_change():
+    """Les empreintes précalculées donnent le même diff ; changement de clé primaire détecté."""
+    old = _mpd(_mcd(), "postgresql")
+    changed = copy.deepcopy(_mcd())
+    changed["entities"]["commande"]["attributes"][1]["primary_key"] = True
+    new = _mpd(changed, "postgresql")
+    assert diff_schemas(schema_index(old), schema_index(new)).to_dict() == diff_schemas(old, new).to_dict()
+    sql = list(MigrationWriter().iter_sql(diff_schemas(old, new)))
+    assert sql[0] == "ALTER TABLE commande DROP CONSTRAINT commande_pkey;"
+    assert "ALTER TABLE commande ADD PRIMARY KEY (id, total);" in sql
+
+
+def test_service_diff_mcd():
+    """mcd_service.diff_mcd sur deux MCD canvas, résultat mis en cache ; SGBD inconnu refusé."""
+    mcd_service.clear_compile_cache()
+    old = {"entities": [{"name": "Client", "attributes": [{"name": "id", "type": "INTEGER", "is_primary_key": True}]}]}
+    new = copy.deepcopy(old)
+    new["entities"][0]["attributes"].append({"name": "ville", "type": "VARCHAR(80)"})
+    result = mcd_service.diff_mcd(old, new, "postgresql")
+    assert result["statements"] == 1
+    assert result["sql"] == "ALTER TABLE client ADD COLUMN ville VARCHAR(80);"
+    assert result["diff"]["altered_tables"][0]["added_columns"] == ["ville"]
+    assert mcd_service.diff_mcd(old, new, "postgresql") is result
+    assert mcd_service.diff_mcd(None, new, "postgresql")["diff"]["added_tables"] == ["client"]
+    with pytest.raises(ValueError):
+        mcd_service.diff_mcd(old, new, "oracle")
+
+
+def test_sqlserver_drops_server_named_primary_key_and_default():
+    """SQL Server : clé primaire et DEFAULT modifiés, anciennes contraintes retrouvées par nom avant l'ajout."""
+    mcd_service.clear_compile_cache()
+    old = {"entities": [{"name": "A", "attributes": [
+        {"name": "ref", "type": "INTEGER", "is_primary_key": True},
+        {"name": "sku", "type": "VARCHAR(10)"},
+        {"name": "x", "type": "INTEGER", "default_value": 1},
+    ]}]}
+    new = copy.deepcopy(old)
+    attributes = new["entities"][0]["attributes"]
+    attributes[0]["is_primary_key"] = False
+    attributes[1]["is_primary_key"] = True
+    attributes[2]["default_value"] = 2
+    sql = mcd_service.diff_mcd(old, new, "sqlserver")["sql"].split("\n\n")
+    assert "FROM sys.key_constraints WHERE parent_object_id = OBJECT_ID(N'a') AND type = 'PK'" in sql[0]
+    assert sql[0].endswith("IF @pk_a IS NOT NULL EXEC sp_executesql @pk_a;")
+    assert sql[-1] == "ALTER TABLE a ADD PRIMARY KEY (sku);"
+    drop_default = next(i for i, s in enumerate(sql) if "sys.default_constraints" in s)
+    assert "c.name = N'x'" in sql[drop_default]
+    assert sql.index("ALTER TABLE a ADD DEFAULT 2 FOR x;") > drop_default
+    assert not any(s.startswith("--") for s in sql)
+
+
+def test_sqlserver_type_change_keeps_default():
+    """SQL Server : ALTER COLUMN d'une colonne avec DEFAULT encadré par la suppression et la recréation du DEFAULT."""
+    old = _mcd()
+    old["entities"]["client"]["attributes"][2]["default_value"] = 0
+    new = copy.deepcopy(old)
+    new["entities"]["client"]["attributes"][2]["type"] = "decimal"
+    sql = list(MigrationWriter().iter_sql(diff_schemas(_mpd(old, "sqlserver"), _mpd(new, "sqlserver"))))
+    assert "sys.default_constraints" in sql[0] and "c.name = N'remise'" in sql[0]
+    assert sql[1:3] == ["ALTER TABLE client ALTER COLUMN remise DECIMAL(10,2) NULL;",
+                        "ALTER TABLE client ADD DEFAULT 0 FOR remise;"]
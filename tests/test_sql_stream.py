@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la génération SQL en flux (ModelConverter.iter_sql_from_mpd, write_sql, mcd_service.mcd_to_sql_stream).
+"""
+
+import io
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from api.services import mcd_service
+from views.model_converter import ModelConverter, write_sql
+
+
+def _canvas():
+    return {
+        "entities": [
+            {"name": "Client", "attributes": [{"name": "id", "type": "INTEGER", "is_primary_key": True},
+                                              {"name": "nom", "type": "NVARCHAR(80)"}]},
+            {"name": "Commande", "attributes": [{"name": "id", "type": "INTEGER", "is_primary_key": True},
+                                                {"name": "total", "type": "DECIMAL(10,2)"}]},
+        ],
+        "associations": [{"name": "Passe", "attributes": []}],
+        "association_links": [
+            {"association": "Passe", "entity": "Client", "card_entity": "0,n", "card_assoc": "1,1"},
+            {"association": "Passe", "entity": "Commande", "card_entity": "1,1", "card_assoc": "0,n"},
+        ],
+    }
+
+
+@pytest.mark.parametrize("dbms", ["mysql", "postgresql", "sqlite", "sqlserver"])
+def test_writer_matches_generate_sql(dbms):
+    """Le texte écrit en flux est identique au script construit en mémoire."""
+    converter = ModelConverter()
+    mcd = mcd_service._canvas_mcd_to_converter_format(_canvas())
+    mpd = converter.build_mpd(converter.build_mld(mcd), dbms)
+    for use_original in (False, True):
+        out = io.StringIO()
+        written = converter.write_sql_from_mpd(mpd, out, use_original=use_original)
+        expected = converter.generate_sql_from_mpd(mpd, use_original=use_original)
+        assert out.getvalue() == expected and written == len(expected)
+    assert write_sql([], io.StringIO()) == 0
+    assert converter.generate_sql_from_mpd({}) == ""
+
+
+@pytest.mark.parametrize("dbms", ["postgresql", "oracle"])
+def test_service_stream_matches_mcd_to_sql(dbms):
+    """mcd_to_sql_stream (petits morceaux, puis depuis le cache) redonne sql et sql_original."""
+    mcd_service.clear_compile_cache()
+    streamed = "".join(mcd_service.mcd_to_sql_stream(_canvas(), dbms, chunk_size=16))
+    streamed_original = "".join(mcd_service.mcd_to_sql_stream(_canvas(), dbms, use_original=True, chunk_size=16))
+    result = mcd_service.mcd_to_sql(_canvas(), dbms)
+    assert streamed == result["sql"] and streamed_original == result["sql_original"]
+    chunks = list(mcd_service.mcd_to_sql_stream(_canvas(), dbms, chunk_size=16))
+    assert "".join(chunks) == result["sql"] and all(len(c) <= 16 for c in chunks)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la traduction de types mémoïsée (views.model_converter).
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from views import model_converter
+from views.model_converter import ModelConverter, convert_type_to_sql, translate_type_for_dbms
+
+
+@pytest.mark.parametrize("type_str,dbms,size,expected", [
+    ("VARCHAR2", "mysql", 30, ("VARCHAR(30)", True)),
+    ("NVARCHAR(MAX)", "mysql", None, ("TEXT", True)),
+    ("NVARCHAR", "mysql", 20000, ("TEXT", True)),
+    ("DATETIME2", "postgresql", None, ("TIMESTAMP", True)),
+    ("BIGINT IDENTITY", "postgresql", None, ("BIGSERIAL", True)),
+    ("NCHAR(400)", "sqlite", None, ("VARCHAR(255)", True)),
+    ("DATETIME", "sqlite", None, ("TEXT", True)),
+    ("BIGSERIAL", "sqlserver", None, ("BIGINT", True)),
+    ("INTEGER", "mysql", None, ("INTEGER", False)),
+    ("", "mysql", None, ("VARCHAR(255)", False)),
+])
+def test_translate_type_rules(type_str, dbms, size, expected):
+    """Règles par SGBD : le mémo et la fonction sans mémo donnent le même résultat."""
+    assert translate_type_for_dbms(type_str, dbms, size) == expected
+    if type_str:
+        assert model_converter._translate_type(type_str, dbms, size, None, None) == expected
+    assert ModelConverter()._translate_type_for_dbms(type_str, dbms, size) == expected
+
+
+def test_decimal_precision_and_convert_type():
+    """Précision / échelle réappliquées aux DECIMAL ; types MCD courants convertis."""
+    assert translate_type_for_dbms("DECIMAL(10,2)", "mysql", None, 12, 3) == ("DECIMAL(12,3)", False)
+    assert convert_type_to_sql(" decimal ") == "DECIMAL(10,2)"
+    assert convert_type_to_sql("Varchar(100)") == "Varchar(100)"
+    assert convert_type_to_sql("inconnu") == "VARCHAR(255)"
+    assert convert_type_to_sql(None) == "VARCHAR(255)"
+
+
+def test_memo_is_typed_and_tolerates_unhashable_arguments():
+    """40 et 40.0 ne partagent pas d'entrée ; un argument non hachable contourne le mémo."""
+    assert translate_type_for_dbms("VARCHAR2", "mysql", 40) == ("VARCHAR(40)", True)
+    assert translate_type_for_dbms("VARCHAR2", "mysql", 40.0) == ("VARCHAR(40.0)", True)
+    assert translate_type_for_dbms("DECIMAL(10,2)", "mysql", [1], 8, 1) == ("DECIMAL(8,1)", False)
+    before = model_converter._translate_type_memo.cache_info().hits
+    translate_type_for_dbms("VARCHAR2", "mysql", 40)
+    assert model_converter._translate_type_memo.cache_info().hits == before + 1
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de l'estimation de volumétrie du MPD (views.volumetry, mcd_service.volumetry).
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from api.services import mcd_service
+from views.model_converter import ModelConverter
+from views.volumetry import column_bytes, estimate_volumetry, format_bytes, row_bytes
+
+
+def _mcd():
+    return {
+        "entities": {
+            "commande": {"name": "commande", "attributes": [
+                {"name": "id", "type": "integer", "primary_key": True},
+                {"name": "total", "type": "decimal"},
+            ]},
+            "produit": {"name": "produit", "attributes": [
+                {"name": "id", "type": "integer", "primary_key": True},
+                {"name": "nom", "type": "varchar"},
+            ]},
+        },
+        "associations": [
+            {"name": "contient", "entity1": "commande", "entity2": "produit", "cardinality1": "0,n", "cardinality2": "1,n"},
+        ],
+        "inheritance": {},
+    }
+
+
+def _mpd(dbms):
+    converter = ModelConverter()
+    return converter.build_mpd(converter.build_mld(_mcd()), dbms)
+
+
+def _tables(result):
+    return {t["table"]: t for t in result["tables"]}
+
+
+def test_column_bytes_per_dialect():
+    """Tailles par SGBD : entiers, décimaux, chaînes variables remplies à moitié."""
+    assert column_bytes("INT AUTO_INCREMENT", "mysql") == 4
+    assert column_bytes("DECIMAL(10,2)", "mysql") == 5
+    assert column_bytes("DECIMAL(10,2)", "postgresql") == 9
+    assert column_bytes("DECIMAL(10,2)", "sqlserver") == 9
+    assert column_bytes("VARCHAR(255)", "mysql") == 127 + 1
+    assert column_bytes("NVARCHAR(100)", "sqlserver") == 100 + 2
+    assert column_bytes("TIMESTAMP", "postgresql") == 8
+    assert column_bytes("UNKNOWN_TYPE", "sqlite") == 8
+
+
+def test_junction_rows_follow_fanout():
+    """Table de liaison : lignes = lignes de entity1 x fan-out de l'association."""
+    result = estimate_volumetry(_mpd("postgresql"), _mcd(), {"Commande": 1000, "produit": 50}, {"contient": 3})
+    tables = _tables(result)
+    assert tables["commande"]["rows"] == 1000
+    assert tables["contient"]["rows"] == 3000
+    assert tables["contient"]["rows_source"] == "commande x 3 (contient)"
+    assert result["total"]["rows"] == 4050
+    assert result["total"]["total_bytes"] == result["total"]["data_bytes"] + result["total"]["index_bytes"]
+
+
+def test_clustered_primary_key_has_no_separate_index():
+    """InnoDB : clé primaire en cluster, pas d'index séparé ; PostgreSQL : index de clé primaire compté."""
+    mysql = _tables(estimate_volumetry(_mpd("mysql"), _mcd(), {"commande": 10000}))
+    postgresql = _tables(estimate_volumetry(_mpd("postgresql"), _mcd(), {"commande": 10000}))
+    assert mysql["commande"]["indexes"] == []
+    assert [i["name"] for i in postgresql["commande"]["indexes"]] == ["pk_commande"]
+    assert postgresql["commande"]["index_bytes"] > 0
+    assert mysql["produit"]["rows_source"] == "défaut"
+
+
+def test_row_bytes_grows_with_columns():
+    """Une colonne de plus élargit la ligne de sa taille estimée."""
+    mpd = _mpd("mysql")
+    assert row_bytes(mpd.tables["produit"], "mysql") > row_bytes(mpd.tables["commande"], "mysql")
+
+
+def test_format_bytes():
+    """Unités lisibles."""
+    assert format_bytes(512) == "512 o"
+    assert format_bytes(1536) == "1.5 Ko"
+    assert format_bytes(3 * 1024 ** 3) == "3.0 Go"
+
+
+def test_service_volumetry_uses_canvas_hints():
+    """mcd_service.volumetry : estimations du canvas, remplacées par celles de la requête."""
+    canvas = {
+        "entities": [
+            {"name": "Client", "estimated_rows": 200, "attributes": [
+                {"name": "id", "type": "INTEGER", "is_primary_key": True}, {"name": "nom", "type": "VARCHAR(80)"},
+            ]},
+        ],
+    }
+    assert _tables(mcd_service.volumetry(canvas, "sqlite"))["client"]["rows"] == 200
+    assert _tables(mcd_service.volumetry(canvas, "sqlite", rows={"Client": 5}))["client"]["rows"] == 5
+    with pytest.raises(ValueError):
+        mcd_service.volumetry(canvas, "oracle")
@@ -0,0 +1,456 @@
+"""
+Génération de données de test à partir du MPD, pour les tests de charge.
+
+Nombre de lignes par table : views.volumetry.resolve_table_rows (estimations par entité, fan-out
+par association, valeur par défaut). Les tables sont produites dans l'ordre topologique des clés
+étrangères (tables référencées d'abord) ; une clé étrangère prise dans un cycle est signalée dans
+notes (chargement avec contraintes désactivées).
+
+Valeurs générées colonne par colonne, par lots de BATCH_ROWS lignes, avec NumPy (importé à la
+première utilisation) : la mémoire est bornée par la taille d'un lot, quel que soit le volume.
+- Clés (colonnes de clé primaire ou d'unicité) : fonction injective du numéro de ligne (1, 2...,
+  « colonne_1 »...), donc uniques et recalculables sans conserver la table.
+- Clés étrangères : clé de la ligne parente recalculée à partir de son numéro, ce qui garantit
+  l'intégrité référentielle sans relire les parents. Cardinalités de l'association (convention de
+  ModelConverter : la clé étrangère est portée par l'entité de cardinalité x,n) :
+  - deux cardinalités x,1 (un-à-un), ou clé étrangère qui forme seule une clé (uk_<enfant>_parent
+    de l'héritage) : un parent distinct par ligne (lignes limitées au nombre de parents) ;
+  - cardinalité 1,x côté référencé : chaque parent reçoit au moins une ligne (sauf si une limite
+    ci-dessus l'interdit : le DDL prime) ;
+  - clé étrangère nullable (porteur 0,n) : NULL dans NULL_RATIO des lignes ;
+  - table de liaison (clé primaire faite de clés étrangères) : couples distincts, chaque occurrence
+    de la première entité liée à fan-out occurrences de la seconde ; association réflexive (clé sur
+    une seule colonne) : une valeur distincte par ligne, signalée dans notes.
+- Autres colonnes : valeurs aléatoires du type (entiers, décimaux, dates, chaînes tronquées à la
+  taille déclarée), NULL dans NULL_RATIO des lignes si la colonne l'accepte.
+
+Sorties en flux : iter_sql / write_sql (INSERT multi-lignes pour tous les SGBD, COPY ... FROM STDIN
+pour PostgreSQL) et write_csv (un CSV par table et un script de chargement : LOAD DATA INFILE,
+\\copy, BULK INSERT ou .import selon le SGBD).
+
+Configuration : BARREL_DATAGEN_BATCH_ROWS, BARREL_DATAGEN_NULL_RATIO, BARREL_DATAGEN_INSERT_ROWS.
+"""
+
+import csv
+import io
+import math
+import os
+import re
+import zlib
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from views.model_ir import Column, Mpd
+from views.volumetry import resolve_table_rows
+
+BATCH_ROWS = int(os.environ.get("BARREL_DATAGEN_BATCH_ROWS", "10000"))
+NULL_RATIO = float(os.environ.get("BARREL_DATAGEN_NULL_RATIO", "0.05"))
+# SQL Server limite une clause VALUES à 1000 lignes
+INSERT_ROWS = int(os.environ.get("BARREL_DATAGEN_INSERT_ROWS", "1000"))
+
+SQL_FORMATS = ("insert", "copy")
+# Multiplicateur de Knuth (premier) : permutation / répartition pseudo-aléatoire déterministe des numéros de ligne
+_MIX = 2654435761
+# Décalage entre les deux colonnes d'une table de liaison
+_PAIR_STRIDE = 7919
+_DATE_ORIGIN = "2020-01-01"
+_DATE_SPAN_DAYS = 5 * 365
+_TYPE_RE = re.compile(r"^\s*([A-Z0-9_]+)(?:\s+VARYING)?\s*(?:\(\s*(\w+)\s*(?:,\s*(\d+)\s*)?\))?")
+_KINDS = {
+    "TINYINT": "int", "SMALLINT": "int", "MEDIUMINT": "int", "INT": "int", "INTEGER": "int", "BIGINT": "int",
+    "SERIAL": "int", "BIGSERIAL": "int",
+    "DECIMAL": "decimal", "NUMERIC": "decimal", "NUMBER": "decimal", "MONEY": "decimal",
+    "FLOAT": "float", "REAL": "float", "DOUBLE": "float",
+    "BOOLEAN": "bool", "BOOL": "bool", "BIT": "bool",
+    "DATE": "date", "DATETIME": "datetime", "DATETIME2": "datetime", "TIMESTAMP": "datetime",
+    "SMALLDATETIME": "datetime", "TIME": "time", "UUID": "uuid", "UNIQUEIDENTIFIER": "uuid",
+}
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("La génération de données de test nécessite NumPy (pip install numpy).") from e
+    return numpy
+
+
+def _column_kind(type_str: str) -> Tuple[str, Optional[int], int]:
+    """(genre de valeur, taille ou précision, échelle) d'un type SQL traduit."""
+    match = _TYPE_RE.match((type_str or "").upper())
+    if not match:
+        return "text", None, 0
+    base, arg1, arg2 = match.groups()
+    size = int(arg1) if arg1 and arg1.isdigit() else None
+    kind = _KINDS.get(base, "text")
+    if kind == "decimal":
+        return kind, size or 10, int(arg2) if arg2 else (2 if size is None else 0)
+    return kind, size, 0
+
+
+def _cardinality(value: str) -> Tuple[str, str]:
+    """(minimum, maximum) d'une cardinalité « 0,n », « 1,1 »..."""
+    parts = [p.strip() for p in str(value or "1,n").lower().split(",")]
+    return (parts[0], parts[-1]) if len(parts) == 2 else ("1", "n")
+
+
+class _ForeignKeyPlan:
+    """Colonne de clé étrangère : table parente et correspondance numéro de ligne → numéro de ligne parente."""
+
+    __slots__ = ("column", "parent", "parent_column", "mode", "nullable", "salt")
+
+    def __init__(self, column: str, parent: str, parent_column: str, mode: str, nullable: bool, salt: int):
+        self.column = column
+        self.parent = parent
+        self.parent_column = parent_column
+        self.mode = mode  # random, unique, cover, self, pair_first, pair_second
+        self.nullable = nullable
+        self.salt = salt
+
+
+class DataGenerator:
+    """
+    Données de test d'un MPD (voir le docstring du module). mcd : MCD au format ModelConverter
+    (cardinalités des associations) ; rows / fanout / default_rows : comme views.volumetry.
+    """
+
+    def __init__(self, mpd, mcd: Optional[Dict] = None, rows: Optional[Dict[str, float]] = None,
+                 fanout: Optional[Dict[str, float]] = None, default_rows: Optional[int] = None, seed: int = 0):
+        self.np = _numpy()
+        self.mpd = mpd if isinstance(mpd, Mpd) else Mpd.from_dict(mpd)
+        self.dbms = self.mpd.dbms
+        self.seed = seed
+        self.notes: List[str] = []
+        resolved = resolve_table_rows(self.mpd, mcd, rows, fanout, default_rows)
+        self.rows = {name: max(0, int(count)) for name, (count, _) in resolved.items()}
+        self.sources = {name: source for name, (_, source) in resolved.items()}
+        self._key_columns: Dict[str, set] = {name: set(t.primary_key) for name, t in self.mpd.tables.items()}
+        # Colonnes formant à elles seules une clé (clé primaire ou contrainte d'unicité d'une seule colonne)
+        self._single_keys: Dict[str, set] = {name: set(t.primary_key) if len(set(t.primary_key)) == 1 else set()
+                                             for name, t in self.mpd.tables.items()}
+        for constraint in self.mpd.constraints:
+            if constraint.get("table") in self._key_columns:
+                columns = set(constraint.get("columns") or ())
+                self._key_columns[constraint.get("table")].update(columns)
+                if len(columns) == 1:
+                    self._single_keys[constraint.get("table")].update(columns)
+        self._plans: Dict[str, Dict[str, _ForeignKeyPlan]] = {name: {} for name in self.mpd.tables}
+        self._pair_width: Dict[str, int] = {}
+        self._plan_foreign_keys(self._cardinalities(mcd))
+        self.order = self._topological_order()
+        # Parents avant enfants : le nombre de lignes d'une table parente est définitif quand on ajuste l'enfant
+        for name in self.order:
+            self._limit_rows(name)
+
+    # --- Plan ---
+
+    @staticmethod
+    def _cardinalities(mcd: Optional[Dict]) -> Dict[Tuple[str, str], Tuple[str, str]]:
+        """(table porteuse, table référencée) → (cardinalité côté porteur, cardinalité côté référencé)."""
+        cards = {}
+        for association in (mcd or {}).get("associations", []):
+            entity1, entity2 = association["entity1"].lower(), association["entity2"].lower()
+            card1, card2 = association.get("cardinality1", "1,1"), association.get("cardinality2", "0,n")
+            cards.setdefault((entity1, entity2), (card1, card2))
+            cards.setdefault((entity2, entity1), (card2, card1))
+        return cards
+
+    def _plan_foreign_keys(self, cardinalities: Dict[Tuple[str, str], Tuple[str, str]]) -> None:
+        by_table: Dict[str, List] = {}
+        for fk in self.mpd.foreign_keys:
+            if fk.get("table") in self.mpd.tables and fk.get("referenced_table") in self.mpd.tables:
+                by_table.setdefault(fk.get("table"), []).append(fk)
+        for name, fks in by_table.items():
+            table = self.mpd.tables[name]
+            plans = self._plans[name]
+            for salt, fk in enumerate(fks, 1):
+                column = table.column(fk.get("column"))
+                if column is None or fk.get("column") in plans:
+                    continue
+                parent = fk.get("referenced_table")
+                holder_card, parent_card = cardinalities.get((name, parent), ("0,n", "0,n"))
+                if parent == name:
+                    mode = "self"
+                elif column.name in self._single_keys[name]:
+                    mode = "unique"  # clé étrangère unique (ex. uk_<enfant>_parent de l'héritage) : un parent par ligne
+                elif _cardinality(holder_card)[1] == "1" and _cardinality(parent_card)[1] == "1":
+                    mode = "unique"
+                elif _cardinality(parent_card)[0] == "1":
+                    mode = "cover"
+                else:
+                    mode = "random"
+                # Nullabilité décidée par ModelConverter (porteur 0,n) ; jamais NULL dans une clé
+                nullable = column.get("nullable", True) and column.name not in self._key_columns[name]
+                parent_column = fk.get("referenced_column") or "id"
+                parent_pk = self.mpd.tables[parent].primary_key
+                if self.mpd.tables[parent].column(parent_column) is None and len(parent_pk) == 1:
+                    parent_column = parent_pk[0]  # ModelConverter référence « id » même si la clé s'appelle code
+                plans[column.name] = _ForeignKeyPlan(column.name, parent, parent_column, mode, nullable, salt)
+            # Table de liaison : couples distincts sur les deux premières colonnes de la clé primaire
+            pk = table.primary_key
+            if len(pk) >= 2 and all(c in plans for c in pk):
+                if plans[pk[0]] is plans[pk[1]]:
+                    # Association réflexive : les deux colonnes de la clé portent le même nom, une seule colonne générée
+                    self.notes.append(f"{name} : clé {', '.join(pk)} sur une seule colonne (association réflexive), "
+                                      f"pas de couples distincts")
+                else:
+                    plans[pk[0]].mode, plans[pk[1]].mode = "pair_first", "pair_second"
+
+    def _limit_rows(self, name: str) -> None:
+        """Ajuste le nombre de lignes de la table aux cardinalités de ses clés étrangères."""
+        plans = self._plans[name]
+        # Minimums de cardinalité d'abord : les plafonds (unicité, couples distincts), imposés par le DDL, priment
+        for plan in plans.values():
+            parents = self.rows[plan.parent]
+            if plan.mode == "cover" and self.rows[name] < parents:
+                self.notes.append(f"{name} : {self.rows[name]} lignes portées à {parents} (cardinalité 1,n de {plan.parent})")
+                self.rows[name] = parents
+        for plan in plans.values():
+            parents = self.rows[plan.parent]
+            if plan.mode == "unique" and self.rows[name] > parents:
+                self.notes.append(f"{name} : {self.rows[name]} lignes ramenées à {parents} (un-à-un avec {plan.parent})")
+                self.rows[name] = parents
+        pk = self.mpd.tables[name].primary_key
+        if len(pk) >= 2 and plans.get(pk[0]) is not None and plans[pk[0]].mode == "pair_first":
+            parents1, parents2 = self.rows[plans[pk[0]].parent], self.rows[plans[pk[1]].parent]
+            if self.rows[name] > parents1 * parents2:
+                self.notes.append(f"{name} : {self.rows[name]} lignes ramenées à {parents1 * parents2} couples distincts")
+                self.rows[name] = parents1 * parents2
+            self._pair_width[name] = max(1, min(parents2, math.ceil(self.rows[name] / max(parents1, 1))))
+
+    def _topological_order(self) -> List[str]:
+        """Tables référencées avant les tables qui les référencent (ordre du MPD à égalité)."""
+        pending = {name: {p.parent for p in plans.values() if p.parent != name} for name, plans in self._plans.items()}
+        order: List[str] = []
+        while pending:
+            ready = [name for name, parents in pending.items() if not parents - set(order)]
+            if not ready:
+                name = next(iter(pending))
+                self.notes.append(f"cycle de clés étrangères : {name} chargée avant "
+                                  f"{', '.join(sorted(pending[name] - set(order)))} (contraintes à désactiver)")
+                ready = [name]
+            for name in ready:
+                order.append(name)
+                del pending[name]
+        return order
+
+    def plan(self) -> List[Dict]:
+        """Tables dans l'ordre de chargement : lignes, origine de l'estimation."""
+        return [{"table": name, "rows": self.rows[name], "rows_source": self.sources[name]} for name in self.order]
+
+    # --- Valeurs ---
+
+    def _parent_index(self, name: str, plan: _ForeignKeyPlan, idx):
+        """Numéros des lignes parentes (déterministes) pour les numéros de ligne idx."""
+        np = self.np
+        parents = max(self.rows[plan.parent], 1)
+        if plan.mode == "unique":
+            return (idx * _MIX) % parents
+        if plan.mode == "pair_first":
+            return idx // self._pair_width[name]
+        if plan.mode == "pair_second":
+            width = self._pair_width[name]
+            return ((idx // width) * _PAIR_STRIDE + idx % width) % parents
+        if plan.mode == "self":
+            # Ligne déjà produite (ou elle-même pour la première)
+            return (idx * _MIX + plan.salt) % np.maximum(idx, 1)
+        scattered = (idx * _MIX + plan.salt * _PAIR_STRIDE) % parents
+        if plan.mode == "cover":
+            return np.where(idx < parents, idx, scattered)
+        return scattered
+
+    def _key_values(self, name: str, column_name: str, idx, depth: int = 0):
+        """Valeurs d'une colonne de clé pour les numéros de ligne idx (clé parente pour une clé étrangère)."""
+        plan = self._plans.get(name, {}).get(column_name)
+        if plan is not None and depth < 8:
+            return self._key_values(plan.parent, plan.parent_column, self._parent_index(name, plan, idx), depth + 1)
+        column = self.mpd.tables[name].column(column_name)
+        kind, size, scale = _column_kind(column.type if column is not None else "INTEGER")
+        np = self.np
+        number = idx + 1
+        if kind in ("int", "float", "bool"):
+            return number
+        if kind == "decimal":
+            return np.char.mod(f"%.{scale}f", number.astype(float))
+        if kind == "date":
+            return np.datetime_as_string(np.datetime64(_DATE_ORIGIN) + number.astype("timedelta64[D]"))
+        if kind == "datetime":
+            return self._datetime_text(number)
+        if kind == "time":
+            return self._time_text(number % 86400)
+        if kind == "uuid":
+            return np.array([f"{n:032x}" for n in number.tolist()])
+        digits = number.astype(str)
+        prefix = f"{column_name}_"
+        if size and size < len(prefix) + 10:
+            return digits
+        return np.char.add(prefix, digits)
+
+    def _datetime_text(self, seconds):
+        np = self.np
+        values = np.datetime64(f"{_DATE_ORIGIN}T00:00:00") + seconds.astype("timedelta64[s]")
+        return np.char.replace(np.datetime_as_string(values), "T", " ")
+
+    def _time_text(self, seconds):
+        np = self.np
+        values = np.datetime64("1970-01-01T00:00:00") + seconds.astype("timedelta64[s]")
+        return np.array([text[11:] for text in np.datetime_as_string(values).tolist()])
+
+    def _random_values(self, column: Column, count: int, rng):
+        np = self.np
+        kind, size, scale = _column_kind(column.type)
+        if kind == "int":
+            return rng.integers(1, 1000000, count)
+        if kind == "decimal":
+            integer_digits = max(0, min((size or 10) - scale, 9))
+            values = rng.integers(0, 10 ** integer_digits, count) + rng.random(count)
+            return np.char.mod(f"%.{scale}f", values)
+        if kind == "float":
+            return np.round(rng.random(count) * 1000, 4)
+        if kind == "bool":
+            flags = rng.integers(0, 2, count)
+            return np.where(flags == 1, "true", "false") if self.dbms == "postgresql" else flags
+        if kind == "date":
+            days = rng.integers(0, _DATE_SPAN_DAYS, count)
+            return np.datetime_as_string(np.datetime64(_DATE_ORIGIN) + days.astype("timedelta64[D]"))
+        if kind == "datetime":
+            return self._datetime_text(rng.integers(0, _DATE_SPAN_DAYS * 86400, count))
+        if kind == "time":
+            return self._time_text(rng.integers(0, 86400, count))
+        if kind == "uuid":
+            high, low = rng.integers(0, 2 ** 63, count), rng.integers(0, 2 ** 63, count)
+            return np.array([f"{h:016x}{l:016x}" for h, l in zip(high.tolist(), low.tolist())])
+        values = np.char.add(f"{column.name} ", rng.integers(0, 1000000, count).astype(str))
+        return values.astype(f"U{size}") if size else values
+
+    def columns(self, name: str) -> List[str]:
+        return [c.name for c in self.mpd.tables[name].columns]
+
+    def iter_batches(self, name: str, null=None) -> Iterator[List[tuple]]:
+        """Lignes de la table par lots de BATCH_ROWS (tuples dans l'ordre des colonnes, null pour NULL)."""
+        np = self.np
+        table = self.mpd.tables[name]
+        plans = self._plans[name]
+        keys = self._key_columns[name]
+        # Graine propre à la table : mêmes données quel que soit l'ordre ou le sous-ensemble produit
+        rng = np.random.default_rng([self.seed, zlib.crc32(name.encode("utf-8"))])
+        total = self.rows[name]
+        for start in range(0, total, BATCH_ROWS):
+            idx = np.arange(start, min(start + BATCH_ROWS, total), dtype=np.int64)
+            count = len(idx)
+            values = []
+            for column in table.columns:
+                plan = plans.get(column.name)
+                if plan is not None or column.name in keys:
+                    data = self._key_values(name, column.name, idx).tolist()
+                    nullable = plan is not None and plan.nullable
+                else:
+                    data = self._random_values(column, count, rng).tolist()
+                    nullable = column.get("nullable", True)
+                if nullable and NULL_RATIO > 0:
+                    for i in np.flatnonzero(rng.random(count) < NULL_RATIO).tolist():
+                        data[i] = null
+                values.append(data)
+            yield list(zip(*values))
+
+    # --- Sorties ---
+
+    def _identity_columns(self, name: str) -> List[str]:
+        return [c.name for c in self.mpd.tables[name].columns if "IDENTITY" in (c.type or "").upper()
+                or (c.type or "").upper().startswith(("SERIAL", "BIGSERIAL"))]
+
+    @staticmethod
+    def _sql_literal(value) -> str:
+        if value is None:
+            return "NULL"
+        if isinstance(value, (int, float)):
+            return repr(value)
+        return "'" + str(value).replace("'", "''") + "'"
+
+    @staticmethod
+    def _csv_text(rows: List[tuple]) -> str:
+        """Lignes CSV (None écrit en champ vide)."""
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue()
+
+    def iter_sql(self, fmt: str = "insert", tables: Optional[List[str]] = None) -> Iterator[str]:
+        """
+        Script de chargement en flux (morceaux de texte, un par lot) :
+        fmt = "insert" (INSERT multi-lignes de INSERT_ROWS lignes) ou "copy" (COPY ... FROM STDIN, PostgreSQL).
+        Format vérifié à l'appel, pas pendant l'itération.
+        """
+        if fmt not in SQL_FORMATS:
+            raise ValueError(f"Format non supporté : {fmt} (attendu : {', '.join(SQL_FORMATS)}).")
+        if fmt == "copy" and self.dbms != "postgresql":
+            raise ValueError("Le format copy (COPY ... FROM STDIN) est propre à PostgreSQL.")
+        return self._iter_sql(fmt, tables or self.order)
+
+    def _iter_sql(self, fmt: str, tables: List[str]) -> Iterator[str]:
+        for name in tables:
+            columns = ", ".join(self.columns(name))
+            identity = self._identity_columns(name)
+            yield f"-- {name} : {self.rows[name]} lignes\n"
+            if identity and self.dbms == "sqlserver":
+                yield f"SET IDENTITY_INSERT {name} ON;\n"
+            if fmt == "copy":
+                yield f"COPY {name} ({columns}) FROM STDIN WITH (FORMAT csv);\n"
+            for batch in self.iter_batches(name):
+                if fmt == "copy":
+                    yield self._csv_text(batch)
+                    continue
+                parts = []
+                for i in range(0, len(batch), INSERT_ROWS):
+                    values = ",\n".join(
+                        "(" + ", ".join(self._sql_literal(v) for v in row) + ")" for row in batch[i:i + INSERT_ROWS]
+                    )
+                    parts.append(f"INSERT INTO {name} ({columns}) VALUES\n{values};\n")
+                yield "".join(parts)
+            if fmt == "copy":
+                yield "\\.\n"
+            if identity and self.dbms == "sqlserver":
+                yield f"SET IDENTITY_INSERT {name} OFF;\n"
+            if identity and self.dbms == "postgresql" and self.rows[name]:
+                # Valeurs explicites : la séquence repart après la dernière clé chargée
+                yield "".join(f"SELECT setval(pg_get_serial_sequence('{name}', '{c}'), {self.rows[name]});\n"
+                              for c in identity)
+
+    def write_sql(self, out: TextIO, fmt: str = "insert", tables: Optional[List[str]] = None) -> int:
+        """Écrit le script de chargement dans out au fil de la génération. Retourne le nombre de caractères écrits."""
+        written = 0
+        for chunk in self.iter_sql(fmt, tables):
+            out.write(chunk)
+            written += len(chunk)
+        return written
+
+    def _load_statement(self, name: str, path: str) -> str:
+        columns = ", ".join(self.columns(name))
+        if self.dbms == "mysql":
+            return (f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {name} CHARACTER SET utf8mb4 "
+                    f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' "
+                    f"IGNORE 1 LINES ({columns});")
+        if self.dbms == "postgresql":
+            return f"\\copy {name} ({columns}) FROM '{path}' WITH (FORMAT csv, HEADER true)"
+        if self.dbms == "sqlserver":
+            options = "FORMAT = 'CSV', FIRSTROW = 2, TABLOCK" + (", KEEPIDENTITY" if self._identity_columns(name) else "")
+            return f"BULK INSERT {name} FROM '{path}' WITH ({options});"
+        return f".import --csv --skip 1 {path} {name}"
+
+    def write_csv(self, directory: str, tables: Optional[List[str]] = None) -> Dict[str, str]:
+        """
+        Un fichier <table>.csv par table (en-tête, NULL = \\N pour MySQL, champ vide sinon) et load.sql,
+        script de chargement du SGBD dans l'ordre des clés étrangères. Retourne {table: chemin}.
+        """
+        os.makedirs(directory, exist_ok=True)
+        null = "\\N" if self.dbms == "mysql" else None
+        paths = {}
+        for name in tables or self.order:
+            path = os.path.join(directory, f"{name}.csv")
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(self._csv_text([tuple(self.columns(name))]))
+                for batch in self.iter_batches(name, null):
+                    f.write(self._csv_text(batch))
+            paths[name] = path
+        with open(os.path.join(directory, "load.sql"), "w", encoding="utf-8") as f:
+            for name in paths:
+                f.write(self._load_statement(name, f"{name}.csv") + "\n")
+        return paths
@@ -0,0 +1,451 @@
+"""
+Lecture rapide du DDL d'un dump SQL (rétro-conception), sans arbre de jetons sqlparse.
+
+- DdlStatementSplitter découpe le script en instructions au fil des morceaux reçus (feed / close) :
+  une seule expression régulière consomme le texte en sautant littéraux ('...', "...", `...`,
+  $tag$...$tag$) et commentaires (--, /* */). Seules les instructions CREATE TABLE et ALTER TABLE
+  sont conservées ; le texte des autres (INSERT de données, vues, fonctions...) est jeté au fur et
+  à mesure : la mémoire reste bornée par la plus grande instruction DDL (ou le plus grand littéral).
+  Les données d'un COPY ... FROM stdin (pg_dump) sont sautées jusqu'à la ligne « \\. ».
+- parse_create_table / parse_alter_table analysent une instruction conservée.
+- DdlSchema accumule tables, clés primaires, unicités et clés étrangères ; scan_ddl enchaîne le tout.
+
+Dialectes visés : MySQL / MariaDB (mysqldump), PostgreSQL (pg_dump), SQLite, SQL Server.
+Les littéraux suivent la convention MySQL (antislash d'échappement) ; '' est traité comme deux
+littéraux contigus, ce qui donne le même découpage.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Taille des blocs lus dans un fichier par iter_ddl_statements
+READ_BLOCK_SIZE = 1 << 20
+
+# Corps d'instruction : tout sauf « ; » hors littéraux / commentaires. S'arrête sur « ; » ou sur
+# un littéral / commentaire non terminé (suite dans le prochain morceau).
+_BODY_RE = re.compile(r"""(?:
+      [^;'"`$/\-]+
+    | '[^'\\]*(?:\\.[^'\\]*)*'
+    | "[^"\\]*(?:\\.[^"\\]*)*"
+    | `[^`]*`
+    | --[^\n]*\n
+    | /\*.*?\*/
+    | \$([A-Za-z_]*)\$.*?\$\1\$
+    | /(?!\*)
+    | -(?!-)
+    | \$(?![A-Za-z_]*\$)
+)*""", re.S | re.X)
+
+# Début possible d'un jeton coupé en fin de morceau (« - » de --, « / » de /*, $tag de $tag$)
+_PARTIAL_TAIL_RE = re.compile(r"(?:[-/]|\$[A-Za-z_]*)\Z")
+
+# Blancs et commentaires en tête d'instruction
+_LEADING_RE = re.compile(r"(?:\s+|--[^\n]*(?:\n|\Z)|/\*.*?\*/)*", re.S)
+_DDL_HEAD_RE = re.compile(
+    r"(?:CREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:GLOBAL|LOCAL)\s+)?(?:TEMP(?:ORARY)?\s+|UNLOGGED\s+)?TABLE"
+    r"|ALTER\s+TABLE)\b",
+    re.I,
+)
+# COPY ... FROM stdin (pg_dump) : les lignes de données qui suivent, sans « ; », vont jusqu'à « \. »
+_COPY_HEAD_RE = re.compile(r"COPY\b", re.I)
+_COPY_STDIN_RE = re.compile(r"COPY\b.*\bFROM\s+STDIN\b", re.I | re.S)
+_COPY_END = "\n\\."
+# Caractères significatifs nécessaires pour trancher garder / jeter
+_HEAD_DECISION_SIZE = 40
+
+# Littéraux et commentaires (pour retirer les commentaires d'une instruction conservée)
+_LITERAL_OR_COMMENT_RE = re.compile(
+    r"""'[^'\\]*(?:\\.[^'\\]*)*'|"[^"\\]*(?:\\.[^"\\]*)*"|`[^`]*`|\[[^\]]*\]|(--[^\n]*|/\*.*?\*/)""",
+    re.S,
+)
+_IDENT = r"""(?:"(?:[^"]|"")+"|`(?:[^`]|``)+`|\[[^\]]+\]|[^\s(),;."`\[]+)"""
+_QUALIFIED_RE = re.compile(rf"\s*({_IDENT}(?:\s*\.\s*{_IDENT})*)")
+_CREATE_RE = re.compile(
+    r"\s*CREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:GLOBAL|LOCAL)\s+)?(?:TEMP(?:ORARY)?\s+|UNLOGGED\s+)?TABLE\s+"
+    r"(?:IF\s+NOT\s+EXISTS\s+)?",
+    re.I,
+)
+_ALTER_RE = re.compile(r"\s*ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?", re.I)
+_TABLE_CONSTRAINT_RE = re.compile(
+    rf"(?:CONSTRAINT\s+{_IDENT}\s*)?"
+    r"(PRIMARY\s+KEY|FOREIGN\s+KEY|UNIQUE(?:\s+(?:KEY|INDEX))?|CHECK|EXCLUDE"
+    r"|(?:FULLTEXT\s+|SPATIAL\s+)?(?:KEY|INDEX))\b",
+    re.I,
+)
+# Suite d'une contrainte de table : nom / options éventuels puis « ( » d'une liste de colonnes
+# (écarte les colonnes nommées key, index, check... suivies d'un type comme VARCHAR(10))
+_CONSTRAINT_BODY_RE = re.compile(
+    rf"\s*(?:(?:CLUSTERED|NONCLUSTERED|USING\s+\w+)\s*)*(?:{_IDENT}\s*)?(?:USING\s+\w+\s*)?\(\s*(?![\d'])",
+    re.I,
+)
+_CONSTRAINT_NAME_RE = re.compile(rf"CONSTRAINT\s+({_IDENT})", re.I)
+_REFERENCES_RE = re.compile(rf"REFERENCES\s+({_IDENT}(?:\s*\.\s*{_IDENT})*)\s*(\([^)]*\))?", re.I)
+# Fin du type d'une colonne : premier mot-clé de contrainte
+_COLUMN_OPTION_RE = re.compile(
+    r"\b(?:NOT\s+NULL|NULL|DEFAULT|PRIMARY\s+KEY|UNIQUE|REFERENCES|CHECK|CONSTRAINT|AUTO_INCREMENT"
+    r"|AUTOINCREMENT|IDENTITY|GENERATED|COLLATE|CHARACTER\s+SET|CHARSET|COMMENT|ON\s+UPDATE)\b",
+    re.I,
+)
+_DEFAULT_RE = re.compile(r"\bDEFAULT\s+('(?:[^'\\]|\\.|'')*'|\([^)]*\)|[^\s,]+)", re.I)
+_AUTO_INCREMENT_RE = re.compile(r"\b(?:AUTO_INCREMENT|AUTOINCREMENT|IDENTITY|GENERATED\s+\w+(?:\s+\w+)?\s+AS\s+IDENTITY)\b", re.I)
+
+
+class DdlStatementSplitter:
+    """
+    Découpe un script SQL en instructions CREATE TABLE / ALTER TABLE, morceau par morceau.
+    feed(texte) et close() renvoient les instructions terminées (texte brut, sans le « ; »).
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._parts: List[str] = []
+        self._keep: Optional[bool] = None  # None : début d'instruction pas encore tranché
+        self._copy_data = False  # dans les données d'un COPY ... FROM stdin
+        self.statements = 0  # instructions vues (conservées ou non)
+        self.kept = 0
+
+    def feed(self, data: str) -> List[str]:
+        return self._scan(self._pending + data, final=False)
+
+    def close(self) -> List[str]:
+        out = self._scan(self._pending, final=True)
+        if self._parts or self._keep is False:  # dernière instruction sans « ; »
+            statement = self._finish()
+            if statement is not None:
+                out.append(statement)
+        return out
+
+    def _scan(self, text: str, final: bool) -> List[str]:
+        out = []
+        pos, n = 0, len(text)
+        while pos < n:
+            if self._copy_data:
+                end = text.find(_COPY_END, pos)
+                if end < 0:
+                    # Données jetées, sauf un « \n\ » de fin possiblement coupé
+                    pos = n if final else max(pos, n - len(_COPY_END) + 1)
+                    break
+                self._copy_data = False
+                pos = end + len(_COPY_END)
+                continue
+            end = _BODY_RE.match(text, pos).end()
+            if end < n and text[end] == ";":
+                self._take(text, pos, end)
+                statement = self._finish()
+                if statement is not None:
+                    out.append(statement)
+                pos = end + 1
+                continue
+            if end == n and not final:
+                tail = _PARTIAL_TAIL_RE.search(text, max(pos, end - 64))
+                if tail is not None:
+                    end = tail.start()
+            elif end < n and final:
+                end = n  # littéral / commentaire jamais fermé : gardé tel quel
+            self._take(text, pos, end)
+            pos = end
+            break
+        self._pending = text[pos:]
+        return out
+
+    def _take(self, text: str, start: int, end: int) -> None:
+        if self._keep is False or start == end:
+            return
+        self._parts.append(text[start:end])
+        if self._keep is None:
+            self._decide()
+
+    def _decide(self) -> None:
+        head = "".join(self._parts)
+        self._parts = [head]
+        start = _LEADING_RE.match(head).end()
+        if len(head) - start >= _HEAD_DECISION_SIZE:
+            self._keep = _DDL_HEAD_RE.match(head, start) is not None or _COPY_HEAD_RE.match(head, start) is not None
+            if not self._keep:
+                self._parts = []
+
+    def _finish(self) -> Optional[str]:
+        statement = "".join(self._parts) if self._keep is not False else ""
+        keep = self._keep
+        self._parts, self._keep = [], None
+        start = _LEADING_RE.match(statement).end()
+        if start == len(statement) and keep is not False:
+            return None  # instruction vide (« ;; ») ou commentaire seul
+        self.statements += 1
+        if keep is not False and _COPY_HEAD_RE.match(statement, start):
+            self._copy_data = _COPY_STDIN_RE.match(statement, start) is not None
+            return None
+        if keep is None:
+            keep = _DDL_HEAD_RE.match(statement, start) is not None
+        if not keep:
+            return None
+        self.kept += 1
+        return statement
+
+
+def iter_ddl_statements(source: Union[str, Iterable[str]], splitter: Optional[DdlStatementSplitter] = None) -> Iterator[str]:
+    """Instructions CREATE / ALTER TABLE d'un script (texte, fichier texte ouvert, ou itérable de morceaux)."""
+    splitter = splitter or DdlStatementSplitter()
+    if isinstance(source, str):
+        chunks: Iterable[str] = (source,)
+    elif hasattr(source, "read"):
+        chunks = iter(lambda: source.read(READ_BLOCK_SIZE), "")
+    else:
+        chunks = source
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.close()
+
+
+def strip_comments(statement: str) -> str:
+    """Retire les commentaires d'une instruction (littéraux préservés)."""
+    return _LITERAL_OR_COMMENT_RE.sub(lambda m: " " if m.group(1) else m.group(0), statement)
+
+
+def unquote(identifier: str) -> str:
+    """Nom sans guillemets / backquotes / crochets."""
+    identifier = identifier.strip()
+    if len(identifier) >= 2 and identifier[0] in "\"`[":
+        inner = identifier[1:-1]
+        return inner.replace('""', '"') if identifier[0] == '"' else inner.replace("``", "`")
+    return identifier
+
+
+def _table_name(qualified: str) -> str:
+    """Dernier élément d'un nom qualifié (schema.table → table)."""
+    parts = re.findall(_IDENT, qualified)
+    return unquote(parts[-1]) if parts else ""
+
+
+def _mask_literals(text: str) -> str:
+    """Même longueur, contenu des littéraux remplacé (les mots-clés n'y sont plus trouvés)."""
+    return _LITERAL_OR_COMMENT_RE.sub(lambda m: m.group(0)[0] + "_" * (len(m.group(0)) - 2) + m.group(0)[-1], text)
+
+
+def _matching_paren(text: str, start: int) -> int:
+    """Indice de la parenthèse fermante associée à text[start] == '(' (-1 si absente)."""
+    masked = _mask_literals(text)
+    depth = 0
+    for i in range(start, len(masked)):
+        c = masked[i]
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def split_top_level(text: str, sep: str = ",") -> List[str]:
+    """Découpe text sur sep hors parenthèses et littéraux."""
+    masked = _mask_literals(text)
+    parts, depth, last = [], 0, 0
+    for i, c in enumerate(masked):
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == sep and depth == 0:
+            parts.append(text[last:i])
+            last = i + 1
+    parts.append(text[last:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _column_list(text: str) -> List[str]:
+    """Noms d'une liste « (a, b(10), c DESC) »."""
+    text = text.strip()
+    if text.startswith("("):
+        text = text[1:text.rfind(")")] if ")" in text else text[1:]
+    names = []
+    for item in split_top_level(text):
+        m = _QUALIFIED_RE.match(item)
+        if m:
+            names.append(unquote(m.group(1)))
+    return names
+
+
+def _parse_references(text: str) -> Optional[Tuple[str, List[str]]]:
+    m = _REFERENCES_RE.search(text)
+    if not m:
+        return None
+    return _table_name(m.group(1)), _column_list(m.group(2) or "")
+
+
+def parse_column(definition: str) -> Optional[Dict]:
+    """Définition de colonne → {name, type, nullable, primary_key, unique, auto_increment, default, references}."""
+    m = _QUALIFIED_RE.match(definition)
+    if not m:
+        return None
+    name = unquote(m.group(1))
+    rest = definition[m.end():]
+    masked = _mask_literals(rest)
+    option = _COLUMN_OPTION_RE.search(masked)
+    type_end = option.start() if option else len(rest)
+    col_type = " ".join(re.sub(r"[\[\]\"`]", "", rest[:type_end]).split()).upper()
+    options = masked[type_end:].upper()
+    column = {
+        "name": name,
+        "type": col_type,
+        "nullable": "NOT NULL" not in options and "PRIMARY KEY" not in options,
+        "primary_key": "PRIMARY KEY" in options,
+        "unique": bool(re.search(r"\bUNIQUE\b", options)),
+        "auto_increment": bool(_AUTO_INCREMENT_RE.search(options)) or "SERIAL" in col_type,
+        "default": None,
+        "references": None,
+    }
+    default = _DEFAULT_RE.search(rest[type_end:])
+    if default:
+        value = default.group(1)
+        column["default"] = value[1:-1].replace("''", "'") if value.startswith("'") else value
+    if "REFERENCES" in options:
+        column["references"] = _parse_references(rest[type_end:])
+    return column
+
+
+def _parse_table_constraint(definition: str, kind: str) -> Optional[Dict]:
+    """Contrainte de table : {kind: primary_key|foreign_key|unique, name, columns[, referenced_table, referenced_columns]}."""
+    kind = " ".join(kind.upper().split())
+    name_match = _CONSTRAINT_NAME_RE.match(definition)
+    name = unquote(name_match.group(1)) if name_match else None
+    paren = definition.find("(")
+    if paren < 0:
+        return None
+    close = _matching_paren(definition, paren)
+    columns = _column_list(definition[paren:close + 1 if close > 0 else len(definition)])
+    if kind == "PRIMARY KEY":
+        return {"kind": "primary_key", "name": name, "columns": columns}
+    if kind.startswith("UNIQUE"):
+        return {"kind": "unique", "name": name, "columns": columns}
+    if kind == "FOREIGN KEY":
+        references = _parse_references(definition[close + 1:] if close > 0 else "")
+        if not references:
+            return None
+        return {"kind": "foreign_key", "name": name, "columns": columns,
+                "referenced_table": references[0], "referenced_columns": references[1]}
+    return None  # CHECK, index simples : sans effet sur le modèle
+
+
+def _parse_element(definition: str) -> Optional[Tuple[str, Dict]]:
+    """Élément de CREATE TABLE / ADD : ("constraint", ...) ou ("column", ...)."""
+    m = _TABLE_CONSTRAINT_RE.match(definition)
+    if m and _CONSTRAINT_BODY_RE.match(definition, m.end()):
+        constraint = _parse_table_constraint(definition, m.group(1))
+        return ("constraint", constraint) if constraint else None
+    column = parse_column(definition)
+    return ("column", column) if column else None
+
+
+def parse_create_table(statement: str) -> Optional[Dict]:
+    """CREATE TABLE → {name, columns, constraints} (None pour CREATE TABLE ... AS / LIKE)."""
+    statement = strip_comments(statement)
+    m = _CREATE_RE.match(statement)
+    if not m:
+        return None
+    name_match = _QUALIFIED_RE.match(statement, m.end())
+    if not name_match:
+        return None
+    paren = statement.find("(", name_match.end())
+    if paren < 0 or statement[name_match.end():paren].strip():
+        return None
+    close = _matching_paren(statement, paren)
+    body = statement[paren + 1:close if close > 0 else len(statement)]
+    table = {"name": _table_name(name_match.group(1)), "columns": [], "constraints": []}
+    for definition in split_top_level(body):
+        element = _parse_element(definition)
+        if element is not None:
+            table["columns" if element[0] == "column" else "constraints"].append(element[1])
+    return table
+
+
+def parse_alter_table(statement: str) -> Optional[Dict]:
+    """ALTER TABLE → {name, columns (ADD COLUMN), constraints (ADD CONSTRAINT)} ; autres actions ignorées."""
+    statement = strip_comments(statement)
+    m = _ALTER_RE.match(statement)
+    if not m:
+        return None
+    name_match = _QUALIFIED_RE.match(statement, m.end())
+    if not name_match:
+        return None
+    result = {"name": _table_name(name_match.group(1)), "columns": [], "constraints": []}
+    for action in split_top_level(statement[name_match.end():]):
+        add = re.match(r"ADD\s+(?:COLUMN\s+)?(?:IF\s+NOT\s+EXISTS\s+)?", action, re.I)
+        if not add:
+            continue
+        element = _parse_element(action[add.end():])
+        if element is not None:
+            result["columns" if element[0] == "column" else "constraints"].append(element[1])
+    return result
+
+
+class DdlSchema:
+    """
+    Schéma accumulé instruction par instruction.
+    tables : nom en minuscules → {name, columns, primary_key, unique} ; foreign_keys : liste de
+    {table, name, columns, referenced_table, referenced_columns} (tables en minuscules).
+    """
+
+    def __init__(self):
+        self.tables: Dict[str, Dict] = {}
+        self.foreign_keys: List[Dict] = []
+
+    def add_statement(self, statement: str) -> None:
+        head = _LEADING_RE.match(statement).end()
+        if statement[head:head + 6].upper() == "CREATE":
+            parsed = parse_create_table(statement)
+            if parsed:
+                self._table(parsed["name"], create=True)
+        else:
+            parsed = parse_alter_table(statement)
+        if not parsed:
+            return
+        table = self._table(parsed["name"])
+        for column in parsed["columns"]:
+            self._add_column(table, column)
+        for constraint in parsed["constraints"]:
+            self._add_constraint(table, constraint)
+
+    def _table(self, name: str, create: bool = False) -> Dict:
+        key = name.lower()
+        if create or key not in self.tables:
+            self.tables[key] = {"name": name, "columns": [], "primary_key": [], "unique": []}
+        return self.tables[key]
+
+    def _add_column(self, table: Dict, column: Dict) -> None:
+        references = column.pop("references", None)
+        table["columns"].append(column)
+        if column["primary_key"] and column["name"] not in table["primary_key"]:
+            table["primary_key"].append(column["name"])
+        if column["unique"]:
+            table["unique"].append([column["name"]])
+        if references:
+            self.foreign_keys.append({
+                "table": table["name"].lower(), "name": None, "columns": [column["name"]],
+                "referenced_table": references[0].lower(), "referenced_columns": references[1],
+            })
+
+    def _add_constraint(self, table: Dict, constraint: Dict) -> None:
+        if constraint["kind"] == "primary_key":
+            table["primary_key"] = list(constraint["columns"])
+            pk = {c.lower() for c in constraint["columns"]}
+            for column in table["columns"]:
+                if column["name"].lower() in pk:
+                    column["primary_key"], column["nullable"] = True, False
+        elif constraint["kind"] == "unique":
+            table["unique"].append(list(constraint["columns"]))
+        else:
+            self.foreign_keys.append({
+                "table": table["name"].lower(), "name": constraint["name"], "columns": constraint["columns"],
+                "referenced_table": constraint["referenced_table"].lower(),
+                "referenced_columns": constraint["referenced_columns"],
+            })
+
+
+def scan_ddl(source: Union[str, Iterable[str]]) -> Tuple[DdlSchema, DdlStatementSplitter]:
+    """Schéma d'un script SQL (texte, fichier ouvert ou morceaux) ; le splitter porte les compteurs."""
+    schema = DdlSchema()
+    splitter = DdlStatementSplitter()
+    for statement in iter_ddl_statements(source, splitter):
+        schema.add_statement(statement)
+    return schema, splitter
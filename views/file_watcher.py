@@ -0,0 +1,91 @@
+"""
+Surveillance des fichiers markdown pour le mode --watch du CLI.
+
+Deux implémentations d'un même contrat : wait() rend la main quand un changement est probable
+(ou au bout de l'intervalle), l'appelant compare ensuite l'état des fichiers (stat_snapshot)
+puis leur contenu. La détection reste donc exacte même si des événements sont perdus.
+- InotifyWatcher : inotify (Linux) via le paquet optionnel inotify_simple, réveil immédiat ;
+- PollingWatcher : repli portable, scrutation toutes les BARREL_WATCH_INTERVAL secondes.
+"""
+
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+WATCH_INTERVAL = float(os.environ.get("BARREL_WATCH_INTERVAL", "0.5"))
+# Regroupement des rafales d'événements d'une sauvegarde (écriture, renommage, attributs)
+DEBOUNCE_SECONDS = 0.05
+# Sans événement inotify, nouvel examen de l'arborescence (répertoires créés ou remplacés)
+INOTIFY_RESCAN_SECONDS = 5.0
+
+
+def stat_snapshot(paths: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+    """(mtime en ns, taille) par fichier ; les fichiers disparus entre-temps sont omis."""
+    snapshot = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        snapshot[path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+class PollingWatcher:
+    """Scrutation périodique : wait() dort interval secondes."""
+
+    kind = "polling"
+
+    def __init__(self, interval: float = WATCH_INTERVAL):
+        self.interval = interval
+
+    def wait(self) -> None:
+        time.sleep(self.interval)
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """inotify sur les répertoires surveillés et leurs sous-répertoires : wait() rend la main au premier événement."""
+
+    kind = "inotify"
+
+    def __init__(self, directories: List[str]):
+        from inotify_simple import INotify, flags
+        self._flags = flags
+        self._mask = (flags.CLOSE_WRITE | flags.MODIFY | flags.CREATE | flags.DELETE
+                      | flags.MOVED_TO | flags.MOVED_FROM | flags.DELETE_SELF)
+        self._directories = directories
+        self._inotify = INotify()
+        self._add_watches()
+
+    def _add_watches(self) -> None:
+        for directory in self._directories:
+            for root, dirs, _ in os.walk(directory):
+                try:
+                    self._inotify.add_watch(root, self._mask)
+                except OSError as e:
+                    logger.debug("inotify indisponible pour %s : %s", root, e)
+
+    def wait(self) -> None:
+        events = self._inotify.read(timeout=int(INOTIFY_RESCAN_SECONDS * 1000))
+        if events:
+            events += self._inotify.read(timeout=int(DEBOUNCE_SECONDS * 1000))
+        if not events or any(e.mask & self._flags.ISDIR for e in events):
+            self._add_watches()
+
+    def close(self) -> None:
+        self._inotify.close()
+
+
+def make_watcher(directories: List[str], interval: float = WATCH_INTERVAL):
+    """InotifyWatcher si inotify_simple est installé et inotify disponible, sinon PollingWatcher."""
+    try:
+        return InotifyWatcher(directories)
+    except (ImportError, OSError) as e:
+        logger.debug("inotify indisponible (%s), scrutation toutes les %ss", e, interval)
+        return PollingWatcher(interval)
@@ -0,0 +1,112 @@
+"""
+Planification des index secondaires du MPD.
+
+Candidats, pour chaque table :
+- une colonne de clé étrangère (jointures, contrôle des suppressions côté table référencée) ;
+- une colonne de recherche courante (nom, code, email...) ;
+- sur une table de liaison (clé primaire composée uniquement de clés étrangères), l'index
+  composite commençant par chaque colonne non initiale de la clé : la clé primaire ne sert
+  que les jointures depuis sa première colonne, cet index sert celles depuis les autres entités.
+
+Un candidat est écarté s'il est un préfixe (ou un doublon) de la clé primaire, d'une contrainte
+d'unicité ou d'un index retenu plus long : le SGBD s'en sert déjà, un index de plus ne coûterait
+qu'en écriture. Chaque décision (retenue ou non) porte sa justification.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from views.model_ir import Index, Mld, Table
+
+SEARCH_COLUMNS = ("nom", "name", "code", "email", "date_creation", "created_at")
+
+# Entrées de la planification d'une table : [(colonne FK, table référencée)], [colonnes d'unicité]
+TableIndexInputs = Tuple[Tuple[Tuple[str, str], ...], Tuple[Tuple[str, ...], ...]]
+_NO_INPUTS: TableIndexInputs = ((), ())
+
+
+class IndexDecision:
+    """Index candidat d'une table : retenu (kept) ou écarté, avec sa justification."""
+
+    __slots__ = ("table", "name", "columns", "kept", "reason")
+
+    def __init__(self, table: str, columns: Sequence[str], reason: str):
+        self.table = table
+        self.name = f"idx_{table}_{'_'.join(columns)}"
+        self.columns = list(columns)
+        self.kept = True
+        self.reason = reason
+
+    def index(self) -> Index:
+        return Index(name=self.name, columns=list(self.columns), type="BTREE", reason=self.reason)
+
+    def to_dict(self) -> Dict:
+        return {"table": self.table, "name": self.name, "columns": list(self.columns),
+                "kept": self.kept, "reason": self.reason}
+
+
+def table_index_inputs(mld: Mld) -> Dict[str, TableIndexInputs]:
+    """Clés étrangères et contraintes d'unicité de chaque table du MLD (MPD accepté)."""
+    foreign_keys: Dict[str, List[Tuple[str, str]]] = {}
+    uniques: Dict[str, List[Tuple[str, ...]]] = {}
+    for fk in mld.foreign_keys:
+        foreign_keys.setdefault(fk.get("table"), []).append((fk.get("column"), fk.get("referenced_table")))
+    for constraint in mld.constraints:
+        if constraint.get("columns"):
+            uniques.setdefault(constraint.get("table"), []).append(tuple(constraint.get("columns")))
+    return {
+        name: (tuple(foreign_keys.get(name, ())), tuple(uniques.get(name, ())))
+        for name in set(foreign_keys) | set(uniques)
+    }
+
+
+def _is_prefix(columns: Sequence[str], of: Sequence[str]) -> bool:
+    return len(columns) <= len(of) and list(of[:len(columns)]) == list(columns)
+
+
+def _candidates(table: Table, foreign_keys: Iterable[Tuple[str, str]]) -> List[IndexDecision]:
+    name = table.name
+    referenced = {}
+    for column, target in foreign_keys:
+        referenced.setdefault(column, target)
+    candidates = [
+        IndexDecision(name, [c.name], f"clé étrangère vers {referenced[c.name]}")
+        for c in table.columns if c.name in referenced
+    ]
+    candidates.extend(
+        IndexDecision(name, [c.name], f"colonne de recherche courante ({c.name})")
+        for c in table.columns if c.name.lower() in SEARCH_COLUMNS
+    )
+    pk = list(table.primary_key)
+    if len(pk) >= 2 and all(c in referenced for c in pk):
+        for column in pk[1:]:
+            candidates.append(IndexDecision(
+                name, [column] + [c for c in pk if c != column],
+                f"table de liaison : jointures depuis {referenced[column]} (la clé primaire commence par {pk[0]})",
+            ))
+    return candidates
+
+
+def plan_table_indexes(table: Table, inputs: Optional[TableIndexInputs] = None) -> List[IndexDecision]:
+    """Décisions d'index d'une table MPD, dans l'ordre des candidats (voir le docstring du module)."""
+    foreign_keys, unique_keys = inputs or _NO_INPUTS
+    candidates = _candidates(table, foreign_keys)
+    covering: List[Tuple[Sequence[str], str]] = []
+    if table.primary_key:
+        covering.append((list(table.primary_key), "clé primaire"))
+    covering.extend((list(u), f"contrainte d'unicité ({', '.join(u)})") for u in unique_keys)
+    # Les plus longs d'abord : un candidat ne peut être couvert que par un index au moins aussi long
+    for decision in sorted(candidates, key=lambda d: -len(d.columns)):
+        for columns, label in covering:
+            if _is_prefix(decision.columns, columns):
+                decision.kept = False
+                decision.reason = f"{decision.reason} : couvert par {label}"
+                break
+        else:
+            covering.append((decision.columns, decision.name))
+    return candidates
+
+
+def plan_indexes(mld: Mld) -> List[IndexDecision]:
+    """Décisions d'index de toutes les tables d'un MLD ou d'un MPD (rapport, API)."""
+    inputs = table_index_inputs(mld)
+    return [d for name, table in mld.tables.items() for d in plan_table_indexes(table, inputs.get(name))]
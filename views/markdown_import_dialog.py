@@ -17,7 +17,7 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
 from PyQt5.QtGui import QFont, QTextCursor, QColor, QPalette
 
-from views.markdown_mcd_parser import MarkdownMCDParser
+from views.markdown_mcd_parser import IncrementalMarkdownParser, MarkdownMCDParser
 
 class MarkdownImportDialog(QDialog):
     """Dialogue amélioré pour importer un fichier markdown et générer un MCD"""
@@ -25,6 +25,8 @@ class MarkdownImportDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parser = MarkdownMCDParser()
+        # Parse à chaque frappe : seules les sections ## / ### modifiées sont réanalysées
+        self.incremental_parser = IncrementalMarkdownParser()
         self.markdown_content = ""
         self.mcd_structure = None
         self.precision_score = 0.0
@@ -324,7 +326,7 @@ class MarkdownImportDialog(QDialog):
             
         try:
             # Parser le markdown
-            self.mcd_structure = self.parser.parse_markdown(self.markdown_content)
+            self.mcd_structure = self.incremental_parser.parse_markdown(self.markdown_content)
             
             # Récupérer le score de précision
             self.precision_score = self.mcd_structure.get('metadata', {}).get('precision_score', 0.0)
@@ -6,9 +6,11 @@ Parseur Markdown vers MCD (Modèle Conceptuel de Données)
 Version 2.0 - Correction fondamentale : Pas de clés en MCD
 """
 
+import copy
+import hashlib
 import re
 import json
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from enum import Enum
 
 class CardinalityType(Enum):
@@ -26,6 +28,68 @@ class CardinalityType(Enum):
     EXACTLY_ONE = "1,1"
     ZERO_OR_ONE = "0,1"
 
+# Lexer : chaque ligne (strippée) est classée une seule fois, dans l'ordre de priorité historique
+# (titres, attributs, puis cardinalité > description > héritage), puis confiée à son analyseur.
+LINE_ENTITY = "entity"
+LINE_ASSOCIATION_H2 = "association_h2"
+LINE_ASSOCIATION = "association"
+LINE_ATTRIBUTE = "attribute"
+LINE_CARDINALITY = "cardinality"
+LINE_DESCRIPTION = "description"
+LINE_INHERITANCE = "inheritance"
+
+# Les 4 cardinalités du MCD Merise, cherchées en une seule passe
+_CARDINALITY_RE = re.compile(r'0,1|1,1|0,n|1,n')
+_INHERITANCE_HINT_RE = re.compile(r'hérite|extends', re.IGNORECASE)
+
+_HEADER_INHERITANCE_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'(\w+)\s+hérite\s+de\s+(\w+)',
+    r'(\w+)\s+extends\s+(\w+)',
+))
+_INHERITANCE_PATTERNS = _HEADER_INHERITANCE_PATTERNS + tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'(\w+)\s+est\s+un\s+(\w+)',
+    r'(\w+)\s+spécialise\s+(\w+)',
+))
+_CARDINALITY_PATTERNS = tuple(re.compile(p) for p in (
+    r'(\w+)\s*:\s*([0-9n]+,?[0-9n]*)',
+    r'([0-9n]+,?[0-9n]*)\s*:\s*(\w+)',
+    r'(\w+)\s*([0-9n]+,?[0-9n]*)',
+    r'([0-9n]+,?[0-9n]*)\s*(\w+)',
+))
+_ASSOCIATION_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'(\w+)\s*<->\s*(\w+)\s*:\s*(\w+)',  # Entity1 <-> Entity2 : Association
+    r'(\w+)\s*-\s*(\w+)\s*:\s*(\w+)',     # Entity1 - Entity2 : Association
+    r'(\w+)\s*et\s*(\w+)\s*:\s*(\w+)',    # Entity1 et Entity2 : Association
+    r'(\w+)\s*(\w+)\s*:\s*(\w+)',         # Entity1 Entity2 : Association
+    r'(\w+)\s*<->\s*(\w+)\s*<->\s*(\w+)\s*:\s*(\w+)',  # Association ternaire
+))
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+_ATTRIBUTE_NAME_RE = re.compile(r'(\w+)(?:\s*\([^)]+\))?')
+_TYPE_SIZE_RE = re.compile(r'\((\w+)\((\d+)\)\)')  # (varchar(50))
+_TYPE_PRECISION_RE = re.compile(r'\((\w+)\((\d+),(\d+)\)\)')  # (decimal(10,2))
+_TYPE_SIMPLE_RE = re.compile(r'\((\w+)\)')  # (integer)
+_DEFAULT_RE = re.compile(r"DEFAULT\s+['\"]?([^'\"]+)['\"]?", re.IGNORECASE)
+
+
+def classify_line(line: str) -> Optional[str]:
+    """Type d'une ligne non vide et strippée du markdown (LINE_*), ou None si elle est ignorée."""
+    first = line[0]
+    if first == '#':
+        if line.startswith('## '):
+            return LINE_ASSOCIATION_H2 if '<->' in line else LINE_ENTITY
+        if line.startswith('### '):
+            return LINE_ASSOCIATION
+    elif first == '-' and line.startswith('- '):
+        return LINE_ATTRIBUTE
+    if ':' in line and _CARDINALITY_RE.search(line):
+        return LINE_CARDINALITY
+    if first == '*' and line.startswith('**') and line.endswith('**'):
+        return LINE_DESCRIPTION
+    if _INHERITANCE_HINT_RE.search(line):
+        return LINE_INHERITANCE
+    return None
+
+
 class MarkdownMCDParser:
     """Parseur Markdown vers MCD avec support étendu"""
     
@@ -37,56 +101,51 @@ class MarkdownMCDParser:
         self.inheritance_hierarchy = {}
         self.foreign_key_mappings = {}
         self.verbose = verbose
+        self._pending = ""  # ligne incomplète entre deux appels à feed()
+        self._line_count = 0
         
-    def log(self, message: str):
-        """Log avec mode verbose"""
+    def log(self, message: str, *args):
+        """Log avec mode verbose (arguments à la %, formatés seulement si verbose)"""
         if self.verbose:
-            print(f"🔍 DEBUG: {message}")
+            print(f"🔍 DEBUG: {message % args if args else message}")
     
     def parse_markdown(self, markdown_content: str) -> Dict:
         """Parse le contenu markdown vers une structure MCD"""
         self.log("=== DÉBUT DU PARSING MARKDOWN ===")
-        self.log(f"Contenu à parser: {len(markdown_content)} caractères")
-        
-        lines = markdown_content.split('\n')
-        self.log(f"Nombre de lignes: {len(lines)}")
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line:
-                continue
-                
-            self.log(f"Ligne {i+1}: '{line}'")
-            
-            # Détecter les associations (titre de niveau 2 avec <->)
-            if line.startswith('## ') and '<->' in line:
-                self.log(f"🔍 Détection association (niveau 2): {line}")
-                self._parse_association_header(line.replace('## ', '### '))
-            # Détecter les entités (titre de niveau 2)
-            elif line.startswith('## '):
-                self.log(f"🔍 Détection entité: {line}")
-                self._parse_entity_header(line)
-            # Détecter les associations (titre de niveau 3)
-            elif line.startswith('### '):
-                self.log(f"🔍 Détection association (niveau 3): {line}")
-                self._parse_association_header(line)
-            # Détecter les attributs (liste avec -)
-            elif line.startswith('- '):
-                self.log(f"🔍 Détection attribut: {line}")
-                self._parse_attribute(line)
-            # Détecter les cardinalités (ligne avec cardinalité)
-            elif ':' in line and self._contains_cardinality(line):
-                self.log(f"🔍 Détection cardinalité: {line}")
-                self._parse_cardinality(line)
-            # Détecter les descriptions d'associations
-            elif line.startswith('**') and line.endswith('**'):
-                self.log(f"🔍 Détection description: {line}")
-                self._parse_association_description(line)
-            # Détecter les héritages
-            elif 'hérite' in line.lower() or 'extends' in line.lower():
-                self.log(f"🔍 Détection héritage: {line}")
-                self._parse_inheritance(line)
-        
+        self.log("Contenu à parser: %s caractères", len(markdown_content))
+        self.feed(markdown_content)
+        return self.close()
+
+    def parse_lines(self, lines: Iterable[str]) -> Dict:
+        """
+        Parse un flux de lignes (fichier ouvert, mmap décodé, flux HTTP) vers une structure MCD.
+        Les lignes sont analysées au fil de l'eau : la mémoire reste proportionnelle au MCD, pas au texte.
+        """
+        self.log("=== DÉBUT DU PARSING MARKDOWN (FLUX) ===")
+        for line in lines:
+            self._parse_line(line)
+        return self.close()
+
+    def feed(self, text: str) -> None:
+        """
+        Ajoute un fragment de texte découpé arbitrairement (morceaux d'un upload) : les lignes complètes
+        sont analysées, la ligne incomplète est conservée jusqu'au fragment suivant ou à close().
+        """
+        buffer = self._pending + text if self._pending else text
+        start = 0
+        end = buffer.find('\n')
+        while end >= 0:
+            self._parse_line(buffer[start:end])
+            start = end + 1
+            end = buffer.find('\n', start)
+        self._pending = buffer[start:]
+
+    def close(self) -> Dict:
+        """Analyse la dernière ligne en attente, applique le post-traitement et retourne la structure MCD."""
+        if self._pending:
+            self._parse_line(self._pending)
+            self._pending = ""
+        self.log("Nombre de lignes: %s", self._line_count)
         self.log("=== FIN DU PARSING LIGNE PAR LIGNE ===")
         
         # Traitement post-parsing
@@ -97,84 +156,107 @@ class MarkdownMCDParser:
         self.log("=== CONSTRUCTION STRUCTURE FINALE ===")
         mcd_structure = self._build_mcd_structure()
         
-        self.log(f"Structure finale:")
-        self.log(f"  - Entités: {len(self.entities)}")
-        self.log(f"  - Associations: {len(self.associations)}")
-        self.log(f"  - Héritage: {len(self.inheritance_hierarchy)}")
+        self.log("Structure finale:")
+        self.log("  - Entités: %s", len(self.entities))
+        self.log("  - Associations: %s", len(self.associations))
+        self.log("  - Héritage: %s", len(self.inheritance_hierarchy))
         
         return mcd_structure
 
-    def _parse_entity_header(self, line: str):
-        """Parse un en-tête d'entité pour MCD (pas de clés primaires)"""
+    def _parse_line(self, line: str):
+        """Analyse une ligne du markdown et applique l'opération obtenue à l'état du parseur"""
+        self._line_count += 1
+        op = self._analyze_line(line)
+        if op is not None:
+            self._apply(op)
+
+    def _analyze_line(self, line: str) -> Optional[Tuple]:
+        """
+        Analyse une ligne (titre d'entité ou d'association, attribut, cardinalité...) sans toucher à l'état :
+        retourne l'opération (type LINE_*, données...) à appliquer par _apply, ou None.
+        """
+        line = line.strip()
+        if not line:
+            return None
+        kind = classify_line(line)
+        if self.verbose:
+            self.log("Ligne %s: '%s'", self._line_count, line)
+            if kind is not None:
+                self.log("🔍 Détection %s: %s", self._LINE_HANDLERS[kind][0], line)
+        if kind is None:
+            return None
+        return self._LINE_HANDLERS[kind][1](self, line)
+
+    def _apply(self, op: Tuple) -> None:
+        """Applique une opération de _analyze_line (entité ou association courante, héritage...)"""
+        self._APPLY_HANDLERS[op[0]](self, *op[1:])
+
+    @staticmethod
+    def _new_entity(name: str, parent: Optional[str]) -> Dict:
+        return {
+            'name': name,
+            'attributes': [],
+            'description': '',
+            'parent': parent,
+            'children': []
+        }
+
+    def _parse_association_h2(self, line: str) -> Optional[Tuple]:
+        """Association en titre de niveau 2 (## A <-> B : nom)"""
+        return self._parse_association_header(line.replace('## ', '### '))
+
+    def _parse_entity_header(self, line: str) -> Tuple:
+        """Parse un en-tête d'entité pour MCD (pas de clés primaires) : (LINE_ENTITY, nom, parent)"""
         entity_text = line[3:].strip()  # Enlever '## '
-        self.log(f"Parsing entité: '{entity_text}'")
+        self.log("Parsing entité: '%s'", entity_text)
         
         # Vérifier s'il y a de l'héritage dans l'en-tête
-        inheritance_patterns = [
-            r'(\w+)\s+hérite\s+de\s+(\w+)',
-            r'(\w+)\s+extends\s+(\w+)',
-        ]
-        
-        for pattern in inheritance_patterns:
-            match = re.search(pattern, entity_text, re.IGNORECASE)
+        for pattern in _HEADER_INHERITANCE_PATTERNS:
+            match = pattern.search(entity_text)
             if match:
                 child = self._clean_entity_name(match.group(1))
                 parent = self._clean_entity_name(match.group(2))
-                self.log(f"Héritage détecté: {child} hérite de {parent}")
-                
-                # Créer l'entité parent si elle n'existe pas
-                if parent not in self.entities:
-                    self.log(f"Création entité parent: {parent}")
-                    self.entities[parent] = {
-                        'name': parent,
-                        'attributes': [],
-                        'description': '',
-                        'parent': None,
-                        'children': []
-                    }
-                
-                # Créer l'entité enfant
-                self.log(f"Création entité enfant: {child}")
-                self.current_entity = child
-                self.entities[child] = {
-                    'name': child,
-                    'attributes': [],
-                    'description': '',
-                    'parent': parent,
-                    'children': []
-                }
-                
-                # Établir la relation d'héritage
-                self.entities[parent]['children'].append(child)
-                self.inheritance_hierarchy[child] = parent
-                self.log(f"Héritage établi: {child} -> {parent}")
-                return
+                self.log("Héritage détecté: %s hérite de %s", child, parent)
+                return (LINE_ENTITY, child, parent)
         
         # Pas d'héritage, entité normale
         entity_name = self._clean_entity_name(entity_text)
-        self.log(f"Entité normale: {entity_name}")
-        self.current_entity = entity_name
-        self.entities[entity_name] = {
-            'name': entity_name,
-            'attributes': [],
-            'description': '',
-            'parent': None,
-            'children': []
-        }
+        self.log("Entité normale: %s", entity_name)
+        return (LINE_ENTITY, entity_name, None)
+
+    def _apply_entity(self, name: str, parent: Optional[str]):
+        if parent is None:
+            self.current_entity = name
+            self.entities[name] = self._new_entity(name, None)
+            return
+        
+        # Créer l'entité parent si elle n'existe pas
+        if parent not in self.entities:
+            self.log("Création entité parent: %s", parent)
+            self.entities[parent] = self._new_entity(parent, None)
         
-    def _parse_association_header(self, line: str):
-        """Parse un en-tête d'association avec support étendu"""
+        # Créer l'entité enfant
+        self.log("Création entité enfant: %s", name)
+        self.current_entity = name
+        self.entities[name] = self._new_entity(name, parent)
+        
+        # Établir la relation d'héritage
+        self.entities[parent]['children'].append(name)
+        self.inheritance_hierarchy[name] = parent
+        self.log("Héritage établi: %s -> %s", name, parent)
+        
+    def _parse_association_header(self, line: str) -> Optional[Tuple]:
+        """Parse un en-tête d'association avec support étendu : (LINE_ASSOCIATION, association)"""
         association_text = line[4:].strip()  # Enlever '### '
-        self.log(f"Parsing association: '{association_text}'")
+        self.log("Parsing association: '%s'", association_text)
         
         # Extraire les entités et le nom de l'association
         entities_and_name = self._extract_entities_from_association(association_text)
         
         if entities_and_name:
             entity1, entity2, association_name = entities_and_name
-            self.log(f"Association extraite: {entity1} <-> {entity2} : {association_name}")
-            
-            self.current_association = {
+            self.log("Association extraite: %s <-> %s : %s", entity1, entity2, association_name)
+            return (LINE_ASSOCIATION, {
                 'name': association_name,
                 'entity1': entity1,
                 'entity2': entity2,
@@ -183,171 +265,142 @@ class MarkdownMCDParser:
                 'description': '',
                 'type': 'binary',  # binary, ternary, inheritance
                 'attributes': []  # Pour les associations avec attributs
-            }
-            
-            self.associations.append(self.current_association)
-            self.log(f"Association ajoutée: {association_name}")
-        else:
-            self.log(f"❌ Impossible d'extraire l'association: {association_text}")
+            })
+        self.log("❌ Impossible d'extraire l'association: %s", association_text)
+        return None
+
+    def _apply_association(self, association: Dict):
+        self.current_association = dict(association, attributes=[])
+        self.associations.append(self.current_association)
+        self.log("Association ajoutée: %s", association['name'])
     
-    def _parse_attribute(self, line: str):
-        """Parse un attribut pour MCD (pas de clés)"""
+    def _parse_attribute(self, line: str) -> Tuple:
+        """Parse un attribut pour MCD (pas de clés) : (LINE_ATTRIBUTE, attribut)"""
         attribute_text = line[2:].strip()  # Enlever '- '
-        self.log(f"Parsing attribut: '{attribute_text}'")
-        
+        self.log("Parsing attribut: '%s'", attribute_text)
+        return (LINE_ATTRIBUTE, self._parse_attribute_info_improved(attribute_text))
+
+    def _apply_attribute(self, attribute_info: Dict):
+        # Copie : les opérations peuvent être rejouées (IncrementalMarkdownParser)
+        attribute_info = dict(attribute_info, constraints=list(attribute_info['constraints']))
         if self.current_entity:
-            # Parser l'attribut pour l'entité courante
-            attribute_info = self._parse_attribute_info_improved(attribute_text)
+            # Attribut de l'entité courante
             self.entities[self.current_entity]['attributes'].append(attribute_info)
-            self.log(f"Attribut ajouté à {self.current_entity}: {attribute_info['name']}")
+            self.log("Attribut ajouté à %s: %s", self.current_entity, attribute_info['name'])
                 
         elif self.current_association:
-            # Parser l'attribut pour l'association courante
-            attribute_info = self._parse_attribute_info_improved(attribute_text)
+            # Attribut de l'association courante
             if 'attributes' not in self.current_association:
                 self.current_association['attributes'] = []
             self.current_association['attributes'].append(attribute_info)
-            self.log(f"Attribut ajouté à l'association: {attribute_info['name']}")
+            self.log("Attribut ajouté à l'association: %s", attribute_info['name'])
         else:
-            self.log(f"❌ Aucune entité/association courante pour l'attribut: {attribute_text}")
+            self.log("❌ Aucune entité/association courante pour l'attribut: %s", attribute_info['description'])
     
-    def _parse_cardinality(self, line: str):
-        """Parse une ligne de cardinalité avec support étendu"""
-        if not self.current_association:
-            self.log(f"❌ Pas d'association courante pour la cardinalité: {line}")
-            return
-            
-        self.log(f"Parsing cardinalité: '{line}'")
-        
-        # CORRECTION FONDAMENTALE : Patterns simplifiés et robustes
-        cardinality_patterns = [
-            r'(\w+)\s*:\s*([0-9n]+,?[0-9n]*)',
-            r'([0-9n]+,?[0-9n]*)\s*:\s*(\w+)',
-            r'(\w+)\s*([0-9n]+,?[0-9n]*)',
-            r'([0-9n]+,?[0-9n]*)\s*(\w+)',
-        ]
-        
-        for pattern in cardinality_patterns:
-            matches = re.findall(pattern, line)
+    def _parse_cardinality(self, line: str) -> Tuple:
+        """Parse une ligne de cardinalité avec support étendu : (LINE_CARDINALITY, ((cardinalité, entité), ...))"""
+        self.log("Parsing cardinalité: '%s'", line)
+        found = []
+        
+        # CORRECTION FONDAMENTALE : Patterns simplifiés et robustes (précompilés)
+        for pattern in _CARDINALITY_PATTERNS:
+            matches = pattern.findall(line)
             if matches:
-                self.log(f"Matches trouvés: {matches}")
+                self.log("Matches trouvés: %s", matches)
                 for match in matches:
                     if len(match) == 2:
                         entity_or_card, card_or_entity = match
-                        self.log(f"Match: {entity_or_card} / {card_or_entity}")
+                        self.log("Match: %s / %s", entity_or_card, card_or_entity)
                         
                         # Déterminer si c'est une entité ou une cardinalité
                         if self._is_cardinality_improved(entity_or_card):
-                            cardinality = entity_or_card
-                            entity_name = card_or_entity
-                            self.log(f"Cardinalité trouvée: {cardinality} pour {entity_name}")
+                            found.append((entity_or_card, card_or_entity))
                         elif self._is_cardinality_improved(card_or_entity):
-                            cardinality = card_or_entity
-                            entity_name = entity_or_card
-                            self.log(f"Cardinalité trouvée: {cardinality} pour {entity_name}")
+                            found.append((card_or_entity, entity_or_card))
                         else:
-                            self.log(f"❌ Cardinalité invalide: {entity_or_card} / {card_or_entity}")
-                            continue
-                            
-                        # Assigner la cardinalité à l'entité appropriée
-                        if entity_name == self.current_association['entity1']:
-                            self.current_association['cardinality1'] = cardinality
-                            self.log(f"Cardinalité 1 assignée: {cardinality}")
-                        elif entity_name == self.current_association['entity2']:
-                            self.current_association['cardinality2'] = cardinality
-                            self.log(f"Cardinalité 2 assignée: {cardinality}")
-                        else:
-                            self.log(f"❌ Entité non reconnue: {entity_name}")
+                            self.log("❌ Cardinalité invalide: %s / %s", entity_or_card, card_or_entity)
+        return (LINE_CARDINALITY, line, tuple(found))
+
+    def _apply_cardinality(self, line: str, cardinalities: Tuple):
+        if not self.current_association:
+            self.log("❌ Pas d'association courante pour la cardinalité: %s", line)
+            return
+        for cardinality, entity_name in cardinalities:
+            self.log("Cardinalité trouvée: %s pour %s", cardinality, entity_name)
+            # Assigner la cardinalité à l'entité appropriée
+            if entity_name == self.current_association['entity1']:
+                self.current_association['cardinality1'] = cardinality
+                self.log("Cardinalité 1 assignée: %s", cardinality)
+            elif entity_name == self.current_association['entity2']:
+                self.current_association['cardinality2'] = cardinality
+                self.log("Cardinalité 2 assignée: %s", cardinality)
+            else:
+                self.log("❌ Entité non reconnue: %s", entity_name)
     
-    def _parse_association_description(self, line: str):
-        """Parse une description d'association"""
+    def _parse_association_description(self, line: str) -> Tuple:
+        """Parse une description d'association : (LINE_DESCRIPTION, ligne, description)"""
+        return (LINE_DESCRIPTION, line, line.strip('*').strip())
+
+    def _apply_description(self, line: str, description: str):
         if self.current_association:
-            description = line.strip('*').strip()
             self.current_association['description'] = description
-            self.log(f"Description d'association: {description}")
+            self.log("Description d'association: %s", description)
         else:
-            self.log(f"❌ Pas d'association courante pour la description: {line}")
+            self.log("❌ Pas d'association courante pour la description: %s", line)
     
-    def _parse_inheritance(self, line: str):
-        """Parse une ligne d'héritage"""
-        self.log(f"Parsing héritage: '{line}'")
-        
-        # Patterns pour détecter l'héritage
-        inheritance_patterns = [
-            r'(\w+)\s+hérite\s+de\s+(\w+)',
-            r'(\w+)\s+extends\s+(\w+)',
-            r'(\w+)\s+est\s+un\s+(\w+)',
-            r'(\w+)\s+spécialise\s+(\w+)',
-        ]
-        
-        for pattern in inheritance_patterns:
-            match = re.search(pattern, line, re.IGNORECASE)
+    def _parse_inheritance(self, line: str) -> Optional[Tuple]:
+        """Parse une ligne d'héritage : (LINE_INHERITANCE, enfant, parent)"""
+        self.log("Parsing héritage: '%s'", line)
+        
+        for pattern in _INHERITANCE_PATTERNS:
+            match = pattern.search(line)
             if match:
                 child = self._clean_entity_name(match.group(1))
                 parent = self._clean_entity_name(match.group(2))
-                self.log(f"Héritage détecté: {child} -> {parent}")
-                
-                # Créer l'entité parent si elle n'existe pas
-                if parent not in self.entities:
-                    self.log(f"Création entité parent: {parent}")
-                    self.entities[parent] = {
-                        'name': parent,
-                        'attributes': [],
-                        'description': '',
-                        'parent': None,
-                        'children': []
-                    }
-                
-                # Créer l'entité enfant si elle n'existe pas
-                if child not in self.entities:
-                    self.log(f"Création entité enfant: {child}")
-                    self.entities[child] = {
-                        'name': child,
-                        'attributes': [],
-                        'description': '',
-                        'parent': parent,
-                        'children': []
-                    }
-                
-                # Établir la relation d'héritage
-                self.entities[child]['parent'] = parent
-                self.entities[parent]['children'].append(child)
-                self.inheritance_hierarchy[child] = parent
-                self.log(f"Héritage établi: {child} -> {parent}")
-                break
+                self.log("Héritage détecté: %s -> %s", child, parent)
+                return (LINE_INHERITANCE, child, parent)
+        return None
+
+    def _apply_inheritance(self, child: str, parent: str):
+        # Créer l'entité parent si elle n'existe pas
+        if parent not in self.entities:
+            self.log("Création entité parent: %s", parent)
+            self.entities[parent] = self._new_entity(parent, None)
+        
+        # Créer l'entité enfant si elle n'existe pas
+        if child not in self.entities:
+            self.log("Création entité enfant: %s", child)
+            self.entities[child] = self._new_entity(child, parent)
+        
+        # Établir la relation d'héritage
+        self.entities[child]['parent'] = parent
+        self.entities[parent]['children'].append(child)
+        self.inheritance_hierarchy[child] = parent
+        self.log("Héritage établi: %s -> %s", child, parent)
     
     def _clean_entity_name(self, name: str) -> str:
         """Nettoie le nom d'une entité"""
         # Supprimer les caractères spéciaux et normaliser
-        name = re.sub(r'[^\w\s]', '', name)
+        name = _NON_WORD_RE.sub('', name)
         name = name.strip().lower()
         # Capitaliser la première lettre
         result = name.capitalize()
-        self.log(f"Nom nettoyé: '{name}' -> '{result}'")
+        self.log("Nom nettoyé: '%s' -> '%s'", name, result)
         return result
     
     def _extract_entities_from_association(self, text: str) -> Optional[Tuple[str, str, str]]:
         """Extrait les entités et le nom de l'association avec support étendu"""
-        self.log(f"Extraction d'association: '{text}'")
-        
-        # Patterns pour détecter les associations
-        patterns = [
-            r'(\w+)\s*<->\s*(\w+)\s*:\s*(\w+)',  # Entity1 <-> Entity2 : Association
-            r'(\w+)\s*-\s*(\w+)\s*:\s*(\w+)',     # Entity1 - Entity2 : Association
-            r'(\w+)\s*et\s*(\w+)\s*:\s*(\w+)',    # Entity1 et Entity2 : Association
-            r'(\w+)\s*(\w+)\s*:\s*(\w+)',         # Entity1 Entity2 : Association
-            r'(\w+)\s*<->\s*(\w+)\s*<->\s*(\w+)\s*:\s*(\w+)',  # Association ternaire
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        self.log("Extraction d'association: '%s'", text)
+        
+        for pattern in _ASSOCIATION_PATTERNS:
+            match = pattern.search(text)
             if match:
-                self.log(f"Pattern match: {pattern}")
+                self.log("Pattern match: %s", pattern.pattern)
                 if len(match.groups()) == 3:
                     entity1 = self._clean_entity_name(match.group(1))
                     entity2 = self._clean_entity_name(match.group(2))
                     association_name = match.group(3).strip()
-                    self.log(f"Association extraite: {entity1} <-> {entity2} : {association_name}")
+                    self.log("Association extraite: %s <-> %s : %s", entity1, entity2, association_name)
                     return (entity1, entity2, association_name)
                 elif len(match.groups()) == 4:
                     # Association ternaire
@@ -356,15 +409,15 @@ class MarkdownMCDParser:
                     entity3 = self._clean_entity_name(match.group(3))
                     association_name = match.group(4).strip()
                     # Pour l'instant, on traite comme binaire
-                    self.log(f"Association ternaire traitée comme binaire: {entity1} <-> {entity2} : {association_name}")
+                    self.log("Association ternaire traitée comme binaire: %s <-> %s : %s", entity1, entity2, association_name)
                     return (entity1, entity2, association_name)
         
-        self.log(f"❌ Aucun pattern ne correspond: {text}")
+        self.log("❌ Aucun pattern ne correspond: %s", text)
         return None
     
     def _parse_attribute_info_improved(self, text: str) -> Dict:
         """Parse les informations d'un attribut pour MCD (pas de clés)"""
-        self.log(f"Parsing attribut amélioré: '{text}'")
+        self.log("Parsing attribut amélioré: '%s'", text)
         
         attribute_info = {
             'name': '',
@@ -383,75 +436,95 @@ class MarkdownMCDParser:
         # On ignore donc les marqueurs PK/FK pour le MCD
         
         # Extraire le nom de l'attribut
-        name_match = re.search(r'(\w+)(?:\s*\([^)]+\))?', text)
+        name_match = _ATTRIBUTE_NAME_RE.search(text)
         if name_match:
             attribute_info['name'] = name_match.group(1).lower()
-            self.log(f"Nom d'attribut extrait: {attribute_info['name']}")
+            self.log("Nom d'attribut extrait: %s", attribute_info['name'])
         
         # Détecter le type avec précision
         # Pattern pour type avec taille: varchar(50)
-        size_pattern = r'\((\w+)\((\d+)\)\)'
-        size_match = re.search(size_pattern, text)
+        size_match = _TYPE_SIZE_RE.search(text)
         if size_match:
             attribute_info['type'] = size_match.group(1).lower()
             attribute_info['size'] = int(size_match.group(2))
-            self.log(f"Type avec taille: {attribute_info['type']}({attribute_info['size']})")
+            self.log("Type avec taille: %s(%s)", attribute_info['type'], attribute_info['size'])
         else:
             # Pattern pour type avec précision: decimal(10,2)
-            precision_pattern = r'\((\w+)\((\d+),(\d+)\)\)'
-            precision_match = re.search(precision_pattern, text)
+            precision_match = _TYPE_PRECISION_RE.search(text)
             if precision_match:
                 attribute_info['type'] = precision_match.group(1).lower()
                 attribute_info['precision'] = int(precision_match.group(2))
                 attribute_info['scale'] = int(precision_match.group(3))
-                self.log(f"Type avec précision: {attribute_info['type']}({attribute_info['precision']},{attribute_info['scale']})")
+                self.log("Type avec précision: %s(%s,%s)", attribute_info['type'], attribute_info['precision'], attribute_info['scale'])
             else:
                 # Pattern pour type simple: varchar, integer, etc.
-                simple_pattern = r'\((\w+)\)'
-                simple_match = re.search(simple_pattern, text)
+                simple_match = _TYPE_SIMPLE_RE.search(text)
                 if simple_match:
                     attribute_info['type'] = simple_match.group(1).lower()
-                    self.log(f"Type simple: {attribute_info['type']}")
+                    self.log("Type simple: %s", attribute_info['type'])
                 else:
                     # Type par défaut
                     attribute_info['type'] = 'varchar'
-                    self.log(f"Type par défaut: {attribute_info['type']}")
+                    self.log("Type par défaut: %s", attribute_info['type'])
         
         # Détecter les contraintes
-        if 'NOT NULL' in text.upper():
+        upper_text = text.upper()
+        if 'NOT NULL' in upper_text:
             attribute_info['is_nullable'] = False
             self.log("Contrainte NOT NULL détectée")
         
-        if 'UNIQUE' in text.upper():
+        if 'UNIQUE' in upper_text:
             attribute_info['constraints'].append('UNIQUE')
             self.log("Contrainte UNIQUE détectée")
         
         # Détecter les valeurs par défaut
-        default_match = re.search(r"DEFAULT\s+['\"]?([^'\"]+)['\"]?", text, re.IGNORECASE)
+        default_match = _DEFAULT_RE.search(text)
         if default_match:
             attribute_info['default_value'] = f"'{default_match.group(1)}'"
-            self.log(f"Valeur par défaut: {attribute_info['default_value']}")
+            self.log("Valeur par défaut: %s", attribute_info['default_value'])
         
-        self.log(f"Attribut parsé: {attribute_info}")
+        self.log("Attribut parsé: %s", attribute_info)
         return attribute_info
     
     # Les 4 cardinalités du MCD Merise : (min, max) avec min ∈ {0,1}, max ∈ {1,n}.
     MCD_CARDINALITIES = ('0,1', '1,1', '0,n', '1,n')
 
+    # Table de dispatch du lexer : type de ligne -> (libellé du log, analyseur)
+    _LINE_HANDLERS = {
+        LINE_ASSOCIATION_H2: ("association (niveau 2)", _parse_association_h2),
+        LINE_ENTITY: ("entité", _parse_entity_header),
+        LINE_ASSOCIATION: ("association (niveau 3)", _parse_association_header),
+        LINE_ATTRIBUTE: ("attribut", _parse_attribute),
+        LINE_CARDINALITY: ("cardinalité", _parse_cardinality),
+        LINE_DESCRIPTION: ("description", _parse_association_description),
+        LINE_INHERITANCE: ("héritage", _parse_inheritance),
+    }
+
+    # Application des opérations : type -> méthode
+    _APPLY_HANDLERS = {
+        LINE_ENTITY: _apply_entity,
+        LINE_ASSOCIATION: _apply_association,
+        LINE_ATTRIBUTE: _apply_attribute,
+        LINE_CARDINALITY: _apply_cardinality,
+        LINE_DESCRIPTION: _apply_description,
+        LINE_INHERITANCE: _apply_inheritance,
+    }
+
     def _is_cardinality_improved(self, text: str) -> bool:
         """Vérifie si un texte représente une des 4 cardinalités MCD Merise."""
-        self.log(f"Vérification cardinalité: '{text}'")
-        t = text.strip().lower()
-        if t in self.MCD_CARDINALITIES:
-            self.log(f"✅ Cardinalité MCD valide: {text}")
-            return True
-        self.log(f"❌ Cardinalité invalide (MCD: 0,1 | 1,1 | 0,n | 1,n): {text}")
-        return False
+        valid = text.strip().lower() in self.MCD_CARDINALITIES
+        if self.verbose:  # appelé pour chaque jeton des lignes de cardinalité
+            self.log("Vérification cardinalité: '%s'", text)
+            if valid:
+                self.log("✅ Cardinalité MCD valide: %s", text)
+            else:
+                self.log("❌ Cardinalité invalide (MCD: 0,1 | 1,1 | 0,n | 1,n): %s", text)
+        return valid
 
     def _contains_cardinality(self, text: str) -> bool:
         """Vérifie si une ligne contient une des 4 cardinalités MCD."""
-        result = any(card in text for card in self.MCD_CARDINALITIES)
-        self.log(f"Contient cardinalité '{text}': {result}")
+        result = _CARDINALITY_RE.search(text) is not None
+        self.log("Contient cardinalité '%s': %s", text, result)
         return result
     
     def _process_inheritance(self):
@@ -459,7 +532,7 @@ class MarkdownMCDParser:
         self.log("=== TRAITEMENT DE L'HÉRITAGE ===")
         
         for child, parent in self.inheritance_hierarchy.items():
-            self.log(f"Traitement héritage: {child} -> {parent}")
+            self.log("Traitement héritage: %s -> %s", child, parent)
             
             if parent in self.entities and child in self.entities:
                 # Copier les attributs de la classe parent
@@ -470,11 +543,11 @@ class MarkdownMCDParser:
                         inherited_attr = attr.copy()
                         inherited_attr['inherited_from'] = parent
                         self.entities[child]['attributes'].append(inherited_attr)
-                        self.log(f"Attribut hérité: {attr['name']} de {parent} vers {child}")
+                        self.log("Attribut hérité: %s de %s vers %s", attr['name'], parent, child)
                     else:
-                        self.log(f"Attribut déjà présent: {attr['name']} dans {child}")
+                        self.log("Attribut déjà présent: %s dans %s", attr['name'], child)
             else:
-                self.log(f"❌ Entité manquante: parent={parent in self.entities}, child={child in self.entities}")
+                self.log("❌ Entité manquante: parent=%s, child=%s", parent in self.entities, child in self.entities)
     
     def _process_foreign_keys(self):
         """Traite les clés étrangères - SUPPRIMÉ car pas de clés en MCD"""
@@ -500,11 +573,11 @@ class MarkdownMCDParser:
             }
         }
         
-        self.log(f"Structure construite:")
-        self.log(f"  - Entités: {len(self.entities)}")
-        self.log(f"  - Associations: {len(self.associations)}")
-        self.log(f"  - Héritage: {len(self.inheritance_hierarchy)}")
-        self.log(f"  - Score: {structure['metadata']['precision_score']:.1f}%")
+        self.log("Structure construite:")
+        self.log("  - Entités: %s", len(self.entities))
+        self.log("  - Associations: %s", len(self.associations))
+        self.log("  - Héritage: %s", len(self.inheritance_hierarchy))
+        self.log("  - Score: %.1f%%", structure['metadata']['precision_score'])
         
         return structure
     
@@ -520,7 +593,7 @@ class MarkdownMCDParser:
         for entity_name, entity in self.entities.items():
             total_checks += 1
             has_attributes = len(entity['attributes']) > 0
-            self.log(f"Entité '{entity_name}' a {len(entity['attributes'])} attributs: {has_attributes}")
+            self.log("Entité '%s' a %s attributs: %s", entity_name, len(entity['attributes']), has_attributes)
             if has_attributes:
                 score += 1
         
@@ -528,7 +601,7 @@ class MarkdownMCDParser:
         if len(self.entities) > 1:
             total_checks += 1
             multiple_entities = len(self.entities) >= 2
-            self.log(f"Plusieurs entités: {multiple_entities} ({len(self.entities)} entités)")
+            self.log("Plusieurs entités: %s (%s entités)", multiple_entities, len(self.entities))
             if multiple_entities:
                 score += 1
         
@@ -537,7 +610,7 @@ class MarkdownMCDParser:
             total_checks += 1
             card1_valid = self._is_cardinality_improved(association['cardinality1'])
             card2_valid = self._is_cardinality_improved(association['cardinality2'])
-            self.log(f"Association '{association['name']}' cardinalités: {association['cardinality1']} ({card1_valid}), {association['cardinality2']} ({card2_valid})")
+            self.log("Association '%s' cardinalités: %s (%s), %s (%s)", association['name'], association['cardinality1'], card1_valid, association['cardinality2'], card2_valid)
             if card1_valid and card2_valid:
                 score += 1
         
@@ -546,7 +619,7 @@ class MarkdownMCDParser:
             total_checks += 1
             entity1_exists = association['entity1'] in self.entities
             entity2_exists = association['entity2'] in self.entities
-            self.log(f"Association '{association['name']}' entités: {association['entity1']} ({entity1_exists}), {association['entity2']} ({entity2_exists})")
+            self.log("Association '%s' entités: %s (%s), %s (%s)", association['name'], association['entity1'], entity1_exists, association['entity2'], entity2_exists)
             if entity1_exists and entity2_exists:
                 score += 1
         
@@ -554,7 +627,7 @@ class MarkdownMCDParser:
         for association in self.associations:
             total_checks += 1
             is_binary = association['entity1'] != association['entity2']
-            self.log(f"Association '{association['name']}' binaire: {is_binary}")
+            self.log("Association '%s' binaire: %s", association['name'], is_binary)
             if is_binary:
                 score += 1
         
@@ -562,7 +635,7 @@ class MarkdownMCDParser:
         if self.inheritance_hierarchy:
             total_checks += 1
             inheritance_valid = len(self.inheritance_hierarchy) > 0
-            self.log(f"Héritage valide: {inheritance_valid} ({len(self.inheritance_hierarchy)} relations)")
+            self.log("Héritage valide: %s (%s relations)", inheritance_valid, len(self.inheritance_hierarchy))
             if inheritance_valid:
                 score += 1
         
@@ -570,7 +643,7 @@ class MarkdownMCDParser:
         # Toujours vérifier les associations, même si aucune n'existe
         total_checks += 1
         associations_valid = len(self.associations) > 0
-        self.log(f"Associations présentes: {associations_valid} ({len(self.associations)} associations)")
+        self.log("Associations présentes: %s (%s associations)", associations_valid, len(self.associations))
         if associations_valid:
             score += 1
         
@@ -579,7 +652,7 @@ class MarkdownMCDParser:
             normalized_score = (score / total_checks) * 100
             # Limiter à 100% maximum
             final_score = min(normalized_score, 100.0)
-            self.log(f"Score final: {score}/{total_checks} = {final_score:.1f}%")
+            self.log("Score final: %s/%s = %.1f%%", score, total_checks, final_score)
             return final_score
         
         self.log("Aucun check effectué, score: 0.0%")
@@ -630,4 +703,102 @@ class MarkdownMCDParser:
 Entite1 : cardinalite1
 Entite2 : cardinalite2
 """
-        return template 
\ No newline at end of file
+        return template 
+
+
+# Début de section : ligne que classify_line lit comme un titre ## ou ### (non vide après le préfixe)
+_SECTION_START_RE = re.compile(r'^[^\S\n]*###? (?=[^\n]*\S)', re.MULTILINE)
+
+
+def split_sections(markdown_content: str) -> List[str]:
+    """Découpe le markdown en sections (préambule, puis une section par titre ## / ###), texte inchangé."""
+    starts = [match.start() for match in _SECTION_START_RE.finditer(markdown_content)]
+    bounds = [0] + starts + [len(markdown_content)]
+    return [markdown_content[a:b] for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+class IncrementalMarkdownParser:
+    """
+    Re-parse incrémental pour la prévisualisation en direct (dialogue d'import, API Flutter).
+
+    Le document est découpé en sections ## / ### ; chaque section est hachée et ses opérations
+    d'analyse (MarkdownMCDParser._analyze_line) sont mises en cache. À chaque appel, seules les
+    sections nouvelles ou modifiées sont analysées (expressions régulières) ; les opérations en cache
+    sont rejouées dans l'ordre du document, puis l'héritage et le score de précision sont recalculés
+    sur le modèle assemblé (une passe linéaire sans analyse de texte). Le résultat est identique à
+    MarkdownMCDParser().parse_markdown(contenu).
+
+    cache : cache partagé (get / put, ex. api.services.compile_cache.CompileCache) ; sans cache,
+    seules les sections du dernier document sont conservées.
+    """
+
+    def __init__(self, verbose: bool = False, cache=None):
+        self.verbose = verbose
+        self._cache = cache
+        self._sections: Dict[bytes, Tuple] = {}
+        self.last_stats = {"sections": 0, "reparsed": 0}
+
+    def parse_markdown(self, markdown_content: str) -> Dict:
+        """Structure MCD du document (même format que MarkdownMCDParser.parse_markdown)"""
+        parser = MarkdownMCDParser(verbose=self.verbose)
+        sections: Dict[bytes, Tuple] = {}
+        texts = split_sections(markdown_content)
+        reparsed = 0
+        for text in texts:
+            key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+            ops = self._sections.get(key)
+            if ops is None and self._cache is not None:
+                ops = self._cache.get(key)
+            if ops is None:
+                reparsed += 1
+                ops = tuple(op for op in map(parser._analyze_line, text.split('\n')) if op is not None)
+                if self._cache is not None:
+                    self._cache.put(key, ops)
+            sections[key] = ops
+            for op in ops:
+                parser._apply(op)
+        self._sections = sections
+        self.last_stats = {"sections": len(texts), "reparsed": reparsed}
+        parser._line_count = markdown_content.count('\n') + 1
+        return parser.close()
+
+
+def merge_mcd_structures(structures: List[Tuple[str, Dict]]) -> Dict:
+    """
+    Fusionne les MCD de plusieurs fichiers [(source, structure)] en un seul, dans l'ordre donné :
+    entités de même nom réunies (attributs absents ajoutés), associations dédoublonnées par
+    (nom, entité 1, entité 2), héritage fusionné. metadata : score recalculé, sources, et conflicts
+    (cardinalités ou parents divergents entre fichiers ; la première définition est conservée).
+    """
+    parser = MarkdownMCDParser()
+    associations: Dict[Tuple[str, str, str], Dict] = {}
+    conflicts: List[str] = []
+    for source, mcd in structures:
+        for name, entity in mcd.get('entities', {}).items():
+            merged = parser.entities.get(name)
+            if merged is None:
+                parser.entities[name] = copy.deepcopy(entity)
+                continue
+            known = {attribute['name'] for attribute in merged['attributes']}
+            merged['attributes'].extend(copy.deepcopy(a) for a in entity['attributes'] if a['name'] not in known)
+            merged['children'].extend(c for c in entity.get('children', []) if c not in merged['children'])
+            merged['parent'] = merged.get('parent') or entity.get('parent')
+        for association in mcd.get('associations', []):
+            key = (association['name'], association['entity1'], association['entity2'])
+            existing = associations.get(key)
+            if existing is None:
+                associations[key] = copy.deepcopy(association)
+                parser.associations.append(associations[key])
+            elif (existing['cardinality1'], existing['cardinality2']) != (association['cardinality1'],
+                                                                          association['cardinality2']):
+                conflicts.append(f"{source}: cardinalités de {key[0]} ({key[1]}/{key[2]}) "
+                                 f"{association['cardinality1']}/{association['cardinality2']} ignorées, "
+                                 f"{existing['cardinality1']}/{existing['cardinality2']} conservées")
+        for child, parent in mcd.get('inheritance', {}).items():
+            current = parser.inheritance_hierarchy.setdefault(child, parent)
+            if current != parent:
+                conflicts.append(f"{source}: {child} hérite de {parent} ignoré, parent {current} conservé")
+    structure = parser._build_mcd_structure()
+    structure['metadata']['sources'] = [source for source, _ in structures]
+    structure['metadata']['conflicts'] = conflicts
+    return structure
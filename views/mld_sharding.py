@@ -0,0 +1,162 @@
+"""
+Conversion MCD → MLD parallèle, par composantes connexes.
+
+Un MCD multi-domaines (ERP, 1 500+ entités) se découpe en composantes connexes du graphe
+associations / héritage : une association ou un lien d'héritage ne touche que les tables de
+sa composante. Chaque composante est convertie dans un pool de processus, puis les morceaux
+sont fusionnés dans l'ordre de la conversion série, ce qui garantit un MLD identique :
+- tables d'entités dans l'ordre des entités, puis tables de liaison dans l'ordre des associations ;
+- clés étrangères dans l'ordre des associations puis de l'héritage ;
+- contraintes d'unicité des entités (dédoublonnées par nom sur tout le MCD), puis de l'héritage.
+
+Les noms qui peuvent se croiser d'une composante à l'autre (table de liaison nommée comme une
+entité ou comme une autre table de liaison, entités de même nom en minuscules) relient leurs
+nœuds : ils tombent dans la même composante.
+
+Configuration : BARREL_PARALLEL_MLD_MIN_ENTITIES (taille de MCD à partir de laquelle le pool est utilisé).
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from views.model_ir import Constraint, ForeignKey, Mld
+
+logger = logging.getLogger(__name__)
+
+# En dessous, le coût du pool (processus, sérialisation) dépasse le gain
+PARALLEL_MIN_ENTITIES = int(os.environ.get("BARREL_PARALLEL_MLD_MIN_ENTITIES", "500"))
+
+# Clé d'ordre d'un élément du MLD : (étape, rang de l'élément MCD d'origine, rang dans cet élément)
+_Key = Tuple[int, int, int]
+
+
+class _Component:
+    """Morceau de MCD (format ModelConverter) d'une composante, avec les rangs globaux de ses éléments."""
+
+    __slots__ = ("entities", "associations", "inheritance")
+
+    def __init__(self):
+        self.entities: List[Tuple[int, Dict]] = []
+        self.associations: List[Tuple[int, Dict]] = []
+        self.inheritance: List[Tuple[int, str, str]] = []
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+
+    def find(self, name: str) -> str:
+        parent = self.parent.setdefault(name, name)
+        while parent != name:
+            grand = self.parent[parent]
+            self.parent[name] = grand
+            name, parent = parent, grand
+        return name
+
+    def union(self, a: str, b: str) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[rb] = ra
+
+
+def split_components(converter, mcd: Dict) -> List[_Component]:
+    """Composantes connexes du MCD, dans l'ordre de leur premier élément."""
+    uf = _UnionFind()
+    entities = list(mcd["entities"].values())
+    associations = mcd.get("associations", [])
+    inheritance = list(mcd.get("inheritance", {}).items())
+    for entity in entities:
+        uf.find(entity["name"].lower())
+    for association in associations:
+        entity1 = association["entity1"].lower()
+        uf.union(entity1, association["entity2"].lower())
+        for name in converter.junction_table_names(association):
+            uf.union(entity1, name)
+    for child, parent in inheritance:
+        uf.union(child.lower(), parent.lower())
+
+    components: Dict[str, _Component] = {}
+    for i, entity in enumerate(entities):
+        components.setdefault(uf.find(entity["name"].lower()), _Component()).entities.append((i, entity))
+    for i, association in enumerate(associations):
+        components.setdefault(uf.find(association["entity1"].lower()), _Component()).associations.append((i, association))
+    for i, (child, parent) in enumerate(inheritance):
+        components.setdefault(uf.find(child.lower()), _Component()).inheritance.append((i, child, parent))
+    return list(components.values())
+
+
+def _convert_component(component: _Component):
+    """
+    Convertit une composante (étapes de ModelConverter._assemble_mld) en relevant, pour chaque
+    table, clé étrangère et contrainte, la clé d'ordre de l'élément MCD qui l'a produite.
+    """
+    from views.model_converter import ModelConverter
+    converter = ModelConverter()
+    mld = Mld()
+    table_keys: Dict[str, _Key] = {}
+    constraints: List[Tuple[_Key, Constraint]] = []
+    foreign_keys: List[Tuple[_Key, ForeignKey]] = []
+
+    for i, entity in component.entities:
+        table, unique_constraints = converter._entity_to_table(entity)
+        for k, constraint in enumerate(unique_constraints):
+            if mld.add_constraint(constraint):
+                constraints.append(((0, i, k), constraint))
+        table_keys.setdefault(table.name, (0, i, 0))
+        mld.tables[table.name] = table
+
+    for i, association in component.associations:
+        n_tables, n_fks = len(mld.tables), len(mld.foreign_keys)
+        converter._convert_association_to_foreign_keys(association, mld)
+        if len(mld.tables) > n_tables:  # table de liaison ajoutée en fin de dict
+            table_keys[next(reversed(mld.tables))] = (1, i, 0)
+        foreign_keys.extend(((0, i, k), fk) for k, fk in enumerate(mld.foreign_keys[n_fks:]))
+
+    for i, child, parent in component.inheritance:
+        n_fks, n_constraints = len(mld.foreign_keys), len(mld.constraints)
+        converter._convert_inheritance_to_foreign_keys(child, parent, mld)
+        foreign_keys.extend(((1, i, k), fk) for k, fk in enumerate(mld.foreign_keys[n_fks:]))
+        constraints.extend(((1, i, k), c) for k, c in enumerate(mld.constraints[n_constraints:]))
+
+    tables = [(table_keys[name], name, table) for name, table in mld.tables.items()]
+    return tables, foreign_keys, constraints
+
+
+def merge_components(parts: List[Tuple[List, List, List]]) -> Mld:
+    """Fusionne les MLD partiels dans l'ordre de la conversion série."""
+    mld = Mld()
+    for _, name, table in sorted((t for tables, _, _ in parts for t in tables), key=lambda t: t[0]):
+        mld.tables[name] = table
+    mld.foreign_keys = [fk for _, fk in sorted((f for _, fks, _ in parts for f in fks), key=lambda f: f[0])]
+    for key, constraint in sorted((c for _, _, cs in parts for c in cs), key=lambda c: c[0]):
+        # Contraintes d'entités dédoublonnées par nom sur tout le MCD ; héritage ajouté tel quel
+        mld.add_constraint(constraint, unique=key[0] == 0)
+    return mld
+
+
+def build_mld_parallel(converter, mcd: Dict, workers: int, executor: Optional[Any] = None) -> Mld:
+    """
+    MLD du MCD, composantes converties en parallèle (workers processus, ou executor fourni).
+    Repli sur la conversion série pour un petit MCD, une seule composante, ou un pool indisponible.
+    """
+    if len(mcd["entities"]) < PARALLEL_MIN_ENTITIES and executor is None:
+        return converter.build_mld(mcd)
+    components = split_components(converter, mcd)
+    if len(components) < 2:
+        return converter.build_mld(mcd)
+    try:
+        if executor is not None:
+            parts = list(executor.map(_convert_component, components))
+        else:
+            # Petites composantes regroupées : quelques gros lots par processus
+            chunksize = max(1, len(components) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(_convert_component, components, chunksize=chunksize))
+    except (BrokenProcessPool, OSError) as e:
+        logger.warning("MLD parallèle indisponible (%s), conversion série", e)
+        return converter.build_mld(mcd)
+    logger.debug("MLD parallèle : %s composantes", len(components))
+    return merge_components(parts)
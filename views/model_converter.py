@@ -1,7 +1,169 @@
+import os
 import re
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Iterable, Iterator, TextIO, Tuple
 from enum import Enum
 
+from views.index_planner import TableIndexInputs, plan_table_indexes, table_index_inputs
+from views.model_ir import Column, Constraint, ForeignKey, Mld, Mpd, Table
+from views.physical_design import create_table_parts, design_table, referenced_tables
+
+# Mémo des traductions de types : quelques dizaines de types distincts reviennent
+# des milliers de fois dans un gros modèle (VARCHAR(255), INTEGER, DECIMAL(10,2), ...)
+TYPE_MEMO_SIZE = int(os.environ.get("BARREL_TYPE_MEMO_SIZE", "4096"))
+
+# Mapping Barrel / SGBD courants (MySQL, PostgreSQL, SQLite, SQL Server)
+_SQL_TYPE_MAPPING = {
+    "INT": "INTEGER",
+    "INTEGER": "INTEGER",
+    "BIGINT": "BIGINT",
+    "TINYINT": "TINYINT",
+    "SMALLINT": "SMALLINT",
+    "VARCHAR": "VARCHAR(255)",
+    "VARCHAR2": "VARCHAR(255)",
+    "NVARCHAR": "NVARCHAR(255)",
+    "CHAR": "CHAR(1)",
+    "TEXT": "TEXT",
+    "DATE": "DATE",
+    "DATETIME": "DATETIME",
+    "DATETIME2": "DATETIME",
+    "TIMESTAMP": "TIMESTAMP",
+    "DECIMAL": "DECIMAL(10,2)",
+    "NUMERIC": "DECIMAL(10,2)",
+    "BOOLEAN": "BOOLEAN",
+    "BOOL": "BOOLEAN",
+    "BLOB": "BLOB",
+    "FLOAT": "FLOAT",
+    "DOUBLE": "DOUBLE",
+    "REAL": "REAL",
+    "SERIAL": "SERIAL",
+    "BIGSERIAL": "BIGSERIAL",
+}
+
+_LENGTH_RE = re.compile(r"(\w+)\s*\(\s*(\d+)\s*\)")
+_DECIMAL_ARGS_RE = re.compile(r"(\w+)\s*\(\s*(\d+)\s*,\s*(\d+)\s*\)")
+_DECIMAL_RE = re.compile(r"DECIMAL\s*\(\s*\d+\s*,\s*\d+\s*\)", re.I)
+_NUMERIC_RE = re.compile(r"NUMERIC\s*\(\s*\d+\s*,\s*\d+\s*\)", re.I)
+
+
+def _mysql_nvarchar(t: str, size: Optional[int]) -> str:
+    if "MAX" in t or (size and size > 16383):
+        return "TEXT"
+    return f"VARCHAR({min(size or 255, 16383)})"
+
+
+# Table de traduction par SGBD, évaluée dans l'ordre : (préfixes, sous-chaînes, type cible(t, size)).
+# t est le type source en majuscules ; la première règle dont un préfixe ou une sous-chaîne correspond s'applique.
+_DBMS_TYPE_RULES = {
+    "mysql": (
+        (("VARCHAR2",), (), lambda t, size: f"VARCHAR({size or 255})"),
+        (("NVARCHAR",), (), _mysql_nvarchar),
+        (("NCHAR",), (), lambda t, size: f"CHAR({size or 1})"),
+        ((), ("DATETIME2",), lambda t, size: "DATETIME"),
+        ((), ("SERIAL",), lambda t, size: "BIGINT" if "BIG" in t else "INT"),
+        ((), ("IDENTITY",), lambda t, size: "INT"),
+    ),
+    "postgresql": (
+        (("VARCHAR2",), (), lambda t, size: f"VARCHAR({size or 255})"),
+        (("NVARCHAR",), (), lambda t, size: f"VARCHAR({size or 255})"),
+        ((), ("DATETIME2",), lambda t, size: "TIMESTAMP"),
+        ((), ("IDENTITY",), lambda t, size: "SERIAL" if "BIG" not in t else "BIGSERIAL"),
+    ),
+    "sqlite": (
+        (("VARCHAR2", "NVARCHAR", "NCHAR"), (), lambda t, size: "TEXT" if (size or 255) > 255 else f"VARCHAR({size or 255})"),
+        ((), ("DATETIME",), lambda t, size: "TEXT"),
+        ((), ("SERIAL", "IDENTITY"), lambda t, size: "INTEGER"),
+    ),
+    "sqlserver": (
+        (("VARCHAR2",), (), lambda t, size: f"NVARCHAR({size or 255})"),
+        (("SERIAL", "BIGSERIAL"), (), lambda t, size: "INT" if "BIG" not in t else "BIGINT"),
+    ),
+}
+
+
+@lru_cache(maxsize=TYPE_MEMO_SIZE)
+def _convert_type_to_sql_memo(mcd_type: str) -> str:
+    t = mcd_type.strip().upper()
+    # Déjà typé avec taille/précision (ex. VARCHAR(100), DECIMAL(10,2))
+    if "(" in t and ")" in t:
+        return mcd_type.strip()
+    return _SQL_TYPE_MAPPING.get(t, "VARCHAR(255)")
+
+
+def convert_type_to_sql(mcd_type: str) -> str:
+    """Type SQL d'un type MCD (mémoïsé)."""
+    if not mcd_type or not isinstance(mcd_type, str):
+        return "VARCHAR(255)"
+    return _convert_type_to_sql_memo(mcd_type)
+
+
+def _translate_type(type_str: str, dbms: str, size: Optional[int],
+                    precision: Optional[int], scale: Optional[int]) -> Tuple[str, bool]:
+    """Traduction d'un type pour un SGBD, sans mémo (voir translate_type_for_dbms)."""
+    t = type_str.strip().upper()
+    size = size or (255 if "VARCHAR" in t or "CHAR" in t else None)
+    out = type_str.strip()
+    changed = False
+    
+    # Extraire taille / précision du type s'il est entre parenthèses
+    if "(" in t and ")" in t:
+        dec_match = _DECIMAL_ARGS_RE.match(t)
+        if dec_match:
+            precision = precision or int(dec_match.group(2))
+            scale = scale or int(dec_match.group(3))
+        elif size is None:
+            len_match = _LENGTH_RE.match(t)
+            if len_match:
+                size = int(len_match.group(2))
+    
+    for prefixes, substrings, target in _DBMS_TYPE_RULES.get(dbms, ()):
+        if t.startswith(prefixes) or any(s in t for s in substrings):
+            out = target(t, size)
+            changed = True
+            break
+    
+    if precision is not None and scale is not None and ("DECIMAL" in out or "NUMERIC" in out):
+        out = _DECIMAL_RE.sub(f"DECIMAL({precision},{scale})", out)
+        out = _NUMERIC_RE.sub(f"NUMERIC({precision},{scale})", out)
+    return (out, changed)
+
+
+# typed=True : 40 et 40.0 (JSON) ne donnent pas le même texte (VARCHAR(40) / VARCHAR(40.0))
+_translate_type_memo = lru_cache(maxsize=TYPE_MEMO_SIZE, typed=True)(_translate_type)
+
+
+def translate_type_for_dbms(type_str: str, dbms: str, size: Optional[int] = None,
+                            precision: Optional[int] = None, scale: Optional[int] = None) -> Tuple[str, bool]:
+    """
+    Traduit un type SQL pour le SGBD cible (types non reconnus → équivalent).
+    Retourne (type_traduit, was_changed). Mémo borné sur (type, dbms, size, precision, scale).
+    """
+    if not type_str or not isinstance(type_str, str):
+        return ("VARCHAR(255)", False)
+    try:
+        return _translate_type_memo(type_str, dbms, size, precision, scale)
+    except TypeError:  # taille / précision non hachable : pas de mémo
+        return _translate_type(type_str, dbms, size, precision, scale)
+
+
+# Séparateur entre deux instructions du script SQL
+SQL_SEPARATOR = "\n\n"
+
+
+def write_sql(statements: Iterable[str], out: TextIO) -> int:
+    """
+    Écrit des instructions SQL dans out au fil de l'eau, séparées par SQL_SEPARATOR
+    (même texte que SQL_SEPARATOR.join(statements), sans construire le script en mémoire).
+    Retourne le nombre de caractères écrits.
+    """
+    written = 0
+    for i, statement in enumerate(statements):
+        chunk = statement if i == 0 else SQL_SEPARATOR + statement
+        out.write(chunk)
+        written += len(chunk)
+    return written
+
+
 class ConversionType(Enum):
     MCD_TO_UML = "mcd_to_uml"
     MCD_TO_MLD = "mcd_to_mld"
@@ -90,78 +252,90 @@ class ModelConverter:
         return uml
         
     def _convert_to_mld(self, mcd: Dict) -> Dict:
-        """Convertit un MCD en MLD avec gestion correcte des clés."""
-        mld = {
-            "tables": {},
-            "foreign_keys": [],
-            "constraints": []
-        }
-        
+        """Convertit un MCD en MLD avec gestion correcte des clés (format dict)."""
+        return self.build_mld(mcd).to_dict()
+
+    def build_mld(self, mcd: Dict, workers: int = 0) -> Mld:
+        """
+        Convertit un MCD en MLD (représentation intermédiaire, voir views.model_ir).
+        workers > 1 : composantes connexes converties dans un pool de processus (views.mld_sharding),
+        résultat identique à la conversion série.
+        """
+        if workers > 1:
+            from views.mld_sharding import build_mld_parallel
+            return build_mld_parallel(self, mcd, workers)
         # CORRECTION FONDAMENTALE : En MCD, il n'y a pas de clés primaires
         # On doit les générer automatiquement pour le MLD
-        
-        # Étape 1 : Créer les tables de base
-        for entity_name, entity in mcd["entities"].items():
-            table = {
-                "name": entity["name"].lower(),  # Nom de table en minuscules
-                "columns": [],
-                "primary_key": []
-            }
+        entity_tables = (self._entity_to_table(entity) for entity in mcd["entities"].values())
+        return self._assemble_mld(entity_tables, mcd.get("associations", []), mcd.get("inheritance", {}))
+
+    def _entity_to_table(self, entity: Dict) -> Tuple[Table, List[Constraint]]:
+        """Construit la table MLD d'une entité (sans clés étrangères) et ses contraintes d'unicité."""
+        table = Table(entity["name"].lower())  # Nom de table en minuscules
+        unique_constraints = []
+        
+        # Ajouter automatiquement une clé primaire si elle n'existe pas
+        has_primary_key = False
+        for attr in entity["attributes"]:
+            column = Column(
+                name=attr["name"],
+                type=self._convert_type_to_sql(attr["type"]),
+                nullable=attr.get("nullable", attr.get("is_nullable", True)),
+                size=attr.get("size"),
+                precision=attr.get("precision"),
+                scale=attr.get("scale"),
+                default=attr.get("default_value"),
+                auto_increment=attr.get("auto_increment", False),
+            )
             
-            # Ajouter automatiquement une clé primaire si elle n'existe pas
-            has_primary_key = False
-            for attr in entity["attributes"]:
-                column = {
-                    "name": attr["name"],
-                    "type": self._convert_type_to_sql(attr["type"]),
-                    "nullable": attr.get("nullable", attr.get("is_nullable", True)),
-                    "size": attr.get("size"),
-                    "precision": attr.get("precision"),
-                    "scale": attr.get("scale"),
-                    "default": attr.get("default_value"),
-                    "auto_increment": attr.get("auto_increment", False),
-                }
-                
-                # Détecter les clés primaires (explicite ou par convention)
-                if (attr.get("primary_key", False) or
-                    attr["name"].lower() in ["id", "code", "numero"] or
-                    "identifiant" in attr.get("description", "").lower()):
-                    column["nullable"] = False
-                    table["primary_key"].append(attr["name"])
-                    has_primary_key = True
-                
-                table["columns"].append(column)
-                
-                # Contrainte d'unicité (clé secondaire)
-                if attr.get("is_unique", False):
-                    constraint_name = f"uq_{entity['name'].lower()}_{attr['name'].lower()}"
-                    if not any(c.get("constraint_name") == constraint_name for c in mld["constraints"]):
-                        mld["constraints"].append({
-                            "table": entity["name"].lower(),
-                            "constraint_name": constraint_name,
-                            "columns": [attr["name"]],
-                        })
+            # Détecter les clés primaires (explicite ou par convention)
+            if (attr.get("primary_key", False) or
+                attr["name"].lower() in ["id", "code", "numero"] or
+                "identifiant" in attr.get("description", "").lower()):
+                column.nullable = False
+                table.primary_key.append(attr["name"])
+                has_primary_key = True
             
-            # Si aucune clé primaire n'a été trouvée, en créer une automatiquement
-            if not has_primary_key:
-                # Ajouter une colonne ID automatique
-                id_column = {
-                    "name": "id",
-                    "type": "INTEGER",
-                    "nullable": False,
-                    "auto_increment": True
-                }
-                table["columns"].insert(0, id_column)
-                table["primary_key"].append("id")
+            table.add_column(column)
             
-            mld["tables"][entity["name"].lower()] = table
+            # Contrainte d'unicité (clé secondaire)
+            if attr.get("is_unique", False):
+                unique_constraints.append(Constraint(
+                    table=entity["name"].lower(),
+                    constraint_name=f"uq_{entity['name'].lower()}_{attr['name'].lower()}",
+                    columns=[attr["name"]],
+                ))
+        
+        # Si aucune clé primaire n'a été trouvée, en créer une automatiquement
+        if not has_primary_key:
+            # Ajouter une colonne ID automatique
+            id_column = Column(name="id", type="INTEGER", nullable=False, auto_increment=True)
+            table.add_column(id_column, position=0)
+            table.primary_key.append("id")
+        
+        # Indications de volumétrie (options physiques du MPD, views.physical_design)
+        for hint in ("estimated_rows", "partition_by"):
+            if entity.get(hint) is not None:
+                table.set(hint, entity[hint])
+        
+        return table, unique_constraints
+
+    def _assemble_mld(self, entity_tables: Iterable[Tuple[Table, List[Constraint]]],
+                      associations: List[Dict], inheritance: Dict) -> Mld:
+        """Assemble le MLD : tables d'entités, puis clés étrangères (associations, héritage)."""
+        mld = Mld()
+        
+        # Étape 1 : Créer les tables de base (contraintes dédoublonnées par nom)
+        for table, unique_constraints in entity_tables:
+            for constraint in unique_constraints:
+                mld.add_constraint(constraint)
+            mld.tables[table.name] = table
         
         # Étape 2 : Traiter les associations pour créer les clés étrangères
-        for association in mcd.get("associations", []):
+        for association in associations:
             self._convert_association_to_foreign_keys(association, mld)
         
         # Étape 3 : Traiter l'héritage
-        inheritance = mcd.get("inheritance", {})
         for child, parent in inheritance.items():
             self._convert_inheritance_to_foreign_keys(child, parent, mld)
         
@@ -183,7 +357,7 @@ class ModelConverter:
             return "0,n"
         return "1,n"
 
-    def _convert_association_to_foreign_keys(self, association: Dict, mld: Dict) -> None:
+    def _convert_association_to_foreign_keys(self, association: Dict, mld: Mld) -> None:
         """Convertit une association MCD en clés étrangères MLD (style Barrel/Merise)."""
         entity1 = association["entity1"].lower()
         entity2 = association["entity2"].lower()
@@ -203,152 +377,118 @@ class ModelConverter:
         else:
             self._add_foreign_key(mld, entity1, entity2, association["name"], cardinality_source=c1)
     
-    def _add_foreign_key(self, mld: Dict, source_table: str, target_table: str, association_name: str, *, cardinality_source: str = "1,n") -> None:
+    def _add_foreign_key(self, mld: Mld, source_table: str, target_table: str, association_name: str, *, cardinality_source: str = "1,n") -> None:
         """Ajoute une clé étrangère au MLD. FK nullable si cardinalité côté source = 0,n (Merise/Barrel)."""
-        if source_table not in mld["tables"] or target_table not in mld["tables"]:
+        if source_table not in mld.tables or target_table not in mld.tables:
             return
         
         fk_column_name = f"{target_table}_id"
         # Règle Merise/Barrel : 0,n côté porteur de la FK → nullable ; 1,n → NOT NULL
         nullable = self._norm_card(cardinality_source) == "0,n"
         
-        fk_column = {
-            "name": fk_column_name,
-            "type": "INTEGER",
-            "nullable": nullable
-        }
-        
-        mld["tables"][source_table]["columns"].append(fk_column)
+        fk_column = Column(name=fk_column_name, type="INTEGER", nullable=nullable)
+        mld.tables[source_table].add_column(fk_column)
         
         # Ajouter la contrainte de clé étrangère
-        foreign_key = {
-            "table": source_table,
-            "column": fk_column_name,
-            "referenced_table": target_table,
-            "referenced_column": "id",
-            "constraint_name": f"fk_{source_table}_{target_table}"
-        }
-        
-        mld["foreign_keys"].append(foreign_key)
+        foreign_key = ForeignKey(
+            table=source_table,
+            column=fk_column_name,
+            referenced_table=target_table,
+            referenced_column="id",
+            constraint_name=f"fk_{source_table}_{target_table}",
+        )
+        
+        mld.foreign_keys.append(foreign_key)
     
-    def _create_junction_table(self, mld: Dict, entity1: str, entity2: str, association: Dict) -> None:
+    def junction_table_names(self, association: Dict) -> Tuple[str, ...]:
+        """
+        Noms possibles de la table de liaison d'une association n,n, par ordre de préférence :
+        nom de l'association nettoyé, puis entité1_entité2 (aucun si l'association n'est pas n,n).
+        """
+        many_side = ("0,n", "1,n")
+        c1 = self._norm_card(association.get("cardinality1", "1,1"))
+        c2 = self._norm_card(association.get("cardinality2", "0,n"))
+        if c1 not in many_side or c2 not in many_side:
+            return ()
+        entity1, entity2 = association["entity1"].lower(), association["entity2"].lower()
+        safe = re.sub(r"[^\w\s]", "", (association.get("name") or "").strip()).strip().lower().replace(" ", "_")
+        return tuple(n for n in (safe, f"{entity1}_{entity2}") if n)
+
+    def _create_junction_table(self, mld: Mld, entity1: str, entity2: str, association: Dict) -> None:
         """Crée une table de liaison pour une relation n,n (style Barrel : nom = nom de l'association si possible)."""
-        raw_name = (association.get("name") or "").strip()
-        if raw_name:
-            safe = re.sub(r"[^\w\s]", "", raw_name).strip().lower().replace(" ", "_")
-            if safe and safe not in mld["tables"]:
-                junction_table_name = safe
-            else:
-                junction_table_name = f"{entity1}_{entity2}"
+        names = self.junction_table_names(association)
+        if names and names[0] not in mld.tables:
+            junction_table_name = names[0]
         else:
             junction_table_name = f"{entity1}_{entity2}"
         
-        junction_table = {
-            "name": junction_table_name,
-            "columns": [
-                {
-                    "name": f"{entity1}_id",
-                    "type": "INTEGER",
-                    "nullable": False
-                },
-                {
-                    "name": f"{entity2}_id",
-                    "type": "INTEGER",
-                    "nullable": False
-                }
+        junction_table = Table(
+            junction_table_name,
+            [
+                Column(name=f"{entity1}_id", type="INTEGER", nullable=False),
+                Column(name=f"{entity2}_id", type="INTEGER", nullable=False),
             ],
-            "primary_key": [f"{entity1}_id", f"{entity2}_id"]
-        }
+            [f"{entity1}_id", f"{entity2}_id"],
+        )
         
         # Ajouter les attributs de l'association s'ils existent
         if "attributes" in association:
             for attr in association["attributes"]:
-                junction_table["columns"].append({
-                    "name": attr["name"],
-                    "type": self._convert_type_to_sql(attr["type"]),
-                    "nullable": attr.get("is_nullable", True)
-                })
+                junction_table.add_column(Column(
+                    name=attr["name"],
+                    type=self._convert_type_to_sql(attr["type"]),
+                    nullable=attr.get("is_nullable", True),
+                ))
         
-        mld["tables"][junction_table_name] = junction_table
+        mld.tables[junction_table_name] = junction_table
         
         # Ajouter les clés étrangères de la table de liaison
-        mld["foreign_keys"].extend([
-            {
-                "table": junction_table_name,
-                "column": f"{entity1}_id",
-                "referenced_table": entity1,
-                "referenced_column": "id",
-                "constraint_name": f"fk_{junction_table_name}_{entity1}"
-            },
-            {
-                "table": junction_table_name,
-                "column": f"{entity2}_id",
-                "referenced_table": entity2,
-                "referenced_column": "id",
-                "constraint_name": f"fk_{junction_table_name}_{entity2}"
-            }
+        mld.foreign_keys.extend([
+            ForeignKey(
+                table=junction_table_name,
+                column=f"{entity1}_id",
+                referenced_table=entity1,
+                referenced_column="id",
+                constraint_name=f"fk_{junction_table_name}_{entity1}",
+            ),
+            ForeignKey(
+                table=junction_table_name,
+                column=f"{entity2}_id",
+                referenced_table=entity2,
+                referenced_column="id",
+                constraint_name=f"fk_{junction_table_name}_{entity2}",
+            ),
         ])
     
-    def _convert_inheritance_to_foreign_keys(self, child: str, parent: str, mld: Dict) -> None:
+    def _convert_inheritance_to_foreign_keys(self, child: str, parent: str, mld: Mld) -> None:
         """Convertit l'héritage en clés étrangères (enfant 1,1 vers parent)."""
         child_table = child.lower()
         parent_table = parent.lower()
         
-        if child_table not in mld["tables"] or parent_table not in mld["tables"]:
+        if child_table not in mld.tables or parent_table not in mld.tables:
             return
         
         # Enfant 1,1 vers parent : FK NOT NULL
         self._add_foreign_key(mld, child_table, parent_table, "inheritance", cardinality_source="1,1")
         
         # Ajouter une contrainte d'unicité pour simuler l'héritage
-        unique_constraint = {
-            "table": child_table,
-            "columns": [f"{parent_table}_id"],
-            "constraint_name": f"uk_{child_table}_parent"
-        }
-        mld["constraints"].append(unique_constraint)
+        unique_constraint = Constraint(
+            table=child_table,
+            constraint_name=f"uk_{child_table}_parent",
+            columns=[f"{parent_table}_id"],
+        )
+        mld.add_constraint(unique_constraint, unique=False)
     
     def _convert_type_to_sql(self, mcd_type: str) -> str:
         """Convertit un type MCD en type SQL (alignement Barrel : types courants SGBD)."""
-        if not mcd_type or not isinstance(mcd_type, str):
-            return "VARCHAR(255)"
-        t = mcd_type.strip().upper()
-        # Déjà typé avec taille/précision (ex. VARCHAR(100), DECIMAL(10,2))
-        if "(" in t and ")" in t:
-            return mcd_type.strip()
-        # Mapping Barrel / SGBD courants (MySQL, PostgreSQL, SQLite, SQL Server)
-        type_mapping = {
-            "INT": "INTEGER",
-            "INTEGER": "INTEGER",
-            "BIGINT": "BIGINT",
-            "TINYINT": "TINYINT",
-            "SMALLINT": "SMALLINT",
-            "VARCHAR": "VARCHAR(255)",
-            "VARCHAR2": "VARCHAR(255)",
-            "NVARCHAR": "NVARCHAR(255)",
-            "CHAR": "CHAR(1)",
-            "TEXT": "TEXT",
-            "DATE": "DATE",
-            "DATETIME": "DATETIME",
-            "DATETIME2": "DATETIME",
-            "TIMESTAMP": "TIMESTAMP",
-            "DECIMAL": "DECIMAL(10,2)",
-            "NUMERIC": "DECIMAL(10,2)",
-            "BOOLEAN": "BOOLEAN",
-            "BOOL": "BOOLEAN",
-            "BLOB": "BLOB",
-            "FLOAT": "FLOAT",
-            "DOUBLE": "DOUBLE",
-            "REAL": "REAL",
-            "SERIAL": "SERIAL",
-            "BIGSERIAL": "BIGSERIAL",
-        }
-        return type_mapping.get(t, "VARCHAR(255)")
+        return convert_type_to_sql(mcd_type)
         
     def _convert_to_sql(self, mld: Dict) -> str:
         """Convertit un MLD en script SQL robuste."""
-        sql_script = []
-        
+        return SQL_SEPARATOR.join(self._iter_mld_sql(mld))
+
+    def _iter_mld_sql(self, mld: Dict) -> Iterator[str]:
+        """Instructions SQL d'un MLD (dict), une par une (voir _convert_to_sql)."""
         # Créer les tables
         for table_name, table in mld["tables"].items():
             sql = f"CREATE TABLE {table_name} (\n"
@@ -385,22 +525,16 @@ class ModelConverter:
             
             sql += ",\n".join(columns)
             sql += "\n);"
-            sql_script.append(sql)
+            yield sql
         
         # Ajouter les clés étrangères
         for fk in mld["foreign_keys"]:
-            sql = f"ALTER TABLE {fk['table']} ADD CONSTRAINT {fk['constraint_name']} "
-            sql += f"FOREIGN KEY ({fk['column']}) REFERENCES {fk['referenced_table']}({fk['referenced_column']});"
-            sql_script.append(sql)
+            yield self._foreign_key_sql(ForeignKey.from_dict(fk))
         
         # Ajouter les contraintes d'unicité
         for constraint in mld["constraints"]:
             if constraint.get("constraint_name"):
-                sql = f"ALTER TABLE {constraint['table']} ADD CONSTRAINT {constraint['constraint_name']} "
-                sql += f"UNIQUE ({', '.join(constraint['columns'])});"
-                sql_script.append(sql)
-        
-        return "\n\n".join(sql_script)
+                yield self._unique_constraint_sql(Constraint.from_dict(constraint))
     
     def _translate_type_for_dbms(self, type_str: str, dbms: str, size: Optional[int] = None,
                                   precision: Optional[int] = None, scale: Optional[int] = None) -> tuple:
@@ -408,278 +542,237 @@ class ModelConverter:
         Traduit un type SQL pour le SGBD cible (types non reconnus → équivalent).
         Retourne (type_traduit, was_changed).
         """
-        if not type_str or not isinstance(type_str, str):
-            return ("VARCHAR(255)", False)
-        t = type_str.strip().upper()
-        size = size or (255 if "VARCHAR" in t or "CHAR" in t else None)
-        out = type_str.strip()
-        changed = False
-        
-        # Extraire taille / précision du type s'il est entre parenthèses
-        if "(" in t and ")" in t:
-            len_match = re.match(r"(\w+)\s*\(\s*(\d+)\s*\)", t)
-            dec_match = re.match(r"(\w+)\s*\(\s*(\d+)\s*,\s*(\d+)\s*\)", t)
-            if dec_match:
-                precision = precision or int(dec_match.group(2))
-                scale = scale or int(dec_match.group(3))
-            elif len_match and size is None:
-                size = int(len_match.group(2))
-        
-        # Mapping par SGBD : type source (début de chaîne) → type cible
-        if dbms == "mysql":
-            if t.startswith("VARCHAR2"):
-                out = f"VARCHAR({size or 255})"
-                changed = True
-            elif t.startswith("NVARCHAR"):
-                if "MAX" in t or (size and size > 16383):
-                    out = "TEXT"
-                else:
-                    out = f"VARCHAR({min(size or 255, 16383)})"
-                changed = True
-            elif t.startswith("NCHAR"):
-                out = f"CHAR({size or 1})"
-                changed = True
-            elif "DATETIME2" in t:
-                out = "DATETIME"
-                changed = True
-            elif "SERIAL" in t or "BIGSERIAL" in t:
-                out = "BIGINT" if "BIG" in t else "INT"
-                changed = True
-            elif "IDENTITY" in t:
-                out = "INT"
-                changed = True
-        elif dbms == "postgresql":
-            if t.startswith("VARCHAR2"):
-                out = f"VARCHAR({size or 255})"
-                changed = True
-            elif t.startswith("NVARCHAR"):
-                out = f"VARCHAR({size or 255})"
-                changed = True
-            elif "DATETIME2" in t:
-                out = "TIMESTAMP"
-                changed = True
-            elif "IDENTITY" in t:
-                out = "SERIAL" if "BIG" not in t else "BIGSERIAL"
-                changed = True
-        elif dbms == "sqlite":
-            if t.startswith("VARCHAR2") or t.startswith("NVARCHAR") or t.startswith("NCHAR"):
-                out = f"TEXT" if (size or 255) > 255 else f"VARCHAR({size or 255})"
-                changed = True
-            elif "DATETIME2" in t or "DATETIME" in t:
-                out = "TEXT"
-                changed = True
-            elif "SERIAL" in t or "BIGSERIAL" in t or "IDENTITY" in t:
-                out = "INTEGER"
-                changed = True
-        elif dbms == "sqlserver":
-            if t.startswith("VARCHAR2"):
-                out = f"NVARCHAR({size or 255})"
-                changed = True
-            elif t.startswith("SERIAL") or t.startswith("BIGSERIAL"):
-                out = "INT" if "BIG" not in t else "BIGINT"
-                changed = True
-        
-        if precision is not None and scale is not None and ("DECIMAL" in out or "NUMERIC" in out):
-            out = re.sub(r"DECIMAL\s*\(\s*\d+\s*,\s*\d+\s*\)", f"DECIMAL({precision},{scale})", out, flags=re.I)
-            out = re.sub(r"NUMERIC\s*\(\s*\d+\s*,\s*\d+\s*\)", f"NUMERIC({precision},{scale})", out, flags=re.I)
-        return (out, changed)
+        return translate_type_for_dbms(type_str, dbms, size, precision, scale)
     
     def generate_mpd(self, mld: Dict, dbms: str = "mysql") -> Dict:
         """Génère un MPD (Modèle Physique de Données) à partir du MLD. Enregistre type_original et type_translations si des types sont traduits pour le SGBD."""
         if not mld:
             return {"tables": {}, "indexes": [], "triggers": [], "procedures": [], "dbms": dbms, "type_translations": []}
-            
-        mpd = {
-            "tables": {},
-            "indexes": [],
-            "triggers": [],
-            "procedures": [],
-            "dbms": dbms,
-            "type_translations": []
-        }
-        
-        for table_name, table in mld["tables"].items():
-            mpd_table = {
-                "name": table_name,
-                "columns": [],
-                "primary_key": table["primary_key"],
-                "indexes": [],
-                "triggers": []
-            }
-            
-            for column in table["columns"]:
-                mpd_column = column.copy()
-                type_orig = mpd_column["type"]
-                mpd_column["type_original"] = type_orig
-                
-                # Traduction du type si non reconnu par le SGBD
-                translated, type_changed = self._translate_type_for_dbms(
-                    type_orig, dbms,
-                    size=mpd_column.get("size"),
-                    precision=mpd_column.get("precision"),
-                    scale=mpd_column.get("scale")
-                )
-                if type_changed:
-                    mpd_column["type"] = translated
-                    mpd["type_translations"].append({
-                        "table": table_name,
-                        "column": mpd_column["name"],
-                        "original_type": type_orig,
-                        "translated_type": translated,
-                    })
-                
-                # Optimisations spécifiques au SGBD (auto_increment, etc.)
-                if dbms == "mysql":
-                    if mpd_column.get("auto_increment"):
-                        prev = mpd_column["type"]
-                        mpd_column["type"] = "INT AUTO_INCREMENT"
-                        if prev != mpd_column["type"]:
-                            mpd["type_translations"].append({
-                                "table": table_name,
-                                "column": mpd_column["name"],
-                                "original_type": type_orig,
-                                "translated_type": mpd_column["type"],
-                            })
-                    if mpd_column["type"].startswith("VARCHAR") and (mpd_column.get("size") or 255) <= 255:
-                        mpd_column["index"] = "BTREE"
-                elif dbms == "postgresql":
-                    if mpd_column.get("auto_increment"):
-                        prev = mpd_column["type"]
-                        mpd_column["type"] = "SERIAL"
-                        if prev != mpd_column["type"]:
-                            mpd["type_translations"].append({
-                                "table": table_name,
-                                "column": mpd_column["name"],
-                                "original_type": type_orig,
-                                "translated_type": mpd_column["type"],
-                            })
-                    if mpd_column["type"].startswith("VARCHAR"):
-                        mpd_column["index"] = "BTREE"
-                elif dbms == "sqlite":
-                    if mpd_column.get("auto_increment"):
-                        prev = mpd_column["type"]
-                        mpd_column["type"] = "INTEGER PRIMARY KEY AUTOINCREMENT"
-                        if prev != mpd_column["type"]:
-                            mpd["type_translations"].append({
-                                "table": table_name,
-                                "column": mpd_column["name"],
-                                "original_type": type_orig,
-                                "translated_type": mpd_column["type"],
-                            })
-                elif dbms == "sqlserver":
-                    if mpd_column.get("auto_increment"):
-                        prev = mpd_column["type"]
-                        mpd_column["type"] = "INT IDENTITY(1,1)"
-                        if prev != mpd_column["type"]:
-                            mpd["type_translations"].append({
-                                "table": table_name,
-                                "column": mpd_column["name"],
-                                "original_type": type_orig,
-                                "translated_type": mpd_column["type"],
-                            })
-                
-                mpd_table["columns"].append(mpd_column)
-            
-            self._add_automatic_indexes(mpd_table, dbms)
-            mpd["tables"][table_name] = mpd_table
-        
-        mpd["foreign_keys"] = mld["foreign_keys"]
-        mpd["constraints"] = mld["constraints"]
+        if not isinstance(mld, Mld):
+            mld = Mld.from_dict(mld)
+        return self.build_mpd(mld, dbms).to_dict()
+
+    def build_mpd(self, mld: Mld, dbms: str = "mysql") -> Mpd:
+        """MPD (représentation intermédiaire) d'un MLD pour le SGBD donné."""
+        mpd = Mpd(dbms)
+        index_inputs = table_index_inputs(mld)
+        referenced = referenced_tables(mld)
+        for table_name, table in mld.tables.items():
+            mpd.tables[table_name] = self._mpd_table(
+                table_name, table, dbms, mpd.type_translations, index_inputs.get(table_name), table_name in referenced
+            )
+        mpd.foreign_keys = mld.foreign_keys
+        mpd.constraints = mld.constraints
         return mpd
     
-    def _add_automatic_indexes(self, table: Dict, dbms: str) -> None:
-        """Ajoute des index automatiques pour optimiser les performances."""
-        table_name = table["name"]
-        
-        # Index sur les clés étrangères
-        for column in table["columns"]:
-            if column["name"].endswith("_id") and column["name"] != "id":
-                index_name = f"idx_{table_name}_{column['name']}"
-                table["indexes"].append({
-                    "name": index_name,
-                    "columns": [column["name"]],
-                    "type": "BTREE"
-                })
-        
-        # Index sur les colonnes fréquemment utilisées
-        common_search_columns = ["nom", "name", "code", "email", "date_creation", "created_at"]
-        for column in table["columns"]:
-            if column["name"].lower() in common_search_columns:
-                index_name = f"idx_{table_name}_{column['name']}"
-                table["indexes"].append({
-                    "name": index_name,
-                    "columns": [column["name"]],
-                    "type": "BTREE"
-                })
-    
-    def generate_sql_from_mpd(self, mpd: Dict, use_original: bool = False) -> str:
-        """Génère du SQL à partir du MPD. Si use_original=True, utilise type_original (version non traduite pour le SGBD)."""
-        if not mpd:
-            return ""
-            
-        sql_script = []
-        dbms = mpd.get("dbms", "mysql")
-        
-        for table_name, table in mpd["tables"].items():
-            sql = f"CREATE TABLE {table_name} (\n"
-            
-            columns = []
-            for column in table["columns"]:
-                col_type = column.get("type_original", column["type"]) if use_original else column["type"]
-                col_def = f"    {column['name']} {col_type}"
-                
-                if not column.get("nullable", True):
-                    col_def += " NOT NULL"
-                if column.get("default") is not None:
-                    default_val = column['default']
-                    if isinstance(default_val, str) and not default_val.isdigit():
-                        default_val = f"'{default_val}'"
-                    col_def += f" DEFAULT {default_val}"
-                
-                columns.append(col_def)
+    def _mpd_table(self, table_name: str, table: Table, dbms: str, type_translations: List[Dict],
+                   index_inputs: Optional[TableIndexInputs] = None, referenced: bool = False) -> Table:
+        """
+        Construit la table MPD d'une table MLD ; ajoute les traductions de types à type_translations.
+        index_inputs : clés étrangères et contraintes d'unicité de la table (index_planner.table_index_inputs).
+        referenced : table référencée par une clé étrangère (options physiques, views.physical_design).
+        """
+        mpd_table = Table(table_name, primary_key=table.primary_key, indexes=[], triggers=[])
+        for hint in ("estimated_rows", "partition_by"):
+            if table.get(hint) is not None:
+                mpd_table.set(hint, table.get(hint))
+        
+        for column in table.columns:
+            mpd_column = column.copy()
+            type_orig = mpd_column.type
+            mpd_column.type_original = type_orig
             
-            # Clé primaire
-            if table["primary_key"]:
-                pk_columns = ", ".join(table["primary_key"])
-                columns.append(f"    PRIMARY KEY ({pk_columns})")
+            size = mpd_column.get("size")
+            auto_increment = mpd_column.get("auto_increment")
             
-            sql += ",\n".join(columns)
-            sql += "\n)"
+            # Traduction du type si non reconnu par le SGBD
+            translated, type_changed = self._translate_type_for_dbms(
+                type_orig, dbms,
+                size=size,
+                precision=mpd_column.get("precision"),
+                scale=mpd_column.get("scale")
+            )
+            if type_changed:
+                mpd_column.type = translated
+                type_translations.append({
+                    "table": table_name,
+                    "column": mpd_column.name,
+                    "original_type": type_orig,
+                    "translated_type": translated,
+                })
             
-            # Options spécifiques au SGBD (meilleur des deux : Barrel + Barrel SQL Server)
+            # Optimisations spécifiques au SGBD (auto_increment, etc.)
             if dbms == "mysql":
-                sql += " ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci"
+                if auto_increment:
+                    prev = mpd_column.type
+                    mpd_column.type = "INT AUTO_INCREMENT"
+                    if prev != mpd_column.type:
+                        type_translations.append({
+                            "table": table_name,
+                            "column": mpd_column.name,
+                            "original_type": type_orig,
+                            "translated_type": mpd_column.type,
+                        })
+                if mpd_column.type.startswith("VARCHAR") and (size or 255) <= 255:
+                    mpd_column.index = "BTREE"
             elif dbms == "postgresql":
-                sql += ""
+                if auto_increment:
+                    prev = mpd_column.type
+                    mpd_column.type = "SERIAL"
+                    if prev != mpd_column.type:
+                        type_translations.append({
+                            "table": table_name,
+                            "column": mpd_column.name,
+                            "original_type": type_orig,
+                            "translated_type": mpd_column.type,
+                        })
+                if mpd_column.type.startswith("VARCHAR"):
+                    mpd_column.index = "BTREE"
             elif dbms == "sqlite":
-                sql += ""
+                if auto_increment:
+                    prev = mpd_column.type
+                    mpd_column.type = "INTEGER PRIMARY KEY AUTOINCREMENT"
+                    if prev != mpd_column.type:
+                        type_translations.append({
+                            "table": table_name,
+                            "column": mpd_column.name,
+                            "original_type": type_orig,
+                            "translated_type": mpd_column.type,
+                        })
             elif dbms == "sqlserver":
-                sql += ""
+                if auto_increment:
+                    prev = mpd_column.type
+                    mpd_column.type = "INT IDENTITY(1,1)"
+                    if prev != mpd_column.type:
+                        type_translations.append({
+                            "table": table_name,
+                            "column": mpd_column.name,
+                            "original_type": type_orig,
+                            "translated_type": mpd_column.type,
+                        })
             
-            sql += ";"
-            sql_script.append(sql)
+            mpd_table.add_column(mpd_column)
+        
+        self._add_automatic_indexes(mpd_table, dbms, index_inputs)
+        design_table(mpd_table, dbms, index_inputs, referenced)
+        return mpd_table
+    
+    def _add_automatic_indexes(self, table: Table, dbms: str, index_inputs: Optional[TableIndexInputs] = None) -> None:
+        """
+        Ajoute les index retenus par le planificateur (views.index_planner) : clés étrangères,
+        colonnes de recherche courantes, index inverse des tables de liaison ; sans les index
+        déjà couverts par la clé primaire, une contrainte d'unicité ou un autre index.
+        """
+        table.indexes.extend(d.index() for d in plan_table_indexes(table, index_inputs) if d.kept)
+    
+    def generate_sql_from_mpd(self, mpd: Dict, use_original: bool = False) -> str:
+        """Génère du SQL à partir du MPD (dict ou Mpd). Si use_original=True, utilise type_original (version non traduite pour le SGBD)."""
+        return SQL_SEPARATOR.join(self.iter_sql_from_mpd(mpd, use_original))
+
+    def iter_sql_from_mpd(self, mpd: Dict, use_original: bool = False) -> Iterator[str]:
+        """
+        Instructions SQL du MPD (dict ou Mpd), une par une : CREATE TABLE table par table,
+        puis clés étrangères, index et contraintes d'unicité (même ordre que generate_sql_from_mpd).
+        """
+        if not mpd:
+            return
+        if not isinstance(mpd, Mpd):
+            mpd = Mpd.from_dict(mpd)
+        dbms = mpd.dbms
+        
+        for table_name, table in mpd.tables.items():
+            yield self._create_table_sql(table_name, table, dbms, use_original)
         
         # Ajouter les clés étrangères
-        for fk in mpd["foreign_keys"]:
-            sql = f"ALTER TABLE {fk['table']} ADD CONSTRAINT {fk['constraint_name']} "
-            sql += f"FOREIGN KEY ({fk['column']}) REFERENCES {fk['referenced_table']}({fk['referenced_column']});"
-            sql_script.append(sql)
+        for fk in mpd.foreign_keys:
+            yield self._foreign_key_sql(fk)
         
         # Ajouter les index
-        for table_name, table in mpd["tables"].items():
-            for index in table["indexes"]:
-                sql = f"CREATE INDEX {index['name']} ON {table_name} "
-                sql += f"({', '.join(index['columns'])});"
-                sql_script.append(sql)
+        for table_name, table in mpd.tables.items():
+            yield from self._index_sql(table_name, table)
         
         # Ajouter les contraintes d'unicité
-        for constraint in mpd["constraints"]:
+        for constraint in mpd.constraints:
             if constraint.get("constraint_name"):
-                sql = f"ALTER TABLE {constraint['table']} ADD CONSTRAINT {constraint['constraint_name']} "
-                sql += f"UNIQUE ({', '.join(constraint['columns'])});"
-                sql_script.append(sql)
+                yield self._unique_constraint_sql(constraint)
+
+    def write_sql_from_mpd(self, mpd: Dict, out: TextIO, use_original: bool = False) -> int:
+        """Écrit le SQL du MPD dans out (fichier texte) au fil de la génération. Retourne le nombre de caractères écrits."""
+        return write_sql(self.iter_sql_from_mpd(mpd, use_original), out)
+
+    def _create_table_sql(self, table_name: str, table: Table, dbms: str, use_original: bool = False) -> str:
+        """
+        Instruction CREATE TABLE d'une table MPD, précédée / suivie des instructions de ses options
+        physiques (fonction de partition, partitions, index cluster : views.physical_design).
+        """
+        physical = create_table_parts(table_name, table, dbms)
+        sql = f"CREATE TABLE {table_name} (\n"
+        
+        columns = [f"    {self._column_sql(column, use_original)}" for column in table.columns]
+        
+        # Clé primaire
+        if table.primary_key:
+            pk_columns = ", ".join(table.primary_key)
+            columns.append(f"    PRIMARY KEY{physical.primary_key_kind} ({pk_columns}){physical.primary_key_options}")
+        
+        sql += ",\n".join(columns)
+        sql += "\n)"
         
-        return "\n\n".join(sql_script)
+        # Options spécifiques au SGBD (meilleur des deux : Barrel + Barrel SQL Server)
+        if dbms == "mysql":
+            sql += " ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci"
+        elif dbms == "postgresql":
+            sql += ""
+        elif dbms == "sqlite":
+            sql += ""
+        elif dbms == "sqlserver":
+            sql += ""
+        sql += physical.table_options + ";"
+        
+        return SQL_SEPARATOR.join(physical.before + [sql] + physical.after)
+
+    def _column_sql(self, column: Column, use_original: bool = False) -> str:
+        """Définition d'une colonne MPD (nom, type, NOT NULL, DEFAULT), telle qu'écrite dans CREATE TABLE."""
+        col_type = column.get("type_original", column.type) if use_original else column.type
+        col_def = f"{column.name} {col_type}"
+        if not column.get("nullable", True):
+            col_def += " NOT NULL"
+        if column.get("default") is not None:
+            col_def += f" DEFAULT {self._default_sql(column.default)}"
+        return col_def
+
+    @staticmethod
+    def _default_sql(default_val: Any) -> str:
+        """Valeur DEFAULT telle qu'écrite en SQL (chaîne non numérique entre apostrophes)."""
+        if isinstance(default_val, str) and not default_val.isdigit():
+            return f"'{default_val}'"
+        return str(default_val)
+
+    def _foreign_key_sql(self, fk: ForeignKey) -> str:
+        """Instruction ALTER TABLE ... FOREIGN KEY d'une clé étrangère."""
+        sql = f"ALTER TABLE {fk.table} ADD CONSTRAINT {fk.constraint_name} "
+        sql += f"FOREIGN KEY ({fk.column}) REFERENCES {fk.referenced_table}({fk.referenced_column});"
+        return sql
+
+    def _index_sql(self, table_name: str, table: Table) -> List[str]:
+        """Instructions CREATE INDEX des index d'une table MPD."""
+        statements = []
+        fillfactor = (table.get("physical") or {}).get("fillfactor")
+        for index in table.get("indexes") or ():
+            sql = f"CREATE INDEX {index.name} ON {table_name} "
+            sql += f"({', '.join(index.columns)})"
+            if index.get("include"):
+                sql += f" INCLUDE ({', '.join(index.include)})"
+            if fillfactor:
+                sql += f" WITH (FILLFACTOR = {fillfactor})"
+            statements.append(sql + ";")
+        return statements
+
+    def _unique_constraint_sql(self, constraint: Constraint) -> str:
+        """Instruction ALTER TABLE ... UNIQUE d'une contrainte d'unicité nommée."""
+        sql = f"ALTER TABLE {constraint.table} ADD CONSTRAINT {constraint.constraint_name} "
+        sql += f"UNIQUE ({', '.join(constraint.columns)});"
+        return sql
         
     def _convert_many_to_many(self, relation: Dict, mld: Dict) -> None:
         """Convertit une relation many-to-many."""
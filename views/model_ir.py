@@ -0,0 +1,316 @@
+"""
+Représentation intermédiaire (IR) compacte du MLD / MPD utilisée par ModelConverter.
+
+Chaque élément (Column, Table, ForeignKey, Constraint, Index) est un objet à __slots__ :
+pas de dict par colonne, et seuls les champs renseignés sont stockés (un champ absent
+reste absent dans to_dict, comme dans l'ancien format dict). Mld / Mpd indexent les
+tables par nom et les contraintes par constraint_name.
+
+La sérialisation en dict (to_dict) n'a lieu qu'aux frontières (API, CLI, tests) ;
+from_dict accepte l'ancien format, clés inconnues comprises (conservées dans extra).
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+class _Unset:
+    """Valeur d'un champ absent (distinct de None) ; fausse, et unique même après pickle (pool de processus)."""
+
+    __slots__ = ()
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return "<absent>"
+
+    def __reduce__(self) -> str:
+        return "_UNSET"
+
+
+_UNSET = _Unset()
+
+
+_ATOMIC = frozenset((str, int, float, bool, type(None), _Unset))
+
+
+def _freeze(value: Any) -> Any:
+    """Valeur hachable équivalente (listes → tuples, dicts → frozensets d'items, enregistrements → key())."""
+    if value.__class__ in _ATOMIC:
+        return value
+    if isinstance(value, _Record):
+        return value.key()
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+def _field_methods(fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    _init, _copy et _fields_dict d'une classe d'enregistrement, écrits champ par champ (comme dataclasses) :
+    ni boucle ni getattr / setattr par champ sur le chemin de conversion.
+    """
+    lines = [f"def _init(self, /, {', '.join(f + '=_UNSET' for f in fields)}, **extra):"]
+    lines += [f"    self.{f} = {f}" for f in fields]
+    lines += ["    self.extra = extra or None", "",
+              "def _copy(self):", "    clone = _new(self.__class__)"]
+    lines += [f"    clone.{f} = self.{f}" for f in fields]
+    lines += ["    clone.extra = dict(self.extra) if self.extra else None", "    return clone", "",
+              "def _fields_dict(self):", "    out = {}"]
+    for f in fields:
+        lines += [f"    value = self.{f}", "    if value is not _UNSET:", f"        out[{f!r}] = value"]
+    lines += ["    return out"]
+    namespace = {"_UNSET": _UNSET, "_new": object.__new__}
+    exec("\n".join(lines), namespace)
+    return namespace
+
+
+class _Record:
+    """
+    Enregistrement à champs fixes ; champs hors FIELDS conservés dans extra.
+    Un champ absent vaut _UNSET dans son slot : get / to_dict / has le traitent comme absent.
+    """
+
+    __slots__ = ("extra",)
+    FIELDS: Tuple[str, ...] = ()
+    _FIELD_SET: frozenset = frozenset()
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+        methods = _field_methods(cls.FIELDS)
+        cls._init, cls._copy, cls._fields_dict = methods["_init"], methods["_copy"], methods["_fields_dict"]
+        if "__init__" not in cls.__dict__:
+            cls.__init__ = cls._init
+        if "copy" not in cls.__dict__:
+            cls.copy = cls._copy
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        return cls(**data)
+
+    def set(self, field: str, value: Any) -> None:
+        if field in self._FIELD_SET:
+            setattr(self, field, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[field] = value
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """Valeur du champ, ou default s'il est absent (équivalent de dict.get)."""
+        if field in self._FIELD_SET:
+            value = getattr(self, field)
+            return default if value is _UNSET else value
+        return self.extra.get(field, default) if self.extra else default
+
+    def has(self, field: str) -> bool:
+        return self.get(field, _UNSET) is not _UNSET
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = self._fields_dict()
+        if self.extra:
+            out.update(self.extra)
+        return out
+
+    def __getitem__(self, field: str) -> Any:
+        """Accès record[champ] de l'ancien format dict ; KeyError si le champ est absent."""
+        value = self.get(field, _UNSET)
+        if value is _UNSET:
+            raise KeyError(field)
+        return value
+
+    def key(self) -> Tuple:
+        """
+        Identité hachable : type et valeurs des champs, listes et dicts figés en tuples / frozensets.
+        Égale pour deux enregistrements égaux ; sert au calcul de deltas par ensembles ou Counter.
+        """
+        return (self.__class__.__name__,) + tuple(_freeze(getattr(self, f)) for f in self.FIELDS) \
+            + (_freeze(self.extra) if self.extra else None,)
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        if other is self:
+            return True
+        for field in self.FIELDS:
+            if getattr(self, field) != getattr(other, field):
+                return False
+        return (self.extra or None) == (other.extra or None)
+
+    def __hash__(self) -> int:
+        # calculé à chaque appel : un enregistrement modifié après insertion dans un set n'y est plus retrouvé
+        return hash(self.key())
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.to_dict()!r})"
+
+
+class Column(_Record):
+    """Colonne MLD / MPD (type_original et index ne sont renseignés que dans le MPD)."""
+
+    FIELDS = ("name", "type", "nullable", "size", "precision", "scale", "default",
+              "auto_increment", "type_original", "index")
+    __slots__ = FIELDS
+
+
+class Index(_Record):
+    """
+    Index secondaire d'une table MPD ; reason = justification donnée par views.index_planner,
+    include = colonnes couvertes hors clé (views.physical_design).
+    """
+
+    FIELDS = ("name", "columns", "type", "reason", "include")
+    __slots__ = FIELDS
+
+
+class ForeignKey(_Record):
+    FIELDS = ("table", "column", "referenced_table", "referenced_column", "constraint_name")
+    __slots__ = FIELDS
+
+
+class Constraint(_Record):
+    """Contrainte d'unicité (clé secondaire, héritage)."""
+
+    FIELDS = ("table", "constraint_name", "columns")
+    __slots__ = FIELDS
+
+
+class Table(_Record):
+    """
+    Table MLD (name, columns, primary_key) ou MPD (+ indexes, triggers) ; colonnes indexées par nom.
+    estimated_rows / partition_by : indications de volumétrie de l'entité ; physical : options physiques
+    du MPD (views.physical_design).
+    """
+
+    FIELDS = ("name", "columns", "primary_key", "indexes", "triggers", "estimated_rows", "partition_by", "physical")
+    __slots__ = FIELDS + ("_by_name",)
+
+    def __init__(self, name: str, columns: Optional[List[Column]] = None,
+                 primary_key: Optional[List[str]] = None, **fields: Any):
+        self._init(name=name, columns=[], primary_key=primary_key if primary_key is not None else [], **fields)
+        self._by_name: Dict[str, Column] = {}
+        for column in columns or ():
+            self.add_column(column)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Table":
+        fields = dict(data)
+        columns = [c if isinstance(c, Column) else Column.from_dict(c) for c in fields.pop("columns", None) or []]
+        if fields.get("indexes") is not None:
+            fields["indexes"] = [i if isinstance(i, Index) else Index.from_dict(i) for i in fields["indexes"]]
+        return cls(fields.pop("name", ""), columns, fields.pop("primary_key", None), **fields)
+
+    def add_column(self, column: Column, position: Optional[int] = None) -> None:
+        if position is None:
+            self.columns.append(column)
+        else:
+            self.columns.insert(position, column)
+        name = column.name
+        self._by_name.setdefault(None if name is _UNSET else name, column)
+
+    def column(self, name: str) -> Optional[Column]:
+        """Première colonne portant ce nom."""
+        return self._by_name.get(name)
+
+    def copy(self) -> "Table":
+        """Copie de la table (listes de colonnes et de clé primaire copiées, colonnes partagées)."""
+        clone = self._copy()
+        clone.columns = list(self.columns)
+        clone.primary_key = list(self.primary_key)
+        clone._by_name = dict(self._by_name)
+        return clone
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = super().to_dict()
+        out["columns"] = [c.to_dict() for c in self.columns]
+        if out.get("indexes") is not None:
+            out["indexes"] = [i.to_dict() if isinstance(i, Index) else i for i in out["indexes"]]
+        return out
+
+
+def _records(cls, items: Iterable) -> List:
+    return [i if isinstance(i, cls) else cls.from_dict(i) for i in items or ()]
+
+
+class Mld:
+    """MLD : tables par nom, clés étrangères, contraintes d'unicité indexées par nom."""
+
+    __slots__ = ("tables", "foreign_keys", "constraints", "_constraint_names")
+
+    def __init__(self):
+        self.tables: Dict[str, Table] = {}
+        self.foreign_keys: List[ForeignKey] = []
+        self.constraints: List[Constraint] = []
+        self._constraint_names: set = set()
+
+    def add_constraint(self, constraint: Constraint, unique: bool = True) -> bool:
+        """Ajoute la contrainte ; si unique, ignorée quand son nom est déjà présent. True si ajoutée."""
+        name = constraint.get("constraint_name")
+        if unique and name in self._constraint_names:
+            return False
+        self._constraint_names.add(name)
+        self.constraints.append(constraint)
+        return True
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Mld":
+        mld = cls()
+        for name, table in (data.get("tables") or {}).items():
+            mld.tables[name] = table if isinstance(table, Table) else Table.from_dict(table)
+        mld.foreign_keys = _records(ForeignKey, data.get("foreign_keys"))
+        for constraint in _records(Constraint, data.get("constraints")):
+            mld.add_constraint(constraint, unique=False)
+        return mld
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tables": {name: table.to_dict() for name, table in self.tables.items()},
+            "foreign_keys": [fk.to_dict() for fk in self.foreign_keys],
+            "constraints": [c.to_dict() for c in self.constraints],
+        }
+
+
+class Mpd:
+    """MPD d'un SGBD : tables physiques, traductions de types, clés étrangères et contraintes du MLD."""
+
+    __slots__ = ("tables", "indexes", "triggers", "procedures", "dbms", "type_translations",
+                 "foreign_keys", "constraints")
+
+    def __init__(self, dbms: str = "mysql"):
+        self.tables: Dict[str, Table] = {}
+        self.indexes: List[Any] = []
+        self.triggers: List[Any] = []
+        self.procedures: List[Any] = []
+        self.dbms = dbms
+        self.type_translations: List[Dict[str, str]] = []
+        self.foreign_keys: List[ForeignKey] = []
+        self.constraints: List[Constraint] = []
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Mpd":
+        mpd = cls(data.get("dbms", "mysql"))
+        for name, table in (data.get("tables") or {}).items():
+            mpd.tables[name] = table if isinstance(table, Table) else Table.from_dict(table)
+        mpd.indexes = list(data.get("indexes") or [])
+        mpd.triggers = list(data.get("triggers") or [])
+        mpd.procedures = list(data.get("procedures") or [])
+        mpd.type_translations = list(data.get("type_translations") or [])
+        mpd.foreign_keys = _records(ForeignKey, data.get("foreign_keys"))
+        mpd.constraints = _records(Constraint, data.get("constraints"))
+        return mpd
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tables": {name: table.to_dict() for name, table in self.tables.items()},
+            "indexes": self.indexes,
+            "triggers": self.triggers,
+            "procedures": self.procedures,
+            "dbms": self.dbms,
+            "type_translations": self.type_translations,
+            "foreign_keys": [fk.to_dict() for fk in self.foreign_keys],
+            "constraints": [c.to_dict() for c in self.constraints],
+        }
@@ -0,0 +1,184 @@
+"""
+Options physiques des tables volumineuses du MPD : partitionnement, index cluster, fillfactor, index couvrants.
+
+Une table est traitée quand son estimation de volumétrie (estimated_rows, portée par l'entité)
+atteint LARGE_TABLE_ROWS. Décisions, enregistrées dans table.physical avec leurs justifications :
+- partitionnement : par intervalle (RANGE) sur la colonne partition_by de l'entité, sinon sur la
+  première colonne date ; à défaut par hachage (HASH) sur la première clé étrangère. La colonne de
+  partitionnement rejoint la clé primaire (exigence des SGBD). Pas de partitionnement si :
+  - la table est référencée par une clé étrangère (la clé primaire ne serait plus unique seule) ;
+  - une contrainte d'unicité n'inclut pas la colonne ;
+  - MySQL : la table porte des clés étrangères (non supportées par InnoDB partitionné) ;
+  - SQL Server : partitionnement par hachage (non natif) ; SQLite : aucun partitionnement.
+- SQL Server : index cluster sur (colonne date, clé primaire) et clé primaire NONCLUSTERED (les index
+  secondaires préfixes de l'index cluster sont retirés), FILLFACTOR = SQLSERVER_FILLFACTOR sur la clé
+  primaire et les index ;
+- index couvrants : les index de clé étrangère incluent (INCLUDE) la colonne de partitionnement
+  par intervalle, pour les lectures « lignes d'un parent sur une période » sans accès à la table.
+
+Configuration : BARREL_LARGE_TABLE_ROWS, BARREL_HASH_PARTITIONS, BARREL_SQLSERVER_FILLFACTOR.
+"""
+
+import os
+from typing import Dict, FrozenSet, List, NamedTuple, Optional
+
+from views.index_planner import TableIndexInputs
+from views.model_ir import Mld, Table
+
+LARGE_TABLE_ROWS = int(os.environ.get("BARREL_LARGE_TABLE_ROWS", "100000000"))
+HASH_PARTITIONS = int(os.environ.get("BARREL_HASH_PARTITIONS", "16"))
+SQLSERVER_FILLFACTOR = int(os.environ.get("BARREL_SQLSERVER_FILLFACTOR", "90"))
+
+_DATE_TYPES = ("DATE", "DATETIME", "TIMESTAMP", "SMALLDATETIME")
+
+
+def referenced_tables(mld: Mld) -> FrozenSet[str]:
+    """Tables référencées par au moins une clé étrangère du MLD (MPD accepté)."""
+    return frozenset(fk.get("referenced_table") for fk in mld.foreign_keys)
+
+
+def _date_column(table: Table) -> Optional[str]:
+    for column in table.columns:
+        if (column.type or "").upper().startswith(_DATE_TYPES):
+            return column.name
+    return None
+
+
+def _partition(table: Table, dbms: str, foreign_keys, unique_keys, referenced: bool,
+               notes: List[str]) -> Optional[Dict]:
+    """Partitionnement retenu pour la table, ou None (raison ajoutée à notes)."""
+    hint = table.get("partition_by")
+    if hint and table.column(hint) is None:
+        notes.append(f"partition_by : colonne {hint} inconnue")
+        hint = None
+    column = hint or _date_column(table)
+    if column is not None:
+        partition = {"method": "range", "column": column}
+    elif foreign_keys:
+        partition = {"method": "hash", "column": foreign_keys[0][0], "partitions": HASH_PARTITIONS}
+    else:
+        notes.append("pas de partitionnement : aucune colonne date ni clé étrangère")
+        return None
+    column = partition["column"]
+    if dbms == "sqlite":
+        blocker = "SQLite ne partitionne pas les tables"
+    elif referenced:
+        blocker = "table référencée par une clé étrangère"
+    elif any(column not in unique for unique in unique_keys):
+        blocker = f"contrainte d'unicité sans la colonne {column}"
+    elif dbms == "mysql" and foreign_keys:
+        blocker = "clés étrangères non supportées par une table InnoDB partitionnée"
+    elif dbms == "sqlserver" and partition["method"] == "hash":
+        blocker = "partitionnement par hachage non natif sous SQL Server"
+    else:
+        blocker = None
+    if blocker:
+        notes.append(f"pas de partitionnement ({partition['method']} sur {column}) : {blocker}")
+        return None
+    notes.append(f"partitionnement {partition['method']} sur {column}")
+    return partition
+
+
+def design_table(table: Table, dbms: str, inputs: Optional[TableIndexInputs] = None, referenced: bool = False) -> None:
+    """
+    Applique les options physiques à la table MPD (index déjà planifiés) si elle est volumineuse :
+    table.physical = {rows, partition, fillfactor, clustered_index, notes} (voir le docstring du module).
+    """
+    rows = table.get("estimated_rows")
+    if not rows or rows < LARGE_TABLE_ROWS:
+        return
+    foreign_keys, unique_keys = inputs or ((), ())
+    notes: List[str] = []
+    partition = _partition(table, dbms, foreign_keys, unique_keys, referenced, notes)
+    physical = {"rows": rows, "partition": partition, "fillfactor": None, "clustered_index": None, "notes": notes}
+
+    if partition is not None:
+        column = partition["column"]
+        if column not in table.primary_key:
+            table.primary_key = list(table.primary_key) + [column]
+            notes.append(f"{column} ajoutée à la clé primaire (clé de partitionnement)")
+        table.column(column).nullable = False  # colonnes MPD copiées du MLD : modification locale
+
+    if dbms == "sqlserver":
+        physical["fillfactor"] = SQLSERVER_FILLFACTOR
+        date_column = partition["column"] if partition else _date_column(table)
+        if date_column is not None:
+            clustered = [date_column] + [c for c in table.primary_key if c != date_column]
+            physical["clustered_index"] = clustered
+            notes.append(f"index cluster sur {date_column}, clé primaire NONCLUSTERED")
+            for index in [i for i in table.indexes if i.columns == clustered[:len(i.columns)]]:
+                table.indexes.remove(index)
+                notes.append(f"{index.name} retiré : couvert par l'index cluster")
+
+    # MySQL partitionné n'a pas de clé étrangère : seuls PostgreSQL et SQL Server sont concernés
+    if partition is not None and partition["method"] == "range":
+        _cover_foreign_key_indexes(table, {fk for fk, _ in foreign_keys}, partition["column"], notes)
+    table.physical = physical
+
+
+def _cover_foreign_key_indexes(table: Table, fk_columns, column: str, notes: List[str]) -> None:
+    """Index de clé étrangère couvrants pour les lectures « lignes d'un parent sur une période »."""
+    for index in table.indexes:
+        if len(index.columns) == 1 and index.columns[0] in fk_columns:
+            index.include = [column]
+            index.reason = f"{index.reason}, couvrant {column}"
+            notes.append(f"{index.name} couvre {column}")
+
+
+class TableSqlParts(NamedTuple):
+    """Fragments SQL des options physiques d'une table (chaînes vides / listes vides par défaut)."""
+    before: List[str]  # instructions avant CREATE TABLE
+    primary_key_kind: str  # entre PRIMARY KEY et ses colonnes (NONCLUSTERED)
+    primary_key_options: str  # après les colonnes de la clé primaire (WITH (FILLFACTOR = n))
+    table_options: str  # après la parenthèse fermante de CREATE TABLE
+    after: List[str]  # instructions après CREATE TABLE (partitions, index cluster)
+
+
+def create_table_parts(table_name: str, table: Table, dbms: str) -> TableSqlParts:
+    """Fragments SQL des options physiques de la table (table.physical), selon le SGBD."""
+    physical = table.get("physical")
+    if not physical:
+        return TableSqlParts([], "", "", "", [])
+    partition = physical.get("partition")
+    fillfactor = physical.get("fillfactor")
+    before: List[str] = []
+    after: List[str] = []
+    kind = options = table_options = ""
+    if dbms == "sqlserver":
+        storage = ""
+        if partition:
+            column = partition["column"]
+            column_type = table.column(column).type.split(" IDENTITY")[0]
+            before.append(f"CREATE PARTITION FUNCTION pf_{table_name} ({column_type}) "
+                          f"AS RANGE RIGHT FOR VALUES ();")
+            before.append(f"CREATE PARTITION SCHEME ps_{table_name} AS PARTITION pf_{table_name} ALL TO ([PRIMARY]);")
+            storage = table_options = f" ON ps_{table_name} ({column})"
+        if fillfactor:
+            options = f" WITH (FILLFACTOR = {fillfactor})"
+        if physical.get("clustered_index"):
+            kind = " NONCLUSTERED"
+            clustered = ", ".join(physical["clustered_index"])
+            after.append(f"CREATE CLUSTERED INDEX cix_{table_name} ON {table_name} ({clustered}){options}{storage};")
+    elif dbms == "postgresql" and partition:
+        column = partition["column"]
+        if partition["method"] == "range":
+            table_options = f" PARTITION BY RANGE ({column})"
+            after.append(f"CREATE TABLE {table_name}_default PARTITION OF {table_name} DEFAULT;")
+        else:
+            count = partition["partitions"]
+            table_options = f" PARTITION BY HASH ({column})"
+            after.extend(
+                f"CREATE TABLE {table_name}_p{i} PARTITION OF {table_name} "
+                f"FOR VALUES WITH (MODULUS {count}, REMAINDER {i});"
+                for i in range(count)
+            )
+    elif dbms == "mysql" and partition:
+        column = partition["column"]
+        if partition["method"] == "hash":
+            table_options = f" PARTITION BY HASH ({column}) PARTITIONS {partition['partitions']}"
+        elif (table.column(column).type or "").upper().startswith("TIMESTAMP"):
+            table_options = (f" PARTITION BY RANGE (UNIX_TIMESTAMP({column})) "
+                             f"(PARTITION p_max VALUES LESS THAN MAXVALUE)")
+        else:
+            table_options = f" PARTITION BY RANGE COLUMNS({column}) (PARTITION p_max VALUES LESS THAN (MAXVALUE))"
+    return TableSqlParts(before, kind, options, table_options, after)
@@ -0,0 +1,368 @@
+"""
+Différence entre deux versions compilées d'un schéma (MPD) et script de migration par SGBD.
+
+Chaque objet (table, colonne, clé étrangère, contrainte d'unicité, index) reçoit une empreinte
+de contenu calculée sur ce qui s'écrit en DDL (type, NOT NULL, DEFAULT, colonnes, références) :
+deux objets de même nom et de même empreinte sont identiques et ne sont pas comparés plus loin.
+Les objets sont indexés par nom (dict), la comparaison est donc linéaire en taille du schéma ;
+les empreintes d'un MPD (SchemaIndex) se calculent une fois et se gardent en cache avec lui.
+
+Une colonne renommée apparaît comme supprimée + ajoutée (le MPD ne garde pas l'identité des
+attributs). Migration émise dans l'ordre :
+suppressions (clés étrangères, contraintes, index, tables), créations de tables,
+ALTER TABLE colonne par colonne, puis clés étrangères, index et contraintes ajoutés.
+SQLite ne sait pas modifier une colonne ni une clé primaire : la table est reconstruite
+(nouvelle table, copie des colonnes communes, remplacement, index recréés).
+SQL Server nomme lui-même la clé primaire et les contraintes DEFAULT du script de création :
+leur suppression retrouve le nom dans sys.key_constraints / sys.default_constraints (SQL dynamique).
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from views.model_converter import SQL_SEPARATOR, ModelConverter
+from views.model_ir import Column, Constraint, ForeignKey, Index, Mpd, Table
+
+# Suffixe de la table temporaire d'une reconstruction SQLite
+_REBUILD_SUFFIX = "__barrel_new"
+
+
+# Signatures, appelées pour chaque objet du schéma (champ absent = None, comme dans l'ancien format dict)
+def _column_signature(column: Column) -> Tuple:
+    return (column.get("type"), bool(column.get("nullable", True)), column.get("default"))
+
+
+def _table_signature(table: Table) -> Tuple:
+    return (tuple([(c.name, _column_signature(c)) for c in table.columns]), tuple(table.primary_key))
+
+
+def _fk_signature(fk: ForeignKey) -> Tuple:
+    return (fk.get("table"), fk.get("column"),
+            fk.get("referenced_table"), fk.get("referenced_column"))
+
+
+def _constraint_signature(constraint: Constraint) -> Tuple:
+    return (constraint.get("table"), tuple(constraint.get("columns") or ()))
+
+
+def _index_signature(index: Index) -> Tuple:
+    return (tuple(index.get("columns") or ()), index.get("type"),
+            tuple(index.get("include") or ()))
+
+
+class _Hashed:
+    """
+    Objets indexés par nom avec l'empreinte (hash 64 bits) de leur signature : {nom: (empreinte, objet)}.
+    Deux objets de même nom et de même empreinte sont considérés identiques.
+    """
+
+    __slots__ = ("items",)
+
+    def __init__(self, named: Iterable[Tuple[Any, Any]], signature_of: Callable[[Any], Tuple]):
+        self.items: Dict[Any, Tuple[int, Any]] = {}
+        for name, obj in named:
+            self.items.setdefault(name, (hash(signature_of(obj)), obj))
+
+    def changes(self, other: "_Hashed") -> Tuple[List[Any], List[Any]]:
+        """(objets de self absents ou modifiés dans other, objets de other absents ou modifiés dans self)."""
+        mine, theirs = self.items, other.items
+        removed = [obj for name, (h, obj) in mine.items() if theirs.get(name, (None,))[0] != h]
+        added = [obj for name, (h, obj) in theirs.items() if mine.get(name, (None,))[0] != h]
+        return removed, added
+
+
+def _named_foreign_keys(mpd: Mpd) -> Iterator[Tuple[Any, ForeignKey]]:
+    return ((fk.get("constraint_name") or _fk_signature(fk), fk) for fk in mpd.foreign_keys)
+
+
+def _named_constraints(mpd: Mpd) -> Iterator[Tuple[Any, Constraint]]:
+    return ((c.get("constraint_name") or _constraint_signature(c), c) for c in mpd.constraints)
+
+
+def _named_indexes(mpd: Mpd) -> Iterator[Tuple[Any, Tuple[str, Index]]]:
+    return (((name, index.get("name")), (name, index))
+            for name, table in mpd.tables.items() for index in table.get("indexes") or ())
+
+
+class TableDiff:
+    """Modifications d'une table présente dans les deux versions."""
+
+    __slots__ = ("name", "old", "new", "added_columns", "dropped_columns", "altered_columns")
+
+    def __init__(self, name: str, old: Table, new: Table):
+        self.name = name
+        self.old = old
+        self.new = new
+        self.added_columns: List[Column] = []
+        self.dropped_columns: List[Column] = []
+        self.altered_columns: List[Tuple[Column, Column]] = []
+
+    @property
+    def primary_key_changed(self) -> bool:
+        return list(self.old.primary_key) != list(self.new.primary_key)
+
+    def is_empty(self) -> bool:
+        return not (self.added_columns or self.dropped_columns or self.altered_columns or self.primary_key_changed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {
+            "table": self.name,
+            "added_columns": [c.name for c in self.added_columns],
+            "dropped_columns": [c.name for c in self.dropped_columns],
+            "altered_columns": [
+                {"column": new.name, "before": old.to_dict(), "after": new.to_dict()}
+                for old, new in self.altered_columns
+            ],
+        }
+        if self.primary_key_changed:
+            out["primary_key"] = {"before": list(self.old.primary_key), "after": list(self.new.primary_key)}
+        return out
+
+
+class SchemaDiff:
+    """Différence entre deux MPD (ancien → nouveau) d'un même SGBD."""
+
+    __slots__ = ("dbms", "old", "new", "added_tables", "dropped_tables", "altered_tables",
+                 "added_foreign_keys", "dropped_foreign_keys", "added_constraints", "dropped_constraints",
+                 "added_indexes", "dropped_indexes")
+
+    def __init__(self, old: Mpd, new: Mpd):
+        self.dbms = new.dbms
+        self.old = old
+        self.new = new
+        self.added_tables: List[str] = []
+        self.dropped_tables: List[str] = []
+        self.altered_tables: List[TableDiff] = []
+        self.added_foreign_keys: List[ForeignKey] = []
+        self.dropped_foreign_keys: List[ForeignKey] = []
+        self.added_constraints: List[Constraint] = []
+        self.dropped_constraints: List[Constraint] = []
+        self.added_indexes: List[Tuple[str, Index]] = []
+        self.dropped_indexes: List[Tuple[str, Index]] = []
+
+    def is_empty(self) -> bool:
+        return not any(getattr(self, field) for field in self.__slots__[3:])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dbms": self.dbms,
+            "added_tables": list(self.added_tables),
+            "dropped_tables": list(self.dropped_tables),
+            "altered_tables": [t.to_dict() for t in self.altered_tables],
+            "added_foreign_keys": [fk.to_dict() for fk in self.added_foreign_keys],
+            "dropped_foreign_keys": [fk.to_dict() for fk in self.dropped_foreign_keys],
+            "added_constraints": [c.to_dict() for c in self.added_constraints],
+            "dropped_constraints": [c.to_dict() for c in self.dropped_constraints],
+            "added_indexes": [{"table": t, **i.to_dict()} for t, i in self.added_indexes],
+            "dropped_indexes": [{"table": t, **i.to_dict()} for t, i in self.dropped_indexes],
+        }
+
+
+def _diff_table(name: str, old: Table, new: Table) -> TableDiff:
+    diff = TableDiff(name, old, new)
+    old_columns = _Hashed(((c.name, c) for c in old.columns), _column_signature)
+    new_columns = _Hashed(((c.name, c) for c in new.columns), _column_signature)
+    for column_name, (h, column) in new_columns.items.items():
+        previous = old_columns.items.get(column_name)
+        if previous is None:
+            diff.added_columns.append(column)
+        elif previous[0] != h:
+            diff.altered_columns.append((previous[1], column))
+    diff.dropped_columns = [c for n, (_, c) in old_columns.items.items() if n not in new_columns.items]
+    return diff
+
+
+class SchemaIndex:
+    """
+    Empreintes d'un MPD (tables, clés étrangères, contraintes, index), calculées une seule fois :
+    un index gardé en cache avec son MPD rend les diffs suivants proportionnels aux seules comparaisons.
+    """
+
+    __slots__ = ("mpd", "tables", "foreign_keys", "constraints", "indexes")
+
+    def __init__(self, mpd: Mpd):
+        self.mpd = mpd
+        self.tables = _Hashed(mpd.tables.items(), _table_signature)
+        self.foreign_keys = _Hashed(_named_foreign_keys(mpd), _fk_signature)
+        self.constraints = _Hashed(_named_constraints(mpd), _constraint_signature)
+        self.indexes = _Hashed(_named_indexes(mpd), lambda item: _index_signature(item[1]))
+
+
+def schema_index(mpd: Any, dbms: str = "mysql") -> SchemaIndex:
+    """SchemaIndex d'un MPD (SchemaIndex, Mpd, dict de generate_mpd, ou None pour un schéma vide)."""
+    if isinstance(mpd, SchemaIndex):
+        return mpd
+    if not isinstance(mpd, Mpd):
+        mpd = Mpd.from_dict(mpd) if mpd else Mpd(dbms)
+    return SchemaIndex(mpd)
+
+
+def diff_schemas(old: Any, new: Any) -> SchemaDiff:
+    """Compare deux MPD (voir schema_index) ; l'ancien peut être vide (None : création complète)."""
+    new = schema_index(new)
+    old = schema_index(old, new.mpd.dbms)
+    diff = SchemaDiff(old.mpd, new.mpd)
+
+    old_tables = old.tables.items
+    for name, (h, table) in new.tables.items.items():
+        previous = old_tables.get(name)
+        if previous is None:
+            diff.added_tables.append(name)
+        elif previous[0] != h:
+            table_diff = _diff_table(name, previous[1], table)
+            if not table_diff.is_empty():
+                diff.altered_tables.append(table_diff)
+    diff.dropped_tables = [name for name in old_tables if name not in new.tables.items]
+
+    diff.dropped_foreign_keys, diff.added_foreign_keys = old.foreign_keys.changes(new.foreign_keys)
+    diff.dropped_constraints, diff.added_constraints = old.constraints.changes(new.constraints)
+    diff.dropped_indexes, diff.added_indexes = old.indexes.changes(new.indexes)
+    return diff
+
+
+class MigrationWriter:
+    """Instructions SQL d'une SchemaDiff pour son SGBD (mysql, postgresql, sqlite, sqlserver)."""
+
+    def __init__(self, converter: Optional[ModelConverter] = None):
+        self.converter = converter or ModelConverter()
+
+    def iter_sql(self, diff: SchemaDiff) -> Iterator[str]:
+        dbms = diff.dbms
+        rebuilt = {t.name for t in diff.altered_tables if dbms == "sqlite" and self._needs_rebuild(t)}
+        dropped_tables = set(diff.dropped_tables)
+        gone = dropped_tables | rebuilt
+
+        for fk in diff.dropped_foreign_keys:
+            if fk.get("table") not in gone:
+                yield self._drop_constraint(fk.get("table"), fk.get("constraint_name"), dbms, foreign_key=True)
+        for constraint in diff.dropped_constraints:
+            if constraint.get("table") not in gone:
+                yield self._drop_constraint(constraint.get("table"), constraint.get("constraint_name"), dbms)
+        for table_name, index in diff.dropped_indexes:
+            if table_name not in gone:
+                yield self._drop_index(table_name, index.name, dbms)
+        for table_name in diff.dropped_tables:
+            yield f"DROP TABLE {table_name};"
+
+        for table_name in diff.added_tables:
+            yield self.converter._create_table_sql(table_name, diff.new.tables[table_name], dbms)
+        for table_diff in diff.altered_tables:
+            if table_diff.name in rebuilt:
+                yield from self._rebuild_table(table_diff, dbms)
+            else:
+                yield from self._alter_table(table_diff, dbms)
+
+        for fk in diff.added_foreign_keys:
+            yield self.converter._foreign_key_sql(fk)
+        for table_name in rebuilt:
+            yield from self.converter._index_sql(table_name, diff.new.tables[table_name])
+        for table_name, index in diff.added_indexes:
+            if table_name not in rebuilt:
+                yield f"CREATE INDEX {index.name} ON {table_name} ({', '.join(index.columns)});"
+        for constraint in diff.added_constraints:
+            if constraint.get("constraint_name"):
+                yield self.converter._unique_constraint_sql(constraint)
+
+    def sql(self, diff: SchemaDiff) -> str:
+        return SQL_SEPARATOR.join(self.iter_sql(diff))
+
+    @staticmethod
+    def _needs_rebuild(table_diff: TableDiff) -> bool:
+        return bool(table_diff.altered_columns or table_diff.dropped_columns or table_diff.primary_key_changed)
+
+    @staticmethod
+    def _drop_constraint(table: str, name: str, dbms: str, foreign_key: bool = False) -> str:
+        if dbms == "mysql":
+            return f"ALTER TABLE {table} DROP {'FOREIGN KEY' if foreign_key else 'INDEX'} {name};"
+        return f"ALTER TABLE {table} DROP CONSTRAINT {name};"
+
+    @staticmethod
+    def _drop_index(table: str, name: str, dbms: str) -> str:
+        if dbms in ("mysql", "sqlserver"):
+            return f"DROP INDEX {name} ON {table};"
+        return f"DROP INDEX {name};"
+
+    @staticmethod
+    def _sqlserver_drop_primary_key(table: str) -> str:
+        """SQL Server : la clé primaire porte un nom choisi par le serveur, retrouvé dans sys.key_constraints."""
+        return (f"DECLARE @pk_{table} NVARCHAR(MAX);\n"
+                f"SELECT @pk_{table} = N'ALTER TABLE {table} DROP CONSTRAINT ' + QUOTENAME(name)\n"
+                f"    FROM sys.key_constraints WHERE parent_object_id = OBJECT_ID(N'{table}') AND type = 'PK';\n"
+                f"IF @pk_{table} IS NOT NULL EXEC sp_executesql @pk_{table};")
+
+    @staticmethod
+    def _sqlserver_drop_default(table: str, column: str) -> str:
+        """SQL Server : contrainte DEFAULT de table.column, nommée par le serveur, retrouvée dans sys.default_constraints."""
+        variable = f"@df_{table}_{column}"
+        return (f"DECLARE {variable} NVARCHAR(MAX);\n"
+                f"SELECT {variable} = N'ALTER TABLE {table} DROP CONSTRAINT ' + QUOTENAME(d.name)\n"
+                f"    FROM sys.default_constraints d\n"
+                f"    JOIN sys.columns c ON c.object_id = d.parent_object_id AND c.column_id = d.parent_column_id\n"
+                f"    WHERE d.parent_object_id = OBJECT_ID(N'{table}') AND c.name = N'{column}';\n"
+                f"IF {variable} IS NOT NULL EXEC sp_executesql {variable};")
+
+    def _alter_table(self, table_diff: TableDiff, dbms: str) -> Iterator[str]:
+        table = table_diff.name
+        add = "ADD" if dbms == "sqlserver" else "ADD COLUMN"
+        if table_diff.primary_key_changed and table_diff.old.primary_key:
+            if dbms == "mysql":
+                yield f"ALTER TABLE {table} DROP PRIMARY KEY;"
+            elif dbms == "postgresql":
+                yield f"ALTER TABLE {table} DROP CONSTRAINT {table}_pkey;"
+            else:
+                yield self._sqlserver_drop_primary_key(table)
+        for column in table_diff.added_columns:
+            yield f"ALTER TABLE {table} {add} {self.converter._column_sql(column)};"
+        for old, new in table_diff.altered_columns:
+            yield from self._alter_column(table, old, new, dbms)
+        for column in table_diff.dropped_columns:
+            if dbms == "sqlserver" and column.get("default") is not None:
+                yield self._sqlserver_drop_default(table, column.name)
+            yield f"ALTER TABLE {table} DROP COLUMN {column.name};"
+        if table_diff.primary_key_changed and table_diff.new.primary_key:
+            yield f"ALTER TABLE {table} ADD PRIMARY KEY ({', '.join(table_diff.new.primary_key)});"
+
+    def _alter_column(self, table: str, old: Column, new: Column, dbms: str) -> Iterator[str]:
+        if dbms == "mysql":
+            yield f"ALTER TABLE {table} MODIFY COLUMN {self.converter._column_sql(new)};"
+            return
+        if dbms == "sqlserver":
+            # ALTER COLUMN est refusé tant qu'une contrainte DEFAULT dépend de la colonne :
+            # elle est supprimée avant, puis recréée si la colonne garde une valeur par défaut.
+            altered = (old.get("type") != new.get("type")
+                       or bool(old.get("nullable", True)) != bool(new.get("nullable", True)))
+            redefault = altered or old.get("default") != new.get("default")
+            if redefault and old.get("default") is not None:
+                yield self._sqlserver_drop_default(table, new.name)
+            if altered:
+                null = "NULL" if new.get("nullable", True) else "NOT NULL"
+                yield f"ALTER TABLE {table} ALTER COLUMN {new.name} {new.type} {null};"
+            if redefault and new.get("default") is not None:
+                yield f"ALTER TABLE {table} ADD DEFAULT {self.converter._default_sql(new.default)} FOR {new.name};"
+            return
+        # PostgreSQL
+        if old.get("type") != new.get("type"):
+            yield f"ALTER TABLE {table} ALTER COLUMN {new.name} TYPE {new.type};"
+        if bool(old.get("nullable", True)) != bool(new.get("nullable", True)):
+            action = "DROP NOT NULL" if new.get("nullable", True) else "SET NOT NULL"
+            yield f"ALTER TABLE {table} ALTER COLUMN {new.name} {action};"
+        if old.get("default") != new.get("default"):
+            if new.get("default") is None:
+                yield f"ALTER TABLE {table} ALTER COLUMN {new.name} DROP DEFAULT;"
+            else:
+                yield f"ALTER TABLE {table} ALTER COLUMN {new.name} SET DEFAULT {self.converter._default_sql(new.default)};"
+
+    def _rebuild_table(self, table_diff: TableDiff, dbms: str) -> Iterator[str]:
+        table = table_diff.name
+        temporary = f"{table}{_REBUILD_SUFFIX}"
+        kept = {c.name for c in table_diff.old.columns}
+        common = ", ".join(c.name for c in table_diff.new.columns if c.name in kept)
+        yield self.converter._create_table_sql(temporary, table_diff.new, dbms)
+        if common:
+            yield f"INSERT INTO {temporary} ({common}) SELECT {common} FROM {table};"
+        yield f"DROP TABLE {table};"
+        yield f"ALTER TABLE {temporary} RENAME TO {table};"
+
+
+def migration_sql(old: Any, new: Any) -> str:
+    """Script de migration de l'ancien MPD vers le nouveau (SGBD du nouveau MPD)."""
+    return MigrationWriter().sql(diff_schemas(old, new))
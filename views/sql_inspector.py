@@ -1,9 +1,16 @@
 from typing import Dict, List, Any, Optional
-import sqlparse
-from sqlparse.sql import Token, TokenList, Identifier, Function
-from sqlparse.tokens import Keyword, Name, Punctuation, String, Number
+try:
+    import sqlparse
+    from sqlparse.sql import Token, TokenList, Identifier, Function
+    from sqlparse.tokens import Keyword, Name, Punctuation, String, Number
+except ImportError:  # pragma: no cover - dépendance optionnelle (seuls les anciens helpers à jetons l'utilisent)
+    sqlparse = None
+    Token = TokenList = Identifier = Function = Any
+    Keyword = Name = Punctuation = String = Number = None
 import re
 
+from views.ddl_scanner import scan_ddl
+
 class SQLInspector:
     """Inspecteur intelligent de schémas SQL"""
     
@@ -30,35 +37,53 @@ class SQLInspector:
             "constraints": []
         }
         
-        # Parser le script SQL
-        statements = sqlparse.parse(sql_script)
-        
-        # Analyser chaque instruction
-        for statement in statements:
-            # Nettoyer et normaliser l'instruction
-            statement_str = str(statement).strip()
-            
-            # Analyser CREATE TABLE
-            if "CREATE TABLE" in statement_str.upper():
-                # Extraire le nom de la table
-                match = re.search(r'CREATE\s+TABLE\s+(\w+)', statement_str, re.IGNORECASE)
-                if match:
-                    table_name = match.group(1).lower()
-                    self._analyze_create_table(statement_str, table_name)
-            
-            # Analyser ALTER TABLE
-            elif "ALTER TABLE" in statement_str.upper():
-                # Extraire le nom de la table
-                match = re.search(r'ALTER\s+TABLE\s+(\w+)', statement_str, re.IGNORECASE)
-                if match:
-                    table_name = match.group(1).lower()
-                    self._analyze_alter_table(statement_str, table_name)
+        # Lecture en flux des seules instructions CREATE / ALTER TABLE (pas d'arbre sqlparse complet)
+        ddl, _ = scan_ddl(sql_script)
+        for table_name, table in ddl.tables.items():
+            self.schema["tables"][table_name] = {
+                "name": table_name,
+                "columns": [self._column_from_ddl(column) for column in table["columns"]],
+                "primary_key": [c.lower() for c in table["primary_key"]],
+            }
+            if table["primary_key"]:
+                self.schema["constraints"].append({
+                    "table": table_name,
+                    "type": "PRIMARY KEY",
+                    "columns": [c.lower() for c in table["primary_key"]],
+                })
+            for columns in table["unique"]:
+                self.schema["constraints"].append({
+                    "table": table_name,
+                    "type": "UNIQUE",
+                    "columns": [c.lower() for c in columns],
+                })
+        for fk in ddl.foreign_keys:
+            if fk["referenced_columns"]:
+                self.schema["foreign_keys"].append({
+                    "table": fk["table"],
+                    "columns": [c.lower() for c in fk["columns"]],
+                    "referenced_table": fk["referenced_table"],
+                    "referenced_columns": [c.lower() for c in fk["referenced_columns"]],
+                })
         
         # Analyser les relations
         self._analyze_relationships()
         
         return self.schema
         
+    def _column_from_ddl(self, column: Dict) -> Dict:
+        """Colonne lue par views.ddl_scanner → format de l'inspecteur."""
+        result = {
+            "name": column["name"].lower(),
+            "type": column["type"],
+            "nullable": column["nullable"],
+        }
+        if column["primary_key"]:
+            result["primary_key"] = True
+        if column["unique"]:
+            result["unique"] = True
+        return result
+
     def _is_create_table(self, statement: TokenList) -> bool:
         """Vérifie si l'instruction est un CREATE TABLE."""
         return (len(statement.tokens) >= 2 and
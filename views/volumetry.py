@@ -0,0 +1,270 @@
+"""
+Estimation de la volumétrie d'un MPD : largeur de ligne par SGBD, taille des tables et des index.
+
+Entrées :
+- rows : nombre de lignes estimé par entité (nom d'entité ou de table, casse indifférente),
+  à défaut l'indication estimated_rows de l'entité reportée sur la table ;
+- fanout : nombre moyen de liens par association (nom de l'association) :
+  - association n,n : nombre moyen d'occurrences de entity2 par occurrence de entity1,
+    la table de liaison compte rows(entity1) x fanout lignes ;
+  - association 1,n : nombre moyen de lignes de la table porteuse de la clé étrangère par ligne
+    de la table référencée (utilisé si la table porteuse n'a pas d'estimation propre).
+  Les tables sans estimation ni fan-out prennent default_rows.
+
+Taille d'une ligne : somme des tailles de colonnes d'après le type traduit pour le SGBD
+(chaînes variables remplies à VARCHAR_FILL en moyenne, TEXT / BLOB à TEXT_BYTES), plus l'en-tête
+de ligne et le bitmap des NULL du moteur. Taille d'un index B-tree : (clé + pointeur de ligne + en-tête)
+par ligne, pages remplies à INDEX_FILL. Clé primaire organisée en index cluster (InnoDB, SQL Server) :
+pas d'index séparé, et les index secondaires embarquent la clé primaire comme pointeur.
+Ordres de grandeur pour le dimensionnement, pas une mesure au octet près.
+
+Configuration : BARREL_VOLUMETRY_DEFAULT_ROWS, BARREL_VOLUMETRY_VARCHAR_FILL, BARREL_VOLUMETRY_TEXT_BYTES.
+"""
+
+import math
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from views.model_ir import Mpd, Table
+
+DEFAULT_ROWS = int(os.environ.get("BARREL_VOLUMETRY_DEFAULT_ROWS", "1000"))
+VARCHAR_FILL = float(os.environ.get("BARREL_VOLUMETRY_VARCHAR_FILL", "0.5"))
+TEXT_BYTES = int(os.environ.get("BARREL_VOLUMETRY_TEXT_BYTES", "512"))
+# Remplissage moyen d'un B-tree alimenté dans le désordre (~ ln 2)
+INDEX_FILL = 0.7
+
+DIALECTS = ("mysql", "postgresql", "sqlite", "sqlserver")
+# Place libre laissée dans les pages de données (InnoDB réserve 1/16 de chaque page)
+_TABLE_FILL = {"mysql": 15 / 16, "postgresql": 1.0, "sqlite": 1.0, "sqlserver": 1.0}
+# En-tête de ligne + pointeur de ligne dans la page
+_ROW_OVERHEAD = {"mysql": 20, "postgresql": 28, "sqlite": 5, "sqlserver": 9}
+# En-tête d'une entrée d'index (hors clé et pointeur de ligne)
+_INDEX_ENTRY_OVERHEAD = {"mysql": 6, "postgresql": 12, "sqlite": 4, "sqlserver": 7}
+# Pointeur de ligne d'un index secondaire quand la table n'est pas organisée en cluster
+_ROW_POINTER = {"postgresql": 6, "sqlite": 8}
+_CLUSTERED = ("mysql", "sqlserver")
+
+# Tailles fixes (octets) : mysql, postgresql, sqlite, sqlserver
+_FIXED_BYTES = {
+    "TINYINT": (1, 2, 1, 1), "SMALLINT": (2, 2, 2, 2), "MEDIUMINT": (3, 4, 3, 4),
+    "INT": (4, 4, 4, 4), "INTEGER": (4, 4, 4, 4), "BIGINT": (8, 8, 8, 8),
+    "SERIAL": (4, 4, 4, 4), "BIGSERIAL": (8, 8, 8, 8),
+    "BOOLEAN": (1, 1, 1, 1), "BOOL": (1, 1, 1, 1), "BIT": (1, 1, 1, 1),
+    "FLOAT": (4, 8, 8, 8), "REAL": (4, 4, 8, 4), "DOUBLE": (8, 8, 8, 8), "MONEY": (8, 8, 8, 8),
+    "DATE": (3, 4, 10, 3), "TIME": (3, 8, 8, 5), "YEAR": (1, 2, 4, 2),
+    "DATETIME": (5, 8, 19, 8), "DATETIME2": (8, 8, 19, 8), "TIMESTAMP": (4, 8, 19, 8),
+    "UUID": (36, 16, 36, 16), "UNIQUEIDENTIFIER": (16, 16, 36, 16),
+}
+_VARIABLE = ("VARCHAR", "VARCHAR2", "NVARCHAR", "NVARCHAR2", "VARBINARY", "CHARACTER")
+_FIXED_LENGTH = ("CHAR", "NCHAR", "BINARY")
+_LARGE = ("TEXT", "NTEXT", "CLOB", "BLOB", "BYTEA", "JSON", "JSONB", "XML", "LONGTEXT", "MEDIUMTEXT")
+_TYPE_RE = re.compile(r"^\s*([A-Z0-9_]+)(?:\s+VARYING)?\s*(?:\(\s*(\w+)\s*(?:,\s*(\d+)\s*)?\))?")
+_MYSQL_DECIMAL_LEFTOVER = (0, 1, 1, 2, 2, 3, 3, 4, 4, 4)
+
+
+def _mysql_decimal_bytes(precision: int, scale: int) -> int:
+    total = 0
+    for digits in (precision - scale, scale):
+        total += 4 * (digits // 9) + _MYSQL_DECIMAL_LEFTOVER[digits % 9]
+    return total
+
+
+def _decimal_bytes(dbms: str, precision: int, scale: int) -> int:
+    if dbms == "mysql":
+        return _mysql_decimal_bytes(precision, scale)
+    if dbms == "postgresql":
+        return 3 + 2 * math.ceil(precision / 4)
+    if dbms == "sqlserver":
+        return 5 if precision <= 9 else 9 if precision <= 19 else 13 if precision <= 28 else 17
+    return 8
+
+
+def _variable_bytes(dbms: str, max_chars: Optional[int], wide: bool) -> int:
+    """Chaîne variable : remplissage moyen + préfixe de longueur."""
+    char_bytes = 2 if wide and dbms == "sqlserver" else 1
+    if max_chars is None:
+        data = TEXT_BYTES
+    else:
+        data = max(1, int(max_chars * char_bytes * VARCHAR_FILL))
+    if dbms == "mysql":
+        prefix = 1 if (max_chars or 256) * char_bytes <= 255 else 2
+    elif dbms == "postgresql":
+        prefix = 1 if data < 127 else 4
+    elif dbms == "sqlserver":
+        prefix = 2
+    else:
+        prefix = 1
+    return data + prefix
+
+
+@lru_cache(maxsize=4096)
+def column_bytes(type_str: str, dbms: str) -> int:
+    """Taille moyenne estimée (octets) d'une valeur du type SQL traduit pour le SGBD."""
+    match = _TYPE_RE.match((type_str or "").upper())
+    if not match:
+        return 8
+    base, arg1, arg2 = match.groups()
+    slot = DIALECTS.index(dbms) if dbms in DIALECTS else 0
+    if base in _FIXED_BYTES:
+        return _FIXED_BYTES[base][slot]
+    if base in ("DECIMAL", "NUMERIC", "NUMBER"):
+        precision = int(arg1) if arg1 and arg1.isdigit() else 10
+        return _decimal_bytes(dbms, precision, int(arg2) if arg2 else 0)
+    length = int(arg1) if arg1 and arg1.isdigit() else None
+    if base in _VARIABLE:
+        return _variable_bytes(dbms, length, base.startswith("N"))
+    if base in _FIXED_LENGTH:
+        return (length or 1) * (2 if base == "NCHAR" and dbms == "sqlserver" else 1)
+    if base in _LARGE:
+        return _variable_bytes(dbms, None, base == "NTEXT")
+    if base.startswith("DOUBLE"):
+        return 8
+    return 8
+
+
+def row_bytes(table: Table, dbms: str) -> int:
+    """Largeur moyenne estimée d'une ligne de la table MPD (colonnes + en-tête + bitmap des NULL)."""
+    columns = table.columns
+    data = sum(column_bytes(c.type, dbms) for c in columns)
+    if dbms == "mysql":
+        nulls = math.ceil(sum(1 for c in columns if c.get("nullable", True)) / 8)
+    elif dbms == "postgresql":
+        nulls = math.ceil(len(columns) / 8) if any(c.get("nullable", True) for c in columns) else 0
+    elif dbms == "sqlserver":
+        nulls = 2 + math.ceil(len(columns) / 8)
+    else:
+        nulls = len(columns)  # en-tête d'enregistrement SQLite : un octet par colonne
+    return data + nulls + _ROW_OVERHEAD.get(dbms, 20)
+
+
+def _key_bytes(table: Table, columns: Sequence[str], dbms: str) -> int:
+    total = 0
+    for name in columns:
+        column = table.column(name)
+        total += column_bytes(column.type, dbms) if column is not None else 8
+    return total
+
+
+def _rowid_primary_key(table: Table) -> bool:
+    """SQLite : INTEGER PRIMARY KEY AUTOINCREMENT est l'identifiant de ligne, sans index séparé."""
+    if len(table.primary_key) != 1:
+        return False
+    column = table.column(table.primary_key[0])
+    return column is not None and "PRIMARY KEY" in (column.type or "").upper()
+
+
+def table_indexes(table: Table, unique_keys: Sequence[Sequence[str]], dbms: str) -> List[Tuple[str, List[str]]]:
+    """(nom, colonnes) des B-trees séparés de la table : clé primaire hors cluster, unicités, index secondaires."""
+    indexes = []
+    if table.primary_key and dbms not in _CLUSTERED and not (dbms == "sqlite" and _rowid_primary_key(table)):
+        indexes.append((f"pk_{table.name}", list(table.primary_key)))
+    indexes.extend((f"uq_{table.name}_{'_'.join(columns)}", list(columns)) for columns in unique_keys)
+    indexes.extend((index.name, list(index.columns)) for index in table.get("indexes") or ())
+    return indexes
+
+
+def index_bytes(table: Table, columns: Sequence[str], rows: float, dbms: str) -> int:
+    """Taille estimée d'un index B-tree sur columns pour rows lignes."""
+    if dbms in _CLUSTERED:
+        pointer = _key_bytes(table, table.primary_key, dbms) if table.primary_key else 8
+    else:
+        pointer = _ROW_POINTER.get(dbms, 8)
+    entry = _key_bytes(table, columns, dbms) + pointer + _INDEX_ENTRY_OVERHEAD.get(dbms, 8)
+    return int(rows * entry / INDEX_FILL)
+
+
+class _RowResolver:
+    """Nombre de lignes de chaque table : estimation, dérivation par fan-out, ou valeur par défaut."""
+
+    def __init__(self, mpd: Mpd, mcd: Dict, rows: Dict[str, float], fanout: Dict[str, float], default_rows: int):
+        from views.model_converter import ModelConverter
+        self.tables = mpd.tables
+        self.rows = {str(k).lower(): float(v) for k, v in (rows or {}).items()}
+        self.default_rows = default_rows
+        self.derived: Dict[str, Tuple[str, str, float]] = {}  # table → (table de base, association, fan-out)
+        fanout = {str(k): float(v) for k, v in (fanout or {}).items()}
+        converter = ModelConverter()
+        for association in (mcd or {}).get("associations", []):
+            name = association.get("name") or ""
+            entity1, entity2 = association["entity1"].lower(), association["entity2"].lower()
+            junction = next((n for n in converter.junction_table_names(association) if n in self.tables), None)
+            if junction is not None:
+                self.derived.setdefault(junction, (entity1, name, fanout.get(name, 1.0)))
+            elif name in fanout:
+                for fk in mpd.foreign_keys:
+                    if {fk.get("table"), fk.get("referenced_table")} == {entity1, entity2}:
+                        self.derived.setdefault(fk.get("table"), (fk.get("referenced_table"), name, fanout[name]))
+                        break
+        self.cache: Dict[str, Tuple[float, str]] = {}
+
+    def resolve(self, table: str, visiting: Optional[set] = None) -> Tuple[float, str]:
+        """(lignes, origine de l'estimation)."""
+        if table in self.cache:
+            return self.cache[table]
+        if table in self.rows:
+            result = (self.rows[table], "estimation")
+        elif table in self.tables and self.tables[table].get("estimated_rows"):
+            result = (float(self.tables[table].get("estimated_rows")), "estimation")
+        elif table in self.derived and table not in (visiting or ()):
+            base, association, fanout = self.derived[table]
+            base_rows, _ = self.resolve(base, (visiting or set()) | {table})
+            result = (base_rows * fanout, f"{base} x {fanout:g} ({association})")
+        else:
+            result = (float(self.default_rows), "défaut")
+        self.cache[table] = result
+        return result
+
+
+def resolve_table_rows(mpd: Mpd, mcd: Optional[Dict] = None, rows: Optional[Dict[str, float]] = None,
+                       fanout: Optional[Dict[str, float]] = None,
+                       default_rows: Optional[int] = None) -> Dict[str, Tuple[float, str]]:
+    """Nombre de lignes de chaque table du MPD et origine de l'estimation (voir le docstring du module)."""
+    resolver = _RowResolver(mpd, mcd, rows, fanout, DEFAULT_ROWS if default_rows is None else default_rows)
+    return {name: resolver.resolve(name) for name in mpd.tables}
+
+
+def estimate_volumetry(mpd: Mpd, mcd: Optional[Dict] = None, rows: Optional[Dict[str, float]] = None,
+                       fanout: Optional[Dict[str, float]] = None, default_rows: Optional[int] = None) -> Dict:
+    """
+    Volumétrie du MPD (voir le docstring du module) ; mcd au format ModelConverter (associations).
+    Retourne: dbms, tables (par table : rows, rows_source, row_bytes, data_bytes, index_bytes,
+    total_bytes, indexes), total (rows, data_bytes, index_bytes, total_bytes).
+    """
+    dbms = mpd.dbms
+    table_rows = resolve_table_rows(mpd, mcd, rows, fanout, default_rows)
+    uniques: Dict[str, List[List[str]]] = {}
+    for constraint in mpd.constraints:
+        if constraint.get("columns"):
+            uniques.setdefault(constraint.get("table"), []).append(list(constraint.get("columns")))
+
+    tables = []
+    total = {"rows": 0, "data_bytes": 0, "index_bytes": 0, "total_bytes": 0}
+    for name, table in mpd.tables.items():
+        n_rows, source = table_rows[name]
+        width = row_bytes(table, dbms)
+        data = int(n_rows * width / _TABLE_FILL.get(dbms, 1.0))
+        indexes = [
+            {"name": index_name, "columns": columns, "bytes": index_bytes(table, columns, n_rows, dbms)}
+            for index_name, columns in table_indexes(table, uniques.get(name, ()), dbms)
+        ]
+        index_total = sum(i["bytes"] for i in indexes)
+        tables.append({
+            "table": name, "rows": int(n_rows), "rows_source": source, "row_bytes": width,
+            "data_bytes": data, "index_bytes": index_total, "total_bytes": data + index_total, "indexes": indexes,
+        })
+        total["rows"] += int(n_rows)
+        total["data_bytes"] += data
+        total["index_bytes"] += index_total
+    total["total_bytes"] = total["data_bytes"] + total["index_bytes"]
+    return {"dbms": dbms, "tables": tables, "total": total}
+
+
+def format_bytes(size: float) -> str:
+    """Taille lisible (o, Ko, Mo, Go, To)."""
+    for unit in ("o", "Ko", "Mo", "Go"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "o" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} To"